@@ -11,6 +11,7 @@ project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
 from src.core.system_controller import SystemController
+from src.utils.bus_manager import get_bus_manager
 
 
 async def test_controller():
@@ -57,6 +58,7 @@ async def test_controller():
     
     # Cleanup
     await controller.cleanup()
+    await get_bus_manager().close()
     print("\n✓ Test complete")
 
 
@@ -1,13 +1,23 @@
 /**
  * Sleep Checker - KWin Idle Dim Detection Script
  * 
- * Emits a custom D-Bus signal when the screen dims/blanks due to inactivity.
- * The Python service subscribes to this signal to trigger face detection.
+ * Calls the Python D-Bus service when the screen dims/blanks due to inactivity.
+ * The Python service exports org.sleepchecker.IdleNotifier and triggers face
+ * detection when the method is called (callDBus() sends method calls, not signals).
  * 
- * Signal: org.sleepchecker.IdleNotifier.screenDimmed(boolean)
+ * Method: org.sleepchecker.IdleNotifier.stateChanged(boolean, uint64 seq)
  *   - true  → Screen dimming/blanking from inactivity → Start face detection
  *   - false → User activity detected → Stop detection / release inhibitors
- * 
+ *   seq grows with every call (and across script reloads), so the service
+ *   drops duplicated or reordered calls.
+ *
+ * Method: org.sleepchecker.IdleNotifier.GetState() → (boolean, uint64)
+ *   Polled on load and every RESYNC_INTERVAL_MS; if the service restarted
+ *   or missed a call, the current state is sent again.
+ *
+ * Activity handlers (cursor, focus, desktop) are throttled: they fire
+ * hundreds of times a second, but only the first one after a dim matters.
+ *
  * Only fires on inactivity-based events, NOT on lid close or sleep button.
  */
 (function () {
@@ -16,12 +26,30 @@
     var SERVICE   = "org.sleepchecker.IdleNotifier";
     var PATH      = "/org/sleepchecker/IdleNotifier";
     var INTERFACE = "org.sleepchecker.IdleNotifier";
-    var SIGNAL    = "screenDimmed";
+    var SIGNAL    = "stateChanged";
+
+    var ACTIVITY_INTERVAL_MS = 1000;
+    var RESYNC_INTERVAL_MS   = 30000;
 
     var currentlyDimmed = false;
+    var seq = 0;
+    var lastActivityAt = 0;
+    var lastResyncAt = 0;
 
     function emitSignal(isDimmed) {
-        callDBus(SERVICE, PATH, INTERFACE, SIGNAL, isDimmed);
+        // Wall-clock based so a reloaded script never reuses a sequence number
+        seq = Math.max(seq + 1, Date.now());
+        callDBus(SERVICE, PATH, INTERFACE, SIGNAL, isDimmed, seq);
+    }
+
+    function resync() {
+        lastResyncAt = Date.now();
+        callDBus(SERVICE, PATH, INTERFACE, "GetState", function (serviceDimmed, serviceSeq) {
+            if (serviceDimmed !== currentlyDimmed || serviceSeq < seq) {
+                emitSignal(currentlyDimmed);
+                print("SleepChecker: Service state out of sync → resent " + currentlyDimmed);
+            }
+        });
     }
 
     function onIdleDetected(source) {
@@ -32,6 +60,20 @@
         }
     }
 
+    // High-rate sources: at most one call per ACTIVITY_INTERVAL_MS
+    function onFrequentActivity(source) {
+        var now = Date.now();
+        if (now - lastActivityAt < ACTIVITY_INTERVAL_MS) {
+            return;
+        }
+        lastActivityAt = now;
+        if (currentlyDimmed) {
+            onActivityDetected(source);
+        } else if (now - lastResyncAt >= RESYNC_INTERVAL_MS) {
+            resync();
+        }
+    }
+
     function onActivityDetected(source) {
         if (currentlyDimmed) {
             currentlyDimmed = false;
@@ -87,22 +129,24 @@
 
     if (workspace.hasOwnProperty("currentDesktopChanged")) {
         workspace.currentDesktopChanged.connect(function () {
-            onActivityDetected("desktop switched");
+            onFrequentActivity("desktop switched");
         });
     }
 
     if (workspace.hasOwnProperty("windowActivated")) {
         workspace.windowActivated.connect(function () {
-            onActivityDetected("window focus changed");
+            onFrequentActivity("window focus changed");
         });
     }
 
     if (workspace.hasOwnProperty("cursorPosChanged")) {
         workspace.cursorPosChanged.connect(function () {
-            onActivityDetected("cursor moved");
+            onFrequentActivity("cursor moved");
         });
     }
 
+    resync();
+
     print("SleepChecker: KWin idle detection script loaded");
     print("SleepChecker: Signal → " + INTERFACE + "." + SIGNAL);
     print("SleepChecker: Monitoring " + (typeof workspace.screens !== "undefined" ? workspace.screens.length : 0) + " screen(s)");
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Startup Benchmark
+Measures how fast the daemon comes up: a `python -X importtime` breakdown
+of the daemon module and the wall time from process spawn until
+org.sleepchecker.IdleNotifier is owned on the session bus
+
+Run inside a session (or under `dbus-run-session -- python3 scripts/benchmark_startup.py`)
+"""
+
+import argparse
+import asyncio
+import os
+import signal
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+DAEMON = PROJECT_ROOT / "src" / "daemon" / "main_service.py"
+BUS_NAME = "org.sleepchecker.IdleNotifier"
+HEAVY_MODULES = ("cv2", "numpy")
+
+
+def importtime_breakdown(module: str) -> List[Tuple[int, int, str]]:
+    """
+    Import a module in a fresh interpreter with -X importtime
+
+    Args:
+        module: Dotted module name
+
+    Returns:
+        List of (self_us, cumulative_us, name) for every imported module
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_ROOT, capture_output=True, text=True
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((int(self_us), int(cumulative_us), name.rstrip()))
+    return rows
+
+
+def print_breakdown(module: str, top: int) -> None:
+    """Print the slowest top-level imports and whether heavy modules load"""
+    rows = importtime_breakdown(module)
+    total = sum(self_us for self_us, _, _ in rows)
+    print(f"Import of {module}: {total / 1000:.1f} ms across {len(rows)} modules")
+
+    # Direct children of the import (one level of indentation in -X importtime)
+    top_level = [r for r in rows if len(r[2]) - len(r[2].lstrip()) <= 3]
+    for self_us, cumulative_us, name in sorted(top_level, key=lambda r: -r[1])[:top]:
+        print(f"  {cumulative_us / 1000:8.1f} ms  {name.strip()}")
+
+    loaded = {name.strip() for _, _, name in rows}
+    for heavy in HEAVY_MODULES:
+        print(f"  {heavy:<8} imported before bus registration: {'YES' if heavy in loaded else 'no'}")
+
+
+async def time_to_bus_name(timeout: float) -> float:
+    """
+    Spawn the daemon and wait until it owns the IdleNotifier bus name
+
+    Returns:
+        Seconds from spawn to NameOwnerChanged
+    """
+    from dbus_next import Message, MessageType
+    from dbus_next.aio import MessageBus
+
+    bus = await MessageBus().connect()
+    acquired = asyncio.Event()
+
+    def on_message(msg: Message) -> None:
+        if (msg.message_type == MessageType.SIGNAL and msg.member == "NameOwnerChanged"
+                and msg.body[0] == BUS_NAME and msg.body[2]):
+            acquired.set()
+
+    bus.add_message_handler(on_message)
+    await bus.call(Message(
+        destination="org.freedesktop.DBus", path="/org/freedesktop/DBus",
+        interface="org.freedesktop.DBus", member="AddMatch", signature="s",
+        body=[f"type='signal',member='NameOwnerChanged',arg0='{BUS_NAME}'"]
+    ))
+
+    start = time.monotonic()
+    proc = subprocess.Popen([sys.executable, str(DAEMON)], cwd=PROJECT_ROOT,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        await asyncio.wait_for(acquired.wait(), timeout)
+        return time.monotonic() - start
+    finally:
+        proc.send_signal(signal.SIGTERM)
+        try:
+            proc.wait(5)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+        bus.disconnect()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Sleep Checker startup benchmark")
+    parser.add_argument("--runs", type=int, default=5, help="daemon launches to time")
+    parser.add_argument("--top", type=int, default=10, help="slowest imports to list")
+    parser.add_argument("--timeout", type=float, default=10.0, help="seconds to wait for the bus name")
+    args = parser.parse_args()
+
+    print_breakdown("src.daemon.main_service", args.top)
+
+    if not os.environ.get("DBUS_SESSION_BUS_ADDRESS"):
+        print("\nNo session bus: skipping time-to-bus-name (use dbus-run-session)")
+        return 0
+
+    samples = []
+    for _ in range(args.runs):
+        try:
+            samples.append(asyncio.run(time_to_bus_name(args.timeout)))
+        except asyncio.TimeoutError:
+            print(f"\nDaemon did not claim {BUS_NAME} within {args.timeout}s")
+            return 1
+
+    print(f"\nTime to {BUS_NAME} ({args.runs} runs): "
+          f"median {statistics.median(samples) * 1000:.0f} ms, "
+          f"min {min(samples) * 1000:.0f} ms, max {max(samples) * 1000:.0f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,26 +1,41 @@
 #!/bin/bash
+# Usage: download_model.sh [--int8]
+#   --int8  also fetch the int8-quantized YuNet as models/yunet_int8.onnx
+#           (compare with scripts/tune_detector.py --model ... --model ...)
 
 # Create models directory if it doesn't exist
 mkdir -p models
 
-# Download YuNet model from OpenCV Zoo
-echo "Downloading YuNet face detection model..."
-wget -O models/yunet.onnx \
-  https://github.com/opencv/opencv_zoo/raw/main/models/face_detection_yunet/face_detection_yunet_2023mar.onnx
-
-# Verify download
-if [ -f models/yunet.onnx ]; then
-    FILE_SIZE=$(stat -c%s models/yunet.onnx)
-    echo "✓ Download complete!"
-    echo "✓ Model size: $(numfmt --to=iec-i --suffix=B $FILE_SIZE)"
-    
-    if [ $FILE_SIZE -lt 200000 ]; then
-        echo "⚠ Warning: File seems too small. Download may have failed."
+ZOO=https://github.com/opencv/opencv_zoo/raw/main/models/face_detection_yunet
+
+download() {
+    local url=$1 target=$2 min_size=$3
+
+    wget -O "$target" "$url"
+
+    # Verify download
+    if [ -f "$target" ]; then
+        FILE_SIZE=$(stat -c%s "$target")
+        echo "✓ Download complete!"
+        echo "✓ Model size: $(numfmt --to=iec-i --suffix=B $FILE_SIZE)"
+
+        if [ $FILE_SIZE -lt $min_size ]; then
+            echo "⚠ Warning: File seems too small. Download may have failed."
+            exit 1
+        fi
+    else
+        echo "✗ Download failed!"
         exit 1
     fi
-else
-    echo "✗ Download failed!"
-    exit 1
-fi
+}
 
+# Download YuNet model from OpenCV Zoo
+echo "Downloading YuNet face detection model..."
+download "$ZOO/face_detection_yunet_2023mar.onnx" models/yunet.onnx 200000
 echo "✓ YuNet model ready at models/yunet.onnx"
+
+if [ "$1" = "--int8" ]; then
+    echo "Downloading int8-quantized YuNet model..."
+    download "$ZOO/face_detection_yunet_2023mar_int8.onnx" models/yunet_int8.onnx 90000
+    echo "✓ int8 YuNet model ready at models/yunet_int8.onnx"
+fi
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Gallery Adaptation
+Inspect or undo the daemon's online adaptation of the owner model
+(adaptation.enabled): show what has been folded in, restore the model
+from before the last fold, or go back to the enrolled model
+
+Restart the daemon after a rollback or reset so it reloads the model.
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.core.gallery_adapter import GalleryAdapter
+from src.utils.config_manager import ConfigManager
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Inspect or undo owner gallery adaptation")
+    parser.add_argument("action", choices=("status", "rollback", "reset"))
+    parser.add_argument("--config-dir", default=str(PROJECT_ROOT / "config"))
+    args = parser.parse_args()
+
+    cfg = ConfigManager(args.config_dir).snapshot
+    adapter = GalleryAdapter(cfg.paths.encodings_path, max_samples=cfg.adaptation.max_samples,
+                             keep_versions=cfg.adaptation.keep_versions)
+
+    if args.action == "status":
+        print(json.dumps(adapter.status(), indent=2))
+        return 0
+    ok = adapter.rollback() if args.action == "rollback" else adapter.reset()
+    print(f"{args.action}: {'done' if ok else 'nothing to undo'}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
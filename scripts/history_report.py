@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+History Report
+Summaries from the daemon's event history (history.path): latency
+percentiles per day, verdict counts per day, and unknown verdicts that
+were probably the owner
+
+Queries run inside SQLite on a read-only connection, so the report is
+safe while the daemon is writing and never loads the history into memory.
+"""
+
+import argparse
+import json
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.utils.config_manager import ConfigManager
+from src.utils.history import (TIMING_COLUMNS, connect, daily_percentiles,
+                               false_unknown_candidates, verdict_counts)
+
+
+def print_latency(rows: list, column: str) -> None:
+    print(f"{'day':<10} {'events':>7} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8}   ({column})")
+    for r in rows:
+        print(f"{r['day']:<10} {r['count']:>7} {r['p50'] * 1000:>8.1f} {r['p95'] * 1000:>8.1f} "
+              f"{r['max'] * 1000:>8.1f}")
+
+
+def print_verdicts(counts: dict) -> None:
+    verdicts = ('owner', 'unknown', 'no_face', 'error')
+    print(f"{'day':<10} " + " ".join(f"{v:>8}" for v in verdicts))
+    for day, by_verdict in counts.items():
+        print(f"{day:<10} " + " ".join(f"{by_verdict.get(v, 0):>8}" for v in verdicts))
+
+
+def print_unknowns(rows: list) -> None:
+    print(f"{'time':<19} {'conf':>6} {'thresh':>6} {'faces':>5} {'action':>8}  followed by")
+    for r in rows:
+        when = datetime.fromtimestamp(r['ts']).strftime('%Y-%m-%d %H:%M:%S')
+        print(f"{when:<19} {r['confidence']:>6.1f} {r['threshold'] or 0:>6.1f} {r['faces'] or 0:>5} "
+              f"{r['action'] or '-':>8}  {r['followed_by'] or '-'}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Summarise the Sleep Checker event history")
+    parser.add_argument("report", choices=("latency", "verdicts", "unknowns"))
+    parser.add_argument("--db", help="history database (defaults to history.path from the config)")
+    parser.add_argument("--config-dir", default=str(PROJECT_ROOT / "config"))
+    parser.add_argument("--days", type=float, default=7, help="look back this many days (0 = all)")
+    parser.add_argument("--column", choices=TIMING_COLUMNS, default="end_to_end",
+                        help="latency to summarise")
+    parser.add_argument("--within", type=float, default=120.0,
+                        help="unknowns: seconds in which an owner verdict or the user's return counts")
+    parser.add_argument("--margin", type=float, default=10.0,
+                        help="unknowns: confidence distance above the threshold counted as a near miss")
+    parser.add_argument("--json", action="store_true", help="print JSON instead of a table")
+    args = parser.parse_args()
+
+    db = args.db or ConfigManager(args.config_dir).snapshot.history.path
+    if not Path(db).exists():
+        print(f"No history database at {db}", file=sys.stderr)
+        return 1
+    conn = connect(db, readonly=True)
+    since = time.time() - args.days * 86400 if args.days > 0 else 0.0
+
+    if args.report == "latency":
+        data = daily_percentiles(conn, args.column, since=since)
+        printer = lambda: print_latency(data, args.column)
+    elif args.report == "verdicts":
+        data = verdict_counts(conn, since)
+        printer = lambda: print_verdicts(data)
+    else:
+        data = [dict(r) for r in false_unknown_candidates(conn, args.within, args.margin, since)]
+        printer = lambda: print_unknowns(data)
+
+    if args.json:
+        print(json.dumps(data, indent=2))
+    else:
+        printer()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -34,6 +34,6 @@ echo ""
 echo "Verification:"
 echo "  1. Check installed: ls $INSTALL_DIR"
 echo "  2. Check enabled:   kreadconfig6 --file kwinrc --group Plugins --key ${KWIN_SCRIPT_NAME}Enabled"
-echo "  3. Monitor signal:  dbus-monitor --session \"type='signal',interface='org.sleepchecker.IdleNotifier'\""
+echo "  3. Monitor calls:   dbus-monitor --session \"type='method_call',interface='org.sleepchecker.IdleNotifier'\""
 echo ""
 echo "Let your screen dim from inactivity to test the signal."
\ No newline at end of file
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Session Replay
+Runs a recording made with `recording.enabled` through the full daemon on
+a private dbus-daemon, with fake PowerDevil/ScreenSaver/logind services,
+and reports decision correctness and end-to-end latency per event
+
+Ground truth is the `expected` field of each line in events.jsonl (the
+live verdict unless edited). Needs dbus-daemon but no desktop session,
+camera or display, so it runs on a headless CI box.
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.replay.replayer import SessionReplayer, summarize
+
+
+def print_table(summary: dict) -> None:
+    print(f"{'event':>6} {'frames':>6} {'verdict':>10} {'expected':>10} {'action':>9} "
+          f"{'e2e ms':>8} {'act ms':>8}  ok")
+    for r in summary['reports']:
+        if not r['idle']:
+            print(f"{r['id']:>6} {'':>6} {'(user back)':>21} {'':>9} {r['end_to_end_ms']:>8.1f}")
+            continue
+        action_ms = f"{r['action_ms']:.1f}" if r['action_ms'] is not None else "-"
+        print(f"{r['id']:>6} {r['frames']:>6} {str(r['verdict']):>10} {str(r['expected']):>10} "
+              f"{str(r['action']):>9} {r['end_to_end_ms']:>8.1f} {action_ms:>8}  "
+              f"{'✓' if r['correct'] else '✗'}")
+
+    e2e = summary['end_to_end_ms']
+    print(f"\n{summary['correct']}/{summary['events']} correct ({summary['accuracy']:.0%}), "
+          f"end-to-end p50 {e2e['p50']:.1f} ms, p95 {e2e['p95']:.1f} ms, max {e2e['max']:.1f} ms")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Replay a recorded Sleep Checker session")
+    parser.add_argument("recording", help="directory written by the recorder")
+    parser.add_argument("--config-dir", default=str(PROJECT_ROOT / "config"),
+                        help="configuration to replay with")
+    parser.add_argument("--json", metavar="FILE", help="also write the summary as JSON")
+    parser.add_argument("--min-accuracy", type=float, default=None,
+                        help="exit 1 if fewer checks are correct (0-1)")
+    parser.add_argument("--max-p95-ms", type=float, default=None,
+                        help="exit 1 if the end-to-end p95 is slower")
+    parser.add_argument("--timeout", type=float, default=30.0, help="seconds allowed per event")
+    args = parser.parse_args()
+
+    replayer = SessionReplayer(args.recording, config_dir=args.config_dir, event_timeout=args.timeout)
+    summary = summarize(asyncio.run(replayer.run()))
+    print_table(summary)
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(summary, indent=2))
+
+    failed = False
+    if args.min_accuracy is not None and summary['accuracy'] < args.min_accuracy:
+        print(f"Accuracy below {args.min_accuracy:.0%}")
+        failed = True
+    if args.max_p95_ms is not None and summary['end_to_end_ms']['p95'] > args.max_p95_ms:
+        print(f"End-to-end p95 above {args.max_p95_ms:.1f} ms")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Detector Tuning
+Benchmarks YuNet on every CPU backend this OpenCV build offers, at several
+OpenCV thread counts, and caches the fastest p95 per model file; the
+daemon reads the cache when detection.backend is "auto" or
+detection.threads is 0
+
+Pass --model more than once to compare variants (e.g. the int8-quantized
+export from scripts/download_model.sh --int8); point paths.model_path at
+the one to use.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.core.detector_tuning import default_thread_counts, save_tuning, tune
+from src.utils.config_manager import ConfigManager
+
+
+def main() -> int:
+    config = ConfigManager(str(PROJECT_ROOT / "config")).snapshot
+    parser = argparse.ArgumentParser(description="Tune YuNet backend and thread count for this machine")
+    parser.add_argument("--model", action="append",
+                        help=f"YuNet ONNX model, repeatable (default: {config.paths.model_path})")
+    parser.add_argument("--threads", default=None,
+                        help=f"comma-separated thread counts (default: {','.join(map(str, default_thread_counts()))})")
+    parser.add_argument("--size", default=f"{config.camera.width}x{config.camera.height}",
+                        help="frame size WxH to detect at")
+    parser.add_argument("--iterations", type=int, default=50, help="timed runs per combination")
+    parser.add_argument("--cache", default=config.detection.tuning_cache, help="tuning cache to write")
+    parser.add_argument("--dry-run", action="store_true", help="print results without writing the cache")
+    args = parser.parse_args()
+
+    width, height = (int(v) for v in args.size.lower().split("x"))
+    thread_counts = [int(n) for n in args.threads.split(",")] if args.threads else None
+    models = args.model or [config.paths.model_path]
+
+    best = []
+    for model in models:
+        if not Path(model).exists():
+            print(f"Model not found: {model}")
+            return 1
+        results = tune(model, width, height, thread_counts, iterations=args.iterations)
+        if not results:
+            print(f"{model}: no backend could run it")
+            continue
+
+        print(f"\n{model} at {width}x{height}")
+        print(f"{'backend':>10} {'target':>8} {'threads':>7} {'p50 ms':>8} {'p95 ms':>8}")
+        for r in results:
+            print(f"{r.backend:>10} {r.target:>8} {r.threads:>7} {r.p50_ms:>8.2f} {r.p95_ms:>8.2f}")
+        best.append((results[0].p95_ms, model))
+
+        if not args.dry_run:
+            if save_tuning(args.cache, model, results, width, height):
+                print(f"Fastest: {results[0].backend}/{results[0].target} x{results[0].threads} -> {args.cache}")
+            else:
+                print(f"Could not write {args.cache}")
+                return 1
+
+    if len(best) > 1:
+        p95, model = min(best)
+        print(f"\nFastest model: {model} (p95 {p95:.2f} ms)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,8 +1,40 @@
-"""Core functionality modules"""
+"""Core functionality modules
 
-from .face_detector import FaceDetector
-from .face_recognizer import FaceRecognizer
-from .face_trainer import FaceTrainer
-from .system_controller import SystemController
+Submodules are imported on first attribute access (PEP 562) so that
+touching src.core does not pull in cv2/numpy before they are needed.
+"""
 
-__all__ = ['FaceDetector', 'FaceRecognizer', 'FaceTrainer', 'SystemController']
+import importlib
+from typing import Any
+
+_LAZY = {
+    'FaceDetector': '.face_detector',
+    'FaceRecognizer': '.face_recognizer',
+    'FaceTrainer': '.face_trainer',
+    'EnrollmentSession': '.enrollment',
+    'FrameSource': '.frame_source',
+    'CameraSource': '.frame_source',
+    'VideoFileSource': '.frame_source',
+    'ImageDirectorySource': '.frame_source',
+    'SyntheticSource': '.frame_source',
+    'StagePipeline': '.pipeline',
+    'SystemController': '.system_controller',
+}
+
+__all__ = [
+    'FaceDetector', 'FaceRecognizer', 'FaceTrainer', 'EnrollmentSession', 'SystemController',
+    'FrameSource', 'CameraSource', 'VideoFileSource', 'ImageDirectorySource', 'SyntheticSource',
+    'StagePipeline',
+]
+
+
+def __getattr__(name: str) -> Any:
+    if name in _LAZY:
+        value = getattr(importlib.import_module(_LAZY[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
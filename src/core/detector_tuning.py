@@ -0,0 +1,229 @@
+"""
+Detector Tuning
+One-shot benchmark of the DNN backends and OpenCV thread counts available
+for YuNet on this machine; the configuration with the best p95 is cached
+per model file and picked up by later startups
+"""
+
+import hashlib
+import json
+import os
+import platform
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+from src.core.face_detector import FaceDetector, available_backends, set_cv_threads
+from src.core.frame_source import render_synthetic_frame
+from src.utils.logger import get_logger
+
+
+CACHE_VERSION = 1
+# Used when threads is 'auto' and nothing was tuned: small enough not to
+# compete with the foreground, enough for a sub-frame-time detect
+UNTUNED_THREADS = 2
+
+
+@dataclass
+class TuningResult:
+    """Latency of one backend/target/thread-count combination"""
+    backend: str
+    target: str
+    threads: int
+    p50_ms: float
+    p95_ms: float
+
+
+def model_fingerprint(model_path: str) -> str:
+    """Content hash of a model file, so a swapped model is re-tuned"""
+    return hashlib.sha256(Path(model_path).read_bytes()).hexdigest()[:16]
+
+
+def machine_fingerprint() -> dict:
+    """What a cached tuning is only valid for"""
+    cpu = platform.processor()
+    try:
+        with open("/proc/cpuinfo") as f:
+            for line in f:
+                if line.startswith("model name"):
+                    cpu = line.split(":", 1)[1].strip()
+                    break
+    except OSError:
+        pass
+    return {'cpu': cpu, 'cores': os.cpu_count() or 1, 'opencv': cv2.__version__}
+
+
+def default_thread_counts(cores: Optional[int] = None) -> List[int]:
+    """1, 2, 4, half and all of the cores (deduplicated, at most all cores)"""
+    cores = cores or os.cpu_count() or 1
+    return sorted({n for n in (1, 2, 4, max(1, cores // 2), cores) if n <= cores})
+
+
+def benchmark(
+    model_path: str,
+    backend: str,
+    target: str,
+    threads: int,
+    frame: np.ndarray,
+    iterations: int = 50,
+    warmup: int = 5
+) -> TuningResult:
+    """
+    Time detect() for one combination
+
+    Args:
+        model_path: YuNet ONNX model (any variant)
+        backend: DNN backend name
+        target: DNN target name
+        threads: OpenCV threads
+        frame: BGR frame to detect on
+        iterations: Timed runs
+        warmup: Untimed runs first (network creation, caches)
+
+    Returns:
+        TuningResult with p50/p95 in milliseconds
+    """
+    set_cv_threads(threads)
+    detector = FaceDetector(model_path, backend=backend, target=target)
+    for _ in range(warmup):
+        detector.detect(frame)
+
+    samples = np.empty(iterations)
+    for i in range(iterations):
+        start = time.perf_counter()
+        detector.detect(frame)
+        samples[i] = time.perf_counter() - start
+    p50, p95 = np.percentile(samples, [50, 95]) * 1000
+    return TuningResult(backend, target, threads, float(p50), float(p95))
+
+
+def tune(
+    model_path: str,
+    width: int = 640,
+    height: int = 480,
+    thread_counts: Optional[Sequence[int]] = None,
+    backends: Optional[Iterable[Tuple[str, str]]] = None,
+    iterations: int = 50
+) -> List[TuningResult]:
+    """
+    Benchmark every CPU backend at every thread count
+
+    Args:
+        model_path: YuNet ONNX model
+        width: Frame width the daemon detects at
+        height: Frame height
+        thread_counts: Candidates (default: default_thread_counts())
+        backends: (backend, target) pairs (default: available CPU pairs)
+        iterations: Timed runs per combination
+
+    Returns:
+        Results sorted fastest p95 first; combinations that fail to run
+        are left out
+    """
+    logger = get_logger(__name__)
+    frame = render_synthetic_frame(width, height)
+    previous = cv2.getNumThreads()
+    results = []
+    try:
+        for backend, target in (backends or available_backends()):
+            for threads in (thread_counts or default_thread_counts()):
+                try:
+                    results.append(benchmark(model_path, backend, target, threads, frame, iterations))
+                except cv2.error as e:
+                    logger.warning(f"Skipping {backend}/{target} x{threads}: {e}")
+    finally:
+        cv2.setNumThreads(previous)
+    return sorted(results, key=lambda r: (r.p95_ms, r.threads))
+
+
+def _read_cache(cache_path: str) -> Optional[dict]:
+    try:
+        cache = json.loads(Path(cache_path).read_text())
+    except (OSError, ValueError):
+        return None
+    if cache.get('version') != CACHE_VERSION or cache.get('machine') != machine_fingerprint():
+        return None
+    return cache
+
+
+def save_tuning(cache_path: str, model_path: str, results: List[TuningResult],
+                width: int, height: int) -> bool:
+    """
+    Store the fastest result for a model (other models' entries are kept)
+
+    Returns:
+        True if written
+    """
+    if not results:
+        return False
+    cache = _read_cache(cache_path) or {'version': CACHE_VERSION, 'machine': machine_fingerprint(), 'models': {}}
+    cache['models'][model_fingerprint(model_path)] = {
+        'model': str(model_path),
+        'input_size': [width, height],
+        'tuned_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'best': asdict(results[0]),
+        'results': [asdict(r) for r in results],
+    }
+    target = Path(cache_path)
+    try:
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_name(f".{target.name}.tmp")
+        tmp.write_text(json.dumps(cache, indent=2) + "\n")
+        os.replace(tmp, target)
+        return True
+    except OSError:
+        return False
+
+
+def load_tuning(cache_path: str, model_path: str) -> Optional[TuningResult]:
+    """
+    Cached best configuration for a model on this machine
+
+    Returns:
+        TuningResult, or None if untuned, tuned elsewhere or for another
+        OpenCV version
+    """
+    cache = _read_cache(cache_path)
+    if cache is None:
+        return None
+    try:
+        entry = cache['models'].get(model_fingerprint(model_path))
+    except OSError:
+        return None
+    return TuningResult(**entry['best']) if entry else None
+
+
+def resolve_detector_settings(
+    model_path: str,
+    backend: str = "auto",
+    target: str = "cpu",
+    threads: int = 0,
+    cache_path: str = ""
+) -> Tuple[str, str, int]:
+    """
+    Turn 'auto' settings into concrete ones
+
+    Args:
+        model_path: YuNet model the detector will load
+        backend: Backend name, or 'auto' for the tuned (backend, target)
+        target: Target name, used when backend is not 'auto'
+        threads: OpenCV threads, 0 for the tuned count
+        cache_path: Tuning cache written by scripts/tune_detector.py
+
+    Returns:
+        Tuple (backend, target, threads); untuned 'auto' falls back to the
+        default CPU backend and UNTUNED_THREADS
+    """
+    tuned = None
+    if cache_path and (backend == "auto" or threads == 0):
+        tuned = load_tuning(cache_path, model_path)
+
+    if backend == "auto":
+        backend, target = (tuned.backend, tuned.target) if tuned else ("default", "cpu")
+    if threads == 0:
+        threads = tuned.threads if tuned else min(UNTUNED_THREADS, os.cpu_count() or 1)
+    return backend, target, threads
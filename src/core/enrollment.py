@@ -0,0 +1,362 @@
+"""
+Enrollment
+Live owner enrollment from the camera: every frame goes through the
+detector and a quality gate, and is kept only if it adds pose or lighting
+diversity to the samples already taken; capture stops by itself once the
+head-yaw range is covered, and the samples are added to the recognizer
+incrementally
+
+Yaw comes from YuNet's landmarks (nose offset from the eye midpoint, in
+eye distances), lighting from the mean luma of the face; the two are
+binned into cells with a small quota each, and a near-duplicate of a kept
+sample is rejected even when its cell has room.
+"""
+
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from src.core.face_detector import FaceDetector
+from src.core.face_recognizer import FaceRecognizer
+from src.core.frame_source import FrameSource
+from src.utils.image_utils import crop_face
+from src.utils.logger import get_logger
+
+
+# Side of the downscaled, normalised face compared between samples
+SIGNATURE_SIZE = 32
+
+
+@dataclass(frozen=True)
+class QualityGate:
+    """Per-frame acceptance limits"""
+    min_face_size: int = 80          # pixels, shorter bbox side
+    min_score: float = 0.8           # YuNet confidence
+    min_sharpness: float = 40.0      # variance of the Laplacian of the face
+    min_brightness: float = 40.0     # mean face luma
+    max_brightness: float = 215.0
+    max_yaw: float = 0.6             # |yaw| beyond this is too close to profile
+
+
+@dataclass
+class Sample:
+    """One kept frame"""
+    frame: np.ndarray       # full BGR frame, saved for offline retraining
+    face: np.ndarray        # gray crop, as the presence check crops it
+    signature: np.ndarray
+    yaw: float
+    brightness: float
+    sharpness: float
+    cell: Tuple[int, int]   # (yaw bin, brightness bin)
+
+
+def estimate_yaw(landmarks: np.ndarray) -> float:
+    """
+    Head yaw from YuNet landmarks
+
+    Args:
+        landmarks: 5x2 array (right eye, left eye, nose, mouth corners)
+
+    Returns:
+        Horizontal nose offset from the eye midpoint in eye distances:
+        0 frontal, about +-0.5 at 45 degrees, sign = turn direction
+    """
+    right_eye, left_eye, nose = landmarks[0], landmarks[1], landmarks[2]
+    eye_distance = float(np.hypot(*(left_eye - right_eye)))
+    if eye_distance < 1.0:
+        return 0.0
+    return float(nose[0] - (right_eye[0] + left_eye[0]) / 2) / eye_distance
+
+
+def face_signature(face: np.ndarray) -> np.ndarray:
+    """Downscaled face with zero mean and unit variance (lighting-invariant)"""
+    small = cv2.resize(face, (SIGNATURE_SIZE, SIGNATURE_SIZE), interpolation=cv2.INTER_AREA).astype(np.float32)
+    small -= small.mean()
+    small /= max(float(small.std()), 1e-3)
+    return small
+
+
+def signature_distance(a: np.ndarray, b: np.ndarray) -> float:
+    """Mean absolute difference of two signatures (0 = identical)"""
+    return float(np.mean(np.abs(a - b)))
+
+
+class EnrollmentSession:
+    """Keeps the frames that add diversity and tracks coverage"""
+
+    def __init__(
+        self,
+        detector: FaceDetector,
+        gate: Optional[QualityGate] = None,
+        yaw_bins: int = 5,
+        brightness_bins: int = 3,
+        per_cell: int = 2,
+        per_yaw_bin: int = 2,
+        min_distance: float = 0.25,
+        min_samples: int = 5
+    ):
+        """
+        Initialize enrollment session
+
+        Args:
+            detector: Face detector (landmarks are needed)
+            gate: Quality limits
+            yaw_bins: Bins over [-max_yaw, max_yaw]
+            brightness_bins: Bins over the accepted brightness range
+            per_cell: Samples kept per (yaw, brightness) cell
+            per_yaw_bin: Samples every yaw bin needs for full coverage
+            min_distance: Signature distance a sample needs from every
+                          kept one
+            min_samples: Samples needed before training (FaceTrainer's
+                         minimum)
+        """
+        self.logger = get_logger(__name__)
+        self.detector = detector
+        self.gate = gate or QualityGate()
+        self.yaw_bins = yaw_bins
+        self.brightness_bins = brightness_bins
+        self.per_cell = per_cell
+        self.per_yaw_bin = per_yaw_bin
+        self.min_distance = min_distance
+        self.min_samples = min_samples
+
+        self.samples: List[Sample] = []
+        self.frames_seen = 0
+        self.rejected: Dict[str, int] = {}
+        self._cells: Dict[Tuple[int, int], int] = {}
+        self._yaw_counts = [0] * yaw_bins
+
+    @property
+    def coverage(self) -> float:
+        """Fraction of the yaw quota filled (0-1)"""
+        filled = sum(min(n, self.per_yaw_bin) for n in self._yaw_counts)
+        return filled / (self.yaw_bins * self.per_yaw_bin)
+
+    @property
+    def is_complete(self) -> bool:
+        """True once every yaw bin is covered and training has enough samples"""
+        return self.coverage >= 1.0 and len(self.samples) >= self.min_samples
+
+    def missing_poses(self) -> List[str]:
+        """Hints for the yaw bins still short of samples"""
+        centre = self.yaw_bins // 2
+        hints = []
+        for b, n in enumerate(self._yaw_counts):
+            if n >= self.per_yaw_bin:
+                continue
+            if b == centre:
+                hints.append("look straight at the camera")
+            else:
+                # Nose towards image-left = head turned to the user's right
+                side = "right" if b < centre else "left"
+                hints.append(f"turn {'slightly ' if abs(b - centre) == 1 else ''}{side}")
+        return hints
+
+    def _bin(self, value: float, low: float, high: float, bins: int) -> int:
+        return min(bins - 1, max(0, int((value - low) / (high - low) * bins)))
+
+    def _reject(self, reason: str) -> Tuple[bool, str]:
+        self.rejected[reason] = self.rejected.get(reason, 0) + 1
+        return False, reason
+
+    def offer(self, frame: np.ndarray) -> Tuple[bool, str]:
+        """
+        Gate one frame and keep it if it adds diversity
+
+        Args:
+            frame: BGR camera frame
+
+        Returns:
+            Tuple (kept, reason); reason names the gate that rejected it
+        """
+        self.frames_seen += 1
+        gate = self.gate
+
+        detections = self.detector.detect_landmarks(frame)
+        if not detections:
+            return self._reject("no face")
+        if len(detections) > 1:
+            return self._reject("several faces")
+        (x, y, w, h, score), landmarks = detections[0]
+        if score < gate.min_score:
+            return self._reject("low detection score")
+        if min(w, h) < gate.min_face_size:
+            return self._reject("face too small")
+        if x < 0 or y < 0 or x + w > frame.shape[1] or y + h > frame.shape[0]:
+            return self._reject("face cut off")
+
+        yaw = estimate_yaw(landmarks)
+        if abs(yaw) > gate.max_yaw:
+            return self._reject("turned too far")
+
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        face = crop_face(gray, (x, y, w, h))
+        if face is None or face.size == 0:
+            return self._reject("face cut off")
+        brightness = float(face.mean())
+        if not gate.min_brightness <= brightness <= gate.max_brightness:
+            return self._reject("too dark" if brightness < gate.min_brightness else "too bright")
+        sharpness = float(cv2.Laplacian(face, cv2.CV_64F).var())
+        if sharpness < gate.min_sharpness:
+            return self._reject("blurry")
+
+        cell = (self._bin(yaw, -gate.max_yaw, gate.max_yaw, self.yaw_bins),
+                self._bin(brightness, gate.min_brightness, gate.max_brightness, self.brightness_bins))
+        if self._cells.get(cell, 0) >= self.per_cell:
+            return self._reject("pose already covered")
+        signature = face_signature(face)
+        if any(signature_distance(signature, s.signature) < self.min_distance for s in self.samples):
+            return self._reject("too similar")
+
+        self.samples.append(Sample(frame.copy(), face.copy(), signature, yaw, brightness, sharpness, cell))
+        self._cells[cell] = self._cells.get(cell, 0) + 1
+        self._yaw_counts[cell[0]] += 1
+        self.logger.debug(f"Kept sample {len(self.samples)}: yaw {yaw:+.2f}, brightness {brightness:.0f}, "
+                          f"sharpness {sharpness:.0f}, coverage {self.coverage:.0%}")
+        return True, "kept"
+
+    def run(
+        self,
+        source: FrameSource,
+        timeout: float = 60.0,
+        max_frames: int = 0,
+        on_frame: Optional[Callable[['EnrollmentSession', bool, str], None]] = None
+    ) -> bool:
+        """
+        Capture until coverage is complete, the timeout or max_frames
+
+        Args:
+            source: Opened frame source
+            timeout: Seconds before giving up
+            max_frames: Frames before giving up (0 = no limit)
+            on_frame: Progress callback (session, kept, reason)
+
+        Returns:
+            True if coverage completed
+        """
+        deadline = time.monotonic() + timeout
+        while not self.is_complete and time.monotonic() < deadline:
+            if max_frames and self.frames_seen >= max_frames:
+                break
+            frame = source.read()
+            if frame is None:
+                self.logger.error("Frame source returned no frame, stopping enrollment")
+                break
+            kept, reason = self.offer(frame)
+            if on_frame is not None:
+                on_frame(self, kept, reason)
+        return self.is_complete
+
+    def save_frames(self, directory: str) -> List[Path]:
+        """
+        Write the kept frames as JPEGs, for face_trainer.py retraining
+
+        Args:
+            directory: Training image directory (created if needed)
+
+        Returns:
+            Paths written
+        """
+        out = Path(directory)
+        out.mkdir(parents=True, exist_ok=True)
+        stamp = time.strftime('%Y%m%d-%H%M%S')
+        paths = []
+        for i, sample in enumerate(self.samples):
+            path = out / f"enroll-{stamp}-{i:02d}.jpg"
+            if cv2.imwrite(str(path), sample.frame):
+                paths.append(path)
+            else:
+                self.logger.warning(f"Could not write {path}")
+        return paths
+
+    def train(self, recognizer: FaceRecognizer, replace: bool = False) -> bool:
+        """
+        Add the samples to the recognizer
+
+        Args:
+            recognizer: Recognizer to update (saved on success)
+            replace: Train a new model from these samples only
+
+        Returns:
+            True if the model was trained and saved
+        """
+        faces = [s.face for s in self.samples]
+        if len(faces) < self.min_samples and (replace or not recognizer.is_trained()):
+            self.logger.error(f"Too few samples ({len(faces)}). Need at least {self.min_samples}")
+            return False
+        if not faces:
+            self.logger.error("No samples to add")
+            return False
+        incremental = recognizer.is_trained() and not replace
+        ok = recognizer.update(faces) if incremental else recognizer.train(faces)
+        if ok:
+            self.logger.info(f"{'Updated' if incremental else 'Trained'} recognizer with "
+                             f"{len(faces)} sample(s) -> {recognizer.encodings_path}")
+        return ok
+
+
+def main() -> int:
+    """Interactive enrollment from the configured camera"""
+    import argparse
+
+    from src.core.frame_source import create_frame_source
+    from src.utils.config_manager import ConfigManager
+    from src.utils.logger import setup_logger
+
+    parser = argparse.ArgumentParser(description='Enroll the owner from the camera')
+    parser.add_argument('--config-dir', default='config', help='Configuration directory')
+    parser.add_argument('--data-dir', default=None,
+                        help='Where kept frames are saved (default: <training_data_dir>/owner)')
+    parser.add_argument('--output', default=None, help='Trained model (default: paths.encodings_path)')
+    parser.add_argument('--timeout', type=float, default=60.0, help='Seconds before giving up')
+    parser.add_argument('--replace', action='store_true',
+                        help='Train a new model instead of adding to the existing one')
+    parser.add_argument('--no-save', action='store_true', help='Do not keep the frames on disk')
+    args = parser.parse_args()
+
+    setup_logger('enrollment', 'data/logs/training.log', 'INFO')
+    cfg = ConfigManager(args.config_dir).snapshot
+
+    source = create_frame_source(cfg.camera.source, device_index=cfg.camera.device_index,
+                                 width=cfg.camera.width, height=cfg.camera.height,
+                                 path=cfg.camera.path, fourcc=cfg.camera.fourcc, fps=cfg.camera.fps)
+    if not source.open():
+        print("Could not open the camera")
+        return 1
+
+    session = EnrollmentSession(FaceDetector(cfg.paths.model_path, score_threshold=cfg.detection.score_threshold))
+
+    def progress(s: EnrollmentSession, kept: bool, reason: str) -> None:
+        hints = s.missing_poses()
+        status = f"kept sample {len(s.samples)}" if kept else reason
+        print(f"\r{s.coverage:4.0%} covered, {len(s.samples):2d} samples | {status:<20} | "
+              f"{hints[0] if hints else 'done':<28}", end='', flush=True)
+
+    print("Look at the camera, then slowly turn your head left and right")
+    try:
+        complete = session.run(source, timeout=args.timeout, on_frame=progress)
+    finally:
+        source.close()
+    print()
+    print(f"{'Coverage complete' if complete else 'Stopped at ' + format(session.coverage, '.0%') + ' coverage'}: "
+          f"{len(session.samples)} samples from {session.frames_seen} frames")
+
+    if not args.no_save and session.samples:
+        directory = args.data_dir or str(Path(cfg.paths.training_data_dir) / 'owner')
+        print(f"Saved {len(session.save_frames(directory))} frames to {directory}")
+
+    recognizer = FaceRecognizer(args.output or cfg.paths.encodings_path,
+                                confidence_threshold=cfg.recognition.confidence_threshold)
+    if not session.train(recognizer, replace=args.replace):
+        print("Training failed")
+        return 1
+    print(f"Model saved to {recognizer.encodings_path}")
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
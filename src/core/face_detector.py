@@ -8,10 +8,61 @@ import numpy as np
 from pathlib import Path
 from typing import List, Tuple, Optional
 
+from src.utils.image_utils import BufferPool, enhance_low_light, resize_frame
+
+# Config names -> OpenCV DNN ids; availability depends on how OpenCV was built
+DNN_BACKENDS = {
+    'default': cv2.dnn.DNN_BACKEND_DEFAULT,
+    'opencv': cv2.dnn.DNN_BACKEND_OPENCV,
+    'openvino': cv2.dnn.DNN_BACKEND_INFERENCE_ENGINE,
+    'cuda': cv2.dnn.DNN_BACKEND_CUDA,
+    'timvx': cv2.dnn.DNN_BACKEND_TIMVX,
+}
+DNN_TARGETS = {
+    'cpu': cv2.dnn.DNN_TARGET_CPU,
+    'opencl': cv2.dnn.DNN_TARGET_OPENCL,
+    'opencl_fp16': cv2.dnn.DNN_TARGET_OPENCL_FP16,
+    'cuda': cv2.dnn.DNN_TARGET_CUDA,
+    'cuda_fp16': cv2.dnn.DNN_TARGET_CUDA_FP16,
+    'npu': cv2.dnn.DNN_TARGET_NPU,
+}
+
+
+def available_backends(cpu_only: bool = True) -> List[Tuple[str, str]]:
+    """
+    (backend, target) name pairs this OpenCV build can run
+
+    Args:
+        cpu_only: Only pairs with the CPU target
+
+    Returns:
+        e.g. [('default', 'cpu'), ('opencv', 'cpu')]
+    """
+    names = {v: k for k, v in DNN_TARGETS.items()}
+    pairs = []
+    for backend, backend_id in DNN_BACKENDS.items():
+        for target_id in cv2.dnn.getAvailableTargets(backend_id):
+            target = names.get(int(target_id))
+            if target is not None and (target == 'cpu' or not cpu_only):
+                pairs.append((backend, target))
+    return pairs
+
+
+def set_cv_threads(threads: int) -> None:
+    """
+    Size OpenCV's thread pool (DNN inference, resize, CLAHE) for this process
+
+    Args:
+        threads: Worker threads; 0 restores OpenCV's default (one per core)
+    """
+    cv2.setNumThreads(threads if threads > 0 else -1)
+
+
 class FaceDetector:
     """YuNet-based face detection"""
 
-    def __init__(self, model_path: str = "models/yunet.onnx", score_threshold: float = 0.5, nms_threshold: float = 0.3, top_k: int = 5000):
+    def __init__(self, model_path: str = "models/yunet.onnx", score_threshold: float = 0.5, nms_threshold: float = 0.3, top_k: int = 5000,
+                 input_scale: float = 1.0, enhance: bool = False, backend: str = "default", target: str = "cpu"):
         """
         Initialize face detector
         
@@ -20,11 +71,28 @@ class FaceDetector:
             score_threshold: Confidence threshold (0-1)
             nms_threshold: Non-maximum suppression threshold
             top_k: Maximum number of detections to keep
+            input_scale: Frames are downscaled by this factor (0-1] before
+                         detection; boxes are still in frame coordinates
+            enhance: Apply CLAHE low-light enhancement before detection
+            backend: DNN backend name (see DNN_BACKENDS)
+            target: DNN target device name (see DNN_TARGETS)
+
+        Any YuNet ONNX export works as model_path, including the
+        int8-quantized one (use it with the default/opencv CPU backend).
         """
         self.model_path = Path(model_path)
         self.score_threshold = score_threshold
         self.nms_threshold = nms_threshold
         self.top_k = top_k
+        self.input_scale = input_scale
+        self.enhance = enhance
+        self._pool = BufferPool()
+        if backend not in DNN_BACKENDS:
+            raise ValueError(f"Unknown DNN backend: {backend}")
+        if target not in DNN_TARGETS:
+            raise ValueError(f"Unknown DNN target: {target}")
+        self.backend = backend
+        self.target = target
 
         if not self.model_path.exists():
             raise FileNotFoundError(f"YuNet model not found: {model_path}")
@@ -42,7 +110,9 @@ class FaceDetector:
                 input_size=(width, height),
                 score_threshold=self.score_threshold,
                 nms_threshold=self.nms_threshold,
-                top_k=self.top_k
+                top_k=self.top_k,
+                backend_id=DNN_BACKENDS[self.backend],
+                target_id=DNN_TARGETS[self.target]
             )
             self.current_size = (width, height)
 
@@ -58,27 +128,115 @@ class FaceDetector:
         """
         if frame is None or frame.size == 0:
             return []
-        
-        height, width = frame.shape[:2]
+        return self.detect_prepared(self._preprocess(frame), frame.shape[1])
 
-        # Initialize detector with frame size
-        self._initialize_detector(width, height)
+    def prepare(self, frame: np.ndarray) -> np.ndarray:
+        """
+        Detection input for a frame (downscaled/enhanced), in a buffer of
+        its own rather than the detector's pool, so a pipeline can prepare
+        frame N+1 while frame N is being detected
 
-        # Run detection
-        _, faces = self.detector.detect(frame)
+        Args:
+            frame: Input image (BGR format)
 
+        Returns:
+            Image for detect_prepared() (the frame itself if no
+            preprocessing is configured)
+        """
+        return self._preprocess(frame, pooled=False)
+
+    def detect_prepared(self, image: np.ndarray, frame_width: int) -> List[Tuple[int, int, int, int, float]]:
+        """
+        Detect faces in an image from prepare()
+
+        Args:
+            image: Preprocessed detection input
+            frame_width: Width of the original frame (boxes are scaled back)
+
+        Returns:
+            List of tuples: (x, y, width, height, confidence)
+        """
+        faces = self._run(image)
         if faces is None:
             return []
-        
-        # Convert to simple format: (x, y, w, h, confidence)
+        scale = image.shape[1] / frame_width
+
+        # Convert to simple format: (x, y, w, h, confidence), in frame coordinates
         detections = []
         for face in faces:
-            x, y, w, h = face[:4].astype(int)
+            x, y, w, h = (face[:4] / scale).astype(int)
             confidence = float(face[-1])
             detections.append((x, y, w, h, confidence))
 
         return detections
-    
+
+    def detect_landmarks(self, frame: np.ndarray) -> List[Tuple[Tuple[int, int, int, int, float], np.ndarray]]:
+        """
+        Detect faces with YuNet's five landmarks
+
+        Args:
+            frame: Input image (BGR format)
+
+        Returns:
+            List of ((x, y, w, h, confidence), landmarks) with landmarks a
+            5x2 float array in frame coordinates: right eye, left eye, nose
+            tip, right and left mouth corner (as seen from the subject)
+        """
+        if frame is None or frame.size == 0:
+            return []
+        image = self._preprocess(frame)
+        faces = self._run(image)
+        if faces is None:
+            return []
+
+        scale = image.shape[1] / frame.shape[1]
+        detections = []
+        for face in faces:
+            x, y, w, h = (face[:4] / scale).astype(int)
+            detections.append(((x, y, w, h, float(face[-1])), face[4:14].reshape(5, 2) / scale))
+        return detections
+
+    def _run(self, image: np.ndarray) -> Optional[np.ndarray]:
+        """YuNet output rows for a preprocessed image"""
+        height, width = image.shape[:2]
+
+        # Initialize detector with (scaled) frame size
+        self._initialize_detector(width, height)
+
+        # Run detection
+        _, faces = self.detector.detect(image)
+        return faces
+
+
+    def _preprocess(self, frame: np.ndarray, pooled: bool = True) -> np.ndarray:
+        """Enhanced and/or downscaled frame (pooled or fresh buffers), or the frame itself"""
+        pool = self._pool if pooled else None
+        image = frame
+        if self.input_scale < 1.0:
+            image = resize_frame(image, max(1, int(frame.shape[1] * self.input_scale)), pool=pool)
+        if self.enhance and image.ndim == 3:
+            # After the resize: CLAHE cost scales with the pixel count
+            image = enhance_low_light(image, pool=pool)
+        return image
+
+    def load(self, width: int, height: int) -> None:
+        """Create the network ahead of the first detect() (pre-warm)"""
+        if self.input_scale < 1.0:
+            # Same rounding as resize_frame()
+            scaled = max(1, int(width * self.input_scale))
+            width, height = scaled, int(height * scaled / width)
+        self._initialize_detector(width, height)
+
+    def unload(self) -> None:
+        """Release the network; the next detect() recreates it"""
+        self.detector = None
+        self.current_size = None
+        self._pool.clear()
+
+    @property
+    def is_loaded(self) -> bool:
+        """True if the network is resident"""
+        return self.detector is not None
 
     def set_score_threshold(self, threshold: float) -> None:
         """Update detections confidence threshold"""
@@ -86,6 +244,23 @@ class FaceDetector:
         if self.detector is not None:
             self.detector.setScoreThreshold(threshold)
     
+    def set_preprocessing(self, input_scale: Optional[float] = None, enhance: Optional[bool] = None) -> None:
+        """
+        Change the detection input (power profiles)
+
+        A new scale takes effect on the next detect(), which recreates the
+        network for the new input size.
+
+        Args:
+            input_scale: Downscale factor (0-1]
+            enhance: Low-light enhancement on/off
+        """
+        if input_scale is not None and input_scale != self.input_scale:
+            self.input_scale = input_scale
+            self._pool.clear()
+        if enhance is not None:
+            self.enhance = enhance
+
     def get_largest_face(self, frame: np.ndarray) -> Optional[Tuple[int, int, int , int, float]]:
         """
         Get the largest detected face (usually the person in front)
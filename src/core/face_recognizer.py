@@ -4,19 +4,29 @@ Recognizes faces using OpenCV's LBPH (Local Binary Patterns Histograms) face rec
 """
 
 import cv2
+import io
 import numpy as np
 import pickle
+import tempfile
 from pathlib import Path
 from typing import Optional, Tuple, List
 
 
+class _DataUnpickler(pickle.Unpickler):
+    """Loads plain data only (dict/bytes/str/numbers): a model file can't run code"""
+
+    def find_class(self, module, name):
+        raise pickle.UnpicklingError(f"{module}.{name} is not allowed in a model file")
+
+
 class FaceRecognizer:
     """OpenCV-based face recognition using LBPH algorithm"""
     
     def __init__(
         self,
         encodings_path: str = "models/face_encodings.pkl",
-        confidence_threshold: float = 50.0
+        confidence_threshold: float = 50.0,
+        model_data: Optional[bytes] = None
     ):
         """
         Initialize face recognizer
@@ -25,25 +35,55 @@ class FaceRecognizer:
             encodings_path: Path to saved face model
             confidence_threshold: Recognition threshold (lower = more strict, 0-100)
                                  Typical values: 40-60 (lower is stricter)
+            model_data: Contents of a model file to load instead of
+                        reading encodings_path
         """
         self.encodings_path = Path(encodings_path)
         self.confidence_threshold = confidence_threshold
         self.owner_name = "owner"
         
         # Create LBPH face recognizer
-        self.recognizer = cv2.face.LBPHFaceRecognizer_create(
-            radius=1,
-            neighbors=8,
-            grid_x=8,
-            grid_y=8
-        )
+        self.recognizer = self._create_recognizer()
         
         self.is_model_trained = False
         
         # Load model if exists
-        if self.encodings_path.exists():
+        if model_data is not None:
+            self.load_bytes(model_data)
+        elif self.encodings_path.exists():
             self.load_model()
     
+    @staticmethod
+    def _create_recognizer():
+        """Create an empty LBPH recognizer"""
+        return cv2.face.LBPHFaceRecognizer_create(
+            radius=1,
+            neighbors=8,
+            grid_x=8,
+            grid_y=8
+        )
+
+    def ensure_loaded(self) -> None:
+        """Recreate the recognizer (and re-read the model) after unload()"""
+        if self.recognizer is None:
+            self.recognizer = self._create_recognizer()
+            if self.is_model_trained and not self.load_model():
+                self.is_model_trained = False
+
+    def unload(self) -> None:
+        """
+        Drop the LBPH model from memory; recognize() reloads it from disk
+
+        Only a model that has been saved can be unloaded.
+        """
+        if self.recognizer is not None and self.encodings_path.exists():
+            self.recognizer = None
+
+    @property
+    def is_loaded(self) -> bool:
+        """True if the recognizer is resident"""
+        return self.recognizer is not None
+
     def load_model(self) -> bool:
         """
         Load trained face recognition model
@@ -53,24 +93,43 @@ class FaceRecognizer:
         """
         try:
             with open(self.encodings_path, 'rb') as f:
-                data = pickle.load(f)
-                
-                # Extract model data
-                model_data = data.get('model_data')
-                self.owner_name = data.get('name', 'owner')
-                
-                if model_data:
-                    # Save to temp file and load (OpenCV requirement)
-                    temp_model = self.encodings_path.parent / "temp_model.yml"
-                    with open(temp_model, 'wb') as tm:
-                        tm.write(model_data)
-                    
+                return self.load_bytes(f.read())
+        except Exception as e:
+            print(f"Error loading model: {e}")
+            return False
+
+    def load_bytes(self, contents: bytes) -> bool:
+        """
+        Load a model from the contents of a model file
+
+        Args:
+            contents: Bytes of a file written by save_model()
+
+        Returns:
+            True if loaded successfully, False otherwise
+        """
+        try:
+            data = _DataUnpickler(io.BytesIO(contents)).load()
+
+            # Extract model data
+            model_data = data.get('model_data')
+            self.owner_name = data.get('name', 'owner')
+
+            if model_data:
+                # Save to temp file and load (OpenCV requirement); a private
+                # directory, since the shared inference service loads
+                # other users' models
+                with tempfile.TemporaryDirectory(prefix="sleep-checker-") as tmp:
+                    temp_model = Path(tmp) / "model.yml"
+                    temp_model.write_bytes(model_data)
+
+                    if self.recognizer is None:
+                        self.recognizer = self._create_recognizer()
                     self.recognizer.read(str(temp_model))
-                    temp_model.unlink()  # Delete temp file
-                    
-                    self.is_model_trained = True
-                    return True
-            
+
+                self.is_model_trained = True
+                return True
+
             return False
         except Exception as e:
             print(f"Error loading model: {e}")
@@ -87,6 +146,8 @@ class FaceRecognizer:
             # Create directory if needed
             self.encodings_path.parent.mkdir(parents=True, exist_ok=True)
             
+            self.ensure_loaded()
+
             # Save model to temp file first
             temp_model = self.encodings_path.parent / "temp_model.yml"
             self.recognizer.write(str(temp_model))
@@ -143,6 +204,9 @@ class FaceRecognizer:
             labels = [1] * len(processed_faces)  # Label 1 = owner
         
         try:
+            if self.recognizer is None:
+                self.recognizer = self._create_recognizer()
+
             # Train the recognizer
             self.recognizer.train(processed_faces, np.array(labels))
             self.is_model_trained = True
@@ -155,6 +219,40 @@ class FaceRecognizer:
             print(f"Error training model: {e}")
             return False
     
+    def update(self, face_images: List[np.ndarray], labels: Optional[List[int]] = None) -> bool:
+        """
+        Add samples to the trained model without retraining it (LBPH keeps
+        one histogram per sample, so this is incremental); trains from
+        scratch if there is no model yet
+
+        Args:
+            face_images: Face images (BGR or grayscale)
+            labels: Labels (defaults to all owner)
+
+        Returns:
+            True if the model was updated and saved
+        """
+        if not self.is_model_trained:
+            return self.train(face_images, labels)
+        if not face_images:
+            return False
+
+        processed_faces = []
+        for img in face_images:
+            if len(img.shape) == 3:
+                img = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+            processed_faces.append(cv2.resize(img, (100, 100)))
+        if labels is None:
+            labels = [1] * len(processed_faces)
+
+        try:
+            self.ensure_loaded()
+            self.recognizer.update(processed_faces, np.array(labels))
+            return self.save_model()
+        except Exception as e:
+            print(f"Error updating model: {e}")
+            return False
+
     def recognize(self, face_image: np.ndarray) -> Tuple[bool, float]:
         """
         Recognize if face belongs to owner
@@ -171,6 +269,8 @@ class FaceRecognizer:
             return False, 100.0
         
         try:
+            self.ensure_loaded()
+
             # Convert to grayscale if needed
             if len(face_image.shape) == 3:
                 gray = cv2.cvtColor(face_image, cv2.COLOR_BGR2GRAY)
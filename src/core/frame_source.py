@@ -0,0 +1,481 @@
+"""
+Frame Sources
+Where presence checks get their frames: the webcam, a video file, a
+directory of images or a synthetic generator
+
+Capture is split like cv2.VideoCapture: grab() takes a frame, then
+retrieve() decodes it to BGR and retrieve_gray() to a single luma plane.
+Gray-only consumers (the motion gate) call just retrieve_gray(), which
+sources implement without the colour decode where the data allows it
+(the Y plane of YUYV, a luma-only JPEG decode).
+"""
+
+import sys
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+import cv2
+import numpy as np
+
+from src.utils.logger import get_logger
+
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+
+
+def _into(frame: np.ndarray, out: Optional[np.ndarray]) -> np.ndarray:
+    """Copy into the caller's buffer when it fits, else hand back the frame"""
+    if out is not None and out.shape == frame.shape and out.dtype == frame.dtype:
+        np.copyto(out, frame)
+        return out
+    return frame
+
+
+def render_synthetic_frame(width: int, height: int, seed: int = 0, offset: int = 0,
+                           face: bool = True) -> np.ndarray:
+    """
+    Deterministic webcam-like BGR frame: smooth background, sensor noise
+    and a face-like blob (skin ellipse with eyes and mouth)
+
+    Args:
+        width: Frame width
+        height: Frame height
+        seed: Noise seed
+        offset: Horizontal shift of the face from the centre, in pixels
+        face: Draw the face blob
+
+    Returns:
+        BGR frame
+    """
+    rng = np.random.default_rng(seed)
+    gradient = np.linspace(60, 140, width, dtype=np.float32)
+    frame = np.repeat(gradient[None, :, None], height, axis=0).repeat(3, axis=2)
+    frame += rng.normal(0, 6, frame.shape).astype(np.float32)
+    frame = np.clip(frame, 0, 255).astype(np.uint8)
+    if not face:
+        return frame
+
+    cx, cy, r = width // 2 + offset, height // 2, min(width, height) // 5
+    cv2.ellipse(frame, (cx, cy), (int(r * 0.8), r), 0, 0, 360, (140, 170, 210), -1)
+    for dx in (-r // 3, r // 3):
+        cv2.circle(frame, (cx + dx, cy - r // 4), max(2, r // 10), (40, 40, 40), -1)
+    cv2.ellipse(frame, (cx, cy + r // 2), (r // 3, max(2, r // 10)), 0, 0, 360, (60, 60, 150), -1)
+    return frame
+
+
+class FrameSource:
+    """Base class for frame providers"""
+
+    name = "base"
+
+    @property
+    def is_open(self) -> bool:
+        raise NotImplementedError
+
+    def open(self) -> bool:
+        """
+        Start delivering frames
+
+        Returns:
+            True if the source is ready
+        """
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Release the device or file"""
+        raise NotImplementedError
+
+    def grab(self) -> bool:
+        """
+        Take the next frame without decoding it
+
+        Returns:
+            True if a frame is available to retrieve
+        """
+        raise NotImplementedError
+
+    def retrieve(self, out: Optional[np.ndarray] = None) -> Optional[np.ndarray]:
+        """
+        Decode the grabbed frame to BGR
+
+        Args:
+            out: Optional buffer to decode into (used when the size matches)
+
+        Returns:
+            BGR frame or None on failure
+        """
+        raise NotImplementedError
+
+    def retrieve_gray(self, out: Optional[np.ndarray] = None) -> Optional[np.ndarray]:
+        """
+        Decode the grabbed frame to a single 8-bit luma plane
+
+        The default converts retrieve()'s BGR frame; sources override it
+        when they can skip the colour decode.
+
+        Args:
+            out: Optional (height, width) uint8 buffer
+
+        Returns:
+            Grayscale frame or None on failure
+        """
+        frame = self.retrieve()
+        if frame is None:
+            return None
+        if out is not None and out.shape == frame.shape[:2] and out.dtype == frame.dtype:
+            return cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=out)
+        return cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+
+    def read(self, out: Optional[np.ndarray] = None) -> Optional[np.ndarray]:
+        """grab() and retrieve() in one call"""
+        return self.retrieve(out) if self.grab() else None
+
+    def read_gray(self, out: Optional[np.ndarray] = None) -> Optional[np.ndarray]:
+        """grab() and retrieve_gray() in one call"""
+        return self.retrieve_gray(out) if self.grab() else None
+
+
+class CameraSource(FrameSource):
+    """
+    Webcam through OpenCV's V4L2 backend
+
+    Asks the driver for a pixel format (MJPEG keeps USB bandwidth low at
+    higher resolutions, YUYV avoids JPEG decoding) and reads the negotiated
+    size back. For gray-only reads it fetches the raw buffer and takes the
+    Y plane (YUYV) or decodes only the JPEG's luma (MJPEG).
+    """
+
+    name = "camera"
+
+    def __init__(self, device_index: int = 0, width: int = 640, height: int = 480,
+                 fourcc: str = "MJPG", fps: float = 0.0):
+        """
+        Initialize camera source
+
+        Args:
+            device_index: /dev/video index
+            width: Requested capture width
+            height: Requested capture height
+            fourcc: Requested pixel format ("MJPG", "YUYV" or "" for the driver default)
+            fps: Requested frame rate (0 = driver default)
+        """
+        self.logger = get_logger(__name__)
+        self.device_index = device_index
+        self.width = width
+        self.height = height
+        self.fourcc = fourcc
+        self.fps = fps
+        self.negotiated_fourcc = ""
+        self._capture: Optional[cv2.VideoCapture] = None
+        self._raw_gray = False
+
+    @property
+    def is_open(self) -> bool:
+        return self._capture is not None and self._capture.isOpened()
+
+    def open(self) -> bool:
+        if self.is_open:
+            return True
+
+        backend = cv2.CAP_V4L2 if sys.platform.startswith("linux") else cv2.CAP_ANY
+        capture = cv2.VideoCapture(self.device_index, backend)
+        if not capture.isOpened() and backend != cv2.CAP_ANY:
+            capture = cv2.VideoCapture(self.device_index)
+        if not capture.isOpened():
+            self.logger.error(f"Cannot open camera {self.device_index}")
+            return False
+
+        # Format first: the driver picks the sizes it offers per format
+        if self.fourcc:
+            capture.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*self.fourcc))
+        capture.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
+        capture.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
+        if self.fps > 0:
+            capture.set(cv2.CAP_PROP_FPS, self.fps)
+
+        self.width = int(capture.get(cv2.CAP_PROP_FRAME_WIDTH)) or self.width
+        self.height = int(capture.get(cv2.CAP_PROP_FRAME_HEIGHT)) or self.height
+        code = int(capture.get(cv2.CAP_PROP_FOURCC))
+        self.negotiated_fourcc = "".join(chr((code >> 8 * i) & 0xFF) for i in range(4)).strip("\0 ")
+        self._raw_gray = (capture.getBackendName() == "V4L2"
+                          and self.negotiated_fourcc in ("YUYV", "MJPG"))
+        self._capture = capture
+        self.logger.debug(f"Camera {self.device_index}: {self.width}x{self.height} "
+                          f"{self.negotiated_fourcc or '?'} ({capture.getBackendName()})")
+        return True
+
+    def close(self) -> None:
+        if self._capture is not None:
+            self._capture.release()
+            self._capture = None
+
+    def grab(self) -> bool:
+        return self._capture is not None and self._capture.grab()
+
+    def retrieve(self, out: Optional[np.ndarray] = None) -> Optional[np.ndarray]:
+        if self._capture is None:
+            return None
+        ok, frame = self._capture.retrieve(out) if out is not None else self._capture.retrieve()
+        return frame if ok else None
+
+    def retrieve_gray(self, out: Optional[np.ndarray] = None) -> Optional[np.ndarray]:
+        if self._raw_gray:
+            gray = self._raw_luma(out)
+            if gray is not None:
+                return gray
+            # Backend did not hand out a buffer we understand: stop trying
+            self._raw_gray = False
+            self.logger.debug("Raw camera buffers unavailable, gray frames are converted from BGR")
+        return super().retrieve_gray(out)
+
+    def _raw_luma(self, out: Optional[np.ndarray]) -> Optional[np.ndarray]:
+        """Luma of the grabbed frame from the undecoded driver buffer"""
+        self._capture.set(cv2.CAP_PROP_CONVERT_RGB, 0)
+        try:
+            ok, raw = self._capture.retrieve()
+        finally:
+            self._capture.set(cv2.CAP_PROP_CONVERT_RGB, 1)
+        if not ok or raw is None:
+            return None
+
+        if self.negotiated_fourcc == "YUYV" and raw.size == self.width * self.height * 2:
+            # Y0 U Y1 V: every other byte is luma
+            luma = raw.reshape(self.height, self.width * 2)[:, ::2]
+            if out is not None and out.shape == luma.shape:
+                np.copyto(out, luma)
+                return out
+            return np.ascontiguousarray(luma)
+
+        if self.negotiated_fourcc == "MJPG" and raw.size > 2:
+            data = raw.reshape(-1)
+            if data[0] == 0xFF and data[1] == 0xD8:
+                gray = cv2.imdecode(data, cv2.IMREAD_GRAYSCALE)
+                return _into(gray, out) if gray is not None else None
+        return None
+
+
+class VideoFileSource(FrameSource):
+    """Frames from a video file, optionally looping"""
+
+    name = "video"
+
+    def __init__(self, path: str, loop: bool = True):
+        """
+        Initialize video source
+
+        Args:
+            path: Video file
+            loop: Restart from the first frame at the end
+        """
+        self.logger = get_logger(__name__)
+        self.path = Path(path)
+        self.loop = loop
+        self._capture: Optional[cv2.VideoCapture] = None
+
+    @property
+    def is_open(self) -> bool:
+        return self._capture is not None and self._capture.isOpened()
+
+    def open(self) -> bool:
+        if self.is_open:
+            return True
+        capture = cv2.VideoCapture(str(self.path))
+        if not capture.isOpened():
+            self.logger.error(f"Cannot open video {self.path}")
+            return False
+        self._capture = capture
+        return True
+
+    def close(self) -> None:
+        if self._capture is not None:
+            self._capture.release()
+            self._capture = None
+
+    def grab(self) -> bool:
+        if self._capture is None:
+            return False
+        if self._capture.grab():
+            return True
+        if not self.loop:
+            return False
+        self._capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+        return self._capture.grab()
+
+    def retrieve(self, out: Optional[np.ndarray] = None) -> Optional[np.ndarray]:
+        if self._capture is None:
+            return None
+        ok, frame = self._capture.retrieve(out) if out is not None else self._capture.retrieve()
+        return frame if ok else None
+
+
+class ImageDirectorySource(FrameSource):
+    """
+    Frames from image files: a directory in name order, or an explicit list
+
+    Files are read as encoded bytes on grab() and decoded on retrieve, so
+    a gray read of a JPEG decodes only its luma.
+    """
+
+    name = "images"
+
+    def __init__(self, directory: str, files: Optional[Sequence[str]] = None, at_end: str = "loop"):
+        """
+        Initialize image source
+
+        Args:
+            directory: Directory holding the images
+            files: Names relative to directory (default: every image in it, sorted)
+            at_end: "loop" to start over, "hold" to repeat the last image
+                    (a still scene), "stop" to report no more frames
+        """
+        if at_end not in ("loop", "hold", "stop"):
+            raise ValueError(f"at_end must be loop, hold or stop, got {at_end!r}")
+        self.logger = get_logger(__name__)
+        self.directory = Path(directory)
+        self.files = list(files) if files is not None else None
+        self.at_end = at_end
+        self._paths: List[Path] = []
+        self._index = -1
+        self._data: Optional[np.ndarray] = None
+        self._open = False
+
+    @property
+    def is_open(self) -> bool:
+        return self._open
+
+    def open(self) -> bool:
+        if self.files is not None:
+            self._paths = [self.directory / name for name in self.files]
+        else:
+            self._paths = sorted(p for p in self.directory.glob("*")
+                                 if p.suffix.lower() in IMAGE_EXTENSIONS)
+        self._paths = [p for p in self._paths if p.is_file()]
+        if not self._paths:
+            self.logger.error(f"No images in {self.directory}")
+            return False
+        self._index = -1
+        self._open = True
+        return True
+
+    def close(self) -> None:
+        self._open = False
+        self._data = None
+
+    def grab(self) -> bool:
+        if not self._open:
+            return False
+        index = self._index + 1
+        if index >= len(self._paths):
+            if self.at_end == "stop":
+                return False
+            index = 0 if self.at_end == "loop" else len(self._paths) - 1
+        if index != self._index or self._data is None:
+            self._data = np.fromfile(self._paths[index], dtype=np.uint8)
+        self._index = index
+        return True
+
+    def _decode(self, flags: int, out: Optional[np.ndarray]) -> Optional[np.ndarray]:
+        if self._data is None:
+            return None
+        frame = cv2.imdecode(self._data, flags)
+        return _into(frame, out) if frame is not None else None
+
+    def retrieve(self, out: Optional[np.ndarray] = None) -> Optional[np.ndarray]:
+        return self._decode(cv2.IMREAD_COLOR, out)
+
+    def retrieve_gray(self, out: Optional[np.ndarray] = None) -> Optional[np.ndarray]:
+        return self._decode(cv2.IMREAD_GRAYSCALE, out)
+
+
+class SyntheticSource(FrameSource):
+    """Generated frames (see render_synthetic_frame); needs no files or device"""
+
+    name = "synthetic"
+
+    def __init__(self, width: int = 640, height: int = 480, seed: int = 0,
+                 motion: int = 0, face: bool = True):
+        """
+        Initialize synthetic source
+
+        Args:
+            width: Frame width
+            height: Frame height
+            seed: Noise seed of the first frame (frame i uses seed + i)
+            motion: Pixels the face moves per frame (0 = still scene)
+            face: Draw a face-like blob
+        """
+        self.width = width
+        self.height = height
+        self.seed = seed
+        self.motion = motion
+        self.face = face
+        self._index = -1
+        self._open = False
+
+    @property
+    def is_open(self) -> bool:
+        return self._open
+
+    def open(self) -> bool:
+        self._open = True
+        return True
+
+    def close(self) -> None:
+        self._open = False
+
+    def grab(self) -> bool:
+        if not self._open:
+            return False
+        self._index += 1
+        return True
+
+    def render(self, index: int) -> np.ndarray:
+        """Frame number `index` of this source"""
+        span = max(1, self.width // 4)
+        offset = (self.motion * index) % (2 * span) - span if self.motion else 0
+        return render_synthetic_frame(self.width, self.height, self.seed + index, offset, self.face)
+
+    def retrieve(self, out: Optional[np.ndarray] = None) -> Optional[np.ndarray]:
+        if self._index < 0:
+            return None
+        return _into(self.render(self._index), out)
+
+
+_SOURCES = {
+    CameraSource.name: CameraSource,
+    VideoFileSource.name: VideoFileSource,
+    ImageDirectorySource.name: ImageDirectorySource,
+    SyntheticSource.name: SyntheticSource,
+}
+
+
+def create_frame_source(kind: str = "camera", device_index: int = 0, width: int = 640,
+                        height: int = 480, path: str = "", fourcc: str = "MJPG",
+                        fps: float = 0.0) -> FrameSource:
+    """
+    Build a frame source from camera settings
+
+    Args:
+        kind: 'camera', 'video', 'images' or 'synthetic'
+        device_index: Camera index (camera)
+        width: Frame width (camera request, synthetic size)
+        height: Frame height (camera request, synthetic size)
+        path: Video file (video) or image directory (images)
+        fourcc: Requested pixel format (camera)
+        fps: Requested frame rate (camera)
+
+    Returns:
+        FrameSource (not yet opened)
+    """
+    if kind not in _SOURCES:
+        raise ValueError(f"Unknown frame source: {kind}")
+    if kind == CameraSource.name:
+        return CameraSource(device_index, width, height, fourcc, fps)
+    if kind == SyntheticSource.name:
+        return SyntheticSource(width, height)
+    if not path:
+        raise ValueError(f"Frame source {kind!r} needs camera.path")
+    if kind == VideoFileSource.name:
+        return VideoFileSource(path)
+    return ImageDirectorySource(path)
+
@@ -0,0 +1,423 @@
+"""
+Gallery Adapter
+Opt-in online adaptation of the owner model: face crops the recognizer
+matched with a very low LBPH distance are reservoir-sampled per time
+window, and each closed window is folded into the model with an
+incremental update
+
+Windows are aligned to the clock (a 24 h window is a UTC day), and the
+samples of windows not yet folded are saved on shutdown and picked up
+again on start, so a daemon restarted at every login still adapts.
+
+The model never grows past a sample cap (the oldest folded windows are
+dropped and the model is rebuilt from the pre-adaptation base), and every
+fold keeps the previous model as a version that rollback() restores.
+A model retrained outside adaptation (enrollment, face_trainer.py) is
+noticed by its digest and becomes the new base, so a rebuild never falls
+back to samples from before the retrain.
+State lives next to the model, in <model>.adapt/:
+
+    base.pkl                 model as it was before the first fold
+    windows/<start>.npy      folded crops of one window (N x 100 x 100, uint8)
+    versions/<stamp>.pkl     model before each fold (newest keep_versions)
+    manifest.json            base size, folded windows, versions, digest
+                             of the model the last fold wrote
+    collecting/<start>.npy   crops of windows not folded yet, saved on shutdown
+    collecting.json          matches seen per saved window (reservoir state)
+"""
+
+import hashlib
+import json
+import math
+import random
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import cv2
+import numpy as np
+
+from src.core.face_recognizer import FaceRecognizer
+from src.utils.logger import get_logger
+
+
+# Crop size FaceRecognizer trains and predicts on
+FACE_SIZE = (100, 100)
+
+
+def file_digest(path: Path) -> str:
+    """SHA-256 of a model file (hex)"""
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def model_samples(recognizer: FaceRecognizer) -> int:
+    """Samples (one LBPH histogram each) held by a trained recognizer"""
+    recognizer.ensure_loaded()
+    return len(recognizer.recognizer.getHistograms()) if recognizer.is_trained() else 0
+
+
+class GalleryAdapter:
+    """Collects confident runtime samples and folds them into the model"""
+
+    def __init__(
+        self,
+        encodings_path: str,
+        accept_confidence: float = 30.0,
+        window_seconds: float = 86400,
+        per_window: int = 20,
+        max_samples: int = 500,
+        keep_versions: int = 5,
+        state_dir: Optional[str] = None
+    ):
+        """
+        Initialize gallery adapter
+
+        Args:
+            encodings_path: Owner model to adapt
+            accept_confidence: LBPH distance a match must be at or below
+                               to be collected (well under the recognition
+                               threshold, so only unambiguous matches count)
+            window_seconds: Length of one sampling window
+            per_window: Reservoir size, i.e. samples folded per window
+            max_samples: Cap on samples in the model (base + folded)
+            keep_versions: Previous models kept for rollback
+            state_dir: Adaptation state (defaults to <model>.adapt/)
+        """
+        self.logger = get_logger(__name__)
+        self.encodings_path = Path(encodings_path)
+        self.accept_confidence = accept_confidence
+        self.window_seconds = window_seconds
+        self.per_window = per_window
+        self.max_samples = max_samples
+        self.keep_versions = keep_versions
+        self.state_dir = Path(state_dir) if state_dir else self.encodings_path.with_suffix('.adapt')
+
+        self._lock = threading.Lock()
+        self._fold_lock = threading.Lock()
+        self._rng = random.Random()
+        self._window_start = self._window_of(time.time())
+        self._seen = 0
+        self._reservoir: List[np.ndarray] = []
+        self._pending: Dict[float, List[np.ndarray]] = {}
+        self._restore()
+
+    @property
+    def manifest_path(self) -> Path:
+        return self.state_dir / "manifest.json"
+
+    def _read_manifest(self) -> Dict:
+        try:
+            return json.loads(self.manifest_path.read_text())
+        except (OSError, ValueError):
+            return {'base_samples': None, 'windows': [], 'versions': [], 'model_digest': None}
+
+    def _write_manifest(self, manifest: Dict) -> None:
+        tmp = self.manifest_path.with_suffix('.tmp')
+        tmp.write_text(json.dumps(manifest, indent=2))
+        tmp.replace(self.manifest_path)
+
+    @property
+    def collecting_dir(self) -> Path:
+        return self.state_dir / "collecting"
+
+    def _window_of(self, ts: float) -> float:
+        """Start of the clock-aligned window holding ts"""
+        return math.floor(ts / self.window_seconds) * self.window_seconds
+
+    def _roll(self, now: float) -> None:
+        """Close the current window if it has ended (lock held)"""
+        if now - self._window_start < self.window_seconds:
+            return
+        if self._reservoir:
+            self._pending[self._window_start] = self._reservoir
+        self._reservoir = []
+        self._seen = 0
+        self._window_start = self._window_of(now)
+
+    def save(self) -> bool:
+        """
+        Save the samples not folded yet (the open window and closed ones)
+        for the next start; call on shutdown
+
+        Returns:
+            True if saved (or nothing to save)
+        """
+        with self._lock:
+            self._roll(time.time())
+            windows = dict(self._pending)
+            if self._reservoir:
+                windows[self._window_start] = self._reservoir
+            seen = {self._window_start: self._seen}
+        try:
+            shutil.rmtree(self.collecting_dir, ignore_errors=True)
+            (self.state_dir / "collecting.json").unlink(missing_ok=True)
+            if not windows:
+                return True
+            self.collecting_dir.mkdir(parents=True, exist_ok=True)
+            for start, faces in windows.items():
+                np.save(self.collecting_dir / f"{int(start)}.npy", np.stack(faces))
+            (self.state_dir / "collecting.json").write_text(json.dumps(
+                {str(int(start)): seen.get(start, len(faces)) for start, faces in windows.items()}
+            ))
+            self.logger.info(f"Saved {sum(len(f) for f in windows.values())} unfolded adaptation sample(s)")
+            return True
+        except OSError as e:
+            self.logger.error(f"Could not save adaptation samples: {e}")
+            return False
+
+    def _restore(self) -> None:
+        """
+        Pick up samples saved by a previous run
+
+        The files stay until the next save(), so an adapter that never
+        saves (the gallery_adapt script) does not lose them; fold() skips
+        windows already folded.
+        """
+        try:
+            seen = json.loads((self.state_dir / "collecting.json").read_text())
+        except (OSError, ValueError):
+            return
+        restored = 0
+        for start, count in seen.items():
+            try:
+                faces = list(np.load(self.collecting_dir / f"{start}.npy"))
+            except (OSError, ValueError):
+                continue
+            start = float(start)
+            if start == self._window_start:
+                self._reservoir, self._seen = faces, max(int(count), len(faces))
+            else:
+                self._pending[start] = faces
+            restored += len(faces)
+        if restored:
+            self.logger.info(f"Restored {restored} adaptation sample(s) from the last run")
+
+    def consider(self, confidence: float, crop: Callable[[], Optional[np.ndarray]]) -> bool:
+        """
+        Offer one owner match (safe from the check thread)
+
+        Reservoir sampling keeps a uniform sample of the window's matches,
+        so a long session cannot crowd out the rest of the day.
+
+        Args:
+            confidence: LBPH distance of the match (lower is better)
+            crop: Returns the face crop (BGR or gray); only called when the
+                  sample is actually kept
+
+        Returns:
+            True if the sample was kept
+        """
+        if confidence > self.accept_confidence:
+            return False
+        with self._lock:
+            self._roll(time.time())
+            self._seen += 1
+            if len(self._reservoir) < self.per_window:
+                slot = len(self._reservoir)
+            else:
+                slot = self._rng.randrange(self._seen)
+                if slot >= self.per_window:
+                    return False
+
+            face = crop()
+            if face is None or face.size == 0:
+                return False
+            if face.ndim == 3:
+                face = cv2.cvtColor(face, cv2.COLOR_BGR2GRAY)
+            face = cv2.resize(face, FACE_SIZE)  # a new array: the crop may be a frame view
+            if slot == len(self._reservoir):
+                self._reservoir.append(face)
+            else:
+                self._reservoir[slot] = face
+            return True
+
+    @property
+    def pending(self) -> int:
+        """Samples waiting for the next fold (closed windows only)"""
+        with self._lock:
+            self._roll(time.time())
+            return sum(len(faces) for faces in self._pending.values())
+
+    def fold(self) -> bool:
+        """
+        Fold closed windows into the model file (blocking)
+
+        Incremental (LBPH update()) while the model stays under
+        max_samples; past the cap the oldest windows are dropped and the
+        model is rebuilt from the base plus the windows that remain.
+        Samples that could not be folded stay pending for the next call.
+
+        Returns:
+            True if the model file changed (the caller reloads it)
+        """
+        with self._lock:
+            self._roll(time.time())
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return False
+
+        ok = False
+        with self._fold_lock:
+            if not self.encodings_path.exists():
+                self.logger.warning(f"No owner model at {self.encodings_path}, keeping adaptation samples")
+            else:
+                try:
+                    ok = self._fold(pending)
+                except Exception as e:
+                    self.logger.error(f"Gallery adaptation failed, model left unchanged: {e}")
+        if not ok and pending:
+            with self._lock:
+                for start, faces in pending.items():
+                    self._pending.setdefault(start, faces)
+        return ok
+
+    def _rebase(self, manifest: Dict) -> Dict:
+        """Make the current model the base, forgetting folded windows and versions"""
+        for version in manifest['versions']:
+            (self.state_dir / "versions" / version['file']).unlink(missing_ok=True)
+        base = self.state_dir / "base.pkl"
+        shutil.copy2(self.encodings_path, base)
+        manifest = {'base_samples': model_samples(FaceRecognizer(str(base))), 'windows': [], 'versions': [],
+                    'model_digest': file_digest(base)}
+        self._prune(manifest)
+        return manifest
+
+    def _fold(self, pending: Dict[float, List[np.ndarray]]) -> bool:
+        """
+        Fold pending windows (fold lock held); windows already folded are
+        removed from pending, the rest stay there unless this succeeds
+        """
+        (self.state_dir / "windows").mkdir(parents=True, exist_ok=True)
+        (self.state_dir / "versions").mkdir(exist_ok=True)
+        manifest = self._read_manifest()
+        # A saved window restored after a crash may have been folded already
+        for start in [s for s in pending if f"{int(s)}.npy" in {w['file'] for w in manifest['windows']}]:
+            del pending[start]
+        if not pending:
+            return False
+        base = self.state_dir / "base.pkl"
+        if not base.exists() or manifest['base_samples'] is None:
+            manifest = self._rebase(manifest)
+        elif manifest.get('model_digest') != file_digest(self.encodings_path):
+            self.logger.info("Owner model changed since the last fold (retrained?), using it as the new base")
+            manifest = self._rebase(manifest)
+        if manifest['base_samples'] >= self.max_samples:
+            self.logger.warning(f"Base model already holds {manifest['base_samples']} samples "
+                                f"(cap {self.max_samples}), not adapting")
+            self._write_manifest(manifest)
+            return False
+
+        # Previous model, for rollback
+        now = time.time()
+        stamp = f"{time.strftime('%Y%m%d-%H%M%S', time.localtime(now))}-{int(now * 1000) % 1000:03d}"
+        version = self.state_dir / "versions" / f"{stamp}.pkl"
+        shutil.copy2(self.encodings_path, version)
+        manifest['versions'].append({'file': version.name, 'windows': list(manifest['windows'])})
+
+        new_faces = []
+        for start, faces in sorted(pending.items()):
+            name = f"{int(start)}.npy"
+            np.save(self.state_dir / "windows" / name, np.stack(faces))
+            manifest['windows'].append({'file': name, 'start': start, 'count': len(faces)})
+            new_faces.extend(faces)
+
+        total = manifest['base_samples'] + sum(w['count'] for w in manifest['windows'])
+        try:
+            if total <= self.max_samples:
+                recognizer = FaceRecognizer(str(self.encodings_path))
+                ok = recognizer.update(new_faces)
+                mode = "incremental"
+            else:
+                while manifest['windows'] and total > self.max_samples:
+                    dropped = manifest['windows'].pop(0)
+                    total -= dropped['count']
+                faces = [face for w in manifest['windows']
+                         for face in np.load(self.state_dir / "windows" / w['file'])]
+                recognizer = FaceRecognizer(str(base))
+                recognizer.encodings_path = self.encodings_path
+                ok = recognizer.update(faces) if faces else recognizer.save_model()
+                mode = "rebuilt from base"
+        except Exception as e:
+            self.logger.error(f"Gallery adaptation update raised: {e}")
+            ok = False
+        if not ok:
+            shutil.copy2(version, self.encodings_path)
+            version.unlink()
+            self.logger.error("Gallery adaptation update failed, previous model restored")
+            return False
+
+        manifest['model_digest'] = file_digest(self.encodings_path)
+        self._prune(manifest)
+        self._write_manifest(manifest)
+        self.logger.info(f"Gallery adapted with {len(new_faces)} sample(s) from {len(pending)} window(s) "
+                         f"({mode}, model now {total}/{self.max_samples} samples)",
+                         extra={'event': 'gallery_adapt', 'samples': len(new_faces), 'total': total})
+        return True
+
+    def _prune(self, manifest: Dict) -> None:
+        """Drop versions past keep_versions and window files nothing refers to"""
+        while len(manifest['versions']) > self.keep_versions:
+            old = manifest['versions'].pop(0)
+            (self.state_dir / "versions" / old['file']).unlink(missing_ok=True)
+        referenced = {w['file'] for w in manifest['windows']}
+        for v in manifest['versions']:
+            referenced.update(w['file'] for w in v['windows'])
+        for path in (self.state_dir / "windows").glob("*.npy"):
+            if path.name not in referenced:
+                path.unlink()
+
+    def rollback(self) -> bool:
+        """
+        Restore the model from before the last fold
+
+        Returns:
+            True if a version was restored (the caller reloads the model)
+        """
+        with self._fold_lock:
+            manifest = self._read_manifest()
+            if not manifest['versions']:
+                self.logger.warning("No adapted model version to roll back to")
+                return False
+            version = manifest['versions'].pop()
+            path = self.state_dir / "versions" / version['file']
+            shutil.copy2(path, self.encodings_path)
+            path.unlink()
+            manifest['windows'] = version['windows']
+            manifest['model_digest'] = file_digest(self.encodings_path)
+            self._prune(manifest)
+            self._write_manifest(manifest)
+            self.logger.info(f"Gallery rolled back to {version['file']}")
+            return True
+
+    def reset(self) -> bool:
+        """
+        Restore the pre-adaptation model and forget all folded samples
+
+        Returns:
+            True if the base model was restored
+        """
+        with self._fold_lock:
+            base = self.state_dir / "base.pkl"
+            if not base.exists():
+                return False
+            shutil.copy2(base, self.encodings_path)
+            shutil.rmtree(self.state_dir)
+            self.logger.info("Gallery adaptation reset to the enrolled model")
+            return True
+
+    def status(self) -> Dict:
+        """Base size, folded windows, versions and samples waiting"""
+        manifest = self._read_manifest()
+        with self._lock:
+            collecting = len(self._reservoir)
+        return {
+            'base_samples': manifest['base_samples'],
+            'folded_samples': sum(w['count'] for w in manifest['windows']),
+            'windows': len(manifest['windows']),
+            'versions': [v['file'] for v in manifest['versions']],
+            'pending': self.pending,
+            'collecting': collecting,
+            'max_samples': self.max_samples,
+        }
@@ -0,0 +1,314 @@
+"""
+Inference Client
+Session-side stand-in for PresenceChecker that forwards checks to the
+shared inference service; imports neither cv2 nor numpy, so a session
+daemon using it stays a thin D-Bus adapter
+"""
+
+import json
+import os
+import socket
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+from src.core import inference_protocol as proto
+from src.core.inference_protocol import Op, Status
+from src.core.presence_result import PresenceResult, Verdict
+from src.utils.logger import get_logger
+from src.utils.metrics import MetricsRegistry, get_metrics
+
+
+class RemotePresenceChecker:
+    """PresenceChecker interface backed by the inference service (blocking calls)"""
+
+    def __init__(
+        self,
+        socket_path: str,
+        encodings_path: str,
+        frames_per_check: int = 3,
+        motion_threshold: float = 8.0,
+        confidence_threshold: float = 50.0,
+        timeout: float = 10.0,
+        metrics: Optional[MetricsRegistry] = None
+    ):
+        """
+        Initialize remote presence checker (connects on first use)
+
+        Args:
+            socket_path: Inference service socket
+            encodings_path: This session's trained recognizer file; its
+                            bytes are uploaded, the service never opens it
+            frames_per_check: Frames analysed by a full check
+            motion_threshold: Motion gate threshold for verify()
+            confidence_threshold: Recognition threshold
+            timeout: Seconds to wait for a reply
+            metrics: Stage latency histograms (defaults to the global registry)
+        """
+        self.logger = get_logger(__name__)
+        self.socket_path = socket_path
+        self.encodings_path = encodings_path
+        self.frames_per_check = frames_per_check
+        self.motion_threshold = motion_threshold
+        self.confidence_threshold = confidence_threshold
+        self.timeout = timeout
+        self.metrics = metrics or get_metrics()
+
+        self.last_result: Optional[PresenceResult] = None
+        self.last_timings: Dict[str, float] = {}
+        self.last_used = time.monotonic()
+        self._sock: Optional[socket.socket] = None
+        self._lock = threading.Lock()
+        self._request_id = 0
+        self._model_stamp: Optional[Tuple[int, int]] = None
+        self._digest: Optional[bytes] = None
+
+    @property
+    def is_loaded(self) -> bool:
+        """Models live in the service; nothing to unload here"""
+        return False
+
+    def unload(self) -> bool:
+        """No-op (see is_loaded)"""
+        return False
+
+    def close_camera(self) -> None:
+        """Disconnect from the service (the camera is the service's)"""
+        with self._lock:
+            self._disconnect()
+
+    def update_settings(
+        self,
+        confidence_threshold: Optional[float] = None,
+        frames_per_check: Optional[int] = None,
+        motion_threshold: Optional[float] = None,
+        **service_settings
+    ) -> None:
+        """
+        Apply per-session tuning; detection settings (score threshold,
+        input scale, threads...) belong to the service and are ignored
+
+        Args:
+            confidence_threshold: Recognition threshold
+            frames_per_check: Frames analysed by a full check
+            motion_threshold: Motion gate threshold
+        """
+        if confidence_threshold is not None:
+            self.confidence_threshold = confidence_threshold
+        if frames_per_check is not None:
+            self.frames_per_check = frames_per_check
+        if motion_threshold is not None:
+            self.motion_threshold = motion_threshold
+        ignored = [name for name, value in service_settings.items() if value is not None]
+        if ignored:
+            self.logger.debug(f"Set by the inference service, ignored here: {', '.join(ignored)}")
+
+    def _connect(self) -> socket.socket:
+        if self._sock is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            try:
+                sock.connect(self.socket_path)
+            except OSError:
+                sock.close()
+                raise
+            self._sock = sock
+        return self._sock
+
+    def _disconnect(self) -> None:
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+    def _call(self, op: int, payload: bytes = b"") -> Optional[Tuple[int, bytes]]:
+        """
+        Send one request and wait for its reply
+
+        A dropped connection (refused, broken pipe, closed before the reply)
+        is retried once on a new one. A reply that does not come in time is
+        not: the service may still be running the request, and sending a
+        CHECK again would start a second capture.
+
+        Returns:
+            Tuple (status, reply payload), or None if the service is
+            unreachable or did not answer
+        """
+        with self._lock:
+            for attempt in (1, 2):
+                try:
+                    sock = self._connect()
+                    self._request_id = (self._request_id + 1) & 0xFFFFFFFF
+                    sock.sendall(proto.encode(op, self._request_id, payload))
+                    status, request_id, reply = proto.recv_message(sock)
+                    if request_id != self._request_id:
+                        raise proto.ProtocolError(f"reply {request_id} for request {self._request_id}")
+                    break
+                except (socket.timeout, proto.ProtocolError) as e:
+                    # Out of step with the service: a late reply must not answer the next request
+                    self._disconnect()
+                    self.logger.error(f"No valid reply from the inference service: {e}")
+                    return None
+                except OSError as e:
+                    # A restarted service leaves a dead connection behind
+                    self._disconnect()
+                    if attempt == 2:
+                        self.logger.error(f"Inference service unreachable at {self.socket_path}: {e}")
+                        return None
+            self.last_used = time.monotonic()
+        return status, reply
+
+    def _request(self, op: int, payload: bytes = b"") -> Optional[bytes]:
+        """
+        Send one request and wait for its reply
+
+        Returns:
+            Reply payload, or None if the service failed or refused
+        """
+        answer = self._call(op, payload)
+        if answer is None:
+            return None
+        status, reply = answer
+        if status != Status.OK:
+            self.logger.error(f"Inference service refused request ({status}): {reply.decode(errors='replace')}")
+            return None
+        return reply
+
+    def _gallery_digest(self) -> Optional[bytes]:
+        """Digest of our model file, re-hashed only when the file changed"""
+        try:
+            info = os.stat(self.encodings_path)
+            stamp = (info.st_mtime_ns, info.st_size)
+            if stamp != self._model_stamp:
+                with open(self.encodings_path, 'rb') as f:
+                    self._digest = proto.gallery_digest(f.read())
+                self._model_stamp = stamp
+            return self._digest
+        except OSError as e:
+            self.logger.error(f"Cannot read owner model {self.encodings_path}: {e}")
+            return None
+
+    def _upload_gallery(self) -> Optional[bytes]:
+        """
+        Send our model file to the service (LOAD)
+
+        Returns:
+            Digest the service knows it by, or None on failure
+        """
+        try:
+            with open(self.encodings_path, 'rb') as f:
+                model = f.read()
+        except OSError as e:
+            self.logger.error(f"Cannot read owner model {self.encodings_path}: {e}")
+            return None
+        digest = self._request(Op.LOAD, model)
+        if digest is not None:
+            self.logger.info(f"Uploaded owner model to the inference service ({len(model)} bytes)")
+        return digest
+
+    def _gallery_request(self, op: int, pack: Callable[[bytes], bytes]) -> Optional[bytes]:
+        """
+        Send a request naming our gallery, uploading it first if the
+        service does not have it (first use, eviction, service restart)
+
+        Args:
+            op: CHECK or VERIFY
+            pack: Builds the payload for a gallery digest
+
+        Returns:
+            Reply payload, or None if the service failed or refused
+        """
+        digest = self._gallery_digest()
+        if digest is None:
+            return None
+        answer = self._call(op, pack(digest))
+        if answer is not None and answer[0] == Status.NOT_LOADED:
+            digest = self._upload_gallery()
+            if digest is None:
+                return None
+            answer = self._call(op, pack(digest))
+        if answer is None:
+            return None
+        status, reply = answer
+        if status != Status.OK:
+            self.logger.error(f"Inference service refused request ({status}): {reply.decode(errors='replace')}")
+            return None
+        return reply
+
+    def ping(self) -> bool:
+        """True if the service answers"""
+        return self._request(Op.PING) is not None
+
+    def stats(self) -> Optional[Dict]:
+        """Service state and metrics, or None if unreachable"""
+        reply = self._request(Op.STATS)
+        return json.loads(reply) if reply is not None else None
+
+    def _check(self, num_frames: int, budget: float) -> Tuple[PresenceResult, Dict[str, float]]:
+        reply = self._gallery_request(Op.CHECK, lambda digest: proto.CHECK_REQUEST.pack(
+            num_frames, budget, self.confidence_threshold, digest))
+        if reply is None:
+            self.last_timings = {}
+            return PresenceResult(Verdict.ERROR), {}
+
+        (verdict, confidence, face_count, frames, duration,
+         capture, detect, recognize, shared) = proto.CHECK_REPLY.unpack(reply)
+        result = PresenceResult(proto.verdict_name(verdict), confidence, face_count, frames, duration)
+        timings = {'capture': capture, 'detect': detect, 'recognize': recognize}
+        self.metrics.observe_many(timings)
+        if shared:
+            self.metrics.increment('shared_checks')
+        self.last_result = result
+        self.last_timings = dict(timings)
+        return result, timings
+
+    def check(self, num_frames: Optional[int] = None) -> PresenceResult:
+        """
+        Full presence check, run by the service (blocking)
+
+        Args:
+            num_frames: Frames to analyse (defaults to frames_per_check)
+
+        Returns:
+            PresenceResult (ERROR if the service is unreachable)
+        """
+        start = time.monotonic()
+        result, _ = self._check(num_frames or self.frames_per_check, 0.0)
+        self.logger.info(
+            f"Presence check: {result.verdict} (confidence: {result.confidence:.1f}, "
+            f"frames: {result.frames}, {(time.monotonic() - start) * 1000:.0f} ms, via service)",
+            extra={'event': 'presence_check', 'verdict': result.verdict,
+                   'confidence': result.confidence, 'face_count': result.face_count,
+                   'frames': result.frames, 'duration': result.duration}
+        )
+        return result
+
+    def check_within(self, budget: float) -> Tuple[PresenceResult, Dict[str, float]]:
+        """
+        Budgeted presence check (blocking)
+
+        Args:
+            budget: Seconds available for the whole check
+
+        Returns:
+            Tuple (result, timings)
+        """
+        start = time.monotonic()
+        result, timings = self._check(self.frames_per_check, budget)
+        timings['total'] = time.monotonic() - start
+        return result, timings
+
+    def verify(self) -> bool:
+        """
+        Lease re-verification by the service (blocking)
+
+        Returns:
+            True if the owner is (still) present
+        """
+        reply = self._gallery_request(Op.VERIFY, lambda digest: proto.VERIFY_REQUEST.pack(
+            self.confidence_threshold, self.motion_threshold, digest))
+        if reply is None:
+            return False
+        present, gated = proto.VERIFY_REPLY.unpack(reply)
+        if gated:
+            self.metrics.increment('motion_gate', 'skip')
+        return bool(present)
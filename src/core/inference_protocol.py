@@ -0,0 +1,169 @@
+"""
+Inference Protocol
+Binary framing between session daemons and the shared inference service
+(Unix domain socket); struct-packed, no cv2/numpy, so the client side
+stays a thin import
+
+Every message is a 12-byte header followed by a payload:
+
+    magic "SC" | version u8 | op (request) or status (reply) u8 |
+    request id u32 | payload length u32
+
+The service never opens files for a client: a session uploads its model
+file once (LOAD) and then names it by the SHA-256 digest of its bytes.
+
+Request payloads:
+    PING    -
+    LOAD    model file contents
+    CHECK   frames u16 | budget f32 (0 = none) | confidence threshold f32 | gallery digest 32s
+    VERIFY  confidence threshold f32 | motion threshold f32 | gallery digest 32s
+    STATS   -
+
+Reply payloads (status OK):
+    LOAD    gallery digest 32s
+    CHECK   verdict u8 | confidence f32 | faces u16 | frames u16 | duration f32 |
+            capture f32 | detect f32 | recognize f32 | shared u8
+    VERIFY  present u8 | gated u8
+    STATS   JSON (UTF-8)
+NOT_LOADED means the digest is not (or no longer) loaded for this uid:
+send LOAD and retry. DENIED means the uid has no active session on a
+local seat (LOAD, CHECK and VERIFY need one). Other statuses carry an
+error message (UTF-8).
+"""
+
+import asyncio
+import hashlib
+import socket
+import struct
+from typing import Tuple
+
+from src.core.presence_result import Verdict
+
+
+MAGIC = b"SC"
+VERSION = 2
+HEADER = struct.Struct("!2sBBII")
+# A trained LBPH model serializes to ~128 KiB per sample; 640 samples
+# covers adaptation.max_samples (500) with room for enrollment
+MAX_MODEL_SAMPLES = 640
+MAX_PAYLOAD = MAX_MODEL_SAMPLES * 132 * 1024
+
+CHECK_REQUEST = struct.Struct("!Hff32s")
+VERIFY_REQUEST = struct.Struct("!ff32s")
+CHECK_REPLY = struct.Struct("!BfHHffffB")
+VERIFY_REPLY = struct.Struct("!BB")
+
+# Wire codes of Verdict values, by position
+VERDICTS = (Verdict.OWNER, Verdict.UNKNOWN, Verdict.NO_FACE, Verdict.ERROR)
+
+
+class Op:
+    """Request types"""
+    PING = 0
+    CHECK = 1
+    VERIFY = 2
+    STATS = 3
+    LOAD = 4
+
+
+class Status:
+    """Reply status codes"""
+    OK = 0
+    ERROR = 1
+    DENIED = 2
+    BAD_REQUEST = 3
+    NOT_LOADED = 4
+
+
+class ProtocolError(ValueError):
+    """Raised for a malformed or incompatible message"""
+
+
+def encode(code: int, request_id: int, payload: bytes = b"") -> bytes:
+    """
+    Frame one message
+
+    Args:
+        code: Op for a request, Status for a reply
+        request_id: Matches a reply to its request
+        payload: Op-specific body
+
+    Returns:
+        Header + payload
+    """
+    if len(payload) > MAX_PAYLOAD:
+        raise ProtocolError(f"payload of {len(payload)} bytes exceeds {MAX_PAYLOAD}")
+    return HEADER.pack(MAGIC, VERSION, code, request_id, len(payload)) + payload
+
+
+def decode_header(header: bytes) -> Tuple[int, int, int]:
+    """
+    Parse and validate a header
+
+    Returns:
+        Tuple (op or status, request id, payload length)
+
+    Raises:
+        ProtocolError: on a wrong magic or version, or an oversized payload
+    """
+    magic, version, code, request_id, length = HEADER.unpack(header)
+    if magic != MAGIC:
+        raise ProtocolError(f"bad magic {magic!r}")
+    if version != VERSION:
+        raise ProtocolError(f"unsupported protocol version {version}")
+    if length > MAX_PAYLOAD:
+        raise ProtocolError(f"payload of {length} bytes exceeds {MAX_PAYLOAD}")
+    return code, request_id, length
+
+
+def gallery_digest(model: bytes) -> bytes:
+    """Name of an uploaded gallery: SHA-256 of the model file"""
+    return hashlib.sha256(model).digest()
+
+
+async def read_message(reader: asyncio.StreamReader) -> Tuple[int, int, bytes]:
+    """
+    Read one message from a stream (server side)
+
+    Returns:
+        Tuple (op or status, request id, payload)
+
+    Raises:
+        asyncio.IncompleteReadError: when the peer closed the connection
+        ProtocolError: on a malformed header
+    """
+    code, request_id, length = decode_header(await reader.readexactly(HEADER.size))
+    payload = await reader.readexactly(length) if length else b""
+    return code, request_id, payload
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    chunks, remaining = [], size
+    while remaining:
+        chunk = sock.recv(remaining)
+        if not chunk:
+            raise ConnectionError("inference service closed the connection")
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return b"".join(chunks)
+
+
+def recv_message(sock: socket.socket) -> Tuple[int, int, bytes]:
+    """
+    Read one message from a blocking socket (client side)
+
+    Returns:
+        Tuple (op or status, request id, payload)
+    """
+    code, request_id, length = decode_header(_recv_exact(sock, HEADER.size))
+    return code, request_id, _recv_exact(sock, length) if length else b""
+
+
+def verdict_code(verdict: str) -> int:
+    """Verdict -> wire code"""
+    return VERDICTS.index(verdict)
+
+
+def verdict_name(code: int) -> str:
+    """Wire code -> Verdict (ERROR for unknown codes)"""
+    return VERDICTS[code] if code < len(VERDICTS) else Verdict.ERROR
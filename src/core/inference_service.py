@@ -0,0 +1,582 @@
+"""
+Inference Service
+Per-machine owner of the camera and the YuNet network, serving presence
+checks to session daemons over a Unix domain socket
+
+Only uids with an active session on a local seat (logind) may upload a
+gallery or turn the camera on; SSH users and background sessions are
+denied. Each session uploads its own gallery (the bytes of its trained
+recognizer file; the service never opens a path a client names) and
+refers to it by digest; galleries are kept in a small LRU per uid, so no
+uid can evict another's. Requests that arrive
+while a capture is running, or shortly after one, reuse its frames and
+detections instead of opening the camera again, so two sessions asking
+at once cost one capture and one detection pass.
+"""
+
+import asyncio
+import json
+import os
+import socket
+import struct
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+import cv2
+import numpy as np
+from dbus_next import BusType, Message, MessageType
+
+from src.core import inference_protocol as proto
+from src.core.face_detector import FaceDetector
+from src.core.face_recognizer import FaceRecognizer
+from src.core.frame_source import FrameSource
+from src.core.inference_protocol import Op, Status, gallery_digest
+from src.core.presence_checker import PresenceChecker
+from src.core.presence_result import PresenceResult, Verdict
+from src.utils.bus_manager import BusManager, get_bus_manager
+from src.utils.image_utils import crop_face
+from src.utils.logger import get_logger
+from src.utils.metrics import MetricsRegistry, get_metrics
+
+
+DEFAULT_SOCKET = "/run/sleep-checker/inference.sock"
+_PEERCRED = struct.Struct("3i")
+
+# Requests that need an active seat session: they load a model or use the camera
+_SEAT_OPS = (Op.LOAD, Op.CHECK, Op.VERIFY)
+
+SeatCheck = Callable[[int], Awaitable[bool]]
+
+
+class GalleryNotLoaded(LookupError):
+    """The requesting uid has no gallery with that digest loaded (NOT_LOADED)"""
+
+
+class LogindSeatCheck:
+    """Allows uids with an active, local session on a seat (asks logind)"""
+
+    def __init__(self, bus_manager: Optional[BusManager] = None, cache_seconds: float = 2.0):
+        """
+        Initialize seat check
+
+        Args:
+            bus_manager: Shared D-Bus connections (defaults to the global one)
+            cache_seconds: How long an answer is reused for the same uid
+        """
+        self.logger = get_logger(__name__)
+        self.bus_manager = bus_manager or get_bus_manager()
+        self.cache_seconds = cache_seconds
+        self._cache: Dict[int, Tuple[float, bool]] = {}
+
+        self.login1_service = "org.freedesktop.login1"
+        self.login1_path = "/org/freedesktop/login1"
+        self.login1_interface = "org.freedesktop.login1.Manager"
+
+    async def __call__(self, uid: int) -> bool:
+        """
+        Check a uid
+
+        Returns:
+            True if the uid has an active session on a seat (not remote);
+            False otherwise, or if logind cannot be asked
+        """
+        cached = self._cache.get(uid)
+        if cached is not None and time.monotonic() - cached[0] < self.cache_seconds:
+            return cached[1]
+        try:
+            allowed = await self._query(uid)
+        except Exception as e:
+            self.logger.warning(f"Could not ask logind about uid {uid}: {e}")
+            allowed = False
+        self._cache[uid] = (time.monotonic(), allowed)
+        return allowed
+
+    async def _query(self, uid: int) -> bool:
+        reply = await self.bus_manager.call(Message(
+            destination=self.login1_service,
+            path=self.login1_path,
+            interface=self.login1_interface,
+            member="ListSessions"
+        ), BusType.SYSTEM)
+        if reply.message_type != MessageType.METHOD_RETURN:
+            self.logger.warning(f"logind ListSessions failed: {reply.body}")
+            return False
+
+        # (id, uid, user, seat, object path); sessions without a seat are remote or background
+        for _, session_uid, _, seat, path in reply.body[0]:
+            if session_uid != uid or not seat:
+                continue
+            if await self._session_property(path, "Active") and not await self._session_property(path, "Remote"):
+                return True
+        return False
+
+    async def _session_property(self, path: str, name: str) -> bool:
+        reply = await self.bus_manager.call(Message(
+            destination=self.login1_service,
+            path=path,
+            interface="org.freedesktop.DBus.Properties",
+            member="Get",
+            signature="ss",
+            body=["org.freedesktop.login1.Session", name]
+        ), BusType.SYSTEM)
+        if reply.message_type != MessageType.METHOD_RETURN:
+            raise RuntimeError(f"{name} of {path}: {reply.body}")
+        return bool(reply.body[0].value)
+
+
+class _Frame:
+    """One captured frame; detection runs at most once, on first need"""
+
+    __slots__ = ('bgr', 'gray', 'thumbnail', 'face_count', 'face', 'detect_time', '_detected')
+
+    def __init__(self, bgr: np.ndarray):
+        self.bgr = bgr
+        self.gray = cv2.cvtColor(bgr, cv2.COLOR_BGR2GRAY)
+        self.thumbnail = PresenceChecker._thumbnail(self.gray)
+        self.face_count = 0
+        self.face: Optional[np.ndarray] = None
+        self.detect_time = 0.0
+        self._detected = False
+
+    def detect(self, detector: FaceDetector) -> float:
+        """
+        Find the largest face (cached across requests)
+
+        Returns:
+            Seconds spent detecting by this call (0 if already done)
+        """
+        if self._detected:
+            return 0.0
+        start = time.monotonic()
+        detections = detector.detect(self.bgr)
+        self.face_count = len(detections)
+        if detections:
+            x, y, w, h, _ = max(detections, key=lambda d: d[2] * d[3])
+            self.face = crop_face(self.gray, (x, y, w, h))
+        self._detected = True
+        self.detect_time = time.monotonic() - start
+        return self.detect_time
+
+
+@dataclass
+class _Capture:
+    frames: List[_Frame]
+    at: float
+    capture_time: float
+
+
+@dataclass
+class _Gallery:
+    """A session's recognizer plus its motion-gate reference"""
+    recognizer: FaceRecognizer
+    reference: Optional[np.ndarray] = None
+    last_used: float = field(default_factory=time.monotonic)
+
+
+class InferenceService:
+    """Shared camera + detector serving CHECK/VERIFY requests from sessions"""
+
+    def __init__(
+        self,
+        socket_path: str,
+        detector: FaceDetector,
+        source: FrameSource,
+        warmup_time: float = 0.5,
+        coalesce_window: float = 0.25,
+        max_galleries: int = 8,
+        unload_after: float = 600.0,
+        seat_check: Optional[SeatCheck] = None,
+        metrics: Optional[MetricsRegistry] = None
+    ):
+        """
+        Initialize inference service
+
+        Args:
+            socket_path: Unix socket to listen on
+            detector: Face detector shared by every session
+            source: Camera (or other frame source) owned by the service
+            warmup_time: Seconds to let auto-exposure settle after opening
+            coalesce_window: Seconds a finished capture is still handed to
+                             new requests instead of capturing again
+            max_galleries: Galleries kept loaded per uid (least recently
+                           used go first)
+            unload_after: Drop the network and galleries after this many
+                          idle seconds (0 = never)
+            seat_check: Coroutine deciding whether a uid may load galleries
+                        and use the camera (e.g. LogindSeatCheck); None
+                        allows every uid
+            metrics: Stage latency histograms (defaults to the global registry)
+        """
+        self.logger = get_logger(__name__)
+        self.socket_path = socket_path
+        self.detector = detector
+        self.source = source
+        self.warmup_time = warmup_time
+        self.coalesce_window = coalesce_window
+        self.max_galleries = max_galleries
+        self.unload_after = unload_after
+        self.seat_check = seat_check
+        self.metrics = metrics or get_metrics()
+
+        # One thread: the camera, the network and the galleries are never
+        # touched concurrently, and requests queue in arrival order
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="inference")
+        self._galleries: "OrderedDict[Tuple[int, bytes], _Gallery]" = OrderedDict()
+        self._pending: Optional[asyncio.Future] = None
+        self._pending_count = 0
+        self._last: Optional[_Capture] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._unload_task: Optional[asyncio.Task] = None
+        self._writers: Set[asyncio.StreamWriter] = set()
+        self.last_used = time.monotonic()
+        self.clients = 0
+
+    async def start(self) -> bool:
+        """
+        Listen on the socket
+
+        Returns:
+            True if listening
+        """
+        try:
+            path = Path(self.socket_path)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            if path.is_socket():
+                path.unlink()
+            self._server = await asyncio.start_unix_server(self._handle_client, path=str(path))
+            # Any local uid may connect; requests that load a model or use
+            # the camera are only served to uids with an active seat session
+            os.chmod(path, 0o666)
+            if self.unload_after > 0:
+                self._unload_task = asyncio.ensure_future(self._unload_loop())
+            self.logger.info(f"✓ Inference service listening on {path}")
+            return True
+        except OSError as e:
+            self.logger.error(f"Failed to start inference service on {self.socket_path}: {e}")
+            return False
+
+    async def stop(self) -> None:
+        """Stop listening and release the camera and models"""
+        if self._unload_task is not None:
+            self._unload_task.cancel()
+        if self._server is not None:
+            self._server.close()
+            # Open sessions too: they reconnect to the next instance
+            for writer in list(self._writers):
+                writer.close()
+            await self._server.wait_closed()
+            self._server = None
+        await self._run(self.source.close)
+        self._executor.shutdown(wait=True)
+        try:
+            Path(self.socket_path).unlink()
+        except OSError:
+            pass
+
+    async def _run(self, fn, *args):
+        """Run fn on the inference thread"""
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serve one session daemon until it disconnects"""
+        uid = self._peer_uid(writer)
+        self.clients += 1
+        self._writers.add(writer)
+        self.logger.info(f"Session connected (uid {uid})")
+        try:
+            while True:
+                try:
+                    op, request_id, length = proto.decode_header(await reader.readexactly(proto.HEADER.size))
+                    if op in _SEAT_OPS and not await self._allowed(uid):
+                        # Nothing from a uid without a seat is buffered or parsed
+                        writer.write(proto.encode(Status.DENIED, request_id, b"no active seat session"))
+                        await writer.drain()
+                        self.logger.warning(f"Dropping client (uid {uid}): no active seat session")
+                        break
+                    payload = await reader.readexactly(length) if length else b""
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except proto.ProtocolError as e:
+                    self.logger.warning(f"Dropping client (uid {uid}): {e}")
+                    break
+
+                status, reply = await self._dispatch(uid, op, payload)
+                writer.write(proto.encode(status, request_id, reply))
+                await writer.drain()
+        finally:
+            self.clients -= 1
+            self._writers.discard(writer)
+            writer.close()
+            self.logger.info(f"Session disconnected (uid {uid})")
+
+    @staticmethod
+    def _peer_uid(writer: asyncio.StreamWriter) -> int:
+        """Kernel-verified uid of the connected process (SO_PEERCRED)"""
+        sock = writer.get_extra_info('socket')
+        _, uid, _ = _PEERCRED.unpack(sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, _PEERCRED.size))
+        return uid
+
+    async def _allowed(self, uid: int) -> bool:
+        """Whether uid may load galleries and use the camera"""
+        return self.seat_check is None or await self.seat_check(uid)
+
+    async def _dispatch(self, uid: int, op: int, payload: bytes) -> Tuple[int, bytes]:
+        """Run one request; returns (status, reply payload)"""
+        try:
+            if op == Op.PING:
+                return Status.OK, b""
+            if op == Op.STATS:
+                return Status.OK, self.stats(uid).encode()
+            if op in _SEAT_OPS and not await self._allowed(uid):
+                self.metrics.increment('service_denied')
+                return Status.DENIED, b"no active seat session"
+            if op == Op.LOAD:
+                return Status.OK, await self.load(uid, payload)
+            if op == Op.CHECK:
+                frames, budget, threshold, digest = proto.CHECK_REQUEST.unpack(payload)
+                return Status.OK, await self.check(uid, digest, frames, budget, threshold)
+            if op == Op.VERIFY:
+                threshold, motion_threshold, digest = proto.VERIFY_REQUEST.unpack(payload)
+                return Status.OK, await self.verify(uid, digest, threshold, motion_threshold)
+            return Status.BAD_REQUEST, f"unknown op {op}".encode()
+        except GalleryNotLoaded as e:
+            return Status.NOT_LOADED, str(e).encode()
+        except (struct.error, ValueError) as e:
+            return Status.BAD_REQUEST, str(e).encode()
+        except Exception as e:
+            self.logger.error(f"Request failed: {e}")
+            return Status.ERROR, str(e).encode()
+        finally:
+            self.last_used = time.monotonic()
+
+    async def check(self, uid: int, digest: bytes, num_frames: int, budget: float,
+                    threshold: float) -> bytes:
+        """
+        Full (or budgeted) presence check against a session's gallery
+
+        Returns:
+            CHECK reply payload
+        """
+        start = time.monotonic()
+        deadline = start + budget if budget > 0 else None
+        gallery = self._gallery(uid, digest)
+        num_frames = max(1, num_frames)
+        capture, shared = await self._frames(num_frames, deadline)
+        result, detect, recognize = await self._run(self._evaluate, capture.frames[:num_frames], gallery,
+                                                    threshold, deadline)
+        result.duration = time.monotonic() - start
+        self.metrics.increment('service_checks', 'shared' if shared else 'captured')
+        self.logger.info(
+            f"Check for uid {uid}: {result.verdict} ({result.frames} frame(s), "
+            f"{result.duration * 1000:.0f} ms{', shared capture' if shared else ''})"
+        )
+        return proto.CHECK_REPLY.pack(
+            proto.verdict_code(result.verdict), result.confidence, result.face_count, result.frames,
+            result.duration, 0.0 if shared else capture.capture_time, detect, recognize, int(shared)
+        )
+
+    async def verify(self, uid: int, digest: bytes, threshold: float, motion_threshold: float) -> bytes:
+        """
+        Lease re-verification: motion gate against the session's reference,
+        else one frame detected and recognized
+
+        Returns:
+            VERIFY reply payload
+        """
+        gallery = self._gallery(uid, digest)
+        capture, _ = await self._frames(1)
+        frame = capture.frames[0] if capture.frames else None
+        if frame is None:
+            return proto.VERIFY_REPLY.pack(0, 0)
+
+        if gallery.reference is not None:
+            motion = float(cv2.absdiff(frame.thumbnail, gallery.reference).mean())
+            if motion < motion_threshold:
+                self.metrics.increment('motion_gate', 'skip')
+                return proto.VERIFY_REPLY.pack(1, 1)
+
+        result, _, _ = await self._run(self._evaluate, [frame], gallery, threshold, None)
+        if result.verdict != Verdict.OWNER:
+            gallery.reference = None
+        return proto.VERIFY_REPLY.pack(int(result.verdict == Verdict.OWNER), 0)
+
+    def stats(self, uid: int) -> str:
+        """Service state and metrics as JSON (STATS reply; only the caller's galleries)"""
+        return json.dumps({
+            'clients': self.clients,
+            'galleries': [digest.hex()[:12] for owner, digest in self._galleries if owner == uid],
+            'detector_loaded': self.detector.is_loaded,
+            'metrics': self.metrics.snapshot(),
+        })
+
+    async def _frames(self, count: int, deadline: Optional[float] = None) -> Tuple[_Capture, bool]:
+        """
+        Frames for a request: a recent or running capture when it has
+        enough frames, otherwise a new one
+
+        Returns:
+            Tuple (capture, shared)
+        """
+        last = self._last
+        if (last is not None and len(last.frames) >= count and
+                time.monotonic() - last.at <= self.coalesce_window):
+            return last, True
+        if self._pending is not None and self._pending_count >= count:
+            return await asyncio.shield(self._pending), True
+
+        future = asyncio.ensure_future(self._run(self._capture, count, deadline))
+        self._pending, self._pending_count = future, count
+        try:
+            capture = await future
+        finally:
+            if self._pending is future:
+                self._pending = None
+        self._last = capture
+        return capture, False
+
+    def _capture(self, count: int, deadline: Optional[float]) -> _Capture:
+        """Open the camera, grab count frames (fewer if the deadline nears), close it"""
+        start = time.monotonic()
+        frames: List[_Frame] = []
+        try:
+            if not self.source.is_open:
+                if not self.source.open():
+                    self.logger.error("Could not open camera")
+                    return _Capture(frames, time.monotonic(), time.monotonic() - start)
+                # Load the network while auto-exposure settles
+                self.detector.load(*self._frame_size())
+                remaining = self.warmup_time - (time.monotonic() - start)
+                if remaining > 0:
+                    time.sleep(remaining)
+
+            frame_cost = 0.0
+            for _ in range(count):
+                if deadline is not None and frames and deadline - time.monotonic() < frame_cost:
+                    break
+                t = time.monotonic()
+                frame = self.source.read()
+                if frame is None:
+                    break
+                frames.append(_Frame(frame))
+                frame_cost = time.monotonic() - t
+        finally:
+            self.source.close()
+
+        elapsed = time.monotonic() - start
+        self.metrics.observe('service_capture', elapsed)
+        return _Capture(frames, time.monotonic(), elapsed)
+
+    def _frame_size(self) -> Tuple[int, int]:
+        width = getattr(self.source, 'width', 640)
+        height = getattr(self.source, 'height', 480)
+        return width, height
+
+    async def load(self, uid: int, model: bytes) -> bytes:
+        """
+        Load a gallery uploaded by a session (LOAD)
+
+        The model is unpickled with the data-only unpickler and parsed by
+        OpenCV on the inference thread; the service runs unprivileged, and
+        a gallery is only ever served back to the uid that uploaded it.
+
+        Returns:
+            Digest the session names the gallery by
+
+        Raises:
+            ValueError: if the upload is not a trained model
+        """
+        digest = await self._run(gallery_digest, model)
+        key = (uid, digest)
+        if key not in self._galleries:
+            recognizer = await self._run(self._parse_gallery, uid, digest, model)
+            self._galleries[key] = _Gallery(recognizer)
+            self.logger.info(f"Loaded gallery {digest.hex()[:12]} for uid {uid} ({len(model)} bytes)")
+            self._galleries.move_to_end(key)
+            # Only this uid's own galleries compete for its slots
+            own = [k for k in self._galleries if k[0] == uid]
+            for evicted in own[:max(0, len(own) - self.max_galleries)]:
+                del self._galleries[evicted]
+                self.logger.info(f"Evicted gallery {evicted[1].hex()[:12]} of uid {uid}")
+        self._galleries.move_to_end(key)
+        return digest
+
+    @staticmethod
+    def _parse_gallery(uid: int, digest: bytes, model: bytes) -> FaceRecognizer:
+        recognizer = FaceRecognizer(encodings_path=f"uid-{uid}-{digest.hex()[:12]}.pkl", model_data=model)
+        if not recognizer.is_trained():
+            raise ValueError("upload is not a trained model")
+        return recognizer
+
+    def _gallery(self, uid: int, digest: bytes) -> _Gallery:
+        """
+        A gallery this uid uploaded (on the event loop, like every change
+        to the gallery table, so a request never queues behind a running
+        capture before it can join it)
+
+        Raises:
+            GalleryNotLoaded: if it was never uploaded by this uid, or evicted
+        """
+        key = (uid, digest)
+        gallery = self._galleries.get(key)
+        if gallery is None:
+            raise GalleryNotLoaded(f"gallery {digest.hex()[:12]} is not loaded for uid {uid}")
+        self._galleries.move_to_end(key)
+        gallery.last_used = time.monotonic()
+        return gallery
+
+    def _evaluate(
+        self, frames: List[_Frame], gallery: _Gallery, threshold: float, deadline: Optional[float]
+    ) -> Tuple[PresenceResult, float, float]:
+        """
+        Combine frames into a verdict for one gallery (same rules as
+        PresenceChecker.check: owner wins, any face means UNKNOWN)
+
+        Returns:
+            Tuple (result, detect seconds, recognize seconds)
+        """
+        recognizer = gallery.recognizer
+        recognizer.set_threshold(threshold)
+        detect_time, recognize_time = 0.0, 0.0
+        result = PresenceResult(Verdict.NO_FACE if frames else Verdict.ERROR)
+
+        for frame in frames:
+            detect_time += frame.detect(self.detector)
+            result.frames += 1
+            result.face_count = max(result.face_count, frame.face_count)
+            if frame.face is None or frame.face.size == 0:
+                continue
+            if deadline is not None and time.monotonic() >= deadline:
+                # Degraded: a face but no time left to recognize it
+                result.verdict = Verdict.UNKNOWN
+                break
+
+            t = time.monotonic()
+            is_owner, confidence = recognizer.recognize(frame.face)
+            recognize_time += time.monotonic() - t
+            if is_owner:
+                result.verdict, result.confidence = Verdict.OWNER, confidence
+                gallery.reference = frame.thumbnail
+                break
+            result.verdict = Verdict.UNKNOWN
+            result.confidence = min(result.confidence, confidence)
+
+        self.metrics.observe_many({'detect': detect_time, 'recognize': recognize_time})
+        return result, detect_time, recognize_time
+
+    async def _unload_loop(self) -> None:
+        """Drop the network and galleries after unload_after idle seconds"""
+        while True:
+            quiet = time.monotonic() - self.last_used
+            if quiet < self.unload_after:
+                await asyncio.sleep(self.unload_after - quiet)
+                continue
+            if self.detector.is_loaded or self._galleries:
+                await self._run(self.detector.unload)
+                self._galleries.clear()
+                self._last = None
+                self.logger.info("Models unloaded after inactivity")
+            await asyncio.sleep(self.unload_after)
@@ -0,0 +1,388 @@
+"""
+Inference Worker
+Runs FaceDetector/FaceRecognizer in a separate process; frames are handed
+over through shared-memory ring slots instead of pickled arrays
+"""
+
+import multiprocessing as mp
+import threading
+import numpy as np
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.utils.logger import get_logger
+
+
+def _worker_main(conn, shm_name: str, slot_bytes: int, settings: Dict[str, Any]) -> None:
+    """
+    Worker process entry point
+
+    Args:
+        conn: Pipe end for requests/replies
+        shm_name: Shared-memory ring name
+        slot_bytes: Size of one ring slot
+        settings: Detector/recognizer constructor arguments
+    """
+    # Heavy imports live only in the worker
+    from src.core.face_detector import FaceDetector, set_cv_threads
+    from src.core.face_recognizer import FaceRecognizer
+    from src.core.presence_checker import analyze_face
+
+    set_cv_threads(settings['threads'])
+    shm = shared_memory.SharedMemory(name=shm_name)
+    detector = FaceDetector(**settings['detector'])
+    recognizer = FaceRecognizer(**settings['recognizer'])
+
+    try:
+        while True:
+            try:
+                request = conn.recv()
+            except EOFError:
+                break
+
+            op = request[0]
+            try:
+                if op == 'analyze':
+                    _, slot, shape, dtype, deadline = request
+                    frame = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf,
+                                       offset=slot * slot_bytes)
+                    result, timings = analyze_face(detector, recognizer, frame, deadline)
+                    del frame
+                    conn.send(('ok', (result.verdict, result.confidence, result.face_count,
+                                       result.face_box), timings))
+                elif op == 'detect':
+                    _, slot, shape, dtype = request
+                    frame = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf,
+                                       offset=slot * slot_bytes)
+                    detections = [tuple(map(float, d)) for d in detector.detect(frame)]
+                    del frame
+                    conn.send(('ok', detections, {}))
+                elif op == 'set_thresholds':
+                    _, score_threshold, confidence_threshold = request
+                    if score_threshold is not None:
+                        detector.set_score_threshold(score_threshold)
+                    if confidence_threshold is not None:
+                        recognizer.set_threshold(confidence_threshold)
+                    conn.send(('ok', None, {}))
+                elif op == 'configure':
+                    _, input_scale, enhance, threads = request
+                    detector.set_preprocessing(input_scale, enhance)
+                    if threads is not None:
+                        set_cv_threads(threads)
+                    conn.send(('ok', None, {}))
+                elif op == 'reload':
+                    conn.send(('ok', recognizer.load_model(), {}))
+                elif op == 'ping':
+                    conn.send(('ok', None, {}))
+                elif op == 'stop':
+                    conn.send(('ok', None, {}))
+                    break
+                else:
+                    conn.send(('error', f"unknown request: {op}", {}))
+            except Exception as e:
+                conn.send(('error', str(e), {}))
+    finally:
+        shm.close()
+        conn.close()
+
+
+class InferenceWorker:
+    """Parent-side handle on the inference subprocess and its frame ring"""
+
+    def __init__(
+        self,
+        model_path: str = "models/yunet.onnx",
+        encodings_path: str = "models/face_encodings.pkl",
+        score_threshold: float = 0.5,
+        nms_threshold: float = 0.3,
+        top_k: int = 5000,
+        confidence_threshold: float = 50.0,
+        slots: int = 4,
+        max_frame_shape: Tuple[int, int, int] = (720, 1280, 3),
+        timeout: float = 5.0,
+        start_timeout: float = 30.0,
+        recycle_after: int = 0,
+        input_scale: float = 1.0,
+        enhance: bool = False,
+        threads: int = 0,
+        backend: str = "default",
+        target: str = "cpu"
+    ):
+        """
+        Initialize inference worker (the process starts on first use)
+
+        Args:
+            model_path: Path to YuNet ONNX model
+            encodings_path: Path to trained recognizer model
+            score_threshold: Detection confidence threshold
+            nms_threshold: Detection NMS threshold
+            top_k: Maximum detections
+            confidence_threshold: Recognition threshold
+            slots: Number of frame slots in the shared-memory ring
+            max_frame_shape: Largest frame (h, w, c) a slot must hold
+            timeout: Seconds to wait for a reply before restarting the worker
+            start_timeout: Seconds a new worker gets to answer its first ping
+                           (interpreter start, cv2 import and model loading)
+            recycle_after: Restart the worker after this many requests (0 = never)
+            input_scale: Detector downscale factor (0-1]
+            enhance: Low-light enhancement before detection
+            threads: OpenCV threads in the worker (0 = OpenCV default)
+            backend: DNN backend name
+            target: DNN target name
+        """
+        self.logger = get_logger(__name__)
+        self.settings = {
+            'detector': {
+                'model_path': model_path,
+                'score_threshold': score_threshold,
+                'nms_threshold': nms_threshold,
+                'top_k': top_k,
+                'input_scale': input_scale,
+                'enhance': enhance,
+                'backend': backend,
+                'target': target,
+            },
+            'recognizer': {
+                'encodings_path': encodings_path,
+                'confidence_threshold': confidence_threshold,
+            },
+            'threads': threads,
+        }
+        self.slots = slots
+        self.slot_bytes = int(np.prod(max_frame_shape))
+        self.timeout = timeout
+        self.start_timeout = start_timeout
+        self.recycle_after = recycle_after
+
+        self.shm: Optional[shared_memory.SharedMemory] = None
+        self.process: Optional[mp.Process] = None
+        self._conn = None
+        self._free: List[int] = list(range(slots))
+        self._slot_lock = threading.Condition()
+        self._request_lock = threading.Lock()
+        self._requests = 0
+
+    @property
+    def is_alive(self) -> bool:
+        """True if the worker process is running"""
+        return self.process is not None and self.process.is_alive()
+
+    def start(self) -> bool:
+        """
+        Create the frame ring (once) and spawn the worker process
+
+        Returns:
+            True if the worker answered a ping
+        """
+        if self.is_alive:
+            return True
+
+        if self.shm is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=self.slots * self.slot_bytes)
+
+        # spawn: the child must not inherit D-Bus sockets or event loop state
+        ctx = mp.get_context('spawn')
+        parent_conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(
+            target=_worker_main,
+            args=(child_conn, self.shm.name, self.slot_bytes, self.settings),
+            name="sleep-checker-inference",
+            daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+        self._conn = parent_conn
+        self._requests = 0
+
+        ok = self._request(('ping',), self.start_timeout) is not None
+        if ok:
+            self.logger.info(f"Inference worker started (pid: {self.process.pid})")
+        return ok
+
+    def stop(self) -> None:
+        """Stop the worker and free the frame ring"""
+        self._stop_process()
+        if self.shm is not None:
+            self.shm.close()
+            self.shm.unlink()
+            self.shm = None
+
+    def restart(self) -> bool:
+        """
+        Restart the worker process (keeps the frame ring)
+
+        Returns:
+            True if the new worker is up
+        """
+        self._stop_process()
+        return self.start()
+
+    def recycle(self) -> bool:
+        """Restart the worker to give its memory back to the system"""
+        self.logger.info("Recycling inference worker")
+        return self.restart()
+
+    def _stop_process(self) -> None:
+        if self.process is None:
+            return
+        if self.process.is_alive():
+            try:
+                with self._request_lock:
+                    self._conn.send(('stop',))
+                    if self._conn.poll(1.0):
+                        self._conn.recv()
+            except (OSError, EOFError):
+                pass
+            self.process.join(2.0)
+            if self.process.is_alive():
+                self.process.kill()
+                self.process.join()
+        if self._conn is not None:
+            self._conn.close()
+        self.process = None
+        self._conn = None
+
+    def acquire_slot(self, shape: Tuple[int, ...], dtype=np.uint8) -> Tuple[int, np.ndarray]:
+        """
+        Reserve a ring slot and return a writable view onto it
+
+        Write the frame straight into the view (e.g. VideoCapture.read(view))
+        so nothing is copied on the way to the worker.
+
+        Args:
+            shape: Frame shape
+            dtype: Frame dtype
+
+        Returns:
+            Tuple (slot index, ndarray view backed by shared memory)
+        """
+        if self.shm is None:
+            self.start()
+
+        nbytes = int(np.prod(shape)) * np.dtype(dtype).itemsize
+        if nbytes > self.slot_bytes:
+            raise ValueError(f"Frame {shape} does not fit a {self.slot_bytes}-byte slot")
+
+        with self._slot_lock:
+            while not self._free:
+                self._slot_lock.wait()
+            slot = self._free.pop()
+
+        view = np.ndarray(shape, dtype=dtype, buffer=self.shm.buf, offset=slot * self.slot_bytes)
+        return slot, view
+
+    def release_slot(self, slot: int) -> None:
+        """Return a slot to the ring"""
+        with self._slot_lock:
+            self._free.append(slot)
+            self._slot_lock.notify()
+
+    def analyze(self, slot: int, view: np.ndarray, deadline: Optional[float] = None):
+        """
+        Detect and recognize the largest face in a slot
+
+        Args:
+            slot: Slot index from acquire_slot()
+            view: The view returned with it (for shape/dtype)
+            deadline: Optional time.monotonic() deadline for degraded mode
+
+        Returns:
+            Tuple ((verdict, confidence, face_count, face_box), timings) or None on failure
+        """
+        return self._request(('analyze', slot, view.shape, view.dtype.str, deadline))
+
+    def detect(self, slot: int, view: np.ndarray) -> Optional[List[Tuple[float, ...]]]:
+        """Run face detection only on a slot"""
+        reply = self._request(('detect', slot, view.shape, view.dtype.str))
+        return None if reply is None else reply[0]
+
+    def set_thresholds(self, score_threshold: Optional[float] = None,
+                       confidence_threshold: Optional[float] = None) -> bool:
+        """Push new detection/recognition thresholds to the worker"""
+        if score_threshold is not None:
+            self.settings['detector']['score_threshold'] = score_threshold
+        if confidence_threshold is not None:
+            self.settings['recognizer']['confidence_threshold'] = confidence_threshold
+        if not self.is_alive:
+            return True
+        return self._request(('set_thresholds', score_threshold, confidence_threshold)) is not None
+
+    def configure(self, input_scale: Optional[float] = None, enhance: Optional[bool] = None,
+                  threads: Optional[int] = None) -> bool:
+        """Push detector preprocessing and thread count (power profile) to the worker"""
+        if input_scale is not None:
+            self.settings['detector']['input_scale'] = input_scale
+        if enhance is not None:
+            self.settings['detector']['enhance'] = enhance
+        if threads is not None:
+            self.settings['threads'] = threads
+        if not self.is_alive:
+            return True
+        return self._request(('configure', input_scale, enhance, threads)) is not None
+
+    @property
+    def pid(self) -> Optional[int]:
+        """Worker process id while it runs (for CPU accounting)"""
+        return self.process.pid if self.is_alive else None
+
+    def reload_model(self) -> bool:
+        """Ask the worker to re-read the recognizer model from disk"""
+        reply = self._request(('reload',))
+        return bool(reply and reply[0])
+
+    def _request(self, request: tuple, timeout: Optional[float] = None):
+        """
+        Send one request and wait for its reply
+
+        Args:
+            request: Operation name and its arguments
+            timeout: Seconds to wait (defaults to self.timeout)
+
+        Returns:
+            Tuple (payload, timings), or None if the worker failed (it is
+            restarted so the next request gets a fresh process)
+        """
+        with self._request_lock:
+            if not self.is_alive and request[0] != 'ping':
+                if not self._spawn_locked():
+                    return None
+
+            timeout = self.timeout if timeout is None else timeout
+            try:
+                self._conn.send(request)
+                if not self._conn.poll(timeout):
+                    raise TimeoutError(f"no reply within {timeout}s")
+                status, payload, timings = self._conn.recv()
+            except (OSError, EOFError, TimeoutError) as e:
+                self.logger.error(f"Inference worker failed ({e}), restarting")
+                self._kill_locked()
+                return None
+
+            if request[0] != 'ping':
+                self._requests += 1
+
+        if status != 'ok':
+            self.logger.error(f"Inference worker error: {payload}")
+            return None
+
+        if self.recycle_after and self._requests >= self.recycle_after:
+            self.recycle()
+        return payload, timings
+
+    def _spawn_locked(self) -> bool:
+        """(Re)start the process while already holding the request lock"""
+        self._request_lock.release()
+        try:
+            return self.start()
+        finally:
+            self._request_lock.acquire()
+
+    def _kill_locked(self) -> None:
+        """Kill a hung or crashed worker; the next request respawns it"""
+        if self.process is not None:
+            self.process.kill()
+            self.process.join()
+            self.process = None
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
@@ -0,0 +1,311 @@
+"""
+Inhibitors
+Idle/sleep inhibitor backends (PowerManagement, ScreenSaver, logind) and a
+manager that takes and releases them concurrently
+"""
+
+import asyncio
+import os
+from dbus_next import BusType, Message, MessageType
+from typing import List, Optional, Sequence
+
+from src.utils.bus_manager import BusManager, get_bus_manager
+from src.utils.logger import get_logger
+
+
+class Inhibitor:
+    """Base class for a single inhibitor backend"""
+
+    name = "base"
+    service = ""
+    bus_type = BusType.SESSION
+
+    def __init__(self, bus_manager: Optional[BusManager] = None, app_name: str = "SleepChecker"):
+        """
+        Initialize inhibitor
+
+        Args:
+            bus_manager: Shared D-Bus connections (defaults to the global one)
+            app_name: Application name reported to the inhibit service
+        """
+        self.logger = get_logger(__name__)
+        self.bus_manager = bus_manager or get_bus_manager()
+        self.app_name = app_name
+
+    @property
+    def is_active(self) -> bool:
+        """True while this backend holds an inhibitor"""
+        raise NotImplementedError
+
+    async def acquire(self, reason: str) -> bool:
+        """
+        Take the inhibitor
+
+        Args:
+            reason: Reason shown by the desktop/logind
+
+        Returns:
+            True if the inhibitor is held
+        """
+        raise NotImplementedError
+
+    async def release(self) -> bool:
+        """
+        Release the inhibitor
+
+        Returns:
+            True if released (or nothing was held)
+        """
+        raise NotImplementedError
+
+    def forget(self) -> None:
+        """Drop the handle without releasing it (the remote side is gone)"""
+        raise NotImplementedError
+
+
+class CookieInhibitor(Inhibitor):
+    """Inhibit(ss) -> u / UnInhibit(u) style services"""
+
+    path = ""
+    interface = ""
+
+    def __init__(self, bus_manager: Optional[BusManager] = None, app_name: str = "SleepChecker"):
+        super().__init__(bus_manager, app_name)
+        self.cookie: Optional[int] = None
+
+    @property
+    def is_active(self) -> bool:
+        return self.cookie is not None
+
+    async def acquire(self, reason: str) -> bool:
+        if self.cookie is not None:
+            return True
+
+        reply = await self.bus_manager.call(Message(
+            destination=self.service,
+            path=self.path,
+            interface=self.interface,
+            member="Inhibit",
+            signature="ss",
+            body=[self.app_name, reason]
+        ), self.bus_type)
+
+        if reply.message_type != MessageType.METHOD_RETURN:
+            self.logger.error(f"{self.name} inhibit failed: {reply.body}")
+            return False
+
+        self.cookie = reply.body[0]
+        self.logger.debug(f"{self.name} inhibitor taken (cookie: {self.cookie})")
+        return True
+
+    async def release(self) -> bool:
+        if self.cookie is None:
+            return True
+
+        cookie, self.cookie = self.cookie, None
+        reply = await self.bus_manager.call(Message(
+            destination=self.service,
+            path=self.path,
+            interface=self.interface,
+            member="UnInhibit",
+            signature="u",
+            body=[cookie]
+        ), self.bus_type)
+
+        if reply.message_type != MessageType.METHOD_RETURN:
+            self.logger.error(f"{self.name} uninhibit failed: {reply.body}")
+            return False
+
+        self.logger.debug(f"{self.name} inhibitor released (cookie: {cookie})")
+        return True
+
+    def forget(self) -> None:
+        self.cookie = None
+
+
+class PowerManagementInhibitor(CookieInhibitor):
+    """org.freedesktop.PowerManagement.Inhibit (PowerDevil)"""
+
+    name = "power_management"
+    service = "org.freedesktop.PowerManagement.Inhibit"
+    path = "/org/freedesktop/PowerManagement/Inhibit"
+    interface = "org.freedesktop.PowerManagement.Inhibit"
+
+
+class ScreenSaverInhibitor(CookieInhibitor):
+    """org.freedesktop.ScreenSaver.Inhibit (stops dim and screen-saver blank)"""
+
+    name = "screensaver"
+    service = "org.freedesktop.ScreenSaver"
+    path = "/org/freedesktop/ScreenSaver"
+    interface = "org.freedesktop.ScreenSaver"
+
+
+class LogindInhibitor(Inhibitor):
+    """logind Inhibit() lock, held as a file descriptor"""
+
+    name = "logind"
+    service = "org.freedesktop.login1"
+    bus_type = BusType.SYSTEM
+
+    def __init__(self, bus_manager: Optional[BusManager] = None, app_name: str = "SleepChecker",
+                 what: str = "idle:sleep", mode: str = "block"):
+        """
+        Initialize logind inhibitor
+
+        Args:
+            bus_manager: Shared D-Bus connections (defaults to the global one)
+            app_name: Application name reported to logind
+            what: Colon-separated lock types (idle, sleep, shutdown, ...)
+            mode: 'block' or 'delay'
+        """
+        super().__init__(bus_manager, app_name)
+        self.what = what
+        self.mode = mode
+        self.fd: Optional[int] = None
+
+    @property
+    def is_active(self) -> bool:
+        return self.fd is not None
+
+    async def acquire(self, reason: str) -> bool:
+        if self.fd is not None:
+            return True
+
+        reply = await self.bus_manager.call(Message(
+            destination=self.service,
+            path="/org/freedesktop/login1",
+            interface="org.freedesktop.login1.Manager",
+            member="Inhibit",
+            signature="ssss",
+            body=[self.what, self.app_name, reason, self.mode]
+        ), self.bus_type)
+
+        if reply.message_type != MessageType.METHOD_RETURN:
+            self.logger.error(f"logind inhibit ({self.what}) failed: {reply.body}")
+            return False
+
+        # Body holds an index into the message's fd array
+        self.fd = reply.unix_fds[reply.body[0]]
+        self.logger.debug(f"logind {self.mode} inhibitor taken for {self.what} (fd: {self.fd})")
+        return True
+
+    async def release(self) -> bool:
+        if self.fd is None:
+            return True
+
+        fd, self.fd = self.fd, None
+        try:
+            os.close(fd)
+        except OSError as e:
+            self.logger.error(f"Error closing logind inhibitor fd: {e}")
+            return False
+
+        self.logger.debug(f"logind inhibitor released (fd: {fd})")
+        return True
+
+    def forget(self) -> None:
+        # The fd stays valid across bus reconnects; only drop it explicitly
+        pass
+
+
+_INHIBITORS = {
+    PowerManagementInhibitor.name: PowerManagementInhibitor,
+    ScreenSaverInhibitor.name: ScreenSaverInhibitor,
+    LogindInhibitor.name: LogindInhibitor,
+}
+
+DEFAULT_INHIBITORS = ("power_management", "screensaver", "logind")
+
+
+class InhibitorManager:
+    """Takes and releases several inhibitor backends in parallel"""
+
+    def __init__(self, backends: Sequence[str] = DEFAULT_INHIBITORS,
+                 bus_manager: Optional[BusManager] = None):
+        """
+        Initialize inhibitor manager
+
+        Args:
+            backends: Backend names ('power_management', 'screensaver', 'logind')
+            bus_manager: Shared D-Bus connections (defaults to the global one)
+        """
+        self.logger = get_logger(__name__)
+        self.inhibitors: List[Inhibitor] = []
+        for name in backends:
+            if name not in _INHIBITORS:
+                raise ValueError(f"Unknown inhibitor backend: {name}")
+            self.inhibitors.append(_INHIBITORS[name](bus_manager))
+
+    @property
+    def is_active(self) -> bool:
+        """True if at least one backend holds an inhibitor"""
+        return any(i.is_active for i in self.inhibitors)
+
+    def active_backends(self) -> List[str]:
+        """Names of backends currently holding an inhibitor"""
+        return [i.name for i in self.inhibitors if i.is_active]
+
+    async def acquire(self, reason: str, only: Optional[Sequence[str]] = None) -> bool:
+        """
+        Take all inhibitors concurrently (one round trip of wall time)
+
+        Args:
+            reason: Reason shown by the desktop/logind
+            only: Restrict to these backend names
+
+        Returns:
+            True if at least one backend holds an inhibitor
+        """
+        pending = [i for i in self.inhibitors
+                   if not i.is_active and (only is None or i.name in only)]
+        results = await asyncio.gather(*(i.acquire(reason) for i in pending),
+                                       return_exceptions=True)
+        self._log_results("acquire", pending, results)
+        return self.is_active
+
+    async def release(self) -> bool:
+        """
+        Release all held inhibitors concurrently
+
+        Returns:
+            True if every backend released cleanly
+        """
+        held = [i for i in self.inhibitors if i.is_active]
+        results = await asyncio.gather(*(i.release() for i in held),
+                                       return_exceptions=True)
+        return self._log_results("release", held, results)
+
+    def forget(self, bus_type: Optional[BusType] = None, service: Optional[str] = None) -> List[str]:
+        """
+        Drop handles invalidated by a reconnect or a service restart
+
+        Args:
+            bus_type: Only backends on this bus
+            service: Only backends talking to this service
+
+        Returns:
+            Names of backends whose handles were dropped
+        """
+        dropped = []
+        for i in self.inhibitors:
+            if not i.is_active:
+                continue
+            if bus_type is not None and i.bus_type != bus_type:
+                continue
+            if service is not None and i.service != service:
+                continue
+            i.forget()
+            if not i.is_active:
+                dropped.append(i.name)
+        return dropped
+
+    def _log_results(self, action: str, inhibitors: List[Inhibitor], results: list) -> bool:
+        ok = True
+        for inhibitor, result in zip(inhibitors, results):
+            if isinstance(result, Exception):
+                self.logger.error(f"{inhibitor.name}: {action} raised {result}")
+                ok = False
+            elif not result:
+                ok = False
+        return ok
@@ -0,0 +1,150 @@
+"""
+Pipeline
+Staged execution for multi-frame checks: one thread per stage, joined by
+bounded queues, so frame N+1 is captured and preprocessed while frame N
+is in detection and frame N-1 in recognition
+
+OpenCV releases the GIL inside capture, resize and DNN calls, so the
+stages really overlap; the bounded queues give backpressure (capture
+blocks instead of running ahead of detection). Wall time for N frames
+tends to max(stage) x N instead of sum(stages) x N.
+"""
+
+import contextvars
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+# Passed down the queues after the last item
+_END = object()
+
+
+@dataclass
+class PipelineStats:
+    """Timing of one pipeline run"""
+    wall: float = 0.0
+    items: int = 0
+    busy: Dict[str, float] = field(default_factory=dict)  # seconds each stage spent working
+
+    @property
+    def occupancy(self) -> Dict[str, float]:
+        """Fraction of the run each stage was busy (the bottleneck is near 1)"""
+        return {name: busy / self.wall if self.wall > 0 else 0.0 for name, busy in self.busy.items()}
+
+
+class StagePipeline:
+    """Runs items through a source and stages, one thread each"""
+
+    def __init__(self, stages: Sequence[Tuple[str, Callable[[Any], Any]]], depth: int = 2):
+        """
+        Initialize pipeline
+
+        Args:
+            stages: (name, function) pairs after the source; a function
+                    takes the item and returns it (possibly updated)
+            depth: Queue capacity between two stages
+        """
+        self.stages = list(stages)
+        self.depth = depth
+
+    def run(
+        self,
+        source: Callable[[], Optional[Any]],
+        count: int,
+        sink: Callable[[Any], bool],
+        source_name: str = "capture"
+    ) -> PipelineStats:
+        """
+        Produce up to count items and pass each through every stage
+
+        The sink runs on the calling thread, in item order; returning True
+        stops the run early (items already in flight are discarded).
+
+        Args:
+            source: Produces the next item, or None when exhausted
+            count: Items to produce at most
+            sink: Receives each finished item; True = stop
+            source_name: Stage name of the source in the stats
+
+        Returns:
+            PipelineStats
+
+        Raises:
+            Exception: the first exception raised by the source or a stage
+        """
+        stats = PipelineStats(busy={source_name: 0.0, **{name: 0.0 for name, _ in self.stages}})
+        stop = threading.Event()
+        errors: List[BaseException] = []
+        queues = [queue.Queue(maxsize=self.depth) for _ in range(len(self.stages) + 1)]
+
+        def produce() -> None:
+            try:
+                for _ in range(count):
+                    if stop.is_set():
+                        break
+                    t = time.monotonic()
+                    item = source()
+                    stats.busy[source_name] += time.monotonic() - t
+                    if item is None:
+                        break
+                    queues[0].put(item)
+            except Exception as e:
+                errors.append(e)
+                stop.set()
+            finally:
+                queues[0].put(_END)
+
+        def work(index: int, name: str, fn: Callable[[Any], Any]) -> None:
+            inbox, outbox = queues[index], queues[index + 1]
+            while True:
+                item = inbox.get()
+                if item is _END:
+                    outbox.put(_END)
+                    return
+                if stop.is_set():
+                    continue  # drain: nothing downstream wants it
+                t = time.monotonic()
+                try:
+                    item = fn(item)
+                except Exception as e:
+                    errors.append(e)
+                    stop.set()
+                    continue
+                finally:
+                    stats.busy[name] += time.monotonic() - t
+                outbox.put(item)
+
+        # Each thread runs in a copy of the caller's context, so trace spans
+        # keep the idle event they belong to
+        start = time.monotonic()
+        threads = [threading.Thread(target=contextvars.copy_context().run, args=(produce,),
+                                    name=f"pipeline-{source_name}", daemon=True)]
+        threads += [threading.Thread(target=contextvars.copy_context().run, args=(work, i, name, fn),
+                                     name=f"pipeline-{name}", daemon=True)
+                    for i, (name, fn) in enumerate(self.stages)]
+        for thread in threads:
+            thread.start()
+
+        # Read to _END even after a stop, so no stage is left blocked on a full queue
+        while True:
+            item = queues[-1].get()
+            if item is _END:
+                break
+            if stop.is_set():
+                continue
+            stats.items += 1
+            try:
+                if sink(item):
+                    stop.set()
+            except Exception as e:
+                errors.append(e)
+                stop.set()
+        for thread in threads:
+            thread.join()
+        stats.wall = time.monotonic() - start
+
+        if errors:
+            raise errors[0]
+        return stats
@@ -0,0 +1,222 @@
+"""
+Power Actions
+Async backends for shutdown and screen lock (logind / ScreenSaver over
+D-Bus, with a non-blocking command fallback)
+"""
+
+import asyncio
+import os
+from dbus_next import BusType, Message, MessageType
+from typing import List, Optional, Sequence
+
+from src.utils.bus_manager import BusManager, get_bus_manager
+from src.utils.logger import get_logger
+
+
+class ActionBackend:
+    """Base class for power action backends"""
+
+    name = "base"
+
+    async def power_off(self) -> bool:
+        """
+        Power off the machine
+
+        Returns:
+            True if the request was accepted
+        """
+        raise NotImplementedError
+
+    async def lock_screen(self) -> bool:
+        """
+        Lock the current session
+
+        Returns:
+            True if the request was accepted
+        """
+        raise NotImplementedError
+
+
+class DBusActionBackend(ActionBackend):
+    """Calls logind and org.freedesktop.ScreenSaver directly"""
+
+    name = "dbus"
+
+    def __init__(self, bus_manager: Optional[BusManager] = None, timeout: float = 5.0):
+        """
+        Initialize D-Bus backend
+
+        Args:
+            bus_manager: Shared D-Bus connections (defaults to the global one)
+            timeout: Maximum time to wait for a reply (seconds), so a hung
+                     service falls through to the next backend
+        """
+        self.logger = get_logger(__name__)
+        self.bus_manager = bus_manager or get_bus_manager()
+        self.timeout = timeout
+
+        # logind (system bus)
+        self.login1_service = "org.freedesktop.login1"
+        self.login1_path = "/org/freedesktop/login1"
+        self.login1_interface = "org.freedesktop.login1.Manager"
+
+        # freedesktop screen saver (session bus); the standard path, which
+        # KDE serves too (it also has the older /ScreenSaver)
+        self.screensaver_service = "org.freedesktop.ScreenSaver"
+        self.screensaver_path = "/org/freedesktop/ScreenSaver"
+        self.screensaver_interface = "org.freedesktop.ScreenSaver"
+
+    async def _call(self, msg: Message, bus_type: BusType) -> bool:
+        """Send a method call and report whether it succeeded"""
+        try:
+            reply = await asyncio.wait_for(self.bus_manager.call(msg, bus_type), self.timeout)
+        except asyncio.TimeoutError:
+            self.logger.error(f"{msg.interface}.{msg.member} timed out after {self.timeout}s")
+            return False
+        if reply.message_type == MessageType.ERROR:
+            self.logger.error(f"{msg.interface}.{msg.member} failed: {reply.error_name} {reply.body}")
+            return False
+        return True
+
+    async def power_off(self) -> bool:
+        """Call org.freedesktop.login1.Manager.PowerOff(interactive=false)"""
+        return await self._call(Message(
+            destination=self.login1_service,
+            path=self.login1_path,
+            interface=self.login1_interface,
+            member="PowerOff",
+            signature="b",
+            body=[False]
+        ), BusType.SYSTEM)
+
+    async def lock_screen(self) -> bool:
+        """Lock via ScreenSaver.Lock, falling back to logind LockSession"""
+        if await self._call(Message(
+            destination=self.screensaver_service,
+            path=self.screensaver_path,
+            interface=self.screensaver_interface,
+            member="Lock"
+        ), BusType.SESSION):
+            return True
+
+        session_id = os.environ.get("XDG_SESSION_ID")
+        if session_id:
+            return await self._call(Message(
+                destination=self.login1_service,
+                path=self.login1_path,
+                interface=self.login1_interface,
+                member="LockSession",
+                signature="s",
+                body=[session_id]
+            ), BusType.SYSTEM)
+
+        # No session id in the environment: logind resolves "auto" to our session
+        return await self._call(Message(
+            destination=self.login1_service,
+            path=f"{self.login1_path}/session/auto",
+            interface="org.freedesktop.login1.Session",
+            member="Lock"
+        ), BusType.SYSTEM)
+
+
+class CommandActionBackend(ActionBackend):
+    """Runs systemctl/loginctl without blocking the event loop"""
+
+    name = "command"
+
+    def __init__(self, timeout: float = 5.0):
+        """
+        Initialize command backend
+
+        Args:
+            timeout: Maximum time to wait for a command (seconds)
+        """
+        self.logger = get_logger(__name__)
+        self.timeout = timeout
+
+    async def _run(self, argv: Sequence[str]) -> bool:
+        """Run a command asynchronously and check its exit status"""
+        proc = await asyncio.create_subprocess_exec(
+            *argv,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.PIPE
+        )
+        try:
+            _, stderr = await asyncio.wait_for(proc.communicate(), self.timeout)
+        except asyncio.TimeoutError:
+            proc.kill()
+            await proc.wait()
+            self.logger.error(f"{argv[0]} timed out")
+            return False
+
+        if proc.returncode != 0:
+            self.logger.error(f"{' '.join(argv)} failed ({proc.returncode}): {stderr.decode().strip()}")
+            return False
+        return True
+
+    async def power_off(self) -> bool:
+        return await self._run(["systemctl", "poweroff"])
+
+    async def lock_screen(self) -> bool:
+        return await self._run(["loginctl", "lock-session"])
+
+
+class FallbackActionBackend(ActionBackend):
+    """Tries each backend in order until one succeeds"""
+
+    name = "fallback"
+
+    def __init__(self, backends: List[ActionBackend]):
+        """
+        Initialize fallback chain
+
+        Args:
+            backends: Backends to try, fastest first
+        """
+        self.logger = get_logger(__name__)
+        self.backends = backends
+
+    async def _first_success(self, action: str) -> bool:
+        for backend in self.backends:
+            try:
+                if await getattr(backend, action)():
+                    return True
+            except Exception as e:
+                self.logger.error(f"{backend.name} backend: {action} raised {e}")
+            self.logger.warning(f"{backend.name} backend could not {action}, trying next")
+        return False
+
+    async def power_off(self) -> bool:
+        return await self._first_success("power_off")
+
+    async def lock_screen(self) -> bool:
+        return await self._first_success("lock_screen")
+
+
+_BACKENDS = {
+    DBusActionBackend.name: DBusActionBackend,
+    CommandActionBackend.name: CommandActionBackend,
+}
+
+
+def create_action_backend(names: Sequence[str] = ("dbus", "command"),
+                          bus_manager: Optional[BusManager] = None) -> ActionBackend:
+    """
+    Build a fallback chain from backend names
+
+    Args:
+        names: Backend names in priority order ('dbus', 'command')
+        bus_manager: Shared D-Bus connections for the dbus backend
+
+    Returns:
+        ActionBackend trying each named backend in order
+    """
+    backends = []
+    for name in names:
+        if name not in _BACKENDS:
+            raise ValueError(f"Unknown action backend: {name}")
+        if name == DBusActionBackend.name:
+            backends.append(DBusActionBackend(bus_manager))
+        else:
+            backends.append(_BACKENDS[name]())
+    return FallbackActionBackend(backends)
@@ -0,0 +1,744 @@
+"""
+Presence Checker
+Captures webcam frames and decides whether the owner, an unknown person
+or nobody is in front of the screen
+"""
+
+import threading
+import time
+import cv2
+import numpy as np
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Callable, Dict, Iterator, List, Optional, Tuple
+
+from src.core.face_detector import FaceDetector, set_cv_threads
+from src.core.face_recognizer import FaceRecognizer
+from src.core.frame_source import CameraSource, FrameSource
+from src.core.pipeline import PipelineStats, StagePipeline
+from src.core.presence_result import PresenceResult, Verdict
+from src.utils.image_utils import crop_face
+from src.utils.logger import get_logger
+from src.utils.metrics import MetricsRegistry, get_metrics
+from src.utils.tracing import get_tracer
+
+if TYPE_CHECKING:
+    from src.core.gallery_adapter import GalleryAdapter
+    from src.core.inference_worker import InferenceWorker
+
+
+def analyze_face(
+    detector: FaceDetector,
+    recognizer: FaceRecognizer,
+    frame: np.ndarray,
+    deadline: Optional[float] = None,
+    gray: Optional[np.ndarray] = None
+) -> Tuple[PresenceResult, Dict[str, float]]:
+    """
+    Detect the largest face in a frame and recognize it
+
+    Args:
+        detector: Face detector
+        recognizer: Owner recognizer
+        frame: BGR frame
+        deadline: Optional time.monotonic() deadline; if detection ends
+                  past it, a found face is reported UNKNOWN without
+                  running recognition (degraded mode)
+        gray: Grayscale version of frame, if the caller has one; the face
+              is then cropped from it and recognition skips its own
+              colour conversion
+
+    Returns:
+        Tuple (single-frame result, timings in seconds)
+    """
+    timings: Dict[str, float] = {}
+    tracer = get_tracer()
+
+    t = time.monotonic()
+    with tracer.span('detect', 'vision'):
+        detections = detector.detect(frame)
+    timings['detect'] = time.monotonic() - t
+
+    if deadline is not None and detections and time.monotonic() >= deadline:
+        return PresenceResult(Verdict.UNKNOWN, face_count=len(detections), frames=1), timings
+    return recognize_largest(recognizer, detections, gray if gray is not None else frame, timings), timings
+
+
+def recognize_largest(
+    recognizer: FaceRecognizer,
+    detections: List[Tuple[int, int, int, int, float]],
+    image: np.ndarray,
+    timings: Dict[str, float]
+) -> PresenceResult:
+    """
+    Crop the largest detected face and recognize it (second half of analyze_face)
+
+    Args:
+        recognizer: Owner recognizer
+        detections: Detector output for the frame
+        image: Frame to crop from (grayscale preferred)
+        timings: Gets 'preprocess' and 'recognize' seconds
+
+    Returns:
+        Single-frame result
+    """
+    if not detections:
+        return PresenceResult(Verdict.NO_FACE, frames=1)
+    tracer = get_tracer()
+
+    t = time.monotonic()
+    with tracer.span('preprocess', 'vision'):
+        x, y, w, h, _ = max(detections, key=lambda d: d[2] * d[3])
+        face = crop_face(image, (x, y, w, h))
+    timings['preprocess'] = time.monotonic() - t
+    if face is None or face.size == 0:
+        return PresenceResult(Verdict.NO_FACE, face_count=len(detections), frames=1)
+
+    t = time.monotonic()
+    with tracer.span('recognize', 'vision'):
+        is_owner, confidence = recognizer.recognize(face)
+    timings['recognize'] = time.monotonic() - t
+
+    verdict = Verdict.OWNER if is_owner else Verdict.UNKNOWN
+    return PresenceResult(verdict, confidence, len(detections), 1, face_box=(int(x), int(y), int(w), int(h)))
+
+
+class _FrameJob:
+    """One frame on its way through the check pipeline"""
+
+    __slots__ = ('frame', 'gray', 'thumbnail', 'image', 'detections', 'result', 'timings')
+
+    def __init__(self):
+        self.frame: Optional[np.ndarray] = None
+        self.gray: Optional[np.ndarray] = None
+        self.thumbnail: Optional[np.ndarray] = None
+        self.image: Optional[np.ndarray] = None
+        self.detections: List[Tuple[int, int, int, int, float]] = []
+        self.result: Optional[PresenceResult] = None
+        self.timings: Dict[str, float] = {}
+
+
+class PresenceChecker:
+    """Runs camera capture, detection and recognition for a presence check"""
+
+    def __init__(
+        self,
+        detector: Optional[FaceDetector],
+        recognizer: Optional[FaceRecognizer],
+        device_index: int = 0,
+        width: int = 640,
+        height: int = 480,
+        warmup_time: float = 0.5,
+        frames_per_check: int = 3,
+        motion_threshold: float = 8.0,
+        worker: Optional['InferenceWorker'] = None,
+        metrics: Optional[MetricsRegistry] = None,
+        source: Optional[FrameSource] = None,
+        frame_tap: Optional[Callable[[np.ndarray], None]] = None,
+        adapter: Optional['GalleryAdapter'] = None,
+        pipeline: bool = False,
+        pipeline_depth: int = 2
+    ):
+        """
+        Initialize presence checker
+
+        Args:
+            detector: Face detector (unused when a worker is given)
+            recognizer: Trained owner recognizer (unused when a worker is given)
+            device_index: Camera device index (used when no source is given)
+            width: Requested capture width
+            height: Requested capture height
+            warmup_time: Seconds to let auto-exposure settle after opening
+            frames_per_check: Frames analysed by a full check
+            motion_threshold: Mean absolute difference (0-255) on a small
+                              grayscale thumbnail below which the scene is
+                              considered unchanged
+            worker: Out-of-process inference; frames are captured straight
+                    into its shared-memory slots
+            metrics: Stage latency histograms (defaults to the global registry)
+            source: Where frames come from (defaults to the camera at
+                    device_index); file and synthetic sources let checks
+                    run without a webcam
+            frame_tap: Called with every captured frame (session recording)
+            adapter: Collects confident owner matches for gallery adaptation
+            pipeline: Run full checks as a capture/prepare/detect/recognize
+                      pipeline, one thread per stage (in-process only)
+            pipeline_depth: Frames queued between two pipeline stages
+        """
+        self.logger = get_logger(__name__)
+        self.detector = detector
+        self.recognizer = recognizer
+        self.device_index = device_index
+        self.width = width
+        self.height = height
+        self.warmup_time = warmup_time
+        self.frames_per_check = frames_per_check
+        self.motion_threshold = motion_threshold
+        self.worker = worker
+        self.metrics = metrics or get_metrics()
+        self.tracer = get_tracer()
+        self.source = source or CameraSource(device_index, width, height)
+        self.frame_tap = frame_tap
+        self.adapter = adapter
+        self.pipeline = pipeline
+        self.pipeline_depth = pipeline_depth
+        self.last_pipeline_stats: Optional[PipelineStats] = None
+
+        self.last_result: Optional[PresenceResult] = None
+        self.last_timings: Dict[str, float] = {}  # per-stage totals of the last check
+        self._reference: Optional[np.ndarray] = None
+        self._frame_shape = (height, width, 3)
+        self._lock = threading.Lock()
+        self.last_used = time.monotonic()
+        self._opened_at: Optional[float] = None
+
+    def open_camera(self) -> bool:
+        """
+        Open the camera and let it warm up
+
+        Returns:
+            True if camera opened
+        """
+        if self.source.is_open:
+            return True
+
+        with self.tracer.span('camera_open', 'camera', source=self.source.name):
+            return self._open_camera()
+
+    def _open_camera(self) -> bool:
+        """Open the source and warm up (see open_camera)"""
+        opened = time.monotonic()
+        if not self.source.open():
+            return False
+
+        # Reload unloaded models while auto-exposure settles
+        start = time.monotonic()
+        with self.tracer.span('warm_up', 'presence'):
+            self.warm_up()
+        remaining = self.warmup_time - (time.monotonic() - start)
+        if remaining > 0:
+            time.sleep(remaining)
+
+        self._opened_at = time.monotonic()
+        self.metrics.observe('camera_open', self._opened_at - opened)
+        return True
+
+    def close_camera(self) -> None:
+        """Release the camera (turns the privacy LED off)"""
+        self.source.close()
+
+    @property
+    def is_loaded(self) -> bool:
+        """True if the detection/recognition models are resident"""
+        if self.worker is not None:
+            return self.worker.is_alive
+        return self.detector.is_loaded or self.recognizer.is_loaded
+
+    def warm_up(self) -> None:
+        """Load models ahead of the first frame (no-op if already resident)"""
+        if self.worker is not None:
+            if not self.worker.is_alive:
+                self.worker.start()
+            return
+        if not self.detector.is_loaded:
+            self.detector.load(self.width, self.height)
+        self.recognizer.ensure_loaded()
+
+    def unload(self) -> bool:
+        """
+        Release models and capture buffers until the next check
+
+        Skipped while a check is running.
+
+        Returns:
+            True if resources were released
+        """
+        if not self._lock.acquire(blocking=False):
+            return False
+        try:
+            self.close_camera()
+            if self.worker is not None:
+                self.worker.stop()
+            else:
+                self.detector.unload()
+                self.recognizer.unload()
+            return True
+        finally:
+            self._lock.release()
+
+    def update_settings(
+        self,
+        score_threshold: Optional[float] = None,
+        confidence_threshold: Optional[float] = None,
+        frames_per_check: Optional[int] = None,
+        motion_threshold: Optional[float] = None,
+        detection_scale: Optional[float] = None,
+        enhance_low_light: Optional[bool] = None,
+        threads: Optional[int] = None,
+        pipeline: Optional[bool] = None
+    ) -> None:
+        """
+        Apply tuning changes between checks (blocking)
+
+        Waits for a running check to finish, so one check never mixes old
+        and new thresholds.
+
+        Args:
+            score_threshold: Detection confidence threshold
+            confidence_threshold: Recognition threshold
+            frames_per_check: Frames analysed by a full check
+            motion_threshold: Motion gate threshold
+            detection_scale: Detector input downscale factor (0-1]
+            enhance_low_light: CLAHE enhancement before detection
+            threads: OpenCV threads for inference (0 = OpenCV default)
+            pipeline: Pipelined full checks on/off
+        """
+        with self._lock:
+            if self.worker is not None:
+                if score_threshold is not None or confidence_threshold is not None:
+                    self.worker.set_thresholds(score_threshold, confidence_threshold)
+                if detection_scale is not None or enhance_low_light is not None or threads is not None:
+                    self.worker.configure(detection_scale, enhance_low_light, threads)
+            else:
+                if score_threshold is not None:
+                    self.detector.set_score_threshold(score_threshold)
+                if confidence_threshold is not None:
+                    self.recognizer.set_threshold(confidence_threshold)
+                self.detector.set_preprocessing(detection_scale, enhance_low_light)
+                if threads is not None:
+                    set_cv_threads(threads)
+            if frames_per_check is not None:
+                self.frames_per_check = frames_per_check
+            if motion_threshold is not None:
+                self.motion_threshold = motion_threshold
+            if pipeline is not None:
+                self.pipeline = pipeline
+
+    @contextmanager
+    def _in_use(self, name: str) -> Iterator[None]:
+        """Serialize checks against unload(), trace them and record the last use"""
+        with self.tracer.span(f'{name}.wait', 'presence'):
+            self._lock.acquire()
+        try:
+            with self.tracer.span(name, 'presence'):
+                yield
+        finally:
+            self.last_used = time.monotonic()
+            self._lock.release()
+
+    def grab_frame(self, out: Optional[np.ndarray] = None) -> Optional[np.ndarray]:
+        """
+        Read one frame from the camera
+
+        Args:
+            out: Optional buffer to decode into (reused when the size matches)
+
+        Returns:
+            BGR frame or None on failure
+        """
+        if not self._grab():
+            return None
+        return self._retrieve(out)
+
+    def _grab(self) -> bool:
+        """Take the next frame from the source, opening it if needed"""
+        if not self.source.is_open and not self.open_camera():
+            return False
+
+        start = time.monotonic()
+        with self.tracer.span('capture', 'camera'):
+            ok = self.source.grab()
+        if not ok:
+            self.logger.warning("Failed to read frame from camera")
+            return False
+
+        now = time.monotonic()
+        self.metrics.observe('capture', now - start)
+        if self._opened_at is not None:
+            # Camera open -> first delivered frame (sensor start-up)
+            self.metrics.observe('first_frame', now - self._opened_at)
+            self._opened_at = None
+        return True
+
+    def _retrieve(self, out: Optional[np.ndarray] = None) -> Optional[np.ndarray]:
+        """Decode the grabbed frame to BGR"""
+        start = time.monotonic()
+        with self.tracer.span('decode', 'camera'):
+            frame = self.source.retrieve(out)
+        if frame is None:
+            self.logger.warning("Failed to decode frame")
+            return None
+        self.metrics.observe('decode', time.monotonic() - start)
+        if self.frame_tap is not None:
+            self.frame_tap(frame)
+        return frame
+
+    def _retrieve_gray(self) -> Optional[np.ndarray]:
+        """Decode only the luma of the grabbed frame (motion gate)"""
+        start = time.monotonic()
+        with self.tracer.span('decode_gray', 'camera'):
+            gray = self.source.retrieve_gray()
+        if gray is not None:
+            self.metrics.observe('decode_gray', time.monotonic() - start)
+        return gray
+
+    def analyze_frame(self, frame: np.ndarray, deadline: Optional[float] = None) -> PresenceResult:
+        """
+        Detect the largest face in a frame and recognize it
+
+        Args:
+            frame: BGR frame
+            deadline: Optional time.monotonic() deadline (see analyze_face)
+
+        Returns:
+            PresenceResult for this single frame
+        """
+        return analyze_face(self.detector, self.recognizer, frame, deadline)[0]
+
+    def _capture_and_analyze(
+        self, deadline: Optional[float] = None
+    ) -> Tuple[Optional[PresenceResult], Optional[np.ndarray], Dict[str, float]]:
+        """
+        Grab one frame and analyse it, in-process or through the worker
+
+        Returns:
+            Tuple (result or None if no frame, motion thumbnail, timings)
+        """
+        timings: Dict[str, float] = {}
+
+        if self.worker is None:
+            t = time.monotonic()
+            frame = self.grab_frame()
+            timings['capture'] = time.monotonic() - t
+            if frame is None:
+                return None, None, timings
+            # One conversion serves the recognizer crop and the motion thumbnail
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            result, stage_timings = analyze_face(self.detector, self.recognizer, frame, deadline, gray)
+            self.metrics.observe_many(stage_timings)
+            timings.update(stage_timings)
+            self._offer_to_adapter(result, gray)
+            return result, self._thumbnail(gray), timings
+
+        t = time.monotonic()
+        if not self._grab():
+            return None, None, {'capture': time.monotonic() - t}
+        slot, frame = self._retrieve_into_slot()
+        timings['capture'] = time.monotonic() - t
+        try:
+            if frame is None:
+                return None, None, timings
+            result, stage_timings = self._analyze_slot(slot, frame, deadline)
+            self.metrics.observe_many(stage_timings)
+            timings.update(stage_timings)
+            # Before the slot goes back to the ring: the adapter copies the crop
+            self._offer_to_adapter(result, frame)
+            return result, self._thumbnail(frame), timings
+        finally:
+            self.worker.release_slot(slot)
+
+    def _offer_to_adapter(self, result: PresenceResult, image: np.ndarray) -> None:
+        """Hand a confident owner match to the gallery adapter, if any"""
+        if self.adapter is None or result.verdict != Verdict.OWNER or result.face_box is None:
+            return
+        if self.adapter.consider(result.confidence, lambda: crop_face(image, result.face_box)):
+            self.metrics.increment('adaptation_samples')
+
+    def reload_model(self) -> bool:
+        """
+        Re-read the owner model from disk (after gallery adaptation)
+
+        Returns:
+            True if the new model is in use
+        """
+        with self._in_use('presence.reload_model'):
+            if self.worker is not None:
+                return self.worker.reload_model() if self.worker.is_alive else True
+            if not self.recognizer.is_loaded:
+                return True  # ensure_loaded() reads the file on the next check
+            return self.recognizer.load_model()
+
+    def _retrieve_into_slot(self) -> Tuple[int, Optional[np.ndarray]]:
+        """
+        Decode the grabbed frame straight into a worker ring slot
+
+        Returns:
+            Tuple (slot index, frame view or None); the caller releases the slot
+        """
+        slot, view = self.worker.acquire_slot(self._frame_shape)
+        frame = self._retrieve(out=view)
+        if frame is not None and not np.shares_memory(frame, view):
+            # Camera delivered another size: remember it, copy this one frame
+            self.worker.release_slot(slot)
+            self._frame_shape = frame.shape
+            slot, view = self.worker.acquire_slot(frame.shape)
+            np.copyto(view, frame)
+            frame = view
+        return slot, frame
+
+    def _analyze_slot(
+        self, slot: int, frame: np.ndarray, deadline: Optional[float] = None
+    ) -> Tuple[PresenceResult, Dict[str, float]]:
+        """Run analyze_face() in the worker on a filled slot"""
+        with self.tracer.span('worker.analyze', 'vision', slot=slot):
+            reply = self.worker.analyze(slot, frame, deadline)
+        if reply is None:
+            return PresenceResult(Verdict.ERROR, frames=1), {}
+        (verdict, confidence, face_count, face_box), timings = reply
+        return PresenceResult(verdict, confidence, face_count, 1, face_box=face_box), timings
+
+    def check(self, num_frames: Optional[int] = None) -> PresenceResult:
+        """
+        Full presence check over several frames (blocking)
+
+        The owner wins as soon as one frame matches; otherwise any face
+        makes the verdict UNKNOWN, and no faces at all mean NO_FACE.
+
+        Args:
+            num_frames: Frames to analyse (defaults to frames_per_check)
+
+        Returns:
+            Combined PresenceResult
+        """
+        with self._in_use('presence.check'):
+            start = time.monotonic()
+            num_frames = num_frames or self.frames_per_check
+
+            if not self.open_camera():
+                return PresenceResult(Verdict.ERROR, duration=time.monotonic() - start)
+
+            timings: Dict[str, float] = {}
+            try:
+                result = PresenceResult(Verdict.NO_FACE)
+                if self.pipeline and self.worker is None and num_frames > 1:
+                    self._check_pipelined(num_frames, result, timings)
+                else:
+                    for _ in range(num_frames):
+                        frame_result, thumbnail, frame_timings = self._capture_and_analyze()
+                        for stage, seconds in frame_timings.items():
+                            timings[stage] = timings.get(stage, 0.0) + seconds
+                        if frame_result is not None and self._merge(result, frame_result, thumbnail):
+                            break
+
+                if result.frames == 0:
+                    result.verdict = Verdict.ERROR
+            finally:
+                self.close_camera()
+
+            result.duration = time.monotonic() - start
+            self.last_result = result
+            self.last_timings = timings
+            self.logger.info(
+                f"Presence check: {result.verdict} (confidence: {result.confidence:.1f}, "
+                f"frames: {result.frames}, {result.duration * 1000:.0f} ms)",
+                extra={'event': 'presence_check', 'verdict': result.verdict,
+                       'confidence': result.confidence, 'face_count': result.face_count,
+                       'frames': result.frames, 'duration': result.duration}
+            )
+            return result
+
+    def _merge(self, result: PresenceResult, frame_result: PresenceResult, thumbnail: np.ndarray) -> bool:
+        """
+        Fold one frame into the check's result
+
+        The owner wins as soon as one frame matches; otherwise any face
+        makes the verdict UNKNOWN.
+
+        Returns:
+            True once the owner was found (no more frames needed)
+        """
+        result.frames += 1
+        result.face_count = max(result.face_count, frame_result.face_count)
+        if frame_result.verdict == Verdict.OWNER:
+            result.verdict = Verdict.OWNER
+            result.confidence = frame_result.confidence
+            self._reference = thumbnail
+            return True
+        if frame_result.verdict == Verdict.UNKNOWN:
+            result.verdict = Verdict.UNKNOWN
+            result.confidence = min(result.confidence, frame_result.confidence)
+        return False
+
+    def _check_pipelined(self, num_frames: int, result: PresenceResult, timings: Dict[str, float]) -> None:
+        """
+        Full check with capture, prepare, detect and recognize on their own
+        threads (see src.core.pipeline), merging frames in order
+
+        Args:
+            num_frames: Frames to analyse
+            result: Check result to merge into
+            timings: Per-stage totals to add to
+        """
+        detector, recognizer = self.detector, self.recognizer
+
+        def capture() -> _FrameJob:
+            job = _FrameJob()
+            t = time.monotonic()
+            job.frame = self.grab_frame()
+            job.timings['capture'] = time.monotonic() - t
+            return job
+
+        def prepare(job: _FrameJob) -> _FrameJob:
+            if job.frame is not None:
+                job.gray = cv2.cvtColor(job.frame, cv2.COLOR_BGR2GRAY)
+                job.thumbnail = self._thumbnail(job.gray)
+                job.image = detector.prepare(job.frame)
+            return job
+
+        def detect(job: _FrameJob) -> _FrameJob:
+            if job.frame is not None:
+                t = time.monotonic()
+                with self.tracer.span('detect', 'vision'):
+                    job.detections = detector.detect_prepared(job.image, job.frame.shape[1])
+                job.timings['detect'] = time.monotonic() - t
+            return job
+
+        def recognize(job: _FrameJob) -> _FrameJob:
+            if job.frame is not None:
+                job.result = recognize_largest(recognizer, job.detections, job.gray, job.timings)
+            return job
+
+        def merge(job: _FrameJob) -> bool:
+            for stage, seconds in job.timings.items():
+                timings[stage] = timings.get(stage, 0.0) + seconds
+            if job.result is None:
+                return False
+            self.metrics.observe_many({k: v for k, v in job.timings.items() if k != 'capture'})
+            self._offer_to_adapter(job.result, job.gray)
+            return self._merge(result, job.result, job.thumbnail)
+
+        pipeline = StagePipeline([('prepare', prepare), ('detect', detect), ('recognize', recognize)],
+                                 depth=self.pipeline_depth)
+        stats = pipeline.run(capture, num_frames, merge)
+        self.last_pipeline_stats = stats
+        self.metrics.increment('pipeline_wall_seconds', amount=stats.wall)
+        for stage, busy in stats.busy.items():
+            self.metrics.increment('pipeline_busy_seconds', stage, busy)
+        self.logger.debug(f"Pipeline: {stats.items} frame(s) in {stats.wall * 1000:.0f} ms, occupancy "
+                          + ", ".join(f"{stage} {share:.0%}" for stage, share in stats.occupancy.items()))
+
+    def check_within(self, budget: float) -> Tuple[PresenceResult, Dict[str, float]]:
+        """
+        Presence check that must finish inside a time budget (blocking)
+
+        Camera warm-up is capped to a fifth of the budget, and another
+        frame is only analysed while the remaining time covers the cost of
+        the previous one. When the budget runs out mid-way the best verdict
+        so far is returned.
+
+        Args:
+            budget: Seconds available for the whole check
+
+        Returns:
+            Tuple (result, timings) with per-stage durations in seconds
+        """
+        with self._in_use('presence.check_within'):
+            start = time.monotonic()
+            deadline = start + budget
+            timings: Dict[str, float] = {}
+
+            def remaining() -> float:
+                return deadline - time.monotonic()
+
+            warmup, self.warmup_time = self.warmup_time, min(self.warmup_time, budget * 0.2)
+            try:
+                t = time.monotonic()
+                opened = self.open_camera()
+                timings['camera_open'] = time.monotonic() - t
+            finally:
+                self.warmup_time = warmup
+
+            result = PresenceResult(Verdict.ERROR if not opened else Verdict.NO_FACE)
+            try:
+                frame_cost = 0.0
+                while opened and result.frames < self.frames_per_check and remaining() > frame_cost:
+                    frame_result, thumbnail, frame_timings = self._capture_and_analyze(deadline)
+                    for stage, seconds in frame_timings.items():
+                        timings[stage] = timings.get(stage, 0.0) + seconds
+                    if frame_result is None:
+                        break
+
+                    result.frames += 1
+                    result.face_count = max(result.face_count, frame_result.face_count)
+                    if frame_result.verdict == Verdict.OWNER:
+                        result.verdict = Verdict.OWNER
+                        result.confidence = frame_result.confidence
+                        self._reference = thumbnail
+                        break
+                    if frame_result.verdict == Verdict.UNKNOWN:
+                        result.verdict = Verdict.UNKNOWN
+                        result.confidence = min(result.confidence, frame_result.confidence)
+                        if 'recognize' not in frame_timings:
+                            # Degraded: a face but no time left to recognize it
+                            break
+
+                    frame_cost = (time.monotonic() - start - timings['camera_open']) / result.frames
+            finally:
+                self.close_camera()
+
+            result.duration = time.monotonic() - start
+            timings['total'] = result.duration
+            self.last_result = result
+            self.last_timings = timings
+            return result, timings
+
+    def verify(self) -> bool:
+        """
+        Cheap re-verification that the owner is still present (blocking)
+
+        Grabs a single frame. If the scene barely changed since the owner
+        was last recognized, the owner is assumed present without running
+        detection; otherwise one frame is detected and recognized.
+
+        Returns:
+            True if the owner is (still) present
+        """
+        with self._in_use('presence.verify'):
+            if not self.open_camera():
+                return False
+
+            slot = None
+            try:
+                if not self._grab():
+                    return False
+
+                # Luma only: an unchanged scene never needs the colour decode
+                gray = self._retrieve_gray()
+                if gray is None:
+                    return False
+                thumbnail = self._thumbnail(gray)
+                if self._reference is not None:
+                    motion = float(cv2.absdiff(thumbnail, self._reference).mean())
+                    if motion < self.motion_threshold:
+                        self.metrics.increment('motion_gate', 'skip')
+                        self.logger.debug(f"Motion gate: scene unchanged ({motion:.1f}), owner assumed present")
+                        return True
+
+                # Same frame, now in colour for detection
+                if self.worker is None:
+                    frame = self._retrieve()
+                    if frame is None:
+                        return False
+                    result = analyze_face(self.detector, self.recognizer, frame, gray=gray)[0]
+                else:
+                    slot, frame = self._retrieve_into_slot()
+                    if frame is None:
+                        return False
+                    result = self._analyze_slot(slot, frame)[0]
+            finally:
+                if slot is not None:
+                    self.worker.release_slot(slot)
+                self.close_camera()
+
+            if result.verdict == Verdict.OWNER:
+                self._reference = thumbnail
+                return True
+
+            self._reference = None
+            return False
+
+    @staticmethod
+    def _thumbnail(frame: np.ndarray) -> np.ndarray:
+        """Small blurred grayscale image for motion comparison (BGR or gray input)"""
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+        small = cv2.resize(gray, (64, 48), interpolation=cv2.INTER_AREA)
+        return cv2.GaussianBlur(small, (5, 5), 0)
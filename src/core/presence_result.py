@@ -0,0 +1,27 @@
+"""
+Presence Result
+Verdict types shared by the presence checker, the daemon and the monitors;
+kept free of cv2/numpy so importing them is cheap
+"""
+
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+
+class Verdict:
+    """Possible outcomes of a presence check"""
+    OWNER = "owner"
+    UNKNOWN = "unknown"
+    NO_FACE = "no_face"
+    ERROR = "error"
+
+
+@dataclass
+class PresenceResult:
+    """Outcome of a presence check"""
+    verdict: str
+    confidence: float = 100.0
+    face_count: int = 0
+    frames: int = 0
+    duration: float = 0.0
+    face_box: Optional[Tuple[int, int, int, int]] = None  # recognized face (single-frame results)
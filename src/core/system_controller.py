@@ -6,22 +6,54 @@ Controls system behavior using D-Bus (inhibit sleep/dim), shutdown
 import asyncio
 from dbus_next.aio import MessageBus
 from dbus_next import BusType, Message, MessageType
-from typing import Optional
-import subprocess
-import os
+from typing import Awaitable, Callable, Optional, Sequence
 
+from src.core.inhibitors import DEFAULT_INHIBITORS, InhibitorManager
+from src.core.power_actions import ActionBackend, create_action_backend
+from src.utils.bus_manager import BusManager, get_bus_manager
 from src.utils.logger import get_logger
+from src.utils.tracing import get_tracer
 
 class SystemController:
     """Controls system power management via D-Bus"""
 
-    def __init__(self):
-        """Initialize system controller"""
+    def __init__(self, bus_manager: Optional[BusManager] = None,
+                 action_backend: Optional[ActionBackend] = None,
+                 inhibitor_backends: Sequence[str] = DEFAULT_INHIBITORS,
+                 lease_duration: float = 300.0,
+                 verify_timeout: float = 5.0,
+                 presence_verifier: Optional[Callable[[], Awaitable[bool]]] = None):
+        """
+        Initialize system controller
+
+        Args:
+            bus_manager: Shared D-Bus connections (defaults to the global one)
+            action_backend: Shutdown/lock backend (defaults to D-Bus with
+                            a systemctl/loginctl fallback)
+            inhibitor_backends: Inhibitors taken together on inhibit_idle()
+            lease_duration: Seconds an inhibitor is held before it must be
+                            re-verified (0 = hold until uninhibit_idle())
+            verify_timeout: Maximum time for one presence re-verification
+            presence_verifier: Coroutine returning True if the owner is still
+                               present; without one, leases simply expire
+        """
         self.logger = get_logger(__name__)
+        self.tracer = get_tracer()
+        self.bus_manager = bus_manager or get_bus_manager()
+        self.action_backend = action_backend or create_action_backend(bus_manager=self.bus_manager)
+        self.inhibitors = InhibitorManager(inhibitor_backends, self.bus_manager)
         self.bus: Optional[MessageBus] = None
-        self.inhibit_cookie: Optional[int] = None
+        self.inhibit_reason: Optional[str] = None
         self.is_connected = False
 
+        # Inhibitor lease
+        self.lease_duration = lease_duration
+        self.verify_timeout = verify_timeout
+        self.presence_verifier = presence_verifier
+        self.lease_expiry: Optional[float] = None
+        self._lease_length = lease_duration
+        self._lease_task: Optional[asyncio.Task] = None
+
         # D-Bus service details
         self.pm_service = "org.freedesktop.PowerManagement.Inhibit"
         self.pm_path = "/org/freedesktop/PowerManagement/Inhibit"
@@ -35,53 +67,64 @@ class SystemController:
             True if connected successfully
         """
         try:
-            self.bus = await MessageBus(bus_type=BusType.SESSION).connect()
+            self.bus = await self.bus_manager.get_bus(BusType.SESSION)
+            self.bus_manager.add_reconnect_callback(self._on_reconnect)
+            for inhibitor in self.inhibitors.inhibitors:
+                if inhibitor.bus_type == BusType.SESSION:
+                    await self.bus_manager.watch_name(inhibitor.service, self._on_service_owner_changed)
             self.is_connected = True
-            self.logger.info("Connected to D-Bus session Bus")
             return True
         except Exception as e:
             self.logger.error(f"Failed to connect to D-Bus: {e}")
             self.is_connected = False
             return False
+
+    async def _on_reconnect(self, bus_type: BusType) -> None:
+        """Re-take inhibitors whose handles died with the old connection"""
+        if bus_type == BusType.SESSION:
+            self.bus = await self.bus_manager.get_bus(BusType.SESSION)
+        await self._replay_inhibitors(bus_type=bus_type)
+
+    async def _on_service_owner_changed(self, name: str, old_owner: str, new_owner: str) -> None:
+        """Re-take an inhibitor when its service restarts (e.g. plasmashell)"""
+        if new_owner:
+            self.logger.info(f"{name} changed owner, replaying inhibitor")
+            await self._replay_inhibitors(service=name)
+
+    async def _replay_inhibitors(self, bus_type: Optional[BusType] = None,
+                                 service: Optional[str] = None) -> None:
+        """Old cookies are meaningless to a new bus/service: inhibit again"""
+        dropped = self.inhibitors.forget(bus_type=bus_type, service=service)
+        if dropped and self.inhibit_reason is not None:
+            await self.inhibitors.acquire(self.inhibit_reason, only=dropped)
     
-    async def inhibit_idle(self, reason: str = "User is present") -> bool:
+    async def inhibit_idle(self, reason: str = "User is present",
+                           duration: Optional[float] = None) -> bool:
         """
-        Inhibit screen dim, lock, and sleep
+        Inhibit screen dim, lock, and sleep on every backend concurrently
         
         Args:
             reason: Reason for inhibiting (shown in system logs)
+            duration: Lease length in seconds (defaults to lease_duration)
             
         Returns:
-            True if inhibitor activated successfully
+            True if at least one inhibitor is active
         """
         if not self.is_connected:
             await self.connect()
 
-        if self.inhibit_cookie is not None:
-            self.logger.debug("Inhibitor already active")
-            return True
-        
         try:
-            # Create D-Bus method call
-            msg = Message(
-                destination=self.pm_service,
-                path=self.pm_path,
-                interface=self.pm_interface,
-                member="Inhibit",
-                signature="ss",
-                body=["SleepChecker", reason]
-            )
-
-            # Send message and wait for reply
-            reply = await self.bus.call(msg)
-
-            if reply.message_type == MessageType.METHOD_RETURN:
-                self.inhibit_cookie = reply.body[0]
-                self.logger.info(f"Inhibitor activated (cookie: {self.inhibit_cookie})")
+            self.inhibit_reason = reason
+            with self.tracer.span('inhibitors.acquire', 'controller'):
+                acquired = await self.inhibitors.acquire(reason)
+            if acquired:
+                self.logger.info(f"Inhibitor activated ({', '.join(self.inhibitors.active_backends())})")
+                self._start_lease(self.lease_duration if duration is None else duration)
                 return True
-            else:
-                self.logger.error(f"Failed to inhibit: {reply.body}")
-                return False
+
+            self.logger.error("Failed to inhibit on any backend")
+            self.inhibit_reason = None
+            return False
             
         except Exception as e:
             self.logger.error(f"Error activating inhibitor: {e}")
@@ -89,42 +132,106 @@ class SystemController:
     
     async def uninhibit_idle(self) -> bool:
         """
-        Release inhibitor lock
+        Release all inhibitors concurrently
         
         Returns:
-            True if inhibitor released successfully
+            True if inhibitors released successfully
         """
-        if self.inhibit_cookie is None:
+        self._stop_lease()
+
+        if not self.inhibitors.is_active:
             self.logger.debug("No active inhibitor to release")
             return True
         
         try:
-            # Create D-Bus method call
-            msg = Message(
-                destination=self.pm_service,
-                path=self.pm_path,
-                interface=self.pm_interface,
-                member="UnInhibit",
-                signature="u",
-                body=[self.inhibit_cookie]
-            )
-
-            # Send message
-            reply = await self.bus.call(msg)
-
-            if reply.message_type == MessageType.METHOD_RETURN:
-                self.logger.info(f"Inhibitor released (cookie: {self.inhibit_cookie})")
-                self.inhibit_cookie = None
-                return True
-            else:
-                self.logger.error(f"Failed to uninhibit: {reply.body}")
-                return False
+            self.inhibit_reason = None
+            with self.tracer.span('inhibitors.release', 'controller'):
+                success = await self.inhibitors.release()
+            self.logger.info("Inhibitor released")
+            return success
             
         except Exception as e:
             self.logger.error(f"Error releasing inhibitor: {e}")
-            self.inhibit_cookie = None
             return False
     
+    def _start_lease(self, duration: float) -> None:
+        """Set (or extend) the lease expiry and make sure the renewer runs"""
+        if duration <= 0:
+            self._stop_lease()
+            return
+
+        loop = asyncio.get_event_loop()
+        self.lease_expiry = loop.time() + duration
+        self._lease_length = duration
+        if self._lease_task is None or self._lease_task.done():
+            self._lease_task = asyncio.ensure_future(self._lease_loop())
+
+    def _stop_lease(self) -> None:
+        """Cancel the renewer (unless we are running inside it)"""
+        self.lease_expiry = None
+        task, self._lease_task = self._lease_task, None
+        if task is not None and task is not asyncio.current_task():
+            task.cancel()
+
+    def renew_lease(self, duration: Optional[float] = None) -> bool:
+        """
+        Extend the current lease (e.g. after an out-of-band presence check)
+
+        Args:
+            duration: New lease length in seconds (defaults to lease_duration)
+
+        Returns:
+            True if a lease was active and has been extended
+        """
+        if self.lease_expiry is None:
+            return False
+        self._start_lease(self.lease_duration if duration is None else duration)
+        return True
+
+    async def _lease_loop(self) -> None:
+        """Re-verify presence shortly before expiry; drop the lease on failure"""
+        loop = asyncio.get_event_loop()
+
+        while self.lease_expiry is not None:
+            # Renew early enough for the verification itself to fit in the
+            # lease; sleep again if renew_lease() moved the expiry meanwhile
+            while True:
+                duration = self._lease_length
+                wake_at = self.lease_expiry - min(self.verify_timeout, duration / 2)
+                if loop.time() >= wake_at:
+                    break
+                await asyncio.sleep(wake_at - loop.time())
+                if self.lease_expiry is None:
+                    return
+
+            if loop.time() >= self.lease_expiry:
+                # Woke after expiry: the loop stalled, do not trust the lease
+                self.logger.warning("Inhibitor lease overran (event loop stalled), releasing")
+                break
+
+            if self.presence_verifier is None:
+                self.logger.info("Inhibitor lease expired")
+                break
+
+            try:
+                with self.tracer.span('lease.verify', 'controller', root=True):
+                    present = await asyncio.wait_for(self.presence_verifier(), self.verify_timeout)
+            except asyncio.TimeoutError:
+                self.logger.warning(f"Presence re-verification timed out after {self.verify_timeout}s")
+                present = False
+            except Exception as e:
+                self.logger.error(f"Presence re-verification failed: {e}")
+                present = False
+
+            if not present:
+                self.logger.info("Owner no longer verified, releasing inhibitor lease")
+                break
+
+            self.lease_expiry = loop.time() + duration
+            self.logger.debug(f"Inhibitor lease renewed for {duration:.0f}s")
+
+        await self.uninhibit_idle()
+
     async def is_inhibited(self) -> bool:
         """
         Check if inhibitor is currently active
@@ -132,7 +239,7 @@ class SystemController:
         Returns:
             True if inhibited
         """
-        return self.inhibit_cookie is not None
+        return self.inhibitors.is_active
     
     async def list_inhibitors(self) -> list:
         """
@@ -152,7 +259,7 @@ class SystemController:
                 member="HasInhibit"
             )
 
-            reply = await self.bus.call(msg)
+            reply = await self.bus_manager.call(msg)
 
             if reply.message_type == MessageType.METHOD_RETURN:
                 has_inhibit = reply.body[0]
@@ -165,36 +272,22 @@ class SystemController:
             self.logger.error(f"Error listing inhibitors: {e}")
             return []
         
-    def shutdown_system(self) -> bool:
+    async def shutdown_system(self) -> bool:
         """
-        Shutdown the system (non-async)
+        Shutdown the system via the action backend
         
         Returns:
             True if shutdown initiated
         """
         try: 
             self.logger.warning("Initiating SYSTEM SHUTDOWN (unknown person detected)")
-
-            # Use systemctl to shutdown
-            subprocess.run(
-                ["systemctl", "poweroff"],
-                check=True,
-                timeout=5
-            )
-
-            return True
-        
-        except subprocess.TimeoutExpired:
-            self.logger.error("Shutdown command timed out")
-            return False
-        except subprocess.CalledProcessError as e:
-            self.logger.error(f"Shutdown command failed: {e}")
-            return False
+            with self.tracer.span('power_off', 'controller'):
+                return await self.action_backend.power_off()
         except Exception as e:
             self.logger.error(f"Error initiating Shutdown: {e}")
             return False
         
-    def lock_screen(self) -> bool:
+    async def lock_screen(self) -> bool:
         """
         Lock the screen immediately
         
@@ -203,25 +296,19 @@ class SystemController:
         """
         try:
             self.logger.info("Locking screen")
-
-            # KDE lock command
-            subprocess.run(
-                ["qbus", "org.freedesktop.ScreenSaver", "/ScreenSaver", "Lock"],
-                check=True,
-                timeout=5
-            )
-
-            return True
-        
+            with self.tracer.span('lock_screen', 'controller'):
+                return await self.action_backend.lock_screen()
         except Exception as e:
             self.logger.error(f"Error locking screen: {e}")
             return False
         
     async def cleanup(self) -> None:
         """Cleanup resources and release inhibitor"""
-        if self.inhibit_cookie is not None:
+        self._stop_lease()
+        if self.inhibitors.is_active:
             await self.uninhibit_idle()
 
-        if self.bus:
-            self.bus.disconnect()
-            self.logger.info("Disconnected from D-Bus")
+        # The connection itself is shared and closed by the bus manager owner
+        self.bus_manager.remove_reconnect_callback(self._on_reconnect)
+        self.bus = None
+        self.is_connected = False
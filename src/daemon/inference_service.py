@@ -0,0 +1,99 @@
+"""
+Inference Service Daemon
+System-level owner of the camera and the YuNet network for multi-session
+hosts; session daemons with inference.service_socket set send their
+checks here instead of loading models themselves
+"""
+
+import asyncio
+import signal
+import sys
+from pathlib import Path
+
+# Allow running as a script (systemd ExecStart points at this file)
+if __name__ == "__main__":
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+
+from src.utils.config_manager import ConfigManager, get_config
+from src.utils.logger import configure_logging, get_logger, shutdown_logging
+
+
+async def serve(config: ConfigManager) -> None:
+    """Build the shared detector and camera, then serve until SIGTERM/SIGINT"""
+    from src.core.detector_tuning import resolve_detector_settings
+    from src.core.face_detector import FaceDetector, set_cv_threads
+    from src.core.frame_source import create_frame_source
+    from src.core.inference_service import DEFAULT_SOCKET, InferenceService, LogindSeatCheck
+    from src.utils.bus_manager import get_bus_manager
+
+    cfg = config.snapshot
+    logger = get_logger(__name__)
+    backend, target, threads = resolve_detector_settings(
+        cfg.paths.model_path,
+        backend=cfg.detection.backend,
+        target=cfg.detection.target,
+        threads=cfg.detection.threads,
+        cache_path=cfg.detection.tuning_cache
+    )
+    set_cv_threads(threads)
+    logger.info(f"Detector: {cfg.paths.model_path} on {backend}/{target}, {threads} thread(s)")
+
+    service = InferenceService(
+        cfg.inference.service_socket or DEFAULT_SOCKET,
+        detector=FaceDetector(
+            model_path=cfg.paths.model_path,
+            score_threshold=cfg.detection.score_threshold,
+            nms_threshold=cfg.detection.nms_threshold,
+            top_k=cfg.detection.top_k,
+            backend=backend,
+            target=target
+        ),
+        source=create_frame_source(
+            cfg.camera.source,
+            device_index=cfg.camera.device_index,
+            width=cfg.camera.width,
+            height=cfg.camera.height,
+            path=cfg.camera.path,
+            fourcc=cfg.camera.fourcc,
+            fps=cfg.camera.fps
+        ),
+        warmup_time=cfg.camera.warmup_time,
+        coalesce_window=cfg.inference.coalesce_window,
+        max_galleries=cfg.inference.max_galleries,
+        unload_after=cfg.memory.unload_after_seconds,
+        seat_check=LogindSeatCheck() if cfg.inference.require_seat else None
+    )
+    if not cfg.inference.require_seat:
+        logger.warning("inference.require_seat is off: any local uid may use the camera")
+    if not await service.start():
+        await get_bus_manager().close()
+        return
+
+    stopped = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stopped.set)
+    await stopped.wait()
+
+    logger.info("Stopping inference service")
+    await service.stop()
+    await get_bus_manager().close()
+
+
+def main() -> int:
+    """Inference service entry point"""
+    # Console only (journald under systemd): logging.file belongs to the
+    # session daemons, and two processes must not rotate one file. Set up
+    # before the config is read, so nothing opens the default file.
+    configure_logging(log_file=None)
+    config = ConfigManager(sys.argv[1]) if len(sys.argv) > 1 else get_config()
+    configure_logging(log_file=None, level=config.snapshot.logging.level)
+    try:
+        asyncio.run(serve(config))
+    finally:
+        shutdown_logging()
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,705 @@
+"""
+Main Service
+Sleep Checker daemon: waits for KWin's screenDimmed() call, checks who is
+in front of the screen and inhibits, allows or acts accordingly
+"""
+
+import time
+_START = time.monotonic()
+
+import asyncio
+import signal
+import sys
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional, Tuple
+
+# Allow running as a script (systemd ExecStart points at this file)
+if __name__ == "__main__":
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+
+# Only D-Bus-side modules here: the vision stack (cv2/numpy) is imported by
+# load_vision() after the bus name is claimed
+from src.core.power_actions import create_action_backend
+from src.core.presence_result import PresenceResult, Verdict
+from src.core.system_controller import SystemController
+from src.monitors.idle_monitor import IdleMonitor
+from src.monitors.power_monitor import PowerMonitor
+from src.monitors.sleep_monitor import SleepMonitor
+from src.utils.bus_manager import get_bus_manager
+from src.utils.config_manager import ConfigManager, get_config
+from src.utils.config_schema import ConfigSnapshot, PowerProfileConfig, diff_snapshots
+from src.utils.config_watcher import ConfigWatcher
+from src.utils.energy import Cost, CostMeter
+from src.utils.history import HistoryEvent, HistoryStore
+from src.utils.logger import configure_logging, get_logger, shutdown_logging
+from src.utils.memory import get_rss_mb, trim_heap
+from src.utils.metrics import get_metrics
+from src.utils.tracing import get_tracer
+
+if TYPE_CHECKING:
+    from src.core.gallery_adapter import GalleryAdapter
+    from src.core.inference_worker import InferenceWorker
+    from src.core.presence_checker import PresenceChecker
+    from src.replay.recording import SessionRecorder
+
+
+class SleepCheckerDaemon:
+    """Orchestrates idle events, presence checks and system actions"""
+
+    # Settings only read while components are built
+    RESTART_SECTIONS = ('camera', 'inference', 'adaptation', 'paths', 'logging', 'recording', 'history')
+    RESTART_KEYS = (
+        'detection.nms_threshold', 'detection.top_k', 'detection.backend', 'detection.target',
+        'detection.threads', 'detection.tuning_cache', 'presence.pipeline_depth',
+        'actions.inhibitors', 'actions.action_backends', 'sleep_monitor.enabled',
+        'power.enabled', 'power.poll_interval',
+    )
+
+    def __init__(self, config: Optional[ConfigManager] = None):
+        """
+        Initialize daemon components from configuration
+
+        Args:
+            config: Configuration (defaults to the global instance)
+        """
+        self.config = config or get_config()
+        cfg = self.config.snapshot
+        configure_logging(
+            log_file=cfg.logging.file,
+            level=cfg.logging.level,
+            max_bytes=cfg.logging.max_bytes,
+            backup_count=cfg.logging.backup_count,
+            json_format=cfg.logging.format == 'json'
+        )
+        self.logger = get_logger(__name__)
+        self.bus_manager = get_bus_manager()
+        self.metrics = get_metrics()
+        self.tracer = get_tracer()
+
+        self.worker: Optional['InferenceWorker'] = None
+        self.presence: Optional['PresenceChecker'] = None
+        self.recorder: Optional['SessionRecorder'] = None
+        self.adapter: Optional['GalleryAdapter'] = None
+        self._vision_ready = asyncio.Event()
+
+        self.controller = SystemController(
+            bus_manager=self.bus_manager,
+            action_backend=create_action_backend(
+                cfg.actions.action_backends,
+                self.bus_manager
+            ),
+            inhibitor_backends=cfg.actions.inhibitors,
+            lease_duration=cfg.actions.inhibit_lease_seconds,
+            verify_timeout=cfg.actions.lease_verify_timeout,
+            presence_verifier=self.verify_presence
+        )
+        self.idle_monitor = IdleMonitor(self.handle_idle_event, bus_manager=self.bus_manager,
+                                        metrics=self.metrics)
+        self.sleep_monitor: Optional[SleepMonitor] = None
+        if cfg.sleep_monitor.enabled:
+            self.sleep_monitor = SleepMonitor(
+                self.check_before_sleep,
+                on_verdict=self.take_sleep_action,
+                safety_margin=cfg.sleep_monitor.safety_margin,
+                bus_manager=self.bus_manager
+            )
+
+        # Battery/AC profiles override the base vision and lease settings
+        self.power_monitor: Optional[PowerMonitor] = None
+        self.profile: Optional[str] = None
+        self.detector_threads = 0  # resolved detection.threads
+        if cfg.power.enabled:
+            self.power_monitor = PowerMonitor(
+                self._on_power_changed,
+                poll_interval=cfg.power.poll_interval,
+                bus_manager=self.bus_manager
+            )
+
+        self.history: Optional[HistoryStore] = None
+        if cfg.history.enabled:
+            self.history = HistoryStore(
+                cfg.history.path,
+                retention_days=cfg.history.retention_days,
+                batch_size=cfg.history.batch_size,
+                flush_interval=cfg.history.flush_interval
+            )
+
+        self.unload_after = cfg.memory.unload_after_seconds
+        self.config_watcher = ConfigWatcher(self.config)
+        self._check_task: Optional[asyncio.Task] = None
+        self._unload_task: Optional[asyncio.Task] = None
+        self._adapt_task: Optional[asyncio.Task] = None
+        self._stopped = asyncio.Event()
+
+    def load_vision(self) -> None:
+        """
+        Import and build the detection/recognition stack (blocking)
+
+        Kept out of __init__ so the D-Bus name is claimed before cv2 and
+        numpy are loaded.
+        """
+        cfg = self.config.snapshot
+        if cfg.inference.service_socket:
+            self.load_remote_vision()
+            return
+
+        from src.core.detector_tuning import resolve_detector_settings
+        from src.core.face_detector import set_cv_threads
+        from src.core.frame_source import create_frame_source
+        from src.core.presence_checker import PresenceChecker
+
+        backend, target, self.detector_threads = resolve_detector_settings(
+            cfg.paths.model_path,
+            backend=cfg.detection.backend,
+            target=cfg.detection.target,
+            threads=cfg.detection.threads,
+            cache_path=cfg.detection.tuning_cache
+        )
+        self.logger.info(f"Detector: {cfg.paths.model_path} on {backend}/{target}, {self.detector_threads} thread(s)")
+
+        detector, recognizer = None, None
+        if cfg.inference.use_worker:
+            from src.core.inference_worker import InferenceWorker
+
+            # Models live in a separate process; frames go through shared memory
+            self.worker = InferenceWorker(
+                model_path=cfg.paths.model_path,
+                encodings_path=cfg.paths.encodings_path,
+                score_threshold=cfg.detection.score_threshold,
+                nms_threshold=cfg.detection.nms_threshold,
+                top_k=cfg.detection.top_k,
+                confidence_threshold=cfg.recognition.confidence_threshold,
+                slots=cfg.inference.ring_slots,
+                timeout=cfg.inference.timeout,
+                start_timeout=cfg.inference.start_timeout,
+                recycle_after=cfg.inference.recycle_after,
+                threads=self.detector_threads,
+                backend=backend,
+                target=target
+            )
+        else:
+            from src.core.face_detector import FaceDetector
+            from src.core.face_recognizer import FaceRecognizer
+
+            detector = FaceDetector(
+                model_path=cfg.paths.model_path,
+                score_threshold=cfg.detection.score_threshold,
+                nms_threshold=cfg.detection.nms_threshold,
+                top_k=cfg.detection.top_k,
+                backend=backend,
+                target=target
+            )
+            # A single small inference: don't fan out over every core
+            set_cv_threads(self.detector_threads)
+            recognizer = FaceRecognizer(
+                encodings_path=cfg.paths.encodings_path,
+                confidence_threshold=cfg.recognition.confidence_threshold
+            )
+        if cfg.recording.enabled:
+            from src.replay.recording import SessionRecorder
+
+            # Idle events and the frames their checks saw, for offline replay
+            self.recorder = SessionRecorder(cfg.recording.directory)
+            self.logger.info(f"Recording idle events to {cfg.recording.directory}")
+        if cfg.adaptation.enabled:
+            from src.core.gallery_adapter import GalleryAdapter
+
+            self.adapter = GalleryAdapter(
+                cfg.paths.encodings_path,
+                accept_confidence=cfg.adaptation.accept_confidence,
+                window_seconds=cfg.adaptation.window_hours * 3600,
+                per_window=cfg.adaptation.per_window,
+                max_samples=cfg.adaptation.max_samples,
+                keep_versions=cfg.adaptation.keep_versions
+            )
+        self.presence = PresenceChecker(
+            detector,
+            recognizer,
+            device_index=cfg.camera.device_index,
+            width=cfg.camera.width,
+            height=cfg.camera.height,
+            warmup_time=cfg.camera.warmup_time,
+            frames_per_check=cfg.presence.frames_per_check,
+            motion_threshold=cfg.presence.motion_threshold,
+            worker=self.worker,
+            metrics=self.metrics,
+            source=create_frame_source(
+                cfg.camera.source,
+                device_index=cfg.camera.device_index,
+                width=cfg.camera.width,
+                height=cfg.camera.height,
+                path=cfg.camera.path,
+                fourcc=cfg.camera.fourcc,
+                fps=cfg.camera.fps
+            ),
+            frame_tap=self.recorder.add_frame if self.recorder is not None else None,
+            adapter=self.adapter,
+            pipeline=cfg.presence.pipeline,
+            pipeline_depth=cfg.presence.pipeline_depth
+        )
+        if self.worker is not None and not self.worker.start():
+            self.logger.error("Inference worker failed to start, it will be retried on first check")
+
+    def load_remote_vision(self) -> None:
+        """
+        Use the shared inference service instead of local models
+
+        The service owns the camera and the network; this session only
+        names its gallery, so cv2 and numpy are never imported here.
+        """
+        from src.core.inference_client import RemotePresenceChecker
+
+        cfg = self.config.snapshot
+        if cfg.adaptation.enabled:
+            self.logger.warning("Gallery adaptation needs local inference, disabled with the inference service")
+        self.presence = RemotePresenceChecker(
+            cfg.inference.service_socket,
+            encodings_path=cfg.paths.encodings_path,
+            frames_per_check=cfg.presence.frames_per_check,
+            motion_threshold=cfg.presence.motion_threshold,
+            confidence_threshold=cfg.recognition.confidence_threshold,
+            timeout=cfg.inference.timeout,
+            metrics=self.metrics
+        )
+        if cfg.recording.enabled:
+            self.logger.warning("Recording needs local frames, disabled while using the inference service")
+        if not self.presence.ping():
+            self.logger.error("Inference service not reachable yet, checks will retry")
+        self.logger.info(f"Using inference service at {cfg.inference.service_socket}")
+
+    def handle_idle_event(self, is_dimmed: bool) -> None:
+        """
+        Called when KWin calls screenDimmed()
+
+        Args:
+            is_dimmed: True = screen turned off from inactivity, False = user back
+        """
+        if self._check_task is not None and not self._check_task.done():
+            self._check_task.cancel()
+        if self.recorder is not None:
+            self.recorder.begin_event(is_dimmed)
+
+        if is_dimmed:
+            self._check_task = asyncio.ensure_future(self._on_dimmed())
+        else:
+            self.record_history('active')
+            self._check_task = asyncio.ensure_future(self.controller.uninhibit_idle())
+
+    async def _on_dimmed(self) -> None:
+        received = self.idle_monitor.last_event_at or time.monotonic()
+        self.metrics.observe('schedule', time.monotonic() - received)
+
+        with self.tracer.span('idle_event', 'daemon', root=True):
+            meter = CostMeter()
+            meter.start([self.worker.pid if self.worker is not None else None])
+            result = await self.check_user_presence()
+            self.record_cost(meter.stop())
+            self.metrics.increment('checks', result.verdict)
+            if self.recorder is not None:
+                self.recorder.end_event(result)
+            with self.tracer.span('take_action', 'daemon', verdict=result.verdict):
+                action = await self.take_action(result)
+
+        # screenDimmed() receipt -> inhibitor/lock/shutdown call returned
+        end_to_end = time.monotonic() - received
+        self.metrics.observe('end_to_end', end_to_end)
+        self.record_history('idle', result, action, end_to_end)
+        await self.write_metrics()
+
+    def record_history(
+        self,
+        kind: str,
+        result: Optional[PresenceResult] = None,
+        action: Optional[str] = None,
+        end_to_end: Optional[float] = None
+    ) -> None:
+        """
+        Append an event to the history store, if enabled (non-blocking)
+
+        Args:
+            kind: 'idle', 'active' (user back) or 'pre_sleep'
+            result: Check outcome; stage timings come from the checker
+            action: Action taken, if any
+            end_to_end: screenDimmed() receipt to action returned, seconds
+        """
+        if self.history is None:
+            return
+        event = HistoryEvent(kind, action=action, end_to_end=end_to_end, profile=self.profile)
+        if result is not None:
+            timings = self.presence.last_timings if self.presence is not None else {}
+            event.verdict = result.verdict
+            event.confidence = result.confidence
+            event.threshold = self.config.snapshot.recognition.confidence_threshold
+            event.faces = result.face_count
+            event.frames = result.frames
+            event.duration = result.duration
+            event.capture = timings.get('capture')
+            event.detect = timings.get('detect')
+            event.recognize = timings.get('recognize')
+        self.history.record(event)
+
+    def record_cost(self, cost: Cost) -> None:
+        """
+        Account a check's CPU time and energy to the active power profile
+
+        Exported as counters (checks_by_profile, check_cpu_seconds,
+        check_energy_joules, labelled by profile), so cost per check is
+        their ratio; energy needs a readable RAPL counter.
+
+        Args:
+            cost: Readings taken around the check
+        """
+        profile = self.profile or 'default'
+        self.metrics.increment('checks_by_profile', profile)
+        self.metrics.increment('check_cpu_seconds', profile, cost.cpu)
+        energy = ""
+        if cost.energy is not None:
+            self.metrics.increment('check_energy_joules', profile, cost.energy)
+            energy = f", {cost.energy:.2f} J"
+        self.logger.info(f"Check cost ({profile}): {cost.cpu * 1000:.0f} ms CPU in {cost.wall * 1000:.0f} ms{energy}",
+                         extra={'event': 'check_cost', 'profile': profile, 'cpu': cost.cpu,
+                                'wall': cost.wall, 'energy': cost.energy})
+
+    def _active_profile(self) -> Tuple[str, PowerProfileConfig]:
+        """(name, settings) of the profile for the current power source"""
+        power = self.config.snapshot.power
+        if self.power_monitor.on_battery:
+            return 'battery', power.battery
+        return 'ac', power.ac
+
+    def _on_power_changed(self, on_battery: bool) -> None:
+        """PowerMonitor callback: switch profiles on the event loop"""
+        asyncio.ensure_future(self.apply_power_profile())
+
+    async def apply_power_profile(self) -> None:
+        """Push the current power source's profile to running components"""
+        if self.power_monitor is None:
+            return
+        name, profile = self._active_profile()
+        self.profile = name
+        self.controller.lease_duration = profile.inhibit_lease_seconds
+        if self.presence is not None:
+            # Between checks, like any other vision setting change
+            await asyncio.to_thread(
+                self.presence.update_settings,
+                frames_per_check=profile.frames_per_check,
+                detection_scale=profile.detection_scale,
+                enhance_low_light=profile.enhance_low_light,
+                threads=profile.threads or self.detector_threads
+            )
+        self.metrics.increment('power_profile', name)
+        self.logger.info(
+            f"Power profile: {name} (scale {profile.detection_scale:g}, "
+            f"{profile.frames_per_check} frame(s), enhance {'on' if profile.enhance_low_light else 'off'}, "
+            f"lease {profile.inhibit_lease_seconds:g}s, threads {profile.threads or self.detector_threads or 'default'})"
+        )
+
+    async def write_metrics(self) -> None:
+        """Refresh the Prometheus textfile, if one is configured"""
+        path = self.config.snapshot.metrics.textfile
+        if path and not await asyncio.to_thread(self.metrics.write_textfile, path):
+            self.logger.warning(f"Could not write metrics textfile {path}")
+
+    async def check_user_presence(self) -> PresenceResult:
+        """
+        Capture frames and run detection/recognition off the event loop
+
+        Returns:
+            PresenceResult of the check
+        """
+        await self._vision_ready.wait()
+        # Span on the loop side; the gap to presence.check is executor queueing
+        with self.tracer.span('await_check', 'daemon'):
+            return await asyncio.to_thread(self.presence.check)
+
+    async def verify_presence(self) -> bool:
+        """Lease re-verification: motion gate or a single frame"""
+        await self._vision_ready.wait()
+        return await asyncio.to_thread(self.presence.verify)
+
+    async def check_before_sleep(self, budget: float):
+        """Budgeted check for the sleep monitor: (result, stage timings)"""
+        await self._vision_ready.wait()
+        with self.tracer.span('pre_sleep_check', 'daemon', root=True, budget=budget):
+            return await asyncio.to_thread(self.presence.check_within, budget)
+
+    def unload_models(self) -> bool:
+        """
+        Release models and camera buffers after a quiet period (blocking)
+
+        Returns:
+            True if anything was released
+        """
+        before = get_rss_mb()
+        if not self.presence.unload():
+            return False
+        if self.config.snapshot.memory.trim_heap:
+            trim_heap()
+        self.logger.info(f"Models unloaded after inactivity (RSS: {before:.1f} MB -> {get_rss_mb():.1f} MB)")
+        return True
+
+    async def _unload_loop(self) -> None:
+        """Unload resident models once no check ran for unload_after seconds"""
+        while True:
+            quiet = time.monotonic() - self.presence.last_used
+            if quiet < self.unload_after:
+                await asyncio.sleep(self.unload_after - quiet)
+                continue
+
+            if self.presence.is_loaded:
+                await asyncio.to_thread(self.unload_models)
+            # Nothing can need unloading before the next check
+            await asyncio.sleep(self.unload_after)
+
+    def adapt_gallery(self) -> bool:
+        """
+        Fold collected samples into the owner model and reload it (blocking)
+
+        Returns:
+            True if the model changed
+        """
+        if not self.adapter.fold():
+            return False
+        if not self.presence.reload_model():
+            self.logger.error("Adapted model failed to load, rolling back")
+            self.adapter.rollback()
+            self.presence.reload_model()
+            return False
+        self.metrics.increment('gallery_folds')
+        return True
+
+    async def _adapt_loop(self) -> None:
+        """Fold each closed sampling window shortly after it closes"""
+        interval = min(self.adapter.window_seconds, 3600)
+        while True:
+            # Windows saved by the last run may have closed while it was down
+            if self.adapter.pending:
+                await asyncio.to_thread(self.adapt_gallery)
+            await asyncio.sleep(interval)
+
+    def toggle_tracing(self) -> None:
+        """
+        SIGUSR1: start tracing, or dump the buffer and stop
+
+        Traces are written as Chrome trace JSON (open in ui.perfetto.dev
+        or chrome://tracing).
+        """
+        cfg = self.config.snapshot.tracing
+        if not self.tracer.enabled:
+            self.tracer.enable(cfg.buffer_size)
+            self.logger.info("Tracing enabled (send SIGUSR1 again to dump)")
+            return
+
+        self.tracer.disable()
+        path = Path(cfg.output_dir) / f"trace-{time.strftime('%Y%m%d-%H%M%S')}.json"
+        try:
+            count = self.tracer.dump(str(path))
+            self.tracer.clear()
+            self.logger.info(f"Tracing disabled, wrote {count} events to {path}")
+        except OSError as e:
+            self.logger.error(f"Could not write trace {path}: {e}")
+
+    def _on_config_changed(self, old: ConfigSnapshot, new: ConfigSnapshot) -> None:
+        """ConfigManager listener: apply the new snapshot on the event loop"""
+        asyncio.ensure_future(self.apply_config(old, new))
+
+    async def apply_config(self, old: ConfigSnapshot, new: ConfigSnapshot) -> None:
+        """
+        Push changed settings to running components without a restart
+
+        Args:
+            old: Snapshot the components were configured with
+            new: Freshly validated snapshot
+        """
+        changed = diff_snapshots(old, new)
+        if not changed:
+            return
+
+        # Plain attributes: set together, with no await in between
+        self.controller.lease_duration = new.actions.inhibit_lease_seconds
+        self.controller.verify_timeout = new.actions.lease_verify_timeout
+        if self.sleep_monitor is not None:
+            self.sleep_monitor.safety_margin = new.sleep_monitor.safety_margin
+        if new.memory.unload_after_seconds != self.unload_after:
+            self.unload_after = new.memory.unload_after_seconds
+            if self._unload_task is not None:
+                self._unload_task.cancel()
+                self._unload_task = None
+            if self.unload_after > 0 and self._vision_ready.is_set():
+                self._unload_task = asyncio.ensure_future(self._unload_loop())
+
+        if new.tracing.enabled != old.tracing.enabled and new.tracing.enabled != self.tracer.enabled:
+            self.toggle_tracing()
+
+        # Vision settings are swapped between checks, never during one
+        vision = {}
+        if new.detection.score_threshold != old.detection.score_threshold:
+            vision['score_threshold'] = new.detection.score_threshold
+        if new.recognition.confidence_threshold != old.recognition.confidence_threshold:
+            vision['confidence_threshold'] = new.recognition.confidence_threshold
+        if new.presence.frames_per_check != old.presence.frames_per_check:
+            vision['frames_per_check'] = new.presence.frames_per_check
+        if new.presence.motion_threshold != old.presence.motion_threshold:
+            vision['motion_threshold'] = new.presence.motion_threshold
+        if new.presence.pipeline != old.presence.pipeline:
+            vision['pipeline'] = new.presence.pipeline
+        if vision and self.presence is not None:
+            await asyncio.to_thread(self.presence.update_settings, **vision)
+        if self.power_monitor is not None:
+            # Profile values win over the base ones just applied
+            await self.apply_power_profile()
+
+        pending = [path for path in changed if path.split('.')[0] in self.RESTART_SECTIONS
+                   or path in self.RESTART_KEYS]
+        self.logger.info(f"Applied config changes: {', '.join(p for p in changed if p not in pending) or 'none'}")
+        if pending:
+            self.logger.warning(f"Restart needed for: {', '.join(pending)}")
+
+    async def take_sleep_action(self, result: PresenceResult) -> None:
+        """
+        Act on a pre-suspend check
+
+        logind cannot cancel a suspend once PrepareForSleep fired, so an
+        owner verdict takes the (block) inhibitor lease to refuse the next
+        idle suspend, and an unknown person gets the screen locked before
+        the machine goes down.
+
+        Args:
+            result: Outcome of the budgeted presence check
+        """
+        action = None
+        if result.verdict == Verdict.OWNER:
+            action = 'inhibit'
+            await self.controller.inhibit_idle("Owner is present")
+        elif result.verdict == Verdict.UNKNOWN:
+            action = 'lock'
+            self.logger.warning("Unknown person at the screen before sleep, locking")
+            await self.controller.lock_screen()
+        self.record_history('pre_sleep', result, action)
+
+    async def take_action(self, result: PresenceResult) -> Optional[str]:
+        """
+        Act on a presence check result
+
+        Args:
+            result: Outcome of the presence check
+
+        Returns:
+            Action taken ('inhibit', 'lock', 'shutdown'), or None
+        """
+        start = time.monotonic()
+        actions = self.config.snapshot.actions
+        action = None
+        if result.verdict == Verdict.OWNER:
+            if actions.inhibit_on_owner:
+                action = 'inhibit'
+
+        elif result.verdict == Verdict.UNKNOWN:
+            action = actions.unknown_person_action
+            self.logger.warning(f"Unknown person detected, action: {action}",
+                                extra={'event': 'action', 'verdict': result.verdict, 'action': action})
+
+        else:
+            # No face (or camera error): let KDE dim/lock/sleep normally
+            self.logger.info(f"No owner present ({result.verdict}), allowing sleep")
+        self.metrics.observe('decision', time.monotonic() - start)
+
+        with self.metrics.timer('controller'):
+            if action == 'inhibit':
+                await self.controller.inhibit_idle("Owner is present")
+            elif action == 'shutdown':
+                await self.controller.shutdown_system()
+            elif action == 'lock':
+                await self.controller.lock_screen()
+        return action if action != 'none' else None
+
+    async def run(self) -> None:
+        """Start the D-Bus service and wait until stopped"""
+        loop = asyncio.get_event_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(sig, self._stopped.set)
+        loop.add_signal_handler(signal.SIGUSR1, self.toggle_tracing)
+        if self.config.snapshot.tracing.enabled:
+            self.tracer.enable(self.config.snapshot.tracing.buffer_size)
+
+        await self.idle_monitor.start()
+        if not self.idle_monitor.is_running:
+            self.logger.error("Idle monitor failed to start, exiting")
+            return
+        self.logger.info(f"Bus name acquired {(time.monotonic() - _START) * 1000:.0f} ms after start")
+
+        await self.controller.connect()
+        if self.history is not None and not await asyncio.to_thread(self.history.start):
+            self.history = None
+        if self.sleep_monitor is not None and not await self.sleep_monitor.start():
+            self.logger.warning("Sleep monitor unavailable, relying on KWin events only")
+            self.sleep_monitor = None
+
+        if self.power_monitor is not None and not await self.power_monitor.start():
+            self.logger.warning("Power monitor unavailable, using base settings")
+            self.power_monitor = None
+
+        await asyncio.to_thread(self.load_vision)
+        await self.apply_power_profile()
+        self._vision_ready.set()
+
+        self.config.add_listener(self._on_config_changed)
+        await self.config_watcher.start()
+        if self.unload_after > 0:
+            self._unload_task = asyncio.ensure_future(self._unload_loop())
+        if self.adapter is not None:
+            self._adapt_task = asyncio.ensure_future(self._adapt_loop())
+        self.logger.info(f"Sleep Checker daemon running (RSS: {get_rss_mb():.1f} MB)")
+
+        await self._stopped.wait()
+        await self.shutdown()
+
+    async def shutdown(self) -> None:
+        """Release everything held by the daemon"""
+        self.logger.info("Stopping Sleep Checker daemon")
+        if self._check_task is not None and not self._check_task.done():
+            self._check_task.cancel()
+        if self._unload_task is not None:
+            self._unload_task.cancel()
+        if self._adapt_task is not None:
+            self._adapt_task.cancel()
+        await self.config_watcher.stop()
+        self.config.remove_listener(self._on_config_changed)
+        if self.sleep_monitor is not None:
+            await self.sleep_monitor.stop()
+        if self.power_monitor is not None:
+            await self.power_monitor.stop()
+        await self.controller.cleanup()
+        await self.idle_monitor.stop()
+        if self.presence is not None:
+            self.presence.close_camera()
+        if self.adapter is not None:
+            if self.adapter.pending:
+                await asyncio.to_thread(self.adapter.fold)
+            # The open window carries over to the next start
+            await asyncio.to_thread(self.adapter.save)
+        if self.worker is not None:
+            await asyncio.to_thread(self.worker.stop)
+        if self.recorder is not None:
+            self.recorder.close()
+        if self.history is not None:
+            await asyncio.to_thread(self.history.close)
+        await self.write_metrics()
+        await self.bus_manager.close()
+
+
+def main() -> int:
+    """Daemon entry point"""
+    async def _run():
+        daemon = SleepCheckerDaemon()
+        await daemon.run()
+
+    try:
+        asyncio.run(_run())
+    finally:
+        shutdown_logging()
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -1,5 +1,27 @@
-"""Monitor modules for different event sources"""
+"""Monitor modules for different event sources
 
-from .idle_monitor import IdleMonitor
+Submodules are imported on first attribute access (PEP 562).
+"""
 
-__all__ = ['IdleMonitor']
\ No newline at end of file
+import importlib
+from typing import Any
+
+_LAZY = {
+    'IdleMonitor': '.idle_monitor',
+    'SleepMonitor': '.sleep_monitor',
+    'PowerMonitor': '.power_monitor',
+}
+
+__all__ = ['IdleMonitor', 'SleepMonitor', 'PowerMonitor']
+
+
+def __getattr__(name: str) -> Any:
+    if name in _LAZY:
+        value = getattr(importlib.import_module(_LAZY[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -1,118 +1,249 @@
 """
 Idle Monitor
-Listens to KDE idle state changes via D-Bus and triggers face detection
+Exports the org.sleepchecker.IdleNotifier D-Bus service that the KWin script
+calls on screen off / user return, and triggers face detection
 """
 
 import asyncio
+import time
 from dbus_next.aio import MessageBus
-from dbus_next import BusType, MessageType
+from dbus_next.service import ServiceInterface, method
+from dbus_next import BusType, Message, MessageType, RequestNameReply
 from typing import Callable, Optional
 import signal
 
+from src.utils.bus_manager import BusManager, get_bus_manager
 from src.utils.logger import get_logger
+from src.utils.metrics import MetricsRegistry, get_metrics
+from src.utils.tracing import get_tracer
+
+
+class _IdleNotifierDBusService(ServiceInterface):
+    """D-Bus interface that KWin's callDBus() invokes"""
+
+    def __init__(self, monitor: 'IdleMonitor'):
+        super().__init__(monitor.interface_name)
+        self._monitor = monitor
+
+    @method()
+    def screenDimmed(self, is_dimmed: 'b'):
+        """Called by KWin: true = screen off from inactivity, false = user back"""
+        self._monitor._dispatch(bool(is_dimmed), "kwin")
+
+    @method()
+    def stateChanged(self, is_dimmed: 'b', seq: 't'):
+        """Sequenced screenDimmed(): stale or repeated states are dropped"""
+        self._monitor.state_changed(bool(is_dimmed), int(seq))
+
+    @method()
+    def GetState(self) -> 'bt':
+        """Last applied (dimmed, seq), so the KWin script can resync after a restart"""
+        return [bool(self._monitor.is_dimmed), self._monitor.last_seq]
+
+    @method()
+    def GetMetrics(self) -> 's':
+        """Stage latency summary and counters as JSON"""
+        return self._monitor.metrics.to_json()
 
 
 class IdleMonitor:
-    """Monitors KDE idle state using D-Bus ScreenSaver interface"""
-    
-    def __init__(self, on_idle_callback: Callable[[bool], None]):
+    """Receives KDE idle state changes over D-Bus"""
+
+    def __init__(self, on_idle_callback: Callable[[bool], None], listen_screensaver: bool = False,
+                 bus_manager: Optional[BusManager] = None, metrics: Optional[MetricsRegistry] = None):
         """
         Initialize idle monitor
-        
+
         Args:
             on_idle_callback: Function called when idle state changes
                              Receives boolean: True = idle, False = active
+            listen_screensaver: Also subscribe to org.freedesktop.ScreenSaver
+                                ActiveChanged (fires on lock, not on dim)
+            bus_manager: Shared D-Bus connections (defaults to the global one)
+            metrics: Registry served by GetMetrics (defaults to the global one)
         """
         self.logger = get_logger(__name__)
+        self.metrics = metrics or get_metrics()
+        self.tracer = get_tracer()
+        self.last_event_at: Optional[float] = None
+        self.is_dimmed = False
+        self.last_seq = 0
         self.on_idle_callback = on_idle_callback
+        self.listen_screensaver = listen_screensaver
+        self.bus_manager = bus_manager or get_bus_manager()
         self.bus: Optional[MessageBus] = None
         self.is_running = False
-        
-        # D-Bus service details for KDE ScreenSaver
-        self.service_name = "org.freedesktop.ScreenSaver"
-        self.object_path = "/org/freedesktop/ScreenSaver"
-        self.interface_name = "org.freedesktop.ScreenSaver"
-        self.signal_name = "ActiveChanged"
-    
+        self._stopped: Optional[asyncio.Event] = None
+        self._service: Optional[_IdleNotifierDBusService] = None
+
+        # D-Bus service we export for the KWin script
+        self.service_name = "org.sleepchecker.IdleNotifier"
+        self.object_path = "/org/sleepchecker/IdleNotifier"
+        self.interface_name = "org.sleepchecker.IdleNotifier"
+
+        # Optional fallback: KDE ScreenSaver signal
+        self.screensaver_interface = "org.freedesktop.ScreenSaver"
+        self.screensaver_signal = "ActiveChanged"
+        self.match_rules = [
+            f"type='signal',interface='{self.screensaver_interface}',"
+            f"member='{self.screensaver_signal}'"
+        ]
+
     async def connect(self) -> bool:
         """
         Connect to D-Bus session bus
-        
+
         Returns:
             True if connected successfully
         """
         try:
-            self.bus = await MessageBus(bus_type=BusType.SESSION).connect()
+            self.bus = await self.bus_manager.get_bus(BusType.SESSION)
             self.logger.info("✓ Connected to D-Bus session bus")
             return True
         except Exception as e:
             self.logger.error(f"Failed to connect to D-Bus: {e}")
             return False
-    
+
     async def start(self) -> None:
-        """Start monitoring idle events"""
+        """Export the IdleNotifier service and request its well-known name"""
         if not self.bus:
             if not await self.connect():
                 self.logger.error("Cannot start - D-Bus not connected")
                 return
-        
+
         try:
-            # Add message handler for signals
-            self.bus.add_message_handler(self._handle_signal)
-            
+            # Export, name and match rules are replayed by the bus manager on reconnect
+            self._service = _IdleNotifierDBusService(self)
+            await self.bus_manager.export(self.object_path, self._service)
+            # KWin's callDBus() cannot type a JS number as uint64
+            await self.bus_manager.add_message_handler(self._handle_untyped_state_change)
+
+            reply = await self.bus_manager.request_name(self.service_name)
+            if reply not in (RequestNameReply.PRIMARY_OWNER, RequestNameReply.ALREADY_OWNER):
+                self.logger.error(f"Could not acquire {self.service_name} ({reply.name})")
+                await self.bus_manager.release_name(self.service_name)
+                self.bus_manager.unexport(self.object_path, self._service)
+                self._service = None
+                return
+
+            if self.listen_screensaver:
+                # Let the bus daemon filter: only ActiveChanged is routed to us
+                await self.bus_manager.add_message_handler(self._handle_signal)
+                for rule in self.match_rules:
+                    await self.bus_manager.add_match(rule)
+
             self.is_running = True
-            self.logger.info(f"✓ Monitoring idle events on {self.interface_name}")
-            self.logger.info(f"  Listening for signal: {self.signal_name}")
-            self.logger.info(f"  Waiting for idle timeout... (don't touch keyboard/mouse)")
-            
+            self._stopped = asyncio.Event()
+            self.logger.info(f"✓ Exported {self.interface_name} at {self.object_path}")
+            self.logger.info(f"  Waiting for KWin to call stateChanged(bool, seq)")
+            if self.listen_screensaver:
+                self.logger.info(f"  Also listening for {self.screensaver_interface}.{self.screensaver_signal}")
+
         except Exception as e:
             self.logger.error(f"Failed to start idle monitoring: {e}")
             self.is_running = False
-    
-    def _handle_signal(self, msg) -> bool:
+
+    def _handle_signal(self, msg) -> None:
         """
-        Handle incoming D-Bus signals
-        
+        Handle ScreenSaver ActiveChanged signals routed by our match rules
+
         Args:
             msg: D-Bus message
-        
-        Returns:
-            True to continue processing
         """
-        # Check if this is the ActiveChanged signal from ScreenSaver
         if (msg.message_type == MessageType.SIGNAL and
-            msg.member == self.signal_name and
-            msg.path == self.object_path):
-            
-            # Extract idle state from signal
-            if msg.body and len(msg.body) > 0:
-                is_idle = bool(msg.body[0])
-                
-                if is_idle:
-                    self.logger.info(" System is now IDLE - checking for user presence")
-                else:
-                    self.logger.info(" System is now ACTIVE - user activity detected")
-                
-                # Trigger callback
-                try:
-                    self.on_idle_callback(is_idle)
-                except Exception as e:
-                    self.logger.error(f"Error in idle callback: {e}")
-        
-        return True  # Continue processing messages
-    
+            msg.member == self.screensaver_signal and
+            msg.interface == self.screensaver_interface and
+            msg.body):
+            self._dispatch(bool(msg.body[0]), "screensaver")
+
+    def _handle_untyped_state_change(self, msg: Message):
+        """
+        Accept stateChanged() whose seq arrived as another numeric type
+
+        Returns:
+            Reply message if handled, None to let the exported interface
+            (or an unknown-method error) take it
+        """
+        if (msg.message_type != MessageType.METHOD_CALL or msg.member != "stateChanged"
+                or msg.path != self.object_path or msg.signature == "bt"
+                or len(msg.signature) != 2 or msg.signature[0] != "b"
+                or msg.signature[1] not in "dxiuyqn"):
+            return None
+        self.state_changed(bool(msg.body[0]), int(msg.body[1]))
+        return Message.new_method_return(msg)
+
+    def state_changed(self, is_idle: bool, seq: int) -> None:
+        """
+        Apply a sequenced state report from the KWin script
+
+        Reports that are not newer than the last one (duplicates, reordered
+        calls) and reports that repeat the current state are dropped, so
+        neither starts another camera check.
+
+        Args:
+            is_idle: True = idle, False = active
+            seq: Monotonic sequence number (milliseconds-based) from KWin
+        """
+        if seq <= self.last_seq:
+            self.metrics.increment('idle_events', 'stale')
+            self.logger.debug(f"Dropped stale state report (seq {seq} <= {self.last_seq})")
+            return
+        self.last_seq = seq
+        if is_idle == self.is_dimmed:
+            self.metrics.increment('idle_events', 'repeat')
+            self.logger.debug(f"State report repeats current state ({'idle' if is_idle else 'active'}, seq {seq})")
+            return
+        self._dispatch(is_idle, "kwin")
+
+    def _dispatch(self, is_idle: bool, source: str) -> None:
+        """
+        Forward an idle state change to the callback
+
+        Args:
+            is_idle: True = idle, False = active
+            source: Where the event came from (for logging)
+        """
+        self.last_event_at = time.monotonic()
+        self.is_dimmed = is_idle
+        self.tracer.instant('screenDimmed' if source == "kwin" else source, 'dbus', idle=is_idle)
+        self.metrics.increment('idle_events', 'idle' if is_idle else 'active')
+        if is_idle:
+            self.logger.info(f" System is now IDLE ({source}) - checking for user presence")
+        else:
+            self.logger.info(f" System is now ACTIVE ({source}) - user activity detected")
+
+        try:
+            with self.tracer.span('idle_callback', 'dbus'):
+                self.on_idle_callback(is_idle)
+        except Exception as e:
+            self.logger.error(f"Error in idle callback: {e}")
+        self.metrics.observe('dbus_dispatch', time.monotonic() - self.last_event_at)
+
     async def stop(self) -> None:
         """Stop monitoring and cleanup"""
         self.is_running = False
-        
-        if self.bus:
-            self.bus.disconnect()
-            self.logger.info("Disconnected from D-Bus")
-    
+
+        if self._service is not None:
+            try:
+                self.bus_manager.remove_message_handler(self._handle_untyped_state_change)
+                if self.listen_screensaver:
+                    self.bus_manager.remove_message_handler(self._handle_signal)
+                    for rule in self.match_rules:
+                        await self.bus_manager.remove_match(rule)
+                await self.bus_manager.release_name(self.service_name)
+            except Exception as e:
+                self.logger.warning(f"Error releasing D-Bus resources: {e}")
+            self.bus_manager.unexport(self.object_path, self._service)
+            self._service = None
+            self.logger.info(f"Stopped exporting {self.interface_name}")
+
+        if self._stopped is not None:
+            self._stopped.set()
+
     async def run_forever(self) -> None:
         """Run event loop forever (for standalone use)"""
         self.logger.info("Starting idle monitor event loop...")
-        
+
         # Handle shutdown signals
         loop = asyncio.get_event_loop()
         for sig in (signal.SIGTERM, signal.SIGINT):
@@ -120,35 +251,35 @@ class IdleMonitor:
                 sig,
                 lambda: asyncio.create_task(self.stop())
             )
-        
+
         await self.start()
-        
-        # Keep running until stopped
-        while self.is_running:
-            await asyncio.sleep(1)
-        
+
+        # Keep running until stopped (no polling: wait on the stop event)
+        if self.is_running:
+            await self._stopped.wait()
+
         self.logger.info("Idle monitor stopped")
 
 
 async def test_idle_monitor():
     """Test function for standalone testing"""
-    
+
     def on_idle_changed(is_idle: bool):
         """Callback for idle state changes"""
         if is_idle:
             print("\n IDLE detected - Face detection would trigger here")
         else:
             print("\n ACTIVE - User is back")
-    
+
     # Create monitor
     monitor = IdleMonitor(on_idle_callback=on_idle_changed)
-    
+
     print("Idle Monitor Test")
     print("=" * 50)
     print("Waiting for idle events...")
     print("Let your system sit idle to test.")
     print("Press Ctrl+C to stop.\n")
-    
+
     try:
         await monitor.run_forever()
     except KeyboardInterrupt:
@@ -157,4 +288,4 @@ async def test_idle_monitor():
 
 
 if __name__ == "__main__":
-    asyncio.run(test_idle_monitor())
\ No newline at end of file
+    asyncio.run(test_idle_monitor())
@@ -0,0 +1,197 @@
+"""
+Power Monitor
+Tracks whether the machine runs on battery or AC: UPower's OnBattery
+property over the system bus, or /sys/class/power_supply polling where
+UPower is not running
+"""
+
+import asyncio
+from dbus_next import BusType, Message, MessageType
+from pathlib import Path
+from typing import Callable, Optional
+
+from src.utils.bus_manager import BusManager, get_bus_manager
+from src.utils.logger import get_logger
+
+
+POWER_SUPPLY_DIR = Path("/sys/class/power_supply")
+
+
+def _read_attribute(supply: Path, name: str) -> Optional[str]:
+    """Optional power_supply attribute (None if the driver lacks it)"""
+    try:
+        return (supply / name).read_text().strip()
+    except OSError:
+        return None
+
+
+def read_on_battery(root: Path = POWER_SUPPLY_DIR) -> Optional[bool]:
+    """
+    Power source from sysfs
+
+    A mains adapter that reports online means AC. Without a mains entry
+    (some USB-C chargers), a discharging battery means battery power.
+    Batteries of peripherals (wireless mice and keyboards, scope "Device")
+    are not the system's and are ignored.
+
+    Args:
+        root: power_supply class directory
+
+    Returns:
+        True on battery, False on AC, None if nothing is reported (desktops)
+    """
+    mains_seen, discharging = False, False
+    try:
+        supplies = sorted(root.iterdir())
+    except OSError:
+        return None
+
+    for supply in supplies:
+        try:
+            kind = (supply / "type").read_text().strip()
+            if kind == "Mains":
+                mains_seen = True
+                if (supply / "online").read_text().strip() == "1":
+                    return False
+            elif kind == "Battery":
+                if _read_attribute(supply, "scope") == "Device":
+                    continue
+                if (supply / "status").read_text().strip() == "Discharging":
+                    discharging = True
+        except OSError:
+            continue
+
+    if mains_seen:
+        return True
+    return True if discharging else None
+
+
+class PowerMonitor:
+    """Calls back when the machine switches between battery and AC"""
+
+    def __init__(
+        self,
+        on_change: Callable[[bool], None],
+        poll_interval: float = 30.0,
+        bus_manager: Optional[BusManager] = None
+    ):
+        """
+        Initialize power monitor
+
+        Args:
+            on_change: Called with True (battery) or False (AC) on every switch
+            poll_interval: Seconds between sysfs reads when UPower is unavailable
+            bus_manager: Shared D-Bus connections (defaults to the global one)
+        """
+        self.logger = get_logger(__name__)
+        self.on_change = on_change
+        self.poll_interval = poll_interval
+        self.bus_manager = bus_manager or get_bus_manager()
+
+        self.on_battery = False
+        self.is_running = False
+        self._poll_task: Optional[asyncio.Task] = None
+        self._use_upower = False
+
+        # UPower details
+        self.upower_service = "org.freedesktop.UPower"
+        self.upower_path = "/org/freedesktop/UPower"
+        self.upower_interface = "org.freedesktop.UPower"
+        self.match_rule = (
+            f"type='signal',sender='{self.upower_service}',path='{self.upower_path}',"
+            f"interface='org.freedesktop.DBus.Properties',member='PropertiesChanged',"
+            f"arg0='{self.upower_interface}'"
+        )
+
+    async def start(self) -> bool:
+        """
+        Read the current power source and start watching for changes
+
+        Returns:
+            True if monitoring started (through UPower or sysfs)
+        """
+        try:
+            on_battery = await self._read_upower()
+            if on_battery is not None:
+                await self.bus_manager.add_message_handler(self._handle_signal, BusType.SYSTEM)
+                await self.bus_manager.add_match(self.match_rule, BusType.SYSTEM)
+                self._use_upower = True
+            else:
+                on_battery = read_on_battery()
+                if on_battery is None:
+                    self.logger.info("No battery or mains adapter reported, assuming AC")
+                    on_battery = False
+                self._poll_task = asyncio.ensure_future(self._poll_loop())
+
+            self.on_battery = on_battery
+            self.is_running = True
+            self.logger.info(f"✓ Power monitor active via {'UPower' if self._use_upower else 'sysfs'} "
+                             f"(on {'battery' if on_battery else 'AC'})")
+            return True
+
+        except Exception as e:
+            self.logger.error(f"Failed to start power monitor: {e}")
+            return False
+
+    async def _read_upower(self) -> Optional[bool]:
+        """UPower OnBattery, or None if UPower is not reachable"""
+        try:
+            reply = await self.bus_manager.call(Message(
+                destination=self.upower_service,
+                path=self.upower_path,
+                interface="org.freedesktop.DBus.Properties",
+                member="Get",
+                signature="ss",
+                body=[self.upower_interface, "OnBattery"]
+            ), BusType.SYSTEM)
+        except Exception as e:
+            self.logger.debug(f"UPower unavailable: {e}")
+            return None
+
+        if reply.message_type != MessageType.METHOD_RETURN:
+            self.logger.debug(f"UPower unavailable: {reply.body}")
+            return None
+        return bool(reply.body[0].value)
+
+    def _handle_signal(self, msg: Message) -> None:
+        """Handle UPower PropertiesChanged routed by our match rule"""
+        if (msg.message_type == MessageType.SIGNAL and
+                msg.member == "PropertiesChanged" and
+                msg.path == self.upower_path and
+                msg.body and msg.body[0] == self.upower_interface):
+            changed = msg.body[1]
+            if "OnBattery" in changed:
+                self._update(bool(changed["OnBattery"].value))
+
+    async def _poll_loop(self) -> None:
+        """sysfs fallback: re-read the power source every poll_interval"""
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            on_battery = read_on_battery()
+            if on_battery is not None:
+                self._update(on_battery)
+
+    def _update(self, on_battery: bool) -> None:
+        """Record the power source and notify on a switch"""
+        if on_battery == self.on_battery:
+            return
+        self.on_battery = on_battery
+        self.logger.info(f"Power source changed: now on {'battery' if on_battery else 'AC'}")
+        try:
+            self.on_change(on_battery)
+        except Exception as e:
+            self.logger.error(f"Error in power change callback: {e}")
+
+    async def stop(self) -> None:
+        """Stop watching the power source"""
+        self.is_running = False
+        if self._poll_task is not None:
+            self._poll_task.cancel()
+            self._poll_task = None
+        if self._use_upower:
+            try:
+                self.bus_manager.remove_message_handler(self._handle_signal, BusType.SYSTEM)
+                await self.bus_manager.remove_match(self.match_rule, BusType.SYSTEM)
+            except Exception as e:
+                self.logger.warning(f"Error removing UPower match: {e}")
+            self._use_upower = False
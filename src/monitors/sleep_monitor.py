@@ -0,0 +1,169 @@
+"""
+Sleep Monitor
+Fallback for suspend paths that bypass KWin's DPMS signal (lid timer,
+idle suspend): holds a logind delay inhibitor and runs a latency-budgeted
+presence check on PrepareForSleep before letting the suspend continue
+"""
+
+import asyncio
+import time
+from dbus_next import BusType, Message, MessageType
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from src.core.inhibitors import LogindInhibitor
+from src.core.presence_result import PresenceResult, Verdict
+from src.utils.bus_manager import BusManager, get_bus_manager
+from src.utils.logger import get_logger
+
+
+PresenceCheck = Callable[[float], Awaitable[Tuple[PresenceResult, Dict[str, float]]]]
+VerdictCallback = Callable[[PresenceResult], Awaitable[None]]
+
+
+class SleepMonitor:
+    """Checks for the owner when logind is about to suspend"""
+
+    def __init__(
+        self,
+        presence_check: PresenceCheck,
+        on_verdict: Optional[VerdictCallback] = None,
+        safety_margin: float = 0.5,
+        bus_manager: Optional[BusManager] = None
+    ):
+        """
+        Initialize sleep monitor
+
+        Args:
+            presence_check: Coroutine taking a budget in seconds and returning
+                            (result, stage timings); e.g. PresenceChecker.check_within
+                            run in a thread
+            on_verdict: Coroutine called with the result before the delay
+                        lock is released (e.g. lock the screen on UNKNOWN)
+            safety_margin: Seconds kept free before InhibitDelayMaxSec
+            bus_manager: Shared D-Bus connections (defaults to the global one)
+        """
+        self.logger = get_logger(__name__)
+        self.presence_check = presence_check
+        self.on_verdict = on_verdict
+        self.safety_margin = safety_margin
+        self.bus_manager = bus_manager or get_bus_manager()
+
+        self.delay_lock = LogindInhibitor(self.bus_manager, what="sleep", mode="delay")
+        self.max_delay: float = 5.0
+        self.is_running = False
+        self.last_report: Dict[str, float] = {}
+        self._task: Optional[asyncio.Task] = None
+
+        # logind details
+        self.login1_service = "org.freedesktop.login1"
+        self.login1_path = "/org/freedesktop/login1"
+        self.login1_interface = "org.freedesktop.login1.Manager"
+        self.match_rule = (
+            f"type='signal',sender='{self.login1_service}',"
+            f"interface='{self.login1_interface}',member='PrepareForSleep'"
+        )
+
+    async def start(self) -> bool:
+        """
+        Subscribe to PrepareForSleep and take the delay inhibitor
+
+        Returns:
+            True if monitoring started
+        """
+        try:
+            self.max_delay = await self._read_max_delay()
+            await self.bus_manager.add_message_handler(self._handle_signal, BusType.SYSTEM)
+            await self.bus_manager.add_match(self.match_rule, BusType.SYSTEM)
+
+            if not await self.delay_lock.acquire("Checking who is at the screen before sleep"):
+                self.logger.error("Could not take logind delay inhibitor")
+                return False
+
+            self.is_running = True
+            self.logger.info(f"✓ Sleep monitor active (InhibitDelayMaxSec: {self.max_delay:.1f}s)")
+            return True
+
+        except Exception as e:
+            self.logger.error(f"Failed to start sleep monitor: {e}")
+            return False
+
+    async def _read_max_delay(self) -> float:
+        """Read InhibitDelayMaxUSec from logind (seconds)"""
+        reply = await self.bus_manager.call(Message(
+            destination=self.login1_service,
+            path=self.login1_path,
+            interface="org.freedesktop.DBus.Properties",
+            member="Get",
+            signature="ss",
+            body=[self.login1_interface, "InhibitDelayMaxUSec"]
+        ), BusType.SYSTEM)
+
+        if reply.message_type != MessageType.METHOD_RETURN:
+            self.logger.warning(f"Could not read InhibitDelayMaxUSec, assuming {self.max_delay}s")
+            return self.max_delay
+        return reply.body[0].value / 1_000_000
+
+    def _handle_signal(self, msg: Message) -> None:
+        """Handle PrepareForSleep routed by our match rule"""
+        if (msg.message_type == MessageType.SIGNAL and
+                msg.member == "PrepareForSleep" and
+                msg.interface == self.login1_interface and
+                msg.body):
+            if msg.body[0]:
+                self._task = asyncio.ensure_future(self._before_sleep())
+            else:
+                self._task = asyncio.ensure_future(self._after_resume())
+
+    async def _before_sleep(self) -> None:
+        """Run the budgeted check, then release the delay lock"""
+        start = time.monotonic()
+        budget = max(0.0, self.max_delay - self.safety_margin)
+        self.logger.info(f"System about to sleep, checking presence (budget: {budget:.2f}s)")
+
+        result, timings = PresenceResult(Verdict.ERROR), {}
+        try:
+            # Hard deadline: the thread may finish later, we don't wait for it
+            result, timings = await asyncio.wait_for(self.presence_check(budget), budget)
+        except asyncio.TimeoutError:
+            self.logger.warning(f"Presence check exceeded {budget:.2f}s budget, allowing sleep")
+        except Exception as e:
+            self.logger.error(f"Presence check failed: {e}")
+
+        remaining = budget - (time.monotonic() - start)
+        if self.on_verdict is not None and result.verdict != Verdict.ERROR and remaining > 0:
+            try:
+                await asyncio.wait_for(self.on_verdict(result), remaining)
+            except asyncio.TimeoutError:
+                self.logger.warning("Verdict action did not finish inside the budget")
+            except Exception as e:
+                self.logger.error(f"Error in verdict callback: {e}")
+
+        await self.delay_lock.release()
+
+        timings['held'] = time.monotonic() - start
+        timings['budget'] = budget
+        self.last_report = timings
+        self.logger.info(
+            f"Pre-sleep verdict: {result.verdict}; " +
+            ", ".join(f"{k}: {v * 1000:.0f} ms" for k, v in timings.items()),
+            extra={'event': 'pre_sleep_check', 'verdict': result.verdict,
+                   'confidence': result.confidence, 'timings': timings}
+        )
+
+    async def _after_resume(self) -> None:
+        """Re-arm the delay lock for the next suspend"""
+        self.logger.info("System resumed, re-arming sleep monitor")
+        if not await self.delay_lock.acquire("Checking who is at the screen before sleep"):
+            self.logger.error("Could not re-take logind delay inhibitor")
+
+    async def stop(self) -> None:
+        """Stop monitoring and release the delay lock"""
+        self.is_running = False
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+        try:
+            self.bus_manager.remove_message_handler(self._handle_signal, BusType.SYSTEM)
+            await self.bus_manager.remove_match(self.match_rule, BusType.SYSTEM)
+        except Exception as e:
+            self.logger.warning(f"Error removing PrepareForSleep match: {e}")
+        await self.delay_lock.release()
@@ -0,0 +1,28 @@
+"""Session recording and offline replay
+
+Submodules are imported on first attribute access (PEP 562).
+"""
+
+import importlib
+from typing import Any
+
+_LAZY = {
+    'SessionRecorder': '.recording',
+    'load_events': '.recording',
+    'SessionReplayer': '.replayer',
+    'summarize': '.replayer',
+}
+
+__all__ = ['SessionRecorder', 'load_events', 'SessionReplayer', 'summarize']
+
+
+def __getattr__(name: str) -> Any:
+    if name in _LAZY:
+        value = getattr(importlib.import_module(_LAZY[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
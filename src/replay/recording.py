@@ -0,0 +1,138 @@
+"""
+Recording
+On-disk format for recorded idle events: one directory holding
+events.jsonl (one line per idle event, with its verdict) and the frames
+each check captured, JPEG-encoded under frames/
+"""
+
+import json
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+import cv2
+import numpy as np
+
+from src.core.presence_result import PresenceResult
+from src.utils.logger import get_logger
+
+
+FORMAT_VERSION = 1
+
+
+@dataclass
+class RecordedEvent:
+    """One screenDimmed() call and what the daemon decided"""
+    id: int
+    t: float                       # seconds since the recording started
+    idle: bool                     # screenDimmed argument
+    frames: List[str] = field(default_factory=list)
+    verdict: Optional[str] = None  # live decision
+    confidence: Optional[float] = None
+    expected: Optional[str] = None  # ground truth; defaults to the live verdict
+
+
+class SessionRecorder:
+    """Writes idle events and the frames of their checks to a recording"""
+
+    def __init__(self, directory: str, jpeg_quality: int = 85, max_frames_per_event: int = 30):
+        """
+        Initialize recorder
+
+        Args:
+            directory: Recording directory (created if needed)
+            jpeg_quality: JPEG quality for stored frames
+            max_frames_per_event: Frames kept per event (checks that retry
+                                  a lot are truncated)
+        """
+        self.logger = get_logger(__name__)
+        self.directory = Path(directory)
+        self.jpeg_quality = jpeg_quality
+        self.max_frames_per_event = max_frames_per_event
+
+        (self.directory / "frames").mkdir(parents=True, exist_ok=True)
+        self._events_file = open(self.directory / "events.jsonl", "a")
+        self._start = time.monotonic()
+        with open(self.directory / "events.jsonl") as f:
+            self._next_id = sum(1 for _ in f) + 1
+        self._current: Optional[RecordedEvent] = None
+        self._lock = threading.Lock()
+
+        manifest = self.directory / "manifest.json"
+        if not manifest.exists():
+            manifest.write_text(json.dumps({'version': FORMAT_VERSION, 'created': time.time()}))
+
+    def begin_event(self, idle: bool) -> None:
+        """Start a new event (an open one without a verdict is written as is)"""
+        with self._lock:
+            if self._current is not None:
+                self._write(self._current)
+            self._current = RecordedEvent(self._next_id, time.monotonic() - self._start, idle)
+            self._next_id += 1
+            if not idle:
+                # User came back: nothing to capture
+                self._write(self._current)
+                self._current = None
+
+    def add_frame(self, frame: np.ndarray) -> None:
+        """Store a frame captured for the open event (called from the check thread)"""
+        with self._lock:
+            event = self._current
+            if event is None or len(event.frames) >= self.max_frames_per_event:
+                return
+            name = f"frames/{event.id:06d}_{len(event.frames):02d}.jpg"
+            event.frames.append(name)
+
+        ok, data = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality])
+        if ok:
+            (self.directory / name).write_bytes(data.tobytes())
+
+    def end_event(self, result: PresenceResult) -> None:
+        """Attach the live verdict to the open event and write it"""
+        with self._lock:
+            event, self._current = self._current, None
+            if event is None:
+                return
+            event.verdict = result.verdict
+            event.confidence = result.confidence
+            event.expected = result.verdict
+            self._write(event)
+
+    def _write(self, event: RecordedEvent) -> None:
+        self._events_file.write(json.dumps(asdict(event)) + "\n")
+        self._events_file.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._current is not None:
+                self._write(self._current)
+                self._current = None
+            self._events_file.close()
+
+
+def load_events(directory: str) -> List[RecordedEvent]:
+    """
+    Read the events of a recording
+
+    Args:
+        directory: Recording directory
+
+    Returns:
+        Events in recording order
+    """
+    events = []
+    with open(Path(directory) / "events.jsonl") as f:
+        for line in f:
+            if line.strip():
+                events.append(RecordedEvent(**json.loads(line)))
+    return events
+
+
+def iter_frames(directory: str, event: RecordedEvent) -> Iterator[np.ndarray]:
+    """Decoded frames of one event"""
+    for name in event.frames:
+        frame = cv2.imread(str(Path(directory) / name))
+        if frame is not None:
+            yield frame
@@ -0,0 +1,380 @@
+"""
+Replayer
+Feeds a recorded session through the full daemon on a private D-Bus
+session bus: screenDimmed() is called like KWin does, the camera is
+replaced by the recorded frames and PowerDevil/ScreenSaver/logind are
+replaced by fakes that only record what they were asked to do
+"""
+
+import asyncio
+import json
+import os
+import shutil
+import signal
+import subprocess
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from dbus_next import BusType, Message, MessageType, RequestNameReply
+from dbus_next.aio import MessageBus
+from dbus_next.service import ServiceInterface, method
+
+from src.core.frame_source import ImageDirectorySource
+from src.core.power_actions import ActionBackend
+from src.core.presence_result import Verdict
+from src.replay.recording import RecordedEvent, load_events
+from src.utils.bus_manager import BusManager
+from src.utils.logger import get_logger
+
+
+# Overrides applied on top of the checked-in defaults: nothing may reach
+# the system bus, and nothing may sleep on purpose
+REPLAY_OVERRIDES: Dict[str, Dict[str, Any]] = {
+    'camera': {'warmup_time': 0.0},
+    'inference': {'use_worker': False},
+    'memory': {'unload_after_seconds': 0},
+    'sleep_monitor': {'enabled': False},
+    'power': {'enabled': False},
+    'actions': {'inhibitors': ['power_management', 'screensaver']},
+    'recording': {'enabled': False},
+    'history': {'enabled': False},
+    'adaptation': {'enabled': False},
+}
+
+
+@dataclass
+class EventReport:
+    """Outcome of one replayed event"""
+    id: int
+    idle: bool
+    frames: int
+    verdict: Optional[str]
+    expected: Optional[str]
+    action: Optional[str]
+    expected_action: Optional[str]
+    correct: bool
+    end_to_end_ms: float               # screenDimmed() sent -> daemon done
+    action_ms: Optional[float] = None  # screenDimmed() sent -> first fake call
+
+
+class _CallLog:
+    """Times of calls made to the fake services"""
+
+    def __init__(self):
+        self.calls: List[tuple] = []
+
+    def record(self, name: str) -> None:
+        self.calls.append((name, time.monotonic()))
+
+    def since(self, start: float) -> List[tuple]:
+        return [(name, t) for name, t in self.calls if t >= start]
+
+
+class _FakeInhibitService(ServiceInterface):
+    """Inhibit(ss)->u / UnInhibit(u) / HasInhibit()->b, as PowerDevil and KScreenLocker"""
+
+    def __init__(self, interface: str, label: str, log: _CallLog):
+        super().__init__(interface)
+        self._label = label
+        self._log = log
+        self._next_cookie = 1
+        self.cookies: Dict[int, str] = {}
+
+    @method()
+    def Inhibit(self, application: 's', reason: 's') -> 'u':
+        self._log.record(f"{self._label}.Inhibit")
+        cookie, self._next_cookie = self._next_cookie, self._next_cookie + 1
+        self.cookies[cookie] = reason
+        return cookie
+
+    @method()
+    def UnInhibit(self, cookie: 'u'):
+        self._log.record(f"{self._label}.UnInhibit")
+        self.cookies.pop(cookie, None)
+
+    @method()
+    def HasInhibit(self) -> 'b':
+        return bool(self.cookies)
+
+
+class _FakeScreenSaverService(_FakeInhibitService):
+    """org.freedesktop.ScreenSaver: inhibitor plus Lock()"""
+
+    def __init__(self, log: _CallLog):
+        super().__init__("org.freedesktop.ScreenSaver", "screensaver", log)
+
+    @method()
+    def Lock(self):
+        self._log.record("screensaver.Lock")
+
+
+class ReplayActionBackend(ActionBackend):
+    """Records power-off and locks through the fake ScreenSaver only"""
+
+    name = "replay"
+
+    def __init__(self, bus_manager: BusManager, log: _CallLog):
+        self.bus_manager = bus_manager
+        self._log = log
+
+    async def power_off(self) -> bool:
+        self._log.record("logind.PowerOff")
+        return True
+
+    async def lock_screen(self) -> bool:
+        # No logind fallback: a failed fake call must not lock the real session
+        reply = await self.bus_manager.call(Message(
+            destination="org.freedesktop.ScreenSaver",
+            path="/ScreenSaver",
+            interface="org.freedesktop.ScreenSaver",
+            member="Lock"
+        ), BusType.SESSION)
+        return reply.message_type == MessageType.METHOD_RETURN
+
+
+class PrivateSessionBus:
+    """A dbus-daemon --session of our own, torn down on exit"""
+
+    def __init__(self):
+        self.process: Optional[subprocess.Popen] = None
+        self.address: Optional[str] = None
+        self._saved_address: Optional[str] = None
+
+    def start(self) -> str:
+        """
+        Spawn the bus and point DBUS_SESSION_BUS_ADDRESS at it
+
+        Returns:
+            Bus address
+
+        Raises:
+            RuntimeError: if dbus-daemon is missing or does not start
+        """
+        binary = shutil.which("dbus-daemon")
+        if binary is None:
+            raise RuntimeError("dbus-daemon not found (install dbus)")
+        self.process = subprocess.Popen(
+            [binary, "--session", "--nofork", "--print-address=1"],
+            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True
+        )
+        self.address = self.process.stdout.readline().strip()
+        if not self.address:
+            self.stop()
+            raise RuntimeError("dbus-daemon did not report an address")
+
+        self._saved_address = os.environ.get("DBUS_SESSION_BUS_ADDRESS")
+        os.environ["DBUS_SESSION_BUS_ADDRESS"] = self.address
+        return self.address
+
+    def stop(self) -> None:
+        # Restore the caller's bus only if start() pointed the environment at ours
+        if self.address and os.environ.get("DBUS_SESSION_BUS_ADDRESS") == self.address:
+            if self._saved_address is None:
+                os.environ.pop("DBUS_SESSION_BUS_ADDRESS")
+            else:
+                os.environ["DBUS_SESSION_BUS_ADDRESS"] = self._saved_address
+        if self.process is not None:
+            self.process.send_signal(signal.SIGTERM)
+            try:
+                self.process.wait(timeout=2)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+            self.process = None
+
+
+class SessionReplayer:
+    """Runs a recording through SleepCheckerDaemon and scores each event"""
+
+    def __init__(self, recording_dir: str, config_dir: str = "config",
+                 overrides: Optional[Dict[str, Dict[str, Any]]] = None,
+                 event_timeout: float = 30.0):
+        """
+        Initialize replayer
+
+        Args:
+            recording_dir: Directory written by SessionRecorder
+            config_dir: Directory holding default_config.json (and an
+                        optional user_config.json) to start from
+            overrides: Extra config sections merged over REPLAY_OVERRIDES
+            event_timeout: Seconds one event may take before it is failed
+        """
+        self.logger = get_logger(__name__)
+        self.recording_dir = recording_dir
+        self.config_dir = Path(config_dir)
+        self.overrides = overrides or {}
+        self.event_timeout = event_timeout
+        self.events = load_events(recording_dir)
+
+        self.calls = _CallLog()
+
+    def _write_config(self, workdir: Path) -> Path:
+        """Copy the configuration and layer the replay overrides on top"""
+        config_dir = workdir / "config"
+        config_dir.mkdir()
+        shutil.copy(self.config_dir / "default_config.json", config_dir / "default_config.json")
+
+        user: Dict[str, Dict[str, Any]] = {}
+        user_path = self.config_dir / "user_config.json"
+        if user_path.exists():
+            user = json.loads(user_path.read_text())
+        for layer in (REPLAY_OVERRIDES, self.overrides,
+                      {'logging': {'file': str(workdir / "replay.log")},
+                       'metrics': {'textfile': ""}}):
+            for section, values in layer.items():
+                user.setdefault(section, {}).update(values)
+        (config_dir / "user_config.json").write_text(json.dumps(user, indent=2))
+        return config_dir
+
+    def expected_action(self, daemon, verdict: Optional[str]) -> Optional[str]:
+        """Action the daemon's configuration prescribes for a verdict"""
+        actions = daemon.config.snapshot.actions
+        if verdict == Verdict.OWNER:
+            return 'inhibit' if actions.inhibit_on_owner else None
+        if verdict == Verdict.UNKNOWN:
+            return actions.unknown_person_action
+        return None
+
+    @staticmethod
+    def _action_of(call: str) -> str:
+        if call.endswith(".Inhibit"):
+            return 'inhibit'
+        if call == "logind.PowerOff":
+            return 'shutdown'
+        if call.endswith(".Lock"):
+            return 'lock'
+        return call
+
+    async def run(self) -> List[EventReport]:
+        """
+        Replay every event in order
+
+        Returns:
+            One report per event
+        """
+        workdir = Path(tempfile.mkdtemp(prefix="sleep-checker-replay-"))
+        bus = PrivateSessionBus()
+        bus.start()
+        try:
+            return await self._run(workdir)
+        finally:
+            bus.stop()
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    async def _run(self, workdir: Path) -> List[EventReport]:
+        # Imported here: the daemon must see the private bus address
+        from src.daemon.main_service import SleepCheckerDaemon
+        from src.utils.config_manager import ConfigManager
+
+        # Fakes live on their own connection, like the real services do
+        services = await MessageBus(bus_type=BusType.SESSION).connect()
+        power = _FakeInhibitService("org.freedesktop.PowerManagement.Inhibit", "power_management", self.calls)
+        screensaver = _FakeScreenSaverService(self.calls)
+        services.export("/org/freedesktop/PowerManagement/Inhibit", power)
+        services.export("/org/freedesktop/ScreenSaver", screensaver)
+        services.export("/ScreenSaver", screensaver)
+        for name in ("org.freedesktop.PowerManagement.Inhibit", "org.freedesktop.ScreenSaver"):
+            if await services.request_name(name) != RequestNameReply.PRIMARY_OWNER:
+                raise RuntimeError(f"Could not own {name} on the private bus")
+
+        daemon = SleepCheckerDaemon(ConfigManager(str(self._write_config(workdir))))
+        daemon.controller.action_backend = ReplayActionBackend(daemon.bus_manager, self.calls)
+        daemon_task = asyncio.ensure_future(daemon.run())
+        reports: List[EventReport] = []
+        try:
+            await asyncio.wait_for(daemon._vision_ready.wait(), self.event_timeout)
+            self.logger.info(f"Replaying {len(self.events)} events from {self.recording_dir}")
+
+            for event in self.events:
+                if event.idle and (power.cookies or screensaver.cookies):
+                    # Every check starts uninhibited, as after the user left
+                    await self._screen_dimmed(services, daemon, False)
+                reports.append(await self._replay_event(services, daemon, event))
+        finally:
+            daemon._stopped.set()
+            await asyncio.wait_for(daemon_task, self.event_timeout)
+            services.disconnect()
+        return reports
+
+    async def _screen_dimmed(self, client: MessageBus, daemon, is_dimmed: bool) -> float:
+        """Call screenDimmed() the way KWin does and wait for the daemon to finish"""
+        sent = time.monotonic()
+        reply = await client.call(Message(
+            destination=daemon.idle_monitor.service_name,
+            path=daemon.idle_monitor.object_path,
+            interface=daemon.idle_monitor.interface_name,
+            member="screenDimmed",
+            signature="b",
+            body=[is_dimmed]
+        ))
+        if reply.message_type == MessageType.ERROR:
+            raise RuntimeError(f"screenDimmed failed: {reply.body}")
+        if daemon._check_task is not None:
+            await asyncio.wait_for(asyncio.shield(daemon._check_task), self.event_timeout)
+        return sent
+
+    async def _replay_event(self, client: MessageBus, daemon, event: RecordedEvent) -> EventReport:
+        # The event's frames stand in for the camera; the last one is held
+        # like a still scene if the check wants more than were recorded
+        daemon.presence.source = ImageDirectorySource(self.recording_dir, event.frames, at_end="hold")
+        daemon.presence.last_result = None
+        try:
+            sent = await self._screen_dimmed(client, daemon, event.idle)
+        except asyncio.TimeoutError:
+            sent = None
+        done = time.monotonic()
+
+        calls = [(name, t) for name, t in self.calls.since(sent or done) if not name.endswith("UnInhibit")]
+        action = self._action_of(calls[0][0]) if calls else None
+        result = daemon.presence.last_result if event.idle else None
+        verdict = result.verdict if result is not None else None
+
+        if not event.idle:
+            expected, expected_action = None, None
+            correct = sent is not None
+        else:
+            expected = event.expected
+            expected_action = self.expected_action(daemon, expected)
+            correct = sent is not None and verdict == expected and action == expected_action
+
+        return EventReport(
+            id=event.id,
+            idle=event.idle,
+            frames=len(event.frames),
+            verdict=verdict,
+            expected=expected,
+            action=action,
+            expected_action=expected_action,
+            correct=correct,
+            end_to_end_ms=(done - sent) * 1000 if sent is not None else self.event_timeout * 1000,
+            action_ms=(calls[0][1] - sent) * 1000 if calls else None,
+        )
+
+
+def summarize(reports: List[EventReport]) -> Dict[str, Any]:
+    """
+    Aggregate event reports for CI
+
+    Returns:
+        {'events', 'correct', 'accuracy', 'end_to_end_ms': {p50, p95, max},
+         'reports': [...]}
+    """
+    checks = [r for r in reports if r.idle]
+    latencies = sorted(r.end_to_end_ms for r in checks)
+
+    def percentile(q: float) -> float:
+        if not latencies:
+            return 0.0
+        return latencies[min(len(latencies) - 1, int(q * len(latencies)))]
+
+    correct = sum(r.correct for r in checks)
+    return {
+        'events': len(checks),
+        'correct': correct,
+        'accuracy': correct / len(checks) if checks else 1.0,
+        'end_to_end_ms': {'p50': percentile(0.5), 'p95': percentile(0.95),
+                          'max': latencies[-1] if latencies else 0.0},
+        'reports': [asdict(r) for r in reports],
+    }
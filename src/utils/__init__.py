@@ -1,17 +1,41 @@
-from .config_manager import ConfigManager, get_config
-from .logger import setup_logger, get_logger
-from .image_utils import (
-    enhance_low_light,
-    resize_frame,
-    flip_horizontal,
-    crop_face,
-    draw_face_box,
-    normalize_face
-)
+"""Utility modules
+
+Submodules are imported on first attribute access (PEP 562); only the
+image helpers need cv2, and config/logging must stay cheap to import.
+"""
+
+import importlib
+from typing import Any
+
+_LAZY = {
+    'ConfigManager': '.config_manager',
+    'get_config': '.config_manager',
+    'setup_logger': '.logger',
+    'get_logger': '.logger',
+    'enhance_low_light': '.image_utils',
+    'resize_frame': '.image_utils',
+    'flip_horizontal': '.image_utils',
+    'crop_face': '.image_utils',
+    'draw_face_box': '.image_utils',
+    'normalize_face': '.image_utils',
+    'BufferPool': '.image_utils',
+}
 
 __all__ = [
     'ConfigManager', 'get_config',
     'setup_logger', 'get_logger',
     'enhance_low_light', 'resize_frame', 'flip_horizontal',
-    'crop_face', 'draw_face_box', 'normalize_face'
-]
\ No newline at end of file
+    'crop_face', 'draw_face_box', 'normalize_face', 'BufferPool'
+]
+
+
+def __getattr__(name: str) -> Any:
+    if name in _LAZY:
+        value = getattr(importlib.import_module(_LAZY[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
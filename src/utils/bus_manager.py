@@ -0,0 +1,351 @@
+"""
+Bus Manager
+Shares one D-Bus connection per bus type, caches proxy objects and
+reconnects (replaying exports, names and match rules) when a bus drops
+"""
+
+import asyncio
+from dbus_next.aio import MessageBus, ProxyObject
+from dbus_next.service import ServiceInterface
+from dbus_next import BusType, Message, MessageType, RequestNameReply
+from typing import Awaitable, Callable, Dict, List, Tuple
+
+from src.utils.logger import get_logger
+
+
+ReconnectCallback = Callable[[BusType], Awaitable[None]]
+NameOwnerCallback = Callable[[str, str, str], Awaitable[None]]
+
+
+class BusManager:
+    """Owns the process-wide D-Bus connections"""
+
+    def __init__(self, reconnect_delay: float = 0.5, max_reconnect_delay: float = 30.0):
+        """
+        Initialize bus manager
+
+        Args:
+            reconnect_delay: First retry delay after a bus drops (seconds)
+            max_reconnect_delay: Upper bound for the exponential backoff
+        """
+        self.logger = get_logger(__name__)
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+
+        self._buses: Dict[BusType, MessageBus] = {}
+        self._locks: Dict[BusType, asyncio.Lock] = {}
+        self._watch_tasks: Dict[BusType, asyncio.Task] = {}
+        self._proxies: Dict[Tuple[BusType, str, str], ProxyObject] = {}
+        self._closing = False
+
+        # State replayed after every reconnect
+        self._exports: Dict[BusType, List[Tuple[str, ServiceInterface]]] = {}
+        self._names: Dict[BusType, List[str]] = {}
+        self._match_rules: Dict[BusType, List[str]] = {}
+        self._handlers: Dict[BusType, List[Callable]] = {}
+        self._reconnect_callbacks: List[ReconnectCallback] = []
+        self._name_watches: Dict[Tuple[BusType, str], List[NameOwnerCallback]] = {}
+        self._name_handlers: Dict[BusType, Callable] = {}
+
+    def _lock(self, bus_type: BusType) -> asyncio.Lock:
+        if bus_type not in self._locks:
+            self._locks[bus_type] = asyncio.Lock()
+        return self._locks[bus_type]
+
+    def is_connected(self, bus_type: BusType = BusType.SESSION) -> bool:
+        """Check if the shared connection for a bus type is up"""
+        bus = self._buses.get(bus_type)
+        return bus is not None and bus.connected
+
+    async def get_bus(self, bus_type: BusType = BusType.SESSION) -> MessageBus:
+        """
+        Get the shared connection, connecting on first use
+
+        Args:
+            bus_type: Session or system bus
+
+        Returns:
+            Connected MessageBus
+        """
+        bus = self._buses.get(bus_type)
+        if bus is not None and bus.connected:
+            return bus
+
+        async with self._lock(bus_type):
+            bus = self._buses.get(bus_type)
+            if bus is not None and bus.connected:
+                return bus
+
+            # negotiate_unix_fd: logind hands out inhibitor locks as fds
+            bus = await MessageBus(bus_type=bus_type, negotiate_unix_fd=True).connect()
+            self._buses[bus_type] = bus
+            self.logger.info(f"Connected to D-Bus {bus_type.name.lower()} bus ({bus.unique_name})")
+
+            self._watch_tasks[bus_type] = asyncio.ensure_future(self._watch(bus_type, bus))
+            return bus
+
+    async def get_proxy(self, bus_name: str, path: str,
+                        bus_type: BusType = BusType.SESSION) -> ProxyObject:
+        """
+        Get a proxy object, introspecting the remote only once
+
+        Args:
+            bus_name: Remote well-known name
+            path: Object path
+            bus_type: Session or system bus
+
+        Returns:
+            Cached ProxyObject bound to the current connection
+        """
+        key = (bus_type, bus_name, path)
+        proxy = self._proxies.get(key)
+        bus = await self.get_bus(bus_type)
+        if proxy is not None and proxy.bus is bus:
+            return proxy
+
+        introspection = await bus.introspect(bus_name, path)
+        proxy = bus.get_proxy_object(bus_name, path, introspection)
+        self._proxies[key] = proxy
+        return proxy
+
+    async def call(self, msg: Message, bus_type: BusType = BusType.SESSION) -> Message:
+        """
+        Send a method call on the shared connection
+
+        Args:
+            msg: Method call message
+            bus_type: Session or system bus
+
+        Returns:
+            Reply message
+        """
+        bus = await self.get_bus(bus_type)
+        return await bus.call(msg)
+
+    async def export(self, path: str, interface: ServiceInterface,
+                     bus_type: BusType = BusType.SESSION) -> None:
+        """Export a service interface (re-exported after reconnects)"""
+        bus = await self.get_bus(bus_type)
+        bus.export(path, interface)
+        self._exports.setdefault(bus_type, []).append((path, interface))
+
+    def unexport(self, path: str, interface: ServiceInterface,
+                 bus_type: BusType = BusType.SESSION) -> None:
+        """Stop exporting a service interface"""
+        exports = self._exports.get(bus_type, [])
+        if (path, interface) in exports:
+            exports.remove((path, interface))
+        if self.is_connected(bus_type):
+            self._buses[bus_type].unexport(path, interface)
+
+    async def request_name(self, name: str, bus_type: BusType = BusType.SESSION):
+        """
+        Request a well-known name (re-requested after reconnects)
+
+        Returns:
+            RequestNameReply from the bus daemon
+        """
+        bus = await self.get_bus(bus_type)
+        reply = await bus.request_name(name)
+        if name not in self._names.setdefault(bus_type, []):
+            self._names[bus_type].append(name)
+        return reply
+
+    async def release_name(self, name: str, bus_type: BusType = BusType.SESSION) -> None:
+        """Release a well-known name"""
+        names = self._names.get(bus_type, [])
+        if name in names:
+            names.remove(name)
+        if self.is_connected(bus_type):
+            await self._buses[bus_type].release_name(name)
+
+    async def add_match(self, rule: str, bus_type: BusType = BusType.SESSION) -> bool:
+        """
+        Register a match rule with the bus daemon (re-added after reconnects)
+
+        Returns:
+            True if the bus daemon accepted the rule
+        """
+        ok = await self._call_bus_daemon("AddMatch", rule, bus_type)
+        if ok:
+            self._match_rules.setdefault(bus_type, []).append(rule)
+        return ok
+
+    async def remove_match(self, rule: str, bus_type: BusType = BusType.SESSION) -> bool:
+        """Remove a previously added match rule"""
+        rules = self._match_rules.get(bus_type, [])
+        if rule not in rules:
+            return False
+        rules.remove(rule)
+        if not self.is_connected(bus_type):
+            return True
+        return await self._call_bus_daemon("RemoveMatch", rule, bus_type)
+
+    async def add_message_handler(self, handler: Callable,
+                                  bus_type: BusType = BusType.SESSION) -> None:
+        """Install a message handler (re-installed after reconnects)"""
+        bus = await self.get_bus(bus_type)
+        bus.add_message_handler(handler)
+        self._handlers.setdefault(bus_type, []).append(handler)
+
+    def remove_message_handler(self, handler: Callable,
+                               bus_type: BusType = BusType.SESSION) -> None:
+        """Remove a message handler"""
+        handlers = self._handlers.get(bus_type, [])
+        if handler in handlers:
+            handlers.remove(handler)
+        if self.is_connected(bus_type):
+            self._buses[bus_type].remove_message_handler(handler)
+
+    def add_reconnect_callback(self, callback: ReconnectCallback) -> None:
+        """Register a coroutine called with the bus type after each reconnect"""
+        if callback not in self._reconnect_callbacks:
+            self._reconnect_callbacks.append(callback)
+
+    def remove_reconnect_callback(self, callback: ReconnectCallback) -> None:
+        """Unregister a reconnect callback"""
+        if callback in self._reconnect_callbacks:
+            self._reconnect_callbacks.remove(callback)
+
+    async def watch_name(self, name: str, callback: NameOwnerCallback,
+                         bus_type: BusType = BusType.SESSION) -> None:
+        """
+        Call back when a remote service changes owner (e.g. plasmashell restart)
+
+        Args:
+            name: Well-known name to watch
+            callback: Coroutine called with (name, old_owner, new_owner)
+            bus_type: Session or system bus
+        """
+        key = (bus_type, name)
+        if key not in self._name_watches:
+            self._name_watches[key] = []
+            rule = (
+                "type='signal',sender='org.freedesktop.DBus',"
+                "interface='org.freedesktop.DBus',member='NameOwnerChanged',"
+                f"arg0='{name}'"
+            )
+            if bus_type not in self._name_handlers:
+                handler = lambda msg: self._on_name_owner_changed(bus_type, msg)
+                self._name_handlers[bus_type] = handler
+                await self.add_message_handler(handler, bus_type)
+            await self.add_match(rule, bus_type)
+        self._name_watches[key].append(callback)
+
+    def _on_name_owner_changed(self, bus_type: BusType, msg: Message) -> None:
+        """Dispatch NameOwnerChanged for watched names"""
+        if (msg.message_type != MessageType.SIGNAL or
+                msg.member != "NameOwnerChanged" or
+                msg.interface != "org.freedesktop.DBus"):
+            return
+
+        name, old_owner, new_owner = msg.body
+        callbacks = self._name_watches.get((bus_type, name))
+        if not callbacks:
+            return
+
+        # Proxies bound to the old owner are stale
+        self._proxies = {k: v for k, v in self._proxies.items()
+                         if not (k[0] == bus_type and k[1] == name)}
+        for callback in callbacks:
+            asyncio.ensure_future(self._run_callback(callback, name, old_owner, new_owner))
+
+    async def _run_callback(self, callback: Callable, *args) -> None:
+        try:
+            await callback(*args)
+        except Exception as e:
+            self.logger.error(f"Error in bus callback: {e}")
+
+    async def _call_bus_daemon(self, member: str, arg: str, bus_type: BusType) -> bool:
+        """Call a single-string method on org.freedesktop.DBus"""
+        reply = await self.call(Message(
+            destination="org.freedesktop.DBus",
+            path="/org/freedesktop/DBus",
+            interface="org.freedesktop.DBus",
+            member=member,
+            signature="s",
+            body=[arg]
+        ), bus_type)
+        if reply.message_type == MessageType.ERROR:
+            self.logger.error(f"{member} failed for {arg}: {reply.body}")
+            return False
+        return True
+
+    async def _watch(self, bus_type: BusType, bus: MessageBus) -> None:
+        """Wait for a bus to drop, then reconnect with backoff"""
+        try:
+            await bus.wait_for_disconnect()
+        except Exception as e:
+            self.logger.warning(f"D-Bus {bus_type.name.lower()} bus terminated: {e}")
+
+        if self._closing or self._buses.get(bus_type) is not bus:
+            return
+
+        self.logger.warning(f"Lost D-Bus {bus_type.name.lower()} bus, reconnecting...")
+        delay = self.reconnect_delay
+        while not self._closing:
+            try:
+                await self._reconnect(bus_type)
+                return
+            except Exception as e:
+                self.logger.warning(f"Reconnect failed ({e}), retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.max_reconnect_delay)
+
+    async def _reconnect(self, bus_type: BusType) -> None:
+        """
+        Open a new connection and replay registered state
+
+        Raises:
+            RuntimeError: a name or match rule could not be restored (the
+                          caller retries on a fresh connection)
+        """
+        # A connection left by a failed attempt still owns the names
+        stale = self._buses.pop(bus_type, None)
+        if stale is not None and stale.connected:
+            stale.disconnect()
+        for key in [k for k in self._proxies if k[0] == bus_type]:
+            del self._proxies[key]
+
+        bus = await self.get_bus(bus_type)
+
+        for handler in self._handlers.get(bus_type, []):
+            bus.add_message_handler(handler)
+        for path, interface in self._exports.get(bus_type, []):
+            bus.export(path, interface)
+        for name in self._names.get(bus_type, []):
+            reply = await bus.request_name(name)
+            if reply not in (RequestNameReply.PRIMARY_OWNER, RequestNameReply.ALREADY_OWNER):
+                raise RuntimeError(f"could not reclaim {name} ({reply.name})")
+        for rule in self._match_rules.get(bus_type, []):
+            if not await self._call_bus_daemon("AddMatch", rule, bus_type):
+                raise RuntimeError(f"could not restore match rule {rule}")
+
+        self.logger.info(f"Reconnected to D-Bus {bus_type.name.lower()} bus, state replayed")
+
+        for callback in list(self._reconnect_callbacks):
+            await self._run_callback(callback, bus_type)
+
+    async def close(self) -> None:
+        """Disconnect all buses (no reconnect)"""
+        self._closing = True
+        for task in self._watch_tasks.values():
+            task.cancel()
+        for bus_type, bus in self._buses.items():
+            if bus.connected:
+                bus.disconnect()
+                self.logger.info(f"Disconnected from D-Bus {bus_type.name.lower()} bus")
+        self._buses.clear()
+        self._proxies.clear()
+        self._watch_tasks.clear()
+
+
+# Singleton instance
+_bus_manager_instance = None
+
+def get_bus_manager() -> BusManager:
+    """Get global bus manager instance"""
+    global _bus_manager_instance
+    if _bus_manager_instance is None:
+        _bus_manager_instance = BusManager()
+    return _bus_manager_instance
@@ -6,32 +6,53 @@ Loads default config and merges with user overrides
 import json
 import os
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Callable, Dict, List
+
+from src.utils.config_schema import ConfigSnapshot, build_snapshot
+from src.utils.logger import get_logger
+
+ConfigListener = Callable[[ConfigSnapshot, ConfigSnapshot], None]
 
 class ConfigManager:
     """Manages application configuration with defaults and user overrides"""
 
     def __init__(self, config_dir: str = "config"):
+        self.logger = get_logger(__name__)
         self.config_dir = Path(config_dir)
         self.default_config_path = self.config_dir / "default_config.json"
         self.user_config_path = self.config_dir / "user_config.json"
         self._config: Dict[str, Any] = {}
+        self.snapshot: ConfigSnapshot = ConfigSnapshot()
+        self._listeners: List[ConfigListener] = []
         self.load()
 
     def load(self) -> None:
-        """Load configuration from default and user config files"""
+        """
+        Load configuration from default and user config files
+
+        Raises:
+            ConfigError: if the merged configuration fails validation
+        """
+        config = self._read()
+        snapshot = build_snapshot(config)
+        # Swap both together so get() and snapshot always agree
+        self._config, self.snapshot = config, snapshot
+
+    def _read(self) -> Dict[str, Any]:
+        """Read and merge default and user config files"""
         # Load defualt config (required)
         if not self.default_config_path.exists():
             raise FileNotFoundError(f"Default config not found: {self.default_config_path}")
         
         with open(self.default_config_path, 'r') as f:
-            self._config = json.load(f)
+            config = json.load(f)
 
         # Merget user config if exists (Optional)
         if self.user_config_path.exists():
             with open(self.user_config_path, 'r') as f:
                 user_config = json.load(f)
-                self._merge_config(self._config, user_config)
+                self._merge_config(config, user_config)
+        return config
 
     def _merge_config(self, base: Dict, override: Dict) -> None:
         """Recursively merge override config into base config"""
@@ -66,9 +87,44 @@ class ConfigManager:
         """Get complete configuration"""
         return self._config.copy()
     
-    def reload(self) -> None:
-        """Reload configuration from disk"""
-        self.load()
+    def add_listener(self, callback: ConfigListener) -> None:
+        """Call callback(old_snapshot, new_snapshot) after every changed reload"""
+        if callback not in self._listeners:
+            self._listeners.append(callback)
+
+    def remove_listener(self, callback: ConfigListener) -> None:
+        """Stop notifying a listener"""
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def reload(self) -> bool:
+        """
+        Reload configuration from disk
+
+        An unreadable or invalid file leaves the current configuration in
+        place, so a half-saved edit never reaches running components.
+
+        Returns:
+            True if a new, valid configuration was applied
+        """
+        old = self.snapshot
+        try:
+            self.load()
+        except (OSError, ValueError) as e:
+            # json.JSONDecodeError and ConfigError are both ValueErrors
+            self.logger.error(f"Config reload rejected, keeping current settings: {e}")
+            return False
+
+        if self.snapshot == old:
+            return False
+
+        self.logger.info("Configuration reloaded")
+        for callback in list(self._listeners):
+            try:
+                callback(old, self.snapshot)
+            except Exception as e:
+                self.logger.error(f"Error in config listener: {e}")
+        return True
 
 # Singleton instance
 _config_instance = None
@@ -0,0 +1,306 @@
+"""
+Configuration Schema
+Typed, immutable snapshots of the merged configuration; values are
+validated once when a snapshot is built and then read as attributes
+"""
+
+from dataclasses import dataclass, field, fields, is_dataclass
+from typing import Any, Dict, List, Tuple, Type, get_args, get_origin, get_type_hints
+
+
+class ConfigError(ValueError):
+    """Raised when the merged configuration does not match the schema"""
+
+
+def _spec(default: Any, minimum: float = None, maximum: float = None, choices: Tuple = None):
+    """Dataclass field with validation bounds stored in its metadata"""
+    return field(default=default, metadata={'min': minimum, 'max': maximum, 'choices': choices})
+
+
+@dataclass(frozen=True, slots=True)
+class CameraConfig:
+    device_index: int = _spec(0, minimum=0)
+    width: int = _spec(640, minimum=1)
+    height: int = _spec(480, minimum=1)
+    warmup_time: float = _spec(0.5, minimum=0)
+    source: str = _spec("camera", choices=("camera", "video", "images", "synthetic"))
+    path: str = ""  # video file or image directory for those sources
+    fourcc: str = _spec("MJPG", choices=("MJPG", "YUYV", ""))
+    fps: float = _spec(0.0, minimum=0)
+
+
+@dataclass(frozen=True, slots=True)
+class DetectionConfig:
+    score_threshold: float = _spec(0.5, minimum=0, maximum=1)
+    nms_threshold: float = _spec(0.3, minimum=0, maximum=1)
+    top_k: int = _spec(5000, minimum=1)
+    # 'auto' and 0 take the values tuned by scripts/tune_detector.py
+    backend: str = _spec("auto", choices=("auto", "default", "opencv", "openvino", "cuda", "timvx"))
+    target: str = _spec("cpu", choices=("cpu", "opencl", "opencl_fp16", "cuda", "cuda_fp16", "npu"))
+    threads: int = _spec(0, minimum=0)
+    tuning_cache: str = "data/detector_tuning.json"
+
+
+@dataclass(frozen=True, slots=True)
+class RecognitionConfig:
+    tolerance: float = _spec(0.6, minimum=0, maximum=1)
+    model: str = "large"
+    confidence_threshold: float = _spec(50.0, minimum=0)
+
+
+@dataclass(frozen=True, slots=True)
+class PresenceConfig:
+    frames_per_check: int = _spec(3, minimum=1)
+    motion_threshold: float = _spec(8.0, minimum=0, maximum=255)
+    pipeline: bool = False  # capture/detect/recognize overlap across frames (in-process inference)
+    pipeline_depth: int = _spec(2, minimum=1)
+
+
+@dataclass(frozen=True, slots=True)
+class InferenceConfig:
+    use_worker: bool = False
+    ring_slots: int = _spec(4, minimum=1)
+    recycle_after: int = _spec(500, minimum=0)
+    timeout: float = _spec(5.0, minimum=0.1)
+    start_timeout: float = _spec(30.0, minimum=0.1)  # first ping of a new worker (imports, model load)
+    # Shared per-machine service (src/daemon/inference_service.py); sessions
+    # use it when service_socket is set
+    service_socket: str = ""
+    coalesce_window: float = _spec(0.25, minimum=0)
+    max_galleries: int = _spec(2, minimum=1)  # per uid
+    require_seat: bool = True  # serve only uids with an active local seat session
+
+
+@dataclass(frozen=True, slots=True)
+class AdaptationConfig:
+    enabled: bool = False
+    accept_confidence: float = _spec(30.0, minimum=0)  # LBPH distance, below recognition.confidence_threshold
+    window_hours: float = _spec(24, minimum=0.01)
+    per_window: int = _spec(20, minimum=1)
+    max_samples: int = _spec(500, minimum=1)
+    keep_versions: int = _spec(5, minimum=1)
+
+
+@dataclass(frozen=True, slots=True)
+class MemoryConfig:
+    unload_after_seconds: float = _spec(600, minimum=0)
+    trim_heap: bool = True
+
+
+@dataclass(frozen=True, slots=True)
+class MetricsConfig:
+    textfile: str = ""
+
+
+@dataclass(frozen=True, slots=True)
+class TracingConfig:
+    enabled: bool = False
+    buffer_size: int = _spec(20000, minimum=100)
+    output_dir: str = "data/traces"
+
+
+@dataclass(frozen=True, slots=True)
+class RecordingConfig:
+    enabled: bool = False
+    directory: str = "data/recordings"
+
+
+@dataclass(frozen=True, slots=True)
+class HistoryConfig:
+    enabled: bool = True
+    path: str = "data/history.db"
+    retention_days: float = _spec(90, minimum=0)  # 0 = keep everything
+    batch_size: int = _spec(64, minimum=1)
+    flush_interval: float = _spec(2.0, minimum=0.01)
+
+
+@dataclass(frozen=True, slots=True)
+class IdleConfig:
+    check_interval: float = _spec(5, minimum=0)
+    kde_idle_timeout: float = _spec(300, minimum=0)
+
+
+@dataclass(frozen=True, slots=True)
+class SleepMonitorConfig:
+    enabled: bool = True
+    safety_margin: float = _spec(0.5, minimum=0)
+
+
+@dataclass(frozen=True, slots=True)
+class PowerProfileConfig:
+    """Vision settings for one power source; while power.enabled they replace
+    presence.frames_per_check, actions.inhibit_lease_seconds and detection.threads"""
+    detection_scale: float = _spec(1.0, minimum=0.1, maximum=1)
+    frames_per_check: int = _spec(3, minimum=1)
+    enhance_low_light: bool = False
+    inhibit_lease_seconds: float = _spec(300, minimum=0)
+    threads: int = _spec(0, minimum=0)  # 0 = detection.threads
+
+
+@dataclass(frozen=True, slots=True)
+class PowerConfig:
+    enabled: bool = False
+    poll_interval: float = _spec(30, minimum=1)
+    ac: PowerProfileConfig = PowerProfileConfig()
+    battery: PowerProfileConfig = PowerProfileConfig(
+        detection_scale=0.5, frames_per_check=1, inhibit_lease_seconds=600, threads=1
+    )
+
+
+@dataclass(frozen=True, slots=True)
+class ActionsConfig:
+    unknown_person_action: str = _spec("shutdown", choices=("shutdown", "lock", "none"))
+    inhibit_on_owner: bool = True
+    no_face_behavior: str = "allow_sleep"
+    inhibit_lease_seconds: float = _spec(300, minimum=0)
+    lease_verify_timeout: float = _spec(5, minimum=0.1)
+    inhibitors: Tuple[str, ...] = _spec(
+        ("power_management", "screensaver", "logind"),
+        choices=("power_management", "screensaver", "logind")
+    )
+    action_backends: Tuple[str, ...] = _spec(("dbus", "command"), choices=("dbus", "command"))
+
+
+@dataclass(frozen=True, slots=True)
+class LoggingConfig:
+    level: str = _spec("INFO", choices=("DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"))
+    file: str = "data/logs/sleep_checker.log"
+    max_bytes: int = _spec(10485760, minimum=1)
+    backup_count: int = _spec(3, minimum=0)
+    format: str = _spec("text", choices=("text", "json"))
+
+
+@dataclass(frozen=True, slots=True)
+class PathsConfig:
+    model_path: str = "models/yunet.onnx"
+    encodings_path: str = "models/face_encodings.pkl"
+    training_data_dir: str = "data/known_faces"
+
+
+@dataclass(frozen=True, slots=True)
+class ConfigSnapshot:
+    """Whole configuration; replaced (never mutated) on reload"""
+    camera: CameraConfig = CameraConfig()
+    detection: DetectionConfig = DetectionConfig()
+    recognition: RecognitionConfig = RecognitionConfig()
+    presence: PresenceConfig = PresenceConfig()
+    inference: InferenceConfig = InferenceConfig()
+    adaptation: AdaptationConfig = AdaptationConfig()
+    memory: MemoryConfig = MemoryConfig()
+    metrics: MetricsConfig = MetricsConfig()
+    tracing: TracingConfig = TracingConfig()
+    recording: RecordingConfig = RecordingConfig()
+    history: HistoryConfig = HistoryConfig()
+    idle: IdleConfig = IdleConfig()
+    sleep_monitor: SleepMonitorConfig = SleepMonitorConfig()
+    power: PowerConfig = PowerConfig()
+    actions: ActionsConfig = ActionsConfig()
+    logging: LoggingConfig = LoggingConfig()
+    paths: PathsConfig = PathsConfig()
+
+
+def _convert(value: Any, expected: Type, path: str, meta: Dict[str, Any], errors: List[str]) -> Any:
+    """Check one leaf value against its annotated type and bounds"""
+    if get_origin(expected) is tuple:
+        item_type = get_args(expected)[0]
+        if not isinstance(value, (list, tuple)) or not all(isinstance(v, item_type) for v in value):
+            errors.append(f"{path}: expected a list of {item_type.__name__}, got {value!r}")
+            return None
+        value = tuple(value)
+        items = value
+    elif expected is bool:
+        if not isinstance(value, bool):
+            errors.append(f"{path}: expected true/false, got {value!r}")
+            return None
+        return value
+    elif expected is float:
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            errors.append(f"{path}: expected a number, got {value!r}")
+            return None
+        value = float(value)
+        items = (value,)
+    elif expected is int:
+        if isinstance(value, bool) or not isinstance(value, int):
+            errors.append(f"{path}: expected an integer, got {value!r}")
+            return None
+        items = (value,)
+    else:
+        if not isinstance(value, expected):
+            errors.append(f"{path}: expected {expected.__name__}, got {value!r}")
+            return None
+        items = (value,)
+
+    if meta.get('min') is not None and value < meta['min']:
+        errors.append(f"{path}: {value} is below the minimum {meta['min']}")
+    if meta.get('max') is not None and value > meta['max']:
+        errors.append(f"{path}: {value} is above the maximum {meta['max']}")
+    if meta.get('choices') is not None:
+        for item in items:
+            if item not in meta['choices']:
+                errors.append(f"{path}: {item!r} is not one of {', '.join(map(str, meta['choices']))}")
+    return value
+
+
+def _build(cls: Type, data: Dict[str, Any], prefix: str, errors: List[str]) -> Any:
+    hints = get_type_hints(cls)
+    values = {}
+    for f in fields(cls):
+        path = f"{prefix}{f.name}"
+        if f.name not in data:
+            continue
+        if is_dataclass(hints[f.name]):
+            if not isinstance(data[f.name], dict):
+                errors.append(f"{path}: expected a section, got {data[f.name]!r}")
+                continue
+            values[f.name] = _build(hints[f.name], data[f.name], f"{path}.", errors)
+        else:
+            value = _convert(data[f.name], hints[f.name], path, f.metadata, errors)
+            if value is not None:
+                values[f.name] = value
+    return cls(**values)
+
+
+def build_snapshot(data: Dict[str, Any]) -> ConfigSnapshot:
+    """
+    Validate a merged configuration dict and freeze it
+
+    Keys the schema does not know are ignored; missing keys take the
+    schema defaults.
+
+    Args:
+        data: Merged default + user configuration
+
+    Returns:
+        Immutable ConfigSnapshot
+
+    Raises:
+        ConfigError: listing every invalid value
+    """
+    errors: List[str] = []
+    snapshot = _build(ConfigSnapshot, data, "", errors)
+    if errors:
+        raise ConfigError("Invalid configuration: " + "; ".join(errors))
+    return snapshot
+
+
+def diff_snapshots(old: Any, new: Any, prefix: str = "") -> List[str]:
+    """
+    Dotted paths of the values that differ between two snapshots
+
+    Args:
+        old: Previous snapshot (or section)
+        new: New snapshot (or section) of the same type
+
+    Returns:
+        e.g. ['detection.score_threshold', 'presence.frames_per_check']
+    """
+    changed: List[str] = []
+    for f in fields(old):
+        a, b = getattr(old, f.name), getattr(new, f.name)
+        if a == b:
+            continue
+        if is_dataclass(a):
+            changed.extend(diff_snapshots(a, b, f"{prefix}{f.name}."))
+        else:
+            changed.append(f"{prefix}{f.name}")
+    return changed
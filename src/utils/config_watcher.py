@@ -0,0 +1,145 @@
+"""
+Config Watcher
+Reloads the configuration when files in config/ change: inotify through
+ctypes where available, mtime polling otherwise
+"""
+
+import asyncio
+import ctypes
+import ctypes.util
+import os
+import struct
+from typing import Dict, Optional, Tuple
+
+from src.utils.config_manager import ConfigManager
+from src.utils.logger import get_logger
+
+
+# <sys/inotify.h>
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = os.O_CLOEXEC
+_EVENT = struct.Struct("iIII")
+
+
+class ConfigWatcher:
+    """Watches the config directory and calls ConfigManager.reload()"""
+
+    def __init__(self, config: ConfigManager, debounce: float = 0.25, poll_interval: float = 2.0):
+        """
+        Initialize config watcher
+
+        Args:
+            config: Configuration to reload
+            debounce: Seconds to wait after the last change before reloading
+                      (editors write files in several steps)
+            poll_interval: Seconds between mtime checks when inotify is unavailable
+        """
+        self.logger = get_logger(__name__)
+        self.config = config
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self.filenames = {config.default_config_path.name, config.user_config_path.name}
+
+        self._fd: Optional[int] = None
+        self._poll_task: Optional[asyncio.Task] = None
+        self._pending: Optional[asyncio.TimerHandle] = None
+
+    async def start(self) -> bool:
+        """
+        Start watching
+
+        Returns:
+            True if a watch (inotify or polling) is active
+        """
+        loop = asyncio.get_running_loop()
+        self._fd = self._inotify_watch(str(self.config.config_dir))
+        if self._fd is not None:
+            loop.add_reader(self._fd, self._on_inotify)
+            self.logger.info(f"Watching {self.config.config_dir} for config changes (inotify)")
+        else:
+            self._poll_task = asyncio.ensure_future(self._poll())
+            self.logger.info(f"Watching {self.config.config_dir} for config changes "
+                             f"(polling every {self.poll_interval}s)")
+        return True
+
+    def _inotify_watch(self, path: str) -> Optional[int]:
+        """Create an inotify instance watching path; None if unsupported"""
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+            fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+            if fd < 0:
+                raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+            mask = IN_CLOSE_WRITE | IN_MOVED_TO | IN_MOVED_FROM | IN_CREATE | IN_DELETE
+            if libc.inotify_add_watch(fd, path.encode(), mask) < 0:
+                err = ctypes.get_errno()
+                os.close(fd)
+                raise OSError(err, f"inotify_add_watch failed on {path}")
+            return fd
+        except (OSError, AttributeError) as e:
+            self.logger.debug(f"inotify unavailable: {e}")
+            return None
+
+    def _on_inotify(self) -> None:
+        """Drain inotify events and schedule a reload for our files"""
+        try:
+            data = os.read(self._fd, 4096)
+        except BlockingIOError:
+            return
+
+        offset, relevant = 0, False
+        while offset + _EVENT.size <= len(data):
+            _, _, _, length = _EVENT.unpack_from(data, offset)
+            name = data[offset + _EVENT.size:offset + _EVENT.size + length].rstrip(b"\0").decode()
+            offset += _EVENT.size + length
+            relevant = relevant or name in self.filenames
+        if relevant:
+            self._schedule_reload()
+
+    async def _poll(self) -> None:
+        """Fallback: compare file mtimes periodically"""
+        last = self._mtimes()
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            current = self._mtimes()
+            if current != last:
+                last = current
+                self._schedule_reload()
+
+    def _mtimes(self) -> Dict[str, Optional[Tuple[int, int]]]:
+        """(mtime, size) of each watched file, None if missing"""
+        result = {}
+        for name in self.filenames:
+            try:
+                st = os.stat(self.config.config_dir / name)
+                result[name] = (st.st_mtime_ns, st.st_size)
+            except FileNotFoundError:
+                result[name] = None
+        return result
+
+    def _schedule_reload(self) -> None:
+        """Debounce bursts of events into one reload"""
+        if self._pending is not None:
+            self._pending.cancel()
+        self._pending = asyncio.get_running_loop().call_later(self.debounce, self._reload)
+
+    def _reload(self) -> None:
+        self._pending = None
+        self.config.reload()
+
+    async def stop(self) -> None:
+        """Stop watching"""
+        if self._pending is not None:
+            self._pending.cancel()
+            self._pending = None
+        if self._fd is not None:
+            asyncio.get_running_loop().remove_reader(self._fd)
+            os.close(self._fd)
+            self._fd = None
+        if self._poll_task is not None:
+            self._poll_task.cancel()
+            self._poll_task = None
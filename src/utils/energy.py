@@ -0,0 +1,101 @@
+"""
+Energy Accounting
+CPU time and (where the kernel exposes it) package energy spent on a
+piece of work, for comparing power profiles
+"""
+
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Optional
+
+
+_CLOCK_TICKS = os.sysconf("SC_CLK_TCK")
+# Intel/AMD RAPL package domain; energy_uj is root-only on many kernels
+RAPL_ENERGY = Path("/sys/class/powercap/intel-rapl:0/energy_uj")
+RAPL_RANGE = Path("/sys/class/powercap/intel-rapl:0/max_energy_range_uj")
+
+
+def process_cpu_seconds(pid: Optional[int] = None) -> float:
+    """
+    User + system CPU time of a process, all threads included
+
+    Args:
+        pid: Process id (None = this process)
+
+    Returns:
+        CPU seconds (0.0 if the process is gone or /proc is unavailable)
+    """
+    if pid is None:
+        return time.process_time()
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            # comm may contain spaces: fields are counted after its closing paren
+            fields = f.read().rsplit(")", 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / _CLOCK_TICKS
+    except (OSError, ValueError, IndexError):
+        return 0.0
+
+
+def read_energy_uj() -> Optional[int]:
+    """Cumulative RAPL package energy in microjoules, or None if unreadable"""
+    try:
+        return int(RAPL_ENERGY.read_text())
+    except (OSError, ValueError):
+        return None
+
+
+@dataclass
+class Cost:
+    """Resources spent between CostMeter.start() and stop()"""
+    wall: float = 0.0
+    cpu: float = 0.0
+    energy: Optional[float] = None  # joules, whole CPU package (not just us)
+
+
+class CostMeter:
+    """Measures wall time, CPU time of this and helper processes, and RAPL energy"""
+
+    def __init__(self):
+        self._wall = 0.0
+        self._cpu = 0.0
+        self._energy: Optional[int] = None
+        self._pids: tuple = ()
+
+    def _cpu_now(self) -> float:
+        return process_cpu_seconds() + sum(process_cpu_seconds(pid) for pid in self._pids)
+
+    def start(self, pids: Iterable[Optional[int]] = ()) -> None:
+        """
+        Take the starting readings
+
+        Args:
+            pids: Helper processes whose CPU time counts too (e.g. the
+                  inference worker); None entries are ignored
+        """
+        self._pids = tuple(pid for pid in pids if pid is not None)
+        self._wall = time.monotonic()
+        self._cpu = self._cpu_now()
+        self._energy = read_energy_uj()
+
+    def stop(self) -> Cost:
+        """
+        Readings since start()
+
+        Returns:
+            Cost; energy is None without a readable RAPL counter
+        """
+        cost = Cost(wall=time.monotonic() - self._wall, cpu=max(0.0, self._cpu_now() - self._cpu))
+        energy = read_energy_uj()
+        if energy is not None and self._energy is not None:
+            delta = energy - self._energy
+            if delta < 0:
+                # Counter wrapped
+                try:
+                    delta += int(RAPL_RANGE.read_text())
+                except (OSError, ValueError):
+                    delta = None
+            if delta is not None:
+                cost.energy = delta / 1_000_000
+        return cost
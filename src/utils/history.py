@@ -0,0 +1,337 @@
+"""
+History
+Indexed store of idle events and their outcomes (verdict, confidence,
+stage timings, action) in SQLite; WAL mode, with rows batched in by one
+background writer so recording never blocks the event loop
+"""
+
+import math
+import queue
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, fields
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from src.utils.logger import get_logger
+
+
+SCHEMA_VERSION = 1
+
+# Columns a latency summary may be computed over
+TIMING_COLUMNS = ('end_to_end', 'duration', 'capture', 'detect', 'recognize')
+
+
+@dataclass
+class HistoryEvent:
+    """One row: an idle event, a pre-sleep check or the user coming back"""
+    kind: str                      # 'idle', 'active' or 'pre_sleep'
+    ts: float = 0.0                # wall clock (filled in by record())
+    verdict: Optional[str] = None
+    confidence: Optional[float] = None
+    threshold: Optional[float] = None  # recognition threshold at the time
+    faces: Optional[int] = None
+    frames: Optional[int] = None
+    duration: Optional[float] = None   # the check itself
+    capture: Optional[float] = None    # per-stage totals, seconds
+    detect: Optional[float] = None
+    recognize: Optional[float] = None
+    end_to_end: Optional[float] = None  # screenDimmed() receipt -> action returned
+    action: Optional[str] = None
+    profile: Optional[str] = None
+
+
+COLUMNS = tuple(f.name for f in fields(HistoryEvent))
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    ts REAL NOT NULL,
+    verdict TEXT,
+    confidence REAL,
+    threshold REAL,
+    faces INTEGER,
+    frames INTEGER,
+    duration REAL,
+    capture REAL,
+    detect REAL,
+    recognize REAL,
+    end_to_end REAL,
+    action TEXT,
+    profile TEXT
+);
+CREATE INDEX IF NOT EXISTS events_ts ON events (ts);
+CREATE INDEX IF NOT EXISTS events_verdict_ts ON events (verdict, ts);
+PRAGMA user_version = {SCHEMA_VERSION};
+"""
+
+_INSERT = f"INSERT INTO events ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})"
+
+_STOP = object()
+
+
+def connect(path: str, readonly: bool = False) -> sqlite3.Connection:
+    """
+    Open a history database (created with its schema unless readonly)
+
+    Args:
+        path: Database file
+        readonly: Open for queries only (the daemon may be writing)
+
+    Returns:
+        Connection with rows as sqlite3.Row
+    """
+    if readonly:
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    else:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(path, check_same_thread=False)
+        # Readers never block the writer; NORMAL only risks the last
+        # transactions on power loss, not corruption
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(_SCHEMA)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+class HistoryStore:
+    """Append-only event history with a batching background writer"""
+
+    def __init__(
+        self,
+        path: str,
+        retention_days: float = 90,
+        batch_size: int = 64,
+        flush_interval: float = 2.0
+    ):
+        """
+        Initialize history store (call start() to open it)
+
+        Args:
+            path: SQLite database file
+            retention_days: Rows older than this are deleted (0 = keep all)
+            batch_size: Rows written per transaction at most
+            flush_interval: Seconds a row may wait for its batch
+        """
+        self.logger = get_logger(__name__)
+        self.path = path
+        self.retention_days = retention_days
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        self._queue: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+        self._conn: Optional[sqlite3.Connection] = None
+        self._next_prune = 0.0
+        self.written = 0
+        self.dropped = 0
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> bool:
+        """
+        Open the database and start the writer thread
+
+        Returns:
+            True if the store is recording
+        """
+        try:
+            self._conn = connect(self.path)
+        except (sqlite3.Error, OSError) as e:
+            self.logger.error(f"Could not open history database {self.path}: {e}")
+            return False
+
+        self._thread = threading.Thread(target=self._run, name="history-writer", daemon=True)
+        self._thread.start()
+        self.logger.info(f"Recording event history to {self.path} (retention {self.retention_days:g} days)")
+        return True
+
+    def record(self, event: HistoryEvent) -> None:
+        """
+        Queue one event for writing (non-blocking, safe from any thread)
+
+        Args:
+            event: Row to append; ts defaults to now
+        """
+        if not self.is_running:
+            self.dropped += 1
+            return
+        if not event.ts:
+            event.ts = time.time()
+        self._queue.put(tuple(getattr(event, name) for name in COLUMNS))
+
+    def close(self) -> None:
+        """Flush queued rows and stop the writer"""
+        if self._thread is None:
+            return
+        self._queue.put(_STOP)
+        self._thread.join()
+        self._thread = None
+        self._conn.close()
+        self._conn = None
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                self._prune()
+                continue
+
+            batch = []
+            deadline = time.monotonic() + self.flush_interval
+            while True:
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+                if len(batch) >= self.batch_size:
+                    break
+                # Gather whatever else arrives before the batch is due
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+            self._write(batch)
+            self._prune()
+
+    def _write(self, batch: List[tuple]) -> None:
+        if not batch:
+            return
+        try:
+            with self._conn:
+                self._conn.executemany(_INSERT, batch)
+            self.written += len(batch)
+        except sqlite3.Error as e:
+            self.dropped += len(batch)
+            self.logger.error(f"Could not write {len(batch)} history row(s): {e}")
+
+    def _prune(self) -> None:
+        """Enforce retention, at most hourly"""
+        now = time.monotonic()
+        if self.retention_days <= 0 or now < self._next_prune:
+            return
+        self._next_prune = now + 3600
+        try:
+            with self._conn:
+                deleted = self._conn.execute(
+                    "DELETE FROM events WHERE ts < ?",
+                    (time.time() - self.retention_days * 86400,)
+                ).rowcount
+            if deleted:
+                self.logger.info(f"History retention removed {deleted} row(s)")
+        except sqlite3.Error as e:
+            self.logger.error(f"History retention failed: {e}")
+
+
+def verdict_counts(conn: sqlite3.Connection, since: float = 0.0) -> Dict[str, Dict[str, int]]:
+    """
+    Verdicts per day
+
+    Args:
+        conn: History connection
+        since: Only rows at or after this wall-clock time
+
+    Returns:
+        {day: {verdict: count}}
+    """
+    counts: Dict[str, Dict[str, int]] = {}
+    for row in conn.execute(
+        "SELECT date(ts, 'unixepoch', 'localtime') AS day, verdict, count(*) AS n FROM events "
+        "WHERE ts >= ? AND verdict IS NOT NULL GROUP BY day, verdict ORDER BY day",
+        (since,)
+    ):
+        counts.setdefault(row['day'], {})[row['verdict']] = row['n']
+    return counts
+
+
+def daily_percentiles(
+    conn: sqlite3.Connection,
+    column: str = 'end_to_end',
+    percentiles=(0.5, 0.95),
+    since: float = 0.0,
+    kind: str = 'idle'
+) -> List[Dict]:
+    """
+    Exact latency percentiles per day, computed in SQLite
+
+    Each percentile is one indexed ORDER BY ... LIMIT 1 OFFSET n query
+    per day, so nothing but the answer is loaded into memory.
+
+    Args:
+        conn: History connection
+        column: One of TIMING_COLUMNS
+        percentiles: Fractions to report
+        since: Only rows at or after this wall-clock time
+        kind: Event kind to summarise
+
+    Returns:
+        [{'day', 'count', 'max', 'p50', 'p95', ...}] in seconds, oldest first
+    """
+    if column not in TIMING_COLUMNS:
+        raise ValueError(f"unknown timing column {column!r} (one of {', '.join(TIMING_COLUMNS)})")
+
+    day = "date(ts, 'unixepoch', 'localtime')"
+    days = conn.execute(
+        f"SELECT {day} AS day, count({column}) AS n, max({column}) AS max, "
+        f"min(ts) AS first, max(ts) AS last FROM events "
+        f"WHERE ts >= ? AND kind = ? AND {column} IS NOT NULL GROUP BY day ORDER BY day",
+        (since, kind)
+    ).fetchall()
+
+    summary = []
+    for row in days:
+        entry = {'day': row['day'], 'count': row['n'], 'max': row['max']}
+        for p in percentiles:
+            # Nearest-rank percentile
+            rank = max(1, math.ceil(p * row['n']))
+            entry[f"p{p * 100:g}"] = conn.execute(
+                f"SELECT {column} FROM events WHERE ts BETWEEN ? AND ? AND kind = ? "
+                f"AND {column} IS NOT NULL ORDER BY {column} LIMIT 1 OFFSET ?",
+                (row['first'], row['last'], kind, rank - 1)
+            ).fetchone()[0]
+        summary.append(entry)
+    return summary
+
+
+def false_unknown_candidates(
+    conn: sqlite3.Connection,
+    within: float = 120.0,
+    margin: float = 10.0,
+    since: float = 0.0
+) -> Iterator[sqlite3.Row]:
+    """
+    Unknown verdicts that were probably the owner
+
+    A candidate is an unknown verdict either followed within `within`
+    seconds by an owner verdict or by the user coming back (unlocking),
+    or whose confidence missed the threshold by at most `margin`.
+
+    Args:
+        conn: History connection
+        within: Seconds after the verdict to look for the owner
+        margin: Confidence distance above the threshold still counted
+        since: Only rows at or after this wall-clock time
+
+    Yields:
+        Rows of the unknown events plus 'followed_by' (kind or verdict of
+        the next owner sign, or None); followed ones first, then by how
+        close the confidence came to the threshold
+    """
+    yield from conn.execute(
+        "SELECT u.*, ("
+        "  SELECT CASE WHEN n.kind = 'active' THEN 'active' ELSE n.verdict END FROM events n "
+        "  WHERE n.ts > u.ts AND n.ts <= u.ts + ? AND (n.kind = 'active' OR n.verdict = 'owner') "
+        "  ORDER BY n.ts LIMIT 1"
+        ") AS followed_by FROM events u "
+        "WHERE u.verdict = 'unknown' AND u.ts >= ? "
+        "AND (followed_by IS NOT NULL OR u.confidence - u.threshold <= ?) "
+        "ORDER BY followed_by IS NULL, abs(u.confidence - u.threshold)",
+        (within, since, margin)
+    )
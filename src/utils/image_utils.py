@@ -1,49 +1,132 @@
 """
 Image Utilities
 Helper functions for image preprocessing and enhancement
+
+Each transform takes an optional `dst` output array and an optional
+BufferPool; with either, the result (and any intermediate step) is written
+into reused memory instead of a fresh allocation per frame.
 """
 
 import cv2
 import numpy as np
-from typing import Tuple, Optional
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
 
+class BufferPool:
+    """
+    Reusable arrays keyed by (tag, shape, dtype)
 
-def enhance_low_light(image: np.ndarray, clip_limit: float = 2.0) -> np.ndarray:
+    A pooled result is overwritten by the next call that uses the same tag,
+    so copy it if it must outlive the frame. Not thread-safe: give each
+    capture/analysis thread its own pool.
+    """
+
+    def __init__(self):
+        self._buffers: Dict[Tuple[str, Tuple[int, ...], np.dtype], np.ndarray] = {}
+        self._objects: Dict[Hashable, Any] = {}
+        self.allocations = 0
+
+    def get(self, shape: Tuple[int, ...], dtype: Any = np.uint8, tag: str = "") -> np.ndarray:
+        """
+        Buffer for (tag, shape, dtype), allocated on first use
+
+        Args:
+            shape: Array shape
+            dtype: Array dtype
+            tag: Distinguishes buffers of the same shape used together
+                 (e.g. the steps of one multi-step transform)
+
+        Returns:
+            Uninitialized array owned by the pool
+        """
+        key = (tag, tuple(shape), np.dtype(dtype))
+        buffer = self._buffers.get(key)
+        if buffer is None:
+            buffer = self._buffers[key] = np.empty(shape, dtype)
+            self.allocations += 1
+        return buffer
+
+    def cached(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        """Per-pool helper object (e.g. a CLAHE instance), built once"""
+        value = self._objects.get(key)
+        if value is None:
+            value = self._objects[key] = factory()
+        return value
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by pooled buffers"""
+        return sum(b.nbytes for b in self._buffers.values())
+
+    def clear(self) -> None:
+        """Drop every buffer (e.g. after the camera resolution changed)"""
+        self._buffers.clear()
+        self._objects.clear()
+
+
+def _output(shape: Tuple[int, ...], dtype: Any, tag: str,
+            dst: Optional[np.ndarray], pool: Optional[BufferPool]) -> Optional[np.ndarray]:
+    """Array to write a result into: dst, a pooled buffer, or None (OpenCV allocates)"""
+    if dst is not None:
+        if dst.shape != tuple(shape) or dst.dtype != np.dtype(dtype):
+            raise ValueError(f"dst must be {tuple(shape)} {np.dtype(dtype)}, got {dst.shape} {dst.dtype}")
+        return dst
+    if pool is not None:
+        return pool.get(shape, dtype, tag)
+    return None
+
+
+def enhance_low_light(image: np.ndarray, clip_limit: float = 2.0,
+                      dst: Optional[np.ndarray] = None,
+                      pool: Optional[BufferPool] = None) -> np.ndarray:
     """
     Enhance image quality in low-light conditions using CLAHE
     
     Args:
         image: Input image (BGR format)
         clip_limit: Contrast limit for CLAHE
+        dst: Output array (same shape and dtype as image)
+        pool: Scratch and output buffers for the LAB steps
     
     Returns:
         Enhanced image
     """
+    def create_clahe():
+        return cv2.createCLAHE(clipLimit=clip_limit, tileGridSize=(8, 8))
+
+    clahe = pool.cached(('clahe', clip_limit), create_clahe) if pool is not None else create_clahe()
+    plane = image.shape[:2]
+
     # Convert to LAB color space
-    lab = cv2.cvtColor(image, cv2.COLOR_BGR2LAB)
-    l, a, b = cv2.split(lab)
+    lab = cv2.cvtColor(image, cv2.COLOR_BGR2LAB,
+                       dst=_output(image.shape, image.dtype, 'enhance.lab', None, pool))
     
-    # Apply CLAHE to L channel
-    clahe = cv2.createCLAHE(clipLimit=clip_limit, tileGridSize=(8, 8))
-    l_enhanced = clahe.apply(l)
+    # Apply CLAHE to L channel, then write it back into the LAB image
+    l = cv2.extractChannel(lab, 0, dst=_output(plane, image.dtype, 'enhance.l', None, pool))
+    l_enhanced = clahe.apply(l, dst=_output(plane, image.dtype, 'enhance.l_enhanced', None, pool))
+    cv2.insertChannel(l_enhanced, lab, 0)
     
-    # Merge channels and convert back to BGR
-    lab_enhanced = cv2.merge([l_enhanced, a, b])
-    enhanced = cv2.cvtColor(lab_enhanced, cv2.COLOR_LAB2BGR)
+    # Convert back to BGR
+    enhanced = cv2.cvtColor(lab, cv2.COLOR_LAB2BGR,
+                            dst=_output(image.shape, image.dtype, 'enhance', dst, pool))
     
     return enhanced
 
 
-def resize_frame(image: np.ndarray, max_width: int = 640) -> np.ndarray:
+def resize_frame(image: np.ndarray, max_width: int = 640,
+                 dst: Optional[np.ndarray] = None,
+                 pool: Optional[BufferPool] = None) -> np.ndarray:
     """
     Resize image while maintaining aspect ratio
     
     Args:
         image: Input image
         max_width: Maximum width in pixels
+        dst: Output array of the resized shape
+        pool: Buffer pool for the output
     
     Returns:
-        Resized image
+        Resized image (the input itself if it is narrow enough)
     """
     height, width = image.shape[:2]
     
@@ -56,22 +139,26 @@ def resize_frame(image: np.ndarray, max_width: int = 640) -> np.ndarray:
     new_height = int(height * ratio)
     
     # Resize
-    resized = cv2.resize(image, (new_width, new_height), interpolation=cv2.INTER_AREA)
+    out = _output((new_height, new_width) + image.shape[2:], image.dtype, 'resize', dst, pool)
+    resized = cv2.resize(image, (new_width, new_height), dst=out, interpolation=cv2.INTER_AREA)
     
     return resized
 
 
-def flip_horizontal(image: np.ndarray) -> np.ndarray:
+def flip_horizontal(image: np.ndarray, dst: Optional[np.ndarray] = None,
+                    pool: Optional[BufferPool] = None) -> np.ndarray:
     """
     Flip image horizontally (mirror effect)
     
     Args:
         image: Input image
+        dst: Output array (same shape and dtype as image)
+        pool: Buffer pool for the output
     
     Returns:
         Flipped image
     """
-    return cv2.flip(image, 1)
+    return cv2.flip(image, 1, dst=_output(image.shape, image.dtype, 'flip', dst, pool))
 
 
 def crop_face(image: np.ndarray, bbox: Tuple[int, int, int, int], 
@@ -164,22 +251,29 @@ def draw_face_box(image: np.ndarray, bbox: Tuple[int, int, int, int],
     return image
 
 
-def normalize_face(face_image: np.ndarray, size: Tuple[int, int] = (128, 128)) -> np.ndarray:
+def normalize_face(face_image: np.ndarray, size: Tuple[int, int] = (128, 128),
+                   dst: Optional[np.ndarray] = None,
+                   pool: Optional[BufferPool] = None) -> np.ndarray:
     """
     Normalize face image for recognition
     
     Args:
         face_image: Cropped face image
         size: Target size (width, height)
+        dst: Output RGB array of shape (height, width, 3)
+        pool: Buffer pool for the resize scratch and the output
     
     Returns:
         Normalized face image
     """
+    shape = (size[1], size[0]) + face_image.shape[2:]
+
     # Resize to standard size
-    normalized = cv2.resize(face_image, size, interpolation=cv2.INTER_AREA)
+    resized = cv2.resize(face_image, size, interpolation=cv2.INTER_AREA,
+                         dst=_output(shape, face_image.dtype, 'normalize.resized', None, pool))
     
     # Convert to RGB (face_recognition expects RGB)
-    normalized = cv2.cvtColor(normalized, cv2.COLOR_BGR2RGB)
+    normalized = cv2.cvtColor(resized, cv2.COLOR_BGR2RGB,
+                              dst=_output(shape, face_image.dtype, 'normalize', dst, pool))
     
     return normalized
-
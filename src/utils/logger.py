@@ -1,83 +1,189 @@
 """
 Logger Setup
 Provides structured logging to file and console
+
+Every logger hands records to one shared QueueHandler; a single
+QueueListener thread formats them and owns the console and the one
+rotating log file, so callers (including the asyncio loop) never block on
+disk and rotation has exactly one writer.
 """
 
+import atexit
+import json
 import logging
+import queue
 import sys
+import threading
 from pathlib import Path
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Any, Dict, Optional
 
 
-def setup_logger(
-    name: str = "sleep_checker",
-    log_file: str = "data/logs/sleep_checker.log",
+# Attributes every LogRecord has; anything else came in through `extra=`
+_RECORD_FIELDS = set(vars(logging.makeLogRecord({}))) | {'message', 'asctime', 'taskName'}
+
+_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+_queue_handler = QueueHandler(_queue)
+_listener: Optional[QueueListener] = None
+_lock = threading.Lock()
+_level = logging.INFO
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, with `extra=` fields as top-level keys"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            'ts': round(record.created, 3),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+            'func': record.funcName,
+            'line': record.lineno,
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_FIELDS:
+                entry[key] = value
+        return json.dumps(entry, default=str)
+
+
+def configure_logging(
+    log_file: Optional[str] = "data/logs/sleep_checker.log",
     level: str = "INFO",
     max_bytes: int = 10485760,  # 10MB
-    backup_count: int = 3
-) -> logging.Logger:
+    backup_count: int = 3,
+    json_format: bool = False,
+    console: bool = True
+) -> None:
     """
-    Setup logger with file and console handlers
-    
+    (Re)configure the shared log outputs
+
+    Replaces the listener's handlers; loggers already handed out keep
+    working because they only hold the shared QueueHandler.
+
     Args:
-        name: Logger name
-        log_file: Path to log file
+        log_file: Path to log file (None = console only, at the configured level)
         level: Logging level (DEBUG, INFO, WARNING, ERROR)
         max_bytes: Max size before rotation
         backup_count: Number of backup files to keep
-    
-    Returns:
-        Configured logger instance
+        json_format: Write the file as JSON lines instead of text
+        console: Also log INFO and above to stdout
     """
-    
-    # Create logger
-    logger = logging.getLogger(name)
-    logger.setLevel(getattr(logging, level.upper()))
-    
-    # Clear existing handlers
-    logger.handlers.clear()
-    
+    global _listener, _level
+
     # Create formatters
     detailed_formatter = logging.Formatter(
         '%(asctime)s - %(name)s - %(levelname)s - %(funcName)s:%(lineno)d - %(message)s',
         datefmt='%Y-%m-%d %H:%M:%S'
     )
-    
+
     simple_formatter = logging.Formatter(
         '%(asctime)s - %(levelname)s - %(message)s',
         datefmt='%H:%M:%S'
     )
-    
+
+    handlers = []
+
     # Console handler (stdout)
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setLevel(logging.INFO)
-    console_handler.setFormatter(simple_formatter)
-    logger.addHandler(console_handler)
-    
+    if console:
+        console_handler = logging.StreamHandler(sys.stdout)
+        console_handler.setLevel(logging.INFO if log_file else logging.DEBUG)
+        console_handler.setFormatter(simple_formatter)
+        handlers.append(console_handler)
+
     # File handler with rotation
-    log_path = Path(log_file)
-    log_path.parent.mkdir(parents=True, exist_ok=True)
-    
-    file_handler = RotatingFileHandler(
-        log_file,
-        maxBytes=max_bytes,
-        backupCount=backup_count
-    )
-    file_handler.setLevel(logging.DEBUG)
-    file_handler.setFormatter(detailed_formatter)
-    logger.addHandler(file_handler)
-    
+    if log_file:
+        log_path = Path(log_file)
+        log_path.parent.mkdir(parents=True, exist_ok=True)
+
+        file_handler = RotatingFileHandler(
+            log_file,
+            maxBytes=max_bytes,
+            backupCount=backup_count
+        )
+        file_handler.setLevel(logging.DEBUG)
+        file_handler.setFormatter(JsonFormatter() if json_format else detailed_formatter)
+        handlers.append(file_handler)
+
+    with _lock:
+        old, _listener = _listener, QueueListener(_queue, *handlers, respect_handler_level=True)
+        if old is not None:
+            # Drains what is queued so far into the old handlers, then closes them
+            old.stop()
+            for handler in old.handlers:
+                handler.close()
+        _listener.start()
+
+        _level = getattr(logging, level.upper())
+        for logger in _managed_loggers():
+            logger.setLevel(_level)
+
+
+def _managed_loggers():
+    """Loggers wired to the shared queue"""
+    for logger in list(logging.Logger.manager.loggerDict.values()):
+        if isinstance(logger, logging.Logger) and _queue_handler in logger.handlers:
+            yield logger
+
+
+def _attach(logger: logging.Logger) -> logging.Logger:
+    """Route a logger through the shared queue"""
+    if _listener is None:
+        configure_logging()
+    if _queue_handler not in logger.handlers:
+        logger.addHandler(_queue_handler)
+        logger.setLevel(_level)
+        logger.propagate = False
+    return logger
+
+
+def setup_logger(
+    name: str = "sleep_checker",
+    log_file: str = "data/logs/sleep_checker.log",
+    level: str = "INFO",
+    max_bytes: int = 10485760,  # 10MB
+    backup_count: int = 3
+) -> logging.Logger:
+    """
+    Setup logger with file and console handlers
+
+    The file is shared by the whole process: this points the single
+    writer at log_file.
+
+    Args:
+        name: Logger name
+        log_file: Path to log file
+        level: Logging level (DEBUG, INFO, WARNING, ERROR)
+        max_bytes: Max size before rotation
+        backup_count: Number of backup files to keep
+
+    Returns:
+        Configured logger instance
+    """
+    configure_logging(log_file, level, max_bytes, backup_count)
+    logger = _attach(logging.getLogger(name))
+
     # Log initial message
     logger.info(f"Logger initialized: {name}")
     logger.debug(f"Log file: {log_file}")
-    
+
     return logger
 
 
 def get_logger(name: str = "sleep_checker") -> logging.Logger:
     """Get existing logger or create new one"""
-    logger = logging.getLogger(name)
-    if not logger.handlers:
-        # If logger doesn't exist, create with defaults
-        return setup_logger(name)
-    return logger
\ No newline at end of file
+    return _attach(logging.getLogger(name))
+
+
+def shutdown_logging() -> None:
+    """Flush queued records and close the log file"""
+    global _listener
+    with _lock:
+        if _listener is not None:
+            _listener.stop()
+            for handler in _listener.handlers:
+                handler.close()
+            _listener = None
+
+
+atexit.register(shutdown_logging)
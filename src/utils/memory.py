@@ -0,0 +1,52 @@
+"""
+Memory Utilities
+Resident-set reporting and heap trimming for the long-running daemon
+"""
+
+import ctypes
+import ctypes.util
+import os
+from typing import Optional
+
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+_libc: Optional[ctypes.CDLL] = None
+
+
+def get_rss_bytes() -> int:
+    """
+    Resident set size of this process
+
+    Returns:
+        RSS in bytes (0 if /proc is unavailable)
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def get_rss_mb() -> float:
+    """Resident set size of this process in MiB"""
+    return get_rss_bytes() / (1024 * 1024)
+
+
+def trim_heap() -> bool:
+    """
+    Ask glibc to return freed heap pages to the kernel (malloc_trim)
+
+    Freed model buffers otherwise stay in the allocator's arenas and keep
+    counting towards RSS.
+
+    Returns:
+        True if memory was released
+    """
+    global _libc
+    try:
+        if _libc is None:
+            _libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6")
+        return bool(_libc.malloc_trim(0))
+    except (OSError, AttributeError):
+        # Not glibc (e.g. musl): nothing to trim
+        return False
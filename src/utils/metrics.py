@@ -0,0 +1,192 @@
+"""
+Metrics
+In-memory latency histograms for the pipeline stages (fixed buckets,
+monotonic timers) with JSON and Prometheus text exposition
+"""
+
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+
+# Seconds; spans a ~1 ms recognize up to a multi-second camera open
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    """Fixed-bucket histogram; observe() is O(log buckets) and allocation-free"""
+
+    __slots__ = ('buckets', 'counts', 'count', 'sum', 'max')
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-quantile (bucket resolution)"""
+        if self.count == 0:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip(self.buckets, self.counts):
+            seen += n
+            if seen >= rank:
+                return bound
+        return self.max
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        """(le, cumulative count) pairs including +Inf, Prometheus style"""
+        result, total = [], 0
+        for bound, n in zip(self.buckets, self.counts):
+            total += n
+            result.append((f"{bound:g}", total))
+        result.append(("+Inf", self.count))
+        return result
+
+
+class MetricsRegistry:
+    """Stage latency histograms and event counters, safe to use from threads"""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._histograms: Dict[str, Histogram] = {}
+        self._counters: Dict[Tuple[str, str], float] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, stage: str, seconds: float) -> None:
+        """Record one duration for a stage"""
+        with self._lock:
+            histogram = self._histograms.get(stage)
+            if histogram is None:
+                histogram = self._histograms[stage] = Histogram(self.buckets)
+            histogram.observe(seconds)
+
+    def observe_many(self, timings: Dict[str, float]) -> None:
+        """Record a stage -> seconds mapping (e.g. analyze_face timings)"""
+        for stage, seconds in timings.items():
+            self.observe(stage, seconds)
+
+    @contextmanager
+    def timer(self, stage: str) -> Iterator[None]:
+        """Time a block with the monotonic clock"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+
+    def increment(self, name: str, label: str = "", amount: float = 1) -> None:
+        """Bump a counter, e.g. increment('checks', verdict) or increment('cpu_seconds', profile, 0.2)"""
+        with self._lock:
+            key = (name, label)
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def reset(self) -> None:
+        """Drop all recorded values"""
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """
+        Summary of every stage and counter
+
+        Returns:
+            {'stages': {stage: {count, sum, max, p50, p95, p99}},
+             'counters': {name: {label: value}}}
+        """
+        with self._lock:
+            stages = {
+                stage: {
+                    'count': h.count,
+                    'sum': h.sum,
+                    'max': h.max,
+                    'p50': h.quantile(0.5),
+                    'p95': h.quantile(0.95),
+                    'p99': h.quantile(0.99),
+                }
+                for stage, h in self._histograms.items()
+            }
+            counters: Dict[str, Dict[str, float]] = {}
+            for (name, label), value in self._counters.items():
+                counters.setdefault(name, {})[label] = value
+        return {'stages': stages, 'counters': counters}
+
+    def to_json(self) -> str:
+        """snapshot() as a JSON string (D-Bus GetMetrics payload)"""
+        return json.dumps(self.snapshot())
+
+    def render_prometheus(self, prefix: str = "sleep_checker") -> str:
+        """
+        Prometheus text exposition format
+
+        Returns:
+            One histogram family (<prefix>_stage_seconds, label `stage`) and
+            one counter family per counter name
+        """
+        lines = [
+            f"# HELP {prefix}_stage_seconds Pipeline stage latency",
+            f"# TYPE {prefix}_stage_seconds histogram",
+        ]
+        with self._lock:
+            for stage, h in sorted(self._histograms.items()):
+                for le, count in h.cumulative():
+                    lines.append(f'{prefix}_stage_seconds_bucket{{stage="{stage}",le="{le}"}} {count}')
+                lines.append(f'{prefix}_stage_seconds_sum{{stage="{stage}"}} {h.sum:.6f}')
+                lines.append(f'{prefix}_stage_seconds_count{{stage="{stage}"}} {h.count}')
+
+            names = sorted({name for name, _ in self._counters})
+            for name in names:
+                lines.append(f"# TYPE {prefix}_{name}_total counter")
+                for (counter, label), value in sorted(self._counters.items()):
+                    if counter == name:
+                        labels = f'{{label="{label}"}}' if label else ""
+                        lines.append(f"{prefix}_{name}_total{labels} {value}")
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path: str) -> bool:
+        """
+        Write the Prometheus text file for node_exporter's textfile collector
+
+        Written to a temporary file and renamed, so the collector never
+        reads a partial file.
+
+        Returns:
+            True if written
+        """
+        target = Path(path)
+        try:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            tmp = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+            tmp.write_text(self.render_prometheus())
+            os.replace(tmp, target)
+            return True
+        except OSError:
+            return False
+
+
+# Singleton instance
+_metrics_instance: Optional[MetricsRegistry] = None
+
+
+def get_metrics() -> MetricsRegistry:
+    """Get global metrics registry"""
+    global _metrics_instance
+    if _metrics_instance is None:
+        _metrics_instance = MetricsRegistry()
+    return _metrics_instance
@@ -0,0 +1,182 @@
+"""
+Tracing
+Opt-in span recorder for single idle events; spans go into a bounded
+in-memory buffer and are dumped as Chrome trace JSON (chrome://tracing,
+ui.perfetto.dev)
+"""
+
+import contextvars
+import itertools
+import json
+import os
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Deque, Dict, Optional
+
+
+# Idle event the current task/thread works for; asyncio.to_thread copies
+# the context, so spans in executor threads keep their event id
+_current_event: contextvars.ContextVar[Optional[int]] = contextvars.ContextVar(
+    "sleep_checker_trace_event", default=None
+)
+
+
+class _NullSpan:
+    """Returned while tracing is off: entering and leaving cost nothing"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        return None
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    """One complete ("X") event, recorded when the block exits"""
+
+    __slots__ = ('tracer', 'name', 'cat', 'args', 'start', 'token')
+
+    def __init__(self, tracer: 'Tracer', name: str, cat: str, args: Dict[str, Any], root: bool):
+        self.tracer = tracer
+        self.name = name
+        self.cat = cat
+        self.args = args
+        self.token = _current_event.set(next(tracer._event_ids)) if root else None
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        end = time.perf_counter()
+        event = _current_event.get()
+        if event is not None:
+            self.args['event'] = event
+        if exc_type is not None:
+            self.args['error'] = exc_type.__name__
+        self.tracer._record({
+            'name': self.name,
+            'cat': self.cat,
+            'ph': 'X',
+            'ts': (self.start - self.tracer._origin) * 1e6,
+            'dur': (end - self.start) * 1e6,
+            'pid': self.tracer._pid,
+            'tid': threading.get_native_id(),
+            'args': self.args,
+        })
+        if self.token is not None:
+            _current_event.reset(self.token)
+
+
+class Tracer:
+    """Records nested spans from the event loop and executor threads"""
+
+    def __init__(self, capacity: int = 20000):
+        """
+        Initialize tracer (disabled until enable() is called)
+
+        Args:
+            capacity: Events kept; the oldest are dropped first
+        """
+        self.enabled = False
+        self._events: Deque[Dict[str, Any]] = deque(maxlen=capacity)
+        self._origin = time.perf_counter()
+        self._pid = os.getpid()
+        self._event_ids = itertools.count(1)
+        self._threads: Dict[int, str] = {}
+
+    def enable(self, capacity: Optional[int] = None) -> None:
+        """Start recording (optionally resizing the buffer)"""
+        if capacity is not None and capacity != self._events.maxlen:
+            self._events = deque(self._events, maxlen=capacity)
+        self.enabled = True
+
+    def disable(self) -> None:
+        """Stop recording; the buffer is kept until dump() or clear()"""
+        self.enabled = False
+
+    def clear(self) -> None:
+        self._events.clear()
+
+    def span(self, name: str, cat: str = "sleep_checker", root: bool = False, **args: Any):
+        """
+        Context manager timing a block as one trace span
+
+        Args:
+            name: Span name shown in the viewer
+            cat: Category (component)
+            root: Start a new idle event; nested spans (in this task and in
+                  threads it hands work to) are tagged with its id
+            **args: Extra values shown with the span
+        """
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, cat, args, root)
+
+    def instant(self, name: str, cat: str = "sleep_checker", **args: Any) -> None:
+        """Record a point-in-time event (e.g. a D-Bus call arriving)"""
+        if not self.enabled:
+            return
+        event = _current_event.get()
+        if event is not None:
+            args['event'] = event
+        self._record({
+            'name': name,
+            'cat': cat,
+            'ph': 'i',
+            's': 't',
+            'ts': (time.perf_counter() - self._origin) * 1e6,
+            'pid': self._pid,
+            'tid': threading.get_native_id(),
+            'args': args,
+        })
+
+    def _record(self, event: Dict[str, Any]) -> None:
+        tid = event['tid']
+        if tid not in self._threads:
+            self._threads[tid] = threading.current_thread().name
+        # deque.append is atomic; no lock on the hot path
+        self._events.append(event)
+
+    def dump(self, path: str) -> int:
+        """
+        Write the buffer as Chrome trace JSON
+
+        Args:
+            path: Output file
+
+        Returns:
+            Number of events written
+        """
+        events = list(self._events)
+        metadata = [
+            {'name': 'thread_name', 'ph': 'M', 'pid': self._pid, 'tid': tid, 'args': {'name': name}}
+            for tid, name in list(self._threads.items())
+        ]
+        metadata.append({'name': 'process_name', 'ph': 'M', 'pid': self._pid, 'tid': 0,
+                         'args': {'name': 'sleep-checker'}})
+
+        target = Path(path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        with open(target, 'w') as f:
+            json.dump({'traceEvents': metadata + events, 'displayTimeUnit': 'ms'}, f)
+        return len(events)
+
+
+# Singleton instance
+_tracer_instance: Optional[Tracer] = None
+
+
+def get_tracer() -> Tracer:
+    """Get global tracer"""
+    global _tracer_instance
+    if _tracer_instance is None:
+        _tracer_instance = Tracer()
+    return _tracer_instance
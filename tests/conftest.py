@@ -0,0 +1,181 @@
+"""
+Benchmark fixtures and regression gate
+
+Fixtures are synthetic and seeded, so every run times the same work.
+The `bench` fixture wraps pytest-benchmark's `benchmark` and records the
+median of each test; at the end of the session the medians are compared
+with a JSON baseline and the run fails if any hot path got slower than
+--bench-threshold percent.
+
+    pytest tests/                          # compare with the baseline
+    pytest tests/ --bench-save-baseline    # record a new baseline
+
+Without --bench-baseline the gate only runs when a baseline for this
+kind of machine exists. Medians do not carry over between machines, so
+no baseline is committed. The reference machine records its own with
+--bench-save-baseline --bench-baseline <file> and passes that file to
+every gated run. An explicit --bench-baseline that does not exist is a
+usage error, so a gated run can never pass by comparing with nothing.
+"""
+
+import json
+import platform
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pytest
+
+from tests.synthetic import RESOLUTIONS, synthetic_faces, synthetic_frame
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+MODEL_PATH = PROJECT_ROOT / "models" / "yunet.onnx"
+BASELINE_DIR = Path(__file__).resolve().parent / "baselines"
+
+_results_key = pytest.StashKey[Dict[str, float]]()
+
+
+def machine_id() -> str:
+    """Baselines are only comparable on the same kind of machine"""
+    return f"{platform.system()}-{platform.machine()}-py{platform.python_version_tuple()[0]}{platform.python_version_tuple()[1]}"
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("bench", "benchmark regression gate")
+    group.addoption("--bench-baseline", default=None,
+                    help="baseline JSON (default: tests/baselines/<machine>.json)")
+    group.addoption("--bench-threshold", type=float, default=20.0,
+                    help="allowed slowdown of a median, in percent")
+    group.addoption("--bench-save-baseline", action="store_true",
+                    help="write this run's medians as the new baseline")
+
+
+def pytest_configure(config):
+    config.stash[_results_key] = {}
+    path = config.getoption("--bench-baseline")
+    if path and not config.getoption("--bench-save-baseline") and not Path(path).exists():
+        raise pytest.UsageError(f"--bench-baseline {path} does not exist "
+                                f"(record it with --bench-save-baseline)")
+
+
+def _baseline_path(config) -> Path:
+    path = config.getoption("--bench-baseline")
+    return Path(path) if path else BASELINE_DIR / f"{machine_id()}.json"
+
+
+def _regressions(config) -> List[Tuple[str, float, float, float]]:
+    """(test, baseline median, median, change %) above the threshold"""
+    path = _baseline_path(config)
+    if not path.exists():
+        return []
+    baseline = json.loads(path.read_text())['medians']
+    threshold = config.getoption("--bench-threshold")
+    slower = []
+    for name, median in config.stash[_results_key].items():
+        base = baseline.get(name)
+        if base:
+            change = (median - base) / base * 100
+            if change > threshold:
+                slower.append((name, base, median, change))
+    return slower
+
+
+def pytest_sessionfinish(session, exitstatus):
+    config = session.config
+    results = config.stash.get(_results_key, {})
+    if not results:
+        return
+
+    if config.getoption("--bench-save-baseline"):
+        path = _baseline_path(config)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps({'machine': machine_id(), 'medians': dict(sorted(results.items()))},
+                                   indent=2) + "\n")
+        return
+
+    if _regressions(config) and session.exitstatus == pytest.ExitCode.OK:
+        session.exitstatus = pytest.ExitCode.TESTS_FAILED
+
+
+def pytest_terminal_summary(terminalreporter, exitstatus, config):
+    results = config.stash.get(_results_key, {})
+    if not results:
+        return
+    path = _baseline_path(config)
+    if config.getoption("--bench-save-baseline"):
+        terminalreporter.write_line(f"Benchmark baseline written to {path}")
+        return
+    if not path.exists():
+        terminalreporter.write_line(f"No benchmark baseline at {path} (run with --bench-save-baseline)")
+        return
+
+    slower = _regressions(config)
+    threshold = config.getoption("--bench-threshold")
+    if not slower:
+        terminalreporter.write_line(f"No benchmark slower than baseline by more than {threshold:g}%")
+        return
+    terminalreporter.section("benchmark regressions", red=True)
+    for name, base, median, change in slower:
+        terminalreporter.write_line(
+            f"{name}: {base * 1e3:.3f} ms -> {median * 1e3:.3f} ms ({change:+.0f}%)", red=True)
+
+
+@pytest.fixture
+def bench(benchmark, request):
+    """pytest-benchmark's fixture, with the median kept for the regression gate"""
+    yield benchmark
+    stats = getattr(benchmark, "stats", None)
+    if stats is not None:
+        request.config.stash[_results_key][request.node.nodeid] = stats.stats.median
+
+
+@pytest.fixture(scope="session")
+def model_path() -> str:
+    if not MODEL_PATH.exists():
+        pytest.skip("YuNet model missing (run scripts/download_model.sh)")
+    return str(MODEL_PATH)
+
+
+@pytest.fixture(scope="session")
+def frames() -> Dict[Tuple[int, int], np.ndarray]:
+    return {size: synthetic_frame(*size) for size in RESOLUTIONS}
+
+
+@pytest.fixture(scope="session")
+def gallery_dir(tmp_path_factory) -> Path:
+    return tmp_path_factory.mktemp("galleries")
+
+
+@pytest.fixture(scope="session")
+def gallery(gallery_dir):
+    """Path of a saved model trained on a synthetic gallery of n samples"""
+    from src.core.face_recognizer import FaceRecognizer
+
+    def build(size: int) -> str:
+        path = gallery_dir / f"gallery_{size}.pkl"
+        if not path.exists():
+            assert FaceRecognizer(encodings_path=str(path)).train(synthetic_faces(size, seed=size))
+        return str(path)
+    return build
+
+
+@pytest.fixture
+def presence_checker(model_path, gallery):
+    """
+    Builds a PresenceChecker for benchmarks: YuNet, a 100-sample gallery,
+    a synthetic 640x480 source, no warm-up and a private metrics registry;
+    keyword arguments override any of them
+    """
+    from src.core.face_detector import FaceDetector
+    from src.core.face_recognizer import FaceRecognizer
+    from src.core.frame_source import SyntheticSource
+    from src.core.presence_checker import PresenceChecker
+    from src.utils.metrics import MetricsRegistry
+
+    def build(detector=None, gallery_size: int = 100, **options):
+        options.setdefault('source', SyntheticSource(640, 480, motion=8))
+        options.setdefault('warmup_time', 0)
+        options.setdefault('metrics', MetricsRegistry())
+        return PresenceChecker(detector or FaceDetector(model_path),
+                               FaceRecognizer(encodings_path=gallery(gallery_size)), **options)
+    return build
@@ -0,0 +1,32 @@
+"""
+Synthetic Fixtures
+Seeded stand-ins for webcam frames and face crops, so benchmarks time the
+same pixels on every run without shipping images
+"""
+
+from typing import List
+
+import cv2
+import numpy as np
+
+from src.core.frame_source import render_synthetic_frame
+
+# (width, height) the detector is timed at
+RESOLUTIONS = [(320, 240), (640, 480), (1280, 720)]
+GALLERY_SIZES = [10, 100, 1000]
+
+
+def synthetic_frame(width: int, height: int, seed: int = 0) -> np.ndarray:
+    """Deterministic webcam-like BGR frame with a face-like blob in the middle"""
+    return render_synthetic_frame(width, height, seed)
+
+
+def synthetic_faces(count: int, seed: int = 0, size: int = 100) -> List[np.ndarray]:
+    """Deterministic grayscale face crops for recognizer galleries"""
+    rng = np.random.default_rng(seed)
+    base = cv2.cvtColor(cv2.resize(synthetic_frame(160, 160), (size, size)), cv2.COLOR_BGR2GRAY)
+    faces = []
+    for _ in range(count):
+        noise = rng.normal(0, 12, base.shape)
+        faces.append(np.clip(base + noise, 0, 255).astype(np.uint8))
+    return faces
@@ -0,0 +1,34 @@
+"""Face detection and model load benchmarks"""
+
+import pytest
+
+from src.core.face_detector import FaceDetector, available_backends
+from tests.synthetic import RESOLUTIONS
+
+
+@pytest.mark.parametrize("size", RESOLUTIONS, ids=lambda s: f"{s[0]}x{s[1]}")
+def test_detect(bench, model_path, frames, size):
+    detector = FaceDetector(model_path)
+    detector.load(*size)
+    frame = frames[size]
+    bench.group = "detect"
+    bench(detector.detect, frame)
+
+
+def test_detector_load(bench, model_path):
+    detector = FaceDetector(model_path)
+
+    def load():
+        detector.unload()
+        detector.load(640, 480)
+
+    bench.group = "model_load"
+    bench(load)
+
+
+@pytest.mark.parametrize("backend,target", available_backends(), ids=lambda v: v)
+def test_detect_backend(bench, model_path, frames, backend, target):
+    detector = FaceDetector(model_path, backend=backend, target=target)
+    detector.load(640, 480)
+    bench.group = "detect_backend"
+    bench(detector.detect, frames[(640, 480)])
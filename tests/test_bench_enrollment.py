@@ -0,0 +1,27 @@
+"""Enrollment gate: per-frame cost once the gallery is nearly full"""
+
+import numpy as np
+
+from src.core.enrollment import EnrollmentSession
+from tests.synthetic import synthetic_frame
+
+
+class FixedFaceDetector:
+    """Stand-in for YuNet (synthetic frames hold no real face): one frontal face"""
+
+    def detect_landmarks(self, frame):
+        landmarks = np.array([[280, 200], [340, 200], [310, 240], [290, 280], [330, 280]], dtype=np.float32)
+        return [((220, 140, 180, 200, 0.95), landmarks)]
+
+
+def test_enrollment_offer(bench):
+    session = EnrollmentSession(FixedFaceDetector(), per_cell=30, min_distance=0.0)
+    for seed in range(29):
+        session.offer(synthetic_frame(640, 480, seed=seed))
+    session.min_distance = 0.25
+    frame = synthetic_frame(640, 480, seed=100)
+
+    bench.group = "enrollment"
+    # Passes every gate, then is compared with all 29 kept signatures
+    assert bench(session.offer, frame) == (False, "too similar")
+    assert len(session.samples) == 29
@@ -0,0 +1,67 @@
+"""Frame source decode, image directory playback and webcam-free presence checks"""
+
+import cv2
+import numpy as np
+import pytest
+
+from src.core.frame_source import ImageDirectorySource, SyntheticSource
+from tests.synthetic import synthetic_frame
+
+
+@pytest.fixture(scope="module")
+def jpeg_dir(tmp_path_factory):
+    """Ten 720p JPEGs of a slowly moving synthetic face"""
+    directory = tmp_path_factory.mktemp("frames")
+    source = SyntheticSource(1280, 720, motion=8)
+    source.open()
+    for i in range(10):
+        cv2.imwrite(str(directory / f"{i:02d}.jpg"), source.read())
+    return directory
+
+
+@pytest.mark.parametrize("gray", [False, True], ids=["bgr", "gray"])
+def test_image_decode(bench, jpeg_dir, gray):
+    source = ImageDirectorySource(str(jpeg_dir))
+    assert source.open()
+    bench.group = "frame_source"
+    bench(source.read_gray if gray else source.read)
+
+
+def test_presence_check(bench, presence_checker, jpeg_dir):
+    source = ImageDirectorySource(str(jpeg_dir))
+    checker = presence_checker(source=source)
+    bench.group = "presence"
+    result = bench(checker.check)
+    # Every frame of the check came from the directory, and the camera-less
+    # source is closed again like the webcam would be
+    assert result.frames == checker.frames_per_check
+    assert not source.is_open
+
+
+@pytest.mark.parametrize("at_end, expected", [
+    ("loop", [0, 1, 2, 0, 1]),
+    ("hold", [0, 1, 2, 2, 2]),
+    ("stop", [0, 1, 2, None, None]),
+])
+def test_image_directory_at_end(tmp_path, at_end, expected):
+    frames = [synthetic_frame(64, 48, seed=i) for i in range(3)]
+    for i, frame in enumerate(frames):
+        cv2.imwrite(str(tmp_path / f"{i}.png"), frame)
+    source = ImageDirectorySource(str(tmp_path), at_end=at_end)
+    assert source.open()
+    got = []
+    for _ in expected:
+        frame = source.read()
+        got.append(None if frame is None else next(i for i, f in enumerate(frames) if np.array_equal(f, frame)))
+    assert got == expected
+
+
+def test_gray_read_matches_color_decode(jpeg_dir):
+    source = ImageDirectorySource(str(jpeg_dir))
+    assert source.open()
+    assert source.grab()
+    gray = source.retrieve_gray()
+    expected = cv2.cvtColor(source.retrieve(), cv2.COLOR_BGR2GRAY)
+    assert gray.shape == expected.shape
+    # Luma-only JPEG decode vs colour decode + conversion: rounding differences only
+    assert np.abs(gray.astype(int) - expected.astype(int)).max() <= 2
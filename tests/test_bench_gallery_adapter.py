@@ -0,0 +1,36 @@
+"""Gallery adaptation: sampling cost inside a check, and one incremental fold"""
+
+import shutil
+
+from src.core.gallery_adapter import GalleryAdapter, model_samples
+from src.core.face_recognizer import FaceRecognizer
+from tests.synthetic import synthetic_faces
+
+
+def test_adapter_consider(bench, tmp_path):
+    adapter = GalleryAdapter(str(tmp_path / "encodings.pkl"), per_window=20)
+    face = synthetic_faces(1, size=140)[0]
+    for _ in range(20):
+        adapter.consider(10.0, lambda: face)
+
+    bench.group = "gallery_adapter"
+    # Reservoir full: most offers are dropped before the crop is taken
+    bench(adapter.consider, 10.0, lambda: face)
+
+
+def test_adapter_fold(bench, gallery, tmp_path):
+    model = tmp_path / "encodings.pkl"
+    faces = synthetic_faces(20, seed=7)
+
+    def setup():
+        shutil.copy(gallery(100), model)
+        shutil.rmtree(tmp_path / "encodings.adapt", ignore_errors=True)
+        adapter = GalleryAdapter(str(model), window_seconds=3600, per_window=20)
+        adapter._window_start -= 3600  # close the window faces were taken in
+        for face in faces:
+            adapter._reservoir.append(face)
+        return (adapter,), {}
+
+    bench.group = "gallery_adapter"
+    assert bench.pedantic(GalleryAdapter.fold, setup=setup, rounds=5)
+    assert model_samples(FaceRecognizer(str(model))) == 120
@@ -0,0 +1,40 @@
+"""Event history: append cost on the caller's side, and a report query"""
+
+import random
+import time
+
+import pytest
+
+from src.utils.history import HistoryEvent, HistoryStore, connect, daily_percentiles
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = HistoryStore(str(tmp_path / "history.db"), flush_interval=0.05)
+    assert store.start()
+    yield store
+    store.close()
+
+
+def test_history_record(bench, store):
+    event = HistoryEvent('idle', verdict='owner', confidence=30.0, threshold=50.0,
+                         end_to_end=0.2, detect=0.01, recognize=0.002, action='inhibit')
+    bench.group = "history"
+    bench(store.record, event)
+    store.close()
+    assert store.written > 0 and store.dropped == 0
+
+
+def test_history_daily_p95(bench, store):
+    rng = random.Random(0)
+    start = time.time() - 7 * 86400
+    for i in range(20000):
+        store.record(HistoryEvent('idle', ts=start + i * 30, verdict='owner',
+                                  end_to_end=rng.uniform(0.05, 0.5)))
+    store.close()
+    conn = connect(store.path, readonly=True)
+
+    bench.group = "history"
+    days = bench(daily_percentiles, conn)
+    assert sum(d['count'] for d in days) == 20000
+    assert all(d['p50'] <= d['p95'] <= d['max'] for d in days)
@@ -0,0 +1,92 @@
+"""Preprocessing benchmarks on a 640x480 frame, allocating and pooled"""
+
+import tracemalloc
+
+import pytest
+
+from src.utils.image_utils import (
+    BufferPool, crop_face, enhance_low_light, flip_horizontal, normalize_face, resize_frame
+)
+
+FACE_BOX = (224, 144, 192, 192)
+
+
+@pytest.fixture
+def frame(frames):
+    return frames[(640, 480)]
+
+
+@pytest.fixture
+def face(frame):
+    return crop_face(frame, FACE_BOX)
+
+
+@pytest.fixture(params=[False, True], ids=["alloc", "pooled"])
+def pool(request):
+    return BufferPool() if request.param else None
+
+
+def test_enhance_low_light(bench, frame, pool):
+    bench.group = "image_utils"
+    bench(enhance_low_light, frame, pool=pool)
+
+
+def test_crop_face(bench, frame):
+    bench.group = "image_utils"
+    bench(crop_face, frame, FACE_BOX)
+
+
+def test_normalize_face(bench, face, pool):
+    bench.group = "image_utils"
+    bench(normalize_face, face, pool=pool)
+
+
+def test_resize_frame(bench, frames, pool):
+    bench.group = "image_utils"
+    bench(resize_frame, frames[(1280, 720)], 640, pool=pool)
+
+
+def test_flip_horizontal(bench, frame, pool):
+    bench.group = "image_utils"
+    bench(flip_horizontal, frame, pool=pool)
+
+
+def _pipeline(frame, pool):
+    """Resize, mirror, enhance, crop and normalize one 720p frame"""
+    small = resize_frame(frame, 640, pool=pool)
+    mirrored = flip_horizontal(small, pool=pool)
+    enhanced = enhance_low_light(mirrored, pool=pool)
+    return normalize_face(crop_face(enhanced, FACE_BOX), pool=pool)
+
+
+def _bytes_per_frame(frame, pool, frames: int = 20) -> int:
+    """Largest transient allocation (tracemalloc peak) of one steady-state frame"""
+    _pipeline(frame, pool)  # warm-up fills the pool
+    tracemalloc.start()
+    try:
+        worst = 0
+        for _ in range(frames):
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            _pipeline(frame, pool)
+            worst = max(worst, tracemalloc.get_traced_memory()[1] - before)
+        return worst
+    finally:
+        tracemalloc.stop()
+
+
+def test_pipeline_allocations(bench, frames, pool):
+    frame = frames[(1280, 720)]
+    allocated = _bytes_per_frame(frame, pool)
+    bench.group = "image_pipeline"
+    bench.extra_info['bytes_allocated_per_frame'] = allocated
+
+    if pool is not None:
+        buffers = pool.allocations
+        bench(_pipeline, frame, pool)
+        # Steady state: no new pool buffers and no image-sized allocations
+        assert pool.allocations == buffers
+        assert allocated < 4096
+    else:
+        bench(_pipeline, frame, pool)
+        assert allocated > frame.nbytes // 4
@@ -0,0 +1,56 @@
+"""Shared inference service round trip: one session, and two coalesced"""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.core.face_detector import FaceDetector
+from src.core.frame_source import SyntheticSource
+from src.core.inference_client import RemotePresenceChecker
+from src.core.inference_service import InferenceService
+from src.utils.metrics import MetricsRegistry
+
+
+@pytest.fixture(scope="module")
+def service(model_path, gallery, tmp_path_factory):
+    """Inference service on a synthetic source, run on its own loop thread"""
+    path = str(tmp_path_factory.mktemp("service") / "inference.sock")
+    service = InferenceService(path, FaceDetector(model_path), SyntheticSource(640, 480, motion=8),
+                               warmup_time=0, coalesce_window=0, unload_after=0, metrics=MetricsRegistry())
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    assert asyncio.run_coroutine_threadsafe(service.start(), loop).result()
+    yield service
+    asyncio.run_coroutine_threadsafe(service.stop(), loop).result()
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+
+
+def test_service_check(bench, service, gallery):
+    client = RemotePresenceChecker(service.socket_path, gallery(100), metrics=MetricsRegistry())
+    bench.group = "inference_service"
+    result = bench(client.check)
+    assert result.frames == client.frames_per_check
+    assert service.clients >= 1
+
+
+def test_service_concurrent_checks(bench, service, gallery):
+    clients = [RemotePresenceChecker(service.socket_path, gallery(size), metrics=MetricsRegistry())
+               for size in (10, 100)]
+    for client in clients:
+        client.verify()  # upload both galleries before timing
+    pool = ThreadPoolExecutor(len(clients))
+
+    def both():
+        return [f.result() for f in [pool.submit(c.check) for c in clients]]
+
+    service.metrics.reset()
+    bench.group = "inference_service"
+    results = bench(both)
+    pool.shutdown()
+    assert all(r.frames == clients[0].frames_per_check for r in results)
+    # Requests that overlap a running capture join it instead of capturing again
+    assert service.metrics.snapshot()['counters']['service_checks'].get('shared', 0) > 0
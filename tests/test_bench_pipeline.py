@@ -0,0 +1,26 @@
+"""Multi-frame presence check: serial vs pipelined capture/detect/recognize"""
+
+import pytest
+
+from src.core.face_detector import FaceDetector
+
+
+class AlwaysFaceDetector(FaceDetector):
+    """YuNet doing its full work, but reporting one face per frame (synthetic
+    frames hold none), so recognition is timed too"""
+
+    def detect_prepared(self, image, frame_width):
+        return super().detect_prepared(image, frame_width) or [(220, 140, 200, 200, 0.9)]
+
+
+@pytest.mark.parametrize("pipeline", [False, True], ids=["serial", "pipelined"])
+def test_presence_check(bench, model_path, presence_checker, pipeline):
+    checker = presence_checker(AlwaysFaceDetector(model_path=model_path), frames_per_check=6, pipeline=pipeline)
+    bench.group = "presence_check"
+    result = bench(checker.check)
+    assert result.frames == 6 and result.face_count == 1
+    assert checker.last_timings['recognize'] > 0
+    if pipeline:
+        stats = checker.last_pipeline_stats
+        assert stats.items == 6
+        assert set(stats.occupancy) == {"capture", "prepare", "detect", "recognize"}
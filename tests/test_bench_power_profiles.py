@@ -0,0 +1,29 @@
+"""Presence check cost under each power profile of the default configuration"""
+
+import pytest
+
+from src.core.face_detector import set_cv_threads
+from src.utils.config_manager import ConfigManager
+from tests.conftest import PROJECT_ROOT
+
+
+@pytest.mark.parametrize("profile", ["ac", "battery"])
+def test_profile_check(bench, presence_checker, profile):
+    settings = getattr(ConfigManager(str(PROJECT_ROOT / "config")).snapshot.power, profile)
+    checker = presence_checker()
+    # The same call the daemon makes when the power source changes
+    checker.update_settings(
+        frames_per_check=settings.frames_per_check,
+        detection_scale=settings.detection_scale,
+        enhance_low_light=settings.enhance_low_light,
+        threads=settings.threads
+    )
+    assert checker.detector.input_scale == settings.detection_scale
+    assert checker.detector.enhance == settings.enhance_low_light
+
+    bench.group = "power_profile"
+    try:
+        result = bench(checker.check)
+    finally:
+        set_cv_threads(0)
+    assert result.frames == settings.frames_per_check
@@ -0,0 +1,22 @@
+"""LBPH recognition and model load benchmarks against synthetic galleries"""
+
+import pytest
+
+from src.core.face_recognizer import FaceRecognizer
+from tests.synthetic import GALLERY_SIZES, synthetic_faces
+
+
+@pytest.mark.parametrize("size", GALLERY_SIZES)
+def test_recognize(bench, gallery, size):
+    recognizer = FaceRecognizer(encodings_path=gallery(size))
+    assert recognizer.is_trained()
+    probe = synthetic_faces(1, seed=999)[0]
+    bench.group = "recognize"
+    bench(recognizer.recognize, probe)
+
+
+@pytest.mark.parametrize("size", GALLERY_SIZES)
+def test_recognizer_load(bench, gallery, size):
+    recognizer = FaceRecognizer(encodings_path=gallery(size))
+    bench.group = "model_load"
+    assert bench(recognizer.load_model)
@@ -0,0 +1,15 @@
+"""Training-set face extraction throughput"""
+
+from src.core.face_trainer import FaceTrainer
+from tests.synthetic import synthetic_frame
+
+IMAGES = 20
+
+
+def test_extract_faces(bench, model_path, tmp_path):
+    trainer = FaceTrainer(data_dir=str(tmp_path), model_path=model_path,
+                          output_path=str(tmp_path / "encodings.pkl"))
+    trainer.face_images = [synthetic_frame(640, 480, seed=i) for i in range(IMAGES)]
+    bench.group = "trainer"
+    bench.extra_info['images'] = IMAGES
+    bench(trainer.extract_faces)
@@ -0,0 +1,87 @@
+"""Bus reconnects: replayed names and match rules, failed attempts"""
+
+import asyncio
+import shutil
+
+import pytest
+from dbus_next import BusType, Message
+
+from src.replay.replayer import PrivateSessionBus
+from src.utils.bus_manager import BusManager
+
+pytestmark = pytest.mark.skipif(shutil.which("dbus-daemon") is None, reason="dbus-daemon not installed")
+
+NAME = "org.example.SleepCheckerTest"
+RULE = "type='signal',interface='org.example.SleepCheckerTest'"
+
+
+@pytest.fixture
+def session_bus(monkeypatch):
+    monkeypatch.delenv("DBUS_SESSION_BUS_ADDRESS", raising=False)
+    bus = PrivateSessionBus()
+    bus.start()
+    yield bus
+    bus.stop()
+
+
+async def name_owner(manager: BusManager) -> str:
+    reply = await manager.call(Message(destination="org.freedesktop.DBus", path="/org/freedesktop/DBus",
+                                       interface="org.freedesktop.DBus", member="GetNameOwner",
+                                       signature="s", body=[NAME]))
+    return reply.body[0] if reply.body else ""
+
+
+async def wait_reconnected(manager: BusManager, *old_buses) -> None:
+    for _ in range(200):
+        bus = manager._buses.get(BusType.SESSION)
+        if bus is not None and bus not in old_buses and bus.connected:
+            if await name_owner(manager) == bus.unique_name:
+                return
+        await asyncio.sleep(0.01)
+    raise AssertionError("bus was not reconnected")
+
+
+def test_reconnect_replays_name(session_bus):
+    async def scenario():
+        manager = BusManager(reconnect_delay=0.01)
+        await manager.request_name(NAME)
+        assert await manager.add_match(RULE)
+        first = await manager.get_bus()
+        first.disconnect()
+        await wait_reconnected(manager, first)
+        await manager.close()
+    asyncio.run(scenario())
+
+
+def test_failed_reconnect_releases_its_connection(session_bus):
+    async def scenario():
+        manager = BusManager(reconnect_delay=0.01)
+        await manager.request_name(NAME)
+        assert await manager.add_match(RULE)
+
+        # The first replay fails after the name was already reclaimed
+        failures, attempts = [1], []
+        call_bus_daemon, get_bus = manager._call_bus_daemon, manager.get_bus
+
+        async def flaky_call_bus_daemon(member, arg, bus_type):
+            if member == "AddMatch" and failures:
+                failures.pop()
+                return False
+            return await call_bus_daemon(member, arg, bus_type)
+
+        async def tracked_get_bus(bus_type=BusType.SESSION):
+            bus = await get_bus(bus_type)
+            if not attempts or attempts[-1] is not bus:
+                attempts.append(bus)
+            return bus
+        manager._call_bus_daemon = flaky_call_bus_daemon
+        manager.get_bus = tracked_get_bus
+
+        first = manager._buses[BusType.SESSION]
+        first.disconnect()
+        while not attempts:
+            await asyncio.sleep(0.01)
+        await wait_reconnected(manager, first, attempts[0])
+        assert not attempts[0].connected  # the failed attempt did not keep the name
+        await manager.close()
+    asyncio.run(scenario())
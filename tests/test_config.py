@@ -0,0 +1,149 @@
+"""Config schema validation, reload and change notification"""
+
+import asyncio
+import json
+import shutil
+from pathlib import Path
+
+import pytest
+
+from src.utils.config_manager import ConfigManager
+from src.utils.config_schema import ConfigError, ConfigSnapshot, build_snapshot, diff_snapshots
+from src.utils.config_watcher import ConfigWatcher
+
+DEFAULT_CONFIG = Path(__file__).resolve().parent.parent / "config" / "default_config.json"
+
+
+@pytest.fixture
+def config_dir(tmp_path) -> Path:
+    shutil.copy(DEFAULT_CONFIG, tmp_path / "default_config.json")
+    return tmp_path
+
+
+def write_user_config(config_dir: Path, data: dict) -> None:
+    (config_dir / "user_config.json").write_text(json.dumps(data))
+
+
+def test_defaults_build():
+    snapshot = build_snapshot(json.loads(DEFAULT_CONFIG.read_text()))
+    assert isinstance(snapshot, ConfigSnapshot)
+
+
+def test_values_are_converted():
+    snapshot = build_snapshot({
+        'camera': {'warmup_time': 1},
+        'actions': {'inhibitors': ['logind']},
+        'unknown_section': {'ignored': True},
+    })
+    assert snapshot.camera.warmup_time == 1.0 and isinstance(snapshot.camera.warmup_time, float)
+    assert snapshot.actions.inhibitors == ('logind',)
+    assert snapshot.presence == ConfigSnapshot().presence
+
+
+@pytest.mark.parametrize("data, message", [
+    ({'camera': {'width': "640"}}, "camera.width: expected an integer"),
+    ({'camera': {'width': 640.0}}, "camera.width: expected an integer"),
+    ({'camera': {'device_index': True}}, "camera.device_index: expected an integer"),
+    ({'presence': {'pipeline': 1}}, "presence.pipeline: expected true/false"),
+    ({'detection': {'score_threshold': 1.5}}, "detection.score_threshold: 1.5 is above the maximum"),
+    ({'camera': {'width': 0}}, "camera.width: 0 is below the minimum"),
+    ({'camera': {'source': "webcam"}}, "camera.source: 'webcam' is not one of"),
+    ({'actions': {'inhibitors': ['logind', 'bogus']}}, "actions.inhibitors: 'bogus' is not one of"),
+    ({'actions': {'inhibitors': 'logind'}}, "actions.inhibitors: expected a list of str"),
+    ({'camera': 5}, "camera: expected a section"),
+])
+def test_invalid_values_rejected(data, message):
+    with pytest.raises(ConfigError, match=message.replace("(", r"\(")):
+        build_snapshot(data)
+
+
+def test_all_errors_reported():
+    with pytest.raises(ConfigError) as info:
+        build_snapshot({'camera': {'width': 0, 'height': "x"}})
+    assert "camera.width" in str(info.value) and "camera.height" in str(info.value)
+
+
+def test_diff_snapshots():
+    old = ConfigSnapshot()
+    new = build_snapshot({'detection': {'score_threshold': 0.7}, 'presence': {'frames_per_check': 5}})
+    assert diff_snapshots(old, new) == ['detection.score_threshold', 'presence.frames_per_check']
+    assert diff_snapshots(old, old) == []
+
+
+def test_load_rejects_invalid_config(config_dir):
+    write_user_config(config_dir, {'camera': {'width': -1}})
+    with pytest.raises(ConfigError):
+        ConfigManager(str(config_dir))
+
+
+def test_user_config_overrides_defaults(config_dir):
+    write_user_config(config_dir, {'presence': {'frames_per_check': 7}})
+    config = ConfigManager(str(config_dir))
+    assert config.snapshot.presence.frames_per_check == 7
+    assert config.get('presence.frames_per_check') == 7
+    assert config.snapshot.presence.motion_threshold == config.get('presence.motion_threshold')
+
+
+def test_reload_notifies_listeners(config_dir):
+    config = ConfigManager(str(config_dir))
+    calls = []
+    config.add_listener(lambda old, new: calls.append((old, new)))
+
+    assert not config.reload()  # nothing changed
+    assert calls == []
+
+    write_user_config(config_dir, {'presence': {'frames_per_check': 5}})
+    assert config.reload()
+    (old, new), = calls
+    assert diff_snapshots(old, new) == ['presence.frames_per_check']
+    assert new is config.snapshot
+
+
+def test_invalid_reload_keeps_snapshot(config_dir):
+    config = ConfigManager(str(config_dir))
+    before = config.snapshot
+    calls = []
+    config.add_listener(lambda old, new: calls.append(new))
+
+    write_user_config(config_dir, {'camera': {'width': "wide"}})
+    assert not config.reload()
+    (config_dir / "user_config.json").write_text("{ half written")
+    assert not config.reload()
+    assert config.snapshot is before
+    assert config.get('camera.width') == before.camera.width
+    assert calls == []
+
+
+def test_failing_listener_does_not_stop_others(config_dir):
+    config = ConfigManager(str(config_dir))
+    calls = []
+
+    def broken(old, new):
+        raise RuntimeError("listener bug")
+    config.add_listener(broken)
+    config.add_listener(lambda old, new: calls.append(new))
+    config.remove_listener(lambda old, new: None)  # unknown listener: no-op
+
+    write_user_config(config_dir, {'presence': {'frames_per_check': 4}})
+    assert config.reload()
+    assert len(calls) == 1
+
+
+@pytest.mark.parametrize("inotify", [True, False], ids=["inotify", "polling"])
+def test_watcher_reloads_on_change(config_dir, inotify):
+    async def scenario():
+        config = ConfigManager(str(config_dir))
+        changed = asyncio.Event()
+        config.add_listener(lambda old, new: changed.set())
+        watcher = ConfigWatcher(config, debounce=0.05, poll_interval=0.05)
+        if not inotify:
+            watcher._inotify_watch = lambda path: None
+        await watcher.start()
+        try:
+            await asyncio.sleep(0.1)
+            write_user_config(config_dir, {'presence': {'frames_per_check': 6}})
+            await asyncio.wait_for(changed.wait(), 2.0)
+        finally:
+            await watcher.stop()
+        assert config.snapshot.presence.frames_per_check == 6
+    asyncio.run(scenario())
@@ -0,0 +1,155 @@
+"""Enrollment: quality and diversity gates, automatic stop, incremental training"""
+
+import cv2
+import numpy as np
+import pytest
+
+from src.core.enrollment import EnrollmentSession
+from tests.synthetic import synthetic_frame
+
+FACE = (220, 140, 180, 200)
+
+
+def landmarks(yaw: float) -> np.ndarray:
+    """Eyes 60 px apart, nose shifted by yaw eye distances"""
+    return np.array([[280, 200], [340, 200], [310 + yaw * 60, 240], [290, 280], [330, 280]], dtype=np.float32)
+
+
+class ScriptedDetector:
+    """Stand-in for YuNet: one face per frame, with the yaw of the next entry in `yaws`"""
+
+    def __init__(self, yaws=(0.0,), box=FACE, score=0.95, faces=1):
+        self.yaws = list(yaws)
+        self.box = box
+        self.score = score
+        self.faces = faces
+        self.calls = 0
+
+    def detect_landmarks(self, frame):
+        yaw = self.yaws[self.calls % len(self.yaws)]
+        self.calls += 1
+        return [((*self.box, self.score), landmarks(yaw))] * self.faces
+
+
+class FrameList:
+    """Frame source handing out synthetic frames (None when exhausted)"""
+
+    def __init__(self, count: int):
+        self.frames = [synthetic_frame(640, 480, seed=seed) for seed in range(count)]
+        self.reads = 0
+
+    def read(self):
+        if self.reads >= len(self.frames):
+            return None
+        self.reads += 1
+        return self.frames[self.reads - 1]
+
+
+def frame() -> np.ndarray:
+    return synthetic_frame(640, 480)
+
+
+@pytest.mark.parametrize("detector, image, reason", [
+    (ScriptedDetector(faces=0), frame(), "no face"),
+    (ScriptedDetector(faces=2), frame(), "several faces"),
+    (ScriptedDetector(score=0.5), frame(), "low detection score"),
+    (ScriptedDetector(box=(220, 140, 60, 70)), frame(), "face too small"),
+    (ScriptedDetector(box=(520, 140, 180, 200)), frame(), "face cut off"),
+    (ScriptedDetector(yaws=[0.8]), frame(), "turned too far"),
+    (ScriptedDetector(), frame() // 8, "too dark"),
+    (ScriptedDetector(), np.full((480, 640, 3), 240, np.uint8), "too bright"),
+    (ScriptedDetector(), cv2.GaussianBlur(frame(), (31, 31), 10), "blurry"),
+])
+def test_quality_gate_rejections(detector, image, reason):
+    session = EnrollmentSession(detector)
+    assert session.offer(image) == (False, reason)
+    assert session.rejected == {reason: 1} and session.samples == []
+
+
+def test_near_duplicate_rejected():
+    session = EnrollmentSession(ScriptedDetector(), per_cell=10)
+    assert session.offer(frame()) == (True, "kept")
+    # Another seed of the same scene differs only by noise
+    assert session.offer(synthetic_frame(640, 480, seed=1)) == (False, "too similar")
+
+
+def test_per_cell_quota():
+    session = EnrollmentSession(ScriptedDetector(), per_cell=2, min_distance=0.0)
+    results = [session.offer(synthetic_frame(640, 480, seed=seed))[1] for seed in range(5)]
+    assert results == ["kept", "kept"] + ["pose already covered"] * 3
+    assert len(session.samples) == 2 and session.rejected == {"pose already covered": 3}
+
+
+def test_other_pose_fills_another_cell():
+    session = EnrollmentSession(ScriptedDetector(yaws=[0.0, 0.0, -0.5]), per_cell=1, min_distance=0.0)
+    reasons = [session.offer(synthetic_frame(640, 480, seed=seed))[1] for seed in range(3)]
+    assert reasons == ["kept", "pose already covered", "kept"]
+    assert session.samples[0].cell[0] != session.samples[1].cell[0]
+
+
+def test_run_stops_once_complete():
+    # One frame per yaw bin completes coverage
+    detector = ScriptedDetector(yaws=[-0.5, -0.25, 0.0, 0.25, 0.5])
+    session = EnrollmentSession(detector, per_yaw_bin=1, min_distance=0.0, min_samples=5)
+    source = FrameList(50)
+    progress = []
+    assert session.run(source, timeout=30, on_frame=lambda s, kept, reason: progress.append(s.coverage))
+    assert session.is_complete and session.missing_poses() == []
+    assert source.reads == 5 and len(session.samples) == 5
+    assert progress == [0.2, 0.4, 0.6, 0.8, 1.0]
+
+
+def test_run_gives_up():
+    session = EnrollmentSession(ScriptedDetector(), min_distance=0.0)
+    assert not session.run(FrameList(50), timeout=30, max_frames=4)
+    assert session.frames_seen == 4 and session.coverage < 1.0
+    assert session.missing_poses()[0].startswith("turn")
+    # Exhausted source
+    assert not EnrollmentSession(ScriptedDetector()).run(FrameList(2), timeout=30)
+
+
+class RecordingRecognizer:
+    """Records whether enrollment trained from scratch or updated"""
+
+    def __init__(self, trained: bool):
+        self.trained = trained
+        self.calls = []
+        self.encodings_path = "owner.pkl"
+
+    def is_trained(self) -> bool:
+        return self.trained
+
+    def train(self, faces) -> bool:
+        self.calls.append(('train', len(faces)))
+        return True
+
+    def update(self, faces) -> bool:
+        self.calls.append(('update', len(faces)))
+        return True
+
+
+def session_with_samples(count: int) -> EnrollmentSession:
+    session = EnrollmentSession(ScriptedDetector(), per_cell=count, min_distance=0.0, min_samples=5)
+    for seed in range(count):
+        session.offer(synthetic_frame(640, 480, seed=seed))
+    assert len(session.samples) == count
+    return session
+
+
+@pytest.mark.parametrize("trained, replace, expected", [
+    (True, False, 'update'),
+    (True, True, 'train'),
+    (False, False, 'train'),
+])
+def test_train_mode(trained, replace, expected):
+    recognizer = RecordingRecognizer(trained)
+    assert session_with_samples(6).train(recognizer, replace=replace)
+    assert recognizer.calls == [(expected, 6)]
+
+
+def test_few_samples_only_added_to_a_model():
+    assert not session_with_samples(3).train(RecordingRecognizer(trained=False))
+    assert not session_with_samples(3).train(RecordingRecognizer(trained=True), replace=True)
+    recognizer = RecordingRecognizer(trained=True)
+    assert session_with_samples(3).train(recognizer)
+    assert recognizer.calls == [('update', 3)]
@@ -0,0 +1,239 @@
+"""Gallery adaptation: clock windows, folding, the sample cap, rollback and restarts"""
+
+import shutil
+
+import pytest
+
+from src.core import gallery_adapter
+from src.core.face_recognizer import FaceRecognizer
+from src.core.gallery_adapter import GalleryAdapter, model_samples
+from tests.synthetic import synthetic_faces
+
+WINDOW = 3600.0
+BASE_SAMPLES = 10
+
+
+class Clock:
+    """Settable time.time() for the adapter"""
+
+    def __init__(self, now: float):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock(1_800_000_000.0 + 123)
+    monkeypatch.setattr(gallery_adapter.time, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def model(gallery, tmp_path):
+    path = tmp_path / "encodings.pkl"
+    shutil.copy(gallery(BASE_SAMPLES), path)
+    return path
+
+
+def make_adapter(model, **options) -> GalleryAdapter:
+    options.setdefault('window_seconds', WINDOW)
+    options.setdefault('per_window', 5)
+    return GalleryAdapter(str(model), **options)
+
+
+def collect(adapter, count: int, seed: int = 1) -> None:
+    for face in synthetic_faces(count, seed=seed):
+        adapter.consider(10.0, lambda face=face: face)
+
+
+def samples(model) -> int:
+    return model_samples(FaceRecognizer(str(model)))
+
+
+def test_windows_aligned_to_clock(model, clock):
+    adapter = make_adapter(model)
+    assert adapter._window_start == 1_800_000_000.0
+    collect(adapter, 3)
+    clock.now = 1_800_000_000.0 + WINDOW - 1
+    assert adapter.pending == 0
+    clock.now += 1
+    assert adapter.pending == 3
+    assert adapter._window_start == 1_800_000_000.0 + WINDOW
+
+
+def test_weak_matches_ignored(model, clock):
+    adapter = make_adapter(model, accept_confidence=30.0)
+    face = synthetic_faces(1)[0]
+    assert not adapter.consider(31.0, lambda: face)
+    assert adapter.consider(30.0, lambda: face)
+    assert adapter.status()['collecting'] == 1
+
+
+def test_reservoir_bounded_per_window(model, clock):
+    adapter = make_adapter(model, per_window=5)
+    collect(adapter, 40)
+    assert adapter.status()['collecting'] == 5
+    assert adapter._seen == 40
+
+
+def test_incremental_fold(model, clock):
+    adapter = make_adapter(model)
+    collect(adapter, 8)
+    clock.now += WINDOW
+    assert adapter.fold()
+    assert samples(model) == BASE_SAMPLES + 5
+    status = adapter.status()
+    assert status['base_samples'] == BASE_SAMPLES and status['folded_samples'] == 5
+    assert len(status['versions']) == 1 and status['pending'] == 0
+    assert not adapter.fold()  # nothing closed since
+
+
+def test_rebuilt_from_base_past_cap(model, clock):
+    adapter = make_adapter(model, max_samples=BASE_SAMPLES + 7)
+    for seed in (1, 2):
+        collect(adapter, 5, seed=seed)
+        clock.now += WINDOW
+        assert adapter.fold()
+    # Base + two windows is over the cap: the oldest window is dropped
+    assert samples(model) == BASE_SAMPLES + 5
+    status = adapter.status()
+    assert status['windows'] == 1 and status['folded_samples'] == 5
+    assert len(list((adapter.state_dir / "windows").glob("*.npy"))) == 2  # the older version still uses it
+
+
+def test_rollback_restores_previous_model(model, clock):
+    adapter = make_adapter(model)
+    before = model.read_bytes()
+    collect(adapter, 5)
+    clock.now += WINDOW
+    assert adapter.fold()
+    assert model.read_bytes() != before
+
+    assert adapter.rollback()
+    assert model.read_bytes() == before
+    status = adapter.status()
+    assert status['versions'] == [] and status['windows'] == 0
+    assert not adapter.rollback()
+
+
+def test_reset_restores_enrolled_model(model, clock):
+    adapter = make_adapter(model)
+    before = model.read_bytes()
+    for seed in (1, 2):
+        collect(adapter, 5, seed=seed)
+        clock.now += WINDOW
+        assert adapter.fold()
+    assert adapter.reset()
+    assert model.read_bytes() == before
+    assert not adapter.state_dir.exists()
+
+
+def test_open_window_survives_restart(model, clock):
+    adapter = make_adapter(model)
+    collect(adapter, 3)
+    assert adapter.save()
+
+    restarted = make_adapter(model)
+    assert restarted.status()['collecting'] == 3 and restarted.pending == 0
+    assert restarted._seen == 3
+
+    clock.now += WINDOW
+    assert restarted.fold()
+    assert samples(model) == BASE_SAMPLES + 3
+
+
+def test_window_closed_while_down_folds_on_start(model, clock):
+    adapter = make_adapter(model)
+    collect(adapter, 4)
+    assert adapter.save()
+
+    clock.now += 2 * WINDOW
+    restarted = make_adapter(model)
+    assert restarted.pending == 4 and restarted.status()['collecting'] == 0
+    assert restarted.fold()
+    assert samples(model) == BASE_SAMPLES + 4
+
+    # Killed before saving: the same window is restored again but not refolded
+    again = make_adapter(model)
+    assert again.pending == 4
+    assert not again.fold()
+    assert samples(model) == BASE_SAMPLES + 4
+
+
+def test_save_without_samples_leaves_nothing(model, clock):
+    adapter = make_adapter(model)
+    assert adapter.save()
+    assert not adapter.state_dir.exists() or not any(adapter.state_dir.iterdir())
+    assert make_adapter(model).status()['collecting'] == 0
+
+
+def test_retrained_model_becomes_new_base(model, clock):
+    adapter = make_adapter(model, max_samples=BASE_SAMPLES + 17)
+    collect(adapter, 5, seed=1)
+    clock.now += WINDOW
+    assert adapter.fold()
+
+    # Enrollment adds samples to the model outside adaptation
+    assert FaceRecognizer(str(model)).update(synthetic_faces(5, seed=50))
+    enrolled = BASE_SAMPLES + 10
+    collect(adapter, 5, seed=2)
+    clock.now += WINDOW
+    assert adapter.fold()
+    status = adapter.status()
+    assert status['base_samples'] == enrolled and status['windows'] == 1
+    assert len(status['versions']) == 1  # versions from before the retrain are gone
+
+    # Past the cap the rebuild starts from the retrained model, not the enrolled one
+    collect(adapter, 5, seed=3)
+    clock.now += WINDOW
+    assert adapter.fold()
+    assert samples(model) == enrolled + 5
+
+
+def test_rollback_keeps_digest_current(model, clock):
+    adapter = make_adapter(model)
+    for seed in (1, 2):
+        collect(adapter, 5, seed=seed)
+        clock.now += WINDOW
+        assert adapter.fold()
+    assert adapter.rollback()
+    collect(adapter, 5, seed=3)
+    clock.now += WINDOW
+    assert adapter.fold()
+    status = adapter.status()
+    assert status['base_samples'] == BASE_SAMPLES  # not mistaken for a retrain
+    assert status['folded_samples'] == 10
+
+
+@pytest.mark.parametrize("failure", ["update fails", "update raises", "base over cap", "no model"])
+def test_failed_fold_keeps_samples(model, clock, monkeypatch, failure):
+    adapter = make_adapter(model, max_samples=5 if failure == "base over cap" else 500)
+    before = model.read_bytes()
+    collect(adapter, 5)
+    clock.now += WINDOW
+
+    def broken_update(self, faces, labels=None):
+        if failure == "update raises":
+            raise RuntimeError("disk full")
+        return False
+    if failure.startswith("update"):
+        monkeypatch.setattr(FaceRecognizer, "update", broken_update)
+    if failure == "no model":
+        model.rename(model.with_suffix(".moved"))
+
+    assert not adapter.fold()
+    assert adapter.pending == 5
+    if failure == "no model":
+        model.with_suffix(".moved").rename(model)
+    assert model.read_bytes() == before
+    assert adapter.status()['versions'] == []
+    assert not any((adapter.state_dir / "versions").glob("*.pkl"))
+
+    monkeypatch.undo()
+    monkeypatch.setattr(gallery_adapter.time, "time", clock)
+    adapter.max_samples = 500
+    assert adapter.fold()
+    assert adapter.pending == 0
+    assert samples(model) == BASE_SAMPLES + 5
@@ -0,0 +1,107 @@
+"""Event history queries and retention against small fixture databases"""
+
+import time
+
+import pytest
+
+from src.utils.history import (HistoryEvent, HistoryStore, connect, daily_percentiles,
+                               false_unknown_candidates, verdict_counts)
+
+
+def local_noon(day: int) -> float:
+    """Wall-clock time of noon on 2026-01-<day>, local time (days group by local date)"""
+    return time.mktime((2026, 1, day, 12, 0, 0, 0, 0, -1))
+
+
+def write(path, events, retention_days=0):
+    store = HistoryStore(str(path), retention_days=retention_days, flush_interval=0.05)
+    assert store.start()
+    for event in events:
+        store.record(event)
+    store.close()
+    return connect(str(path), readonly=True)
+
+
+@pytest.fixture
+def latency_db(tmp_path):
+    events = [HistoryEvent('idle', ts=local_noon(10) + i, verdict='owner', end_to_end=(i + 1) / 10)
+              for i in range(10)]
+    events += [HistoryEvent('idle', ts=local_noon(11) + i, verdict='unknown', end_to_end=v)
+               for i, v in enumerate([0.4, 0.2])]
+    events += [
+        HistoryEvent('idle', ts=local_noon(11) + 5, verdict='no_face'),            # no timing
+        HistoryEvent('pre_sleep', ts=local_noon(11) + 6, verdict='owner', end_to_end=9.0),
+    ]
+    return write(tmp_path / "history.db", events)
+
+
+def test_daily_percentiles(latency_db):
+    first, second = daily_percentiles(latency_db)
+    assert (first['day'], second['day']) == ("2026-01-10", "2026-01-11")
+    # Nearest rank: p50 of 10 values is the 5th, p95 the 10th
+    assert first['count'] == 10
+    assert first['p50'] == pytest.approx(0.5) and first['p95'] == pytest.approx(1.0)
+    assert first['max'] == pytest.approx(1.0)
+    # Other kinds and rows without the timing are left out
+    assert second['count'] == 2
+    assert second['p50'] == pytest.approx(0.2) and second['p95'] == pytest.approx(0.4)
+
+
+def test_daily_percentiles_filters(latency_db):
+    assert [d['day'] for d in daily_percentiles(latency_db, since=local_noon(11) - 3600)] == ["2026-01-11"]
+    (pre_sleep,) = daily_percentiles(latency_db, kind='pre_sleep', percentiles=(0.99,))
+    assert pre_sleep['p99'] == pytest.approx(9.0)
+    with pytest.raises(ValueError):
+        daily_percentiles(latency_db, column='ts; DROP TABLE events')
+
+
+def test_verdict_counts(latency_db):
+    assert verdict_counts(latency_db) == {
+        "2026-01-10": {'owner': 10},
+        "2026-01-11": {'unknown': 2, 'no_face': 1, 'owner': 1},
+    }
+
+
+def test_false_unknown_candidates(tmp_path):
+    t = local_noon(12)
+    unknown = dict(verdict='unknown', threshold=50.0)
+    conn = write(tmp_path / "history.db", [
+        HistoryEvent('idle', ts=t, confidence=80.0, **unknown),           # user back 60 s later
+        HistoryEvent('active', ts=t + 60),
+        HistoryEvent('idle', ts=t + 1000, confidence=70.0, **unknown),    # owner seen 30 s later
+        HistoryEvent('idle', ts=t + 1030, verdict='owner', confidence=30.0, threshold=50.0),
+        HistoryEvent('idle', ts=t + 2000, confidence=58.0, **unknown),    # near miss
+        HistoryEvent('idle', ts=t + 3000, confidence=52.0, **unknown),    # nearer miss
+        HistoryEvent('idle', ts=t + 4000, confidence=90.0, **unknown),    # a stranger
+        HistoryEvent('idle', ts=t + 5000, confidence=85.0, **unknown),    # back too late
+        HistoryEvent('active', ts=t + 5300),
+    ])
+
+    rows = [(row['confidence'], row['followed_by']) for row in false_unknown_candidates(conn, within=120, margin=10)]
+    # Followed ones first, then by distance to the threshold
+    assert rows == [(70.0, 'owner'), (80.0, 'active'), (52.0, None), (58.0, None)]
+
+    assert [row['confidence'] for row in false_unknown_candidates(conn, within=120, margin=5)] == [70.0, 80.0, 52.0]
+    assert [row['confidence'] for row in false_unknown_candidates(conn, since=t + 1500)] == [52.0, 58.0]
+
+
+def test_retention_removes_old_rows(tmp_path):
+    now = time.time()
+    conn = write(tmp_path / "history.db", [
+        HistoryEvent('idle', ts=now - 3 * 86400, verdict='owner'),
+        HistoryEvent('idle', ts=now - 60, verdict='unknown'),
+    ], retention_days=1)
+    assert [row['verdict'] for row in conn.execute("SELECT verdict FROM events")] == ['unknown']
+
+
+def test_retention_disabled_keeps_rows(tmp_path):
+    conn = write(tmp_path / "history.db", [HistoryEvent('idle', ts=1.0, verdict='owner')], retention_days=0)
+    assert conn.execute("SELECT count(*) FROM events").fetchone()[0] == 1
+
+
+def test_record_after_close_is_dropped(tmp_path):
+    store = HistoryStore(str(tmp_path / "history.db"))
+    assert store.start()
+    store.close()
+    store.record(HistoryEvent('idle', verdict='owner'))
+    assert store.dropped == 1
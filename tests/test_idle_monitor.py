@@ -0,0 +1,87 @@
+"""Sequenced KWin state reports: ordering, duplicates and untyped calls"""
+
+import pytest
+from dbus_next import Message, MessageType
+
+from src.monitors.idle_monitor import IdleMonitor
+from src.utils.metrics import MetricsRegistry
+
+
+@pytest.fixture
+def monitor():
+    calls = []
+    monitor = IdleMonitor(calls.append, bus_manager=object(), metrics=MetricsRegistry())
+    monitor.calls = calls
+    return monitor
+
+
+def counters(monitor) -> dict:
+    return monitor.metrics.snapshot()['counters'].get('idle_events', {})
+
+
+def state_call(monitor, signature: str, body: list, member: str = "stateChanged") -> Message:
+    return Message(destination=monitor.service_name, path=monitor.object_path,
+                   interface=monitor.interface_name, member=member, signature=signature, body=body,
+                   serial=1)
+
+
+def test_in_order_reports_dispatch(monitor):
+    monitor.state_changed(True, 100)
+    monitor.state_changed(False, 200)
+    monitor.state_changed(True, 300)
+    assert monitor.calls == [True, False, True]
+    assert monitor.last_seq == 300 and monitor.is_dimmed
+
+
+def test_stale_report_dropped(monitor):
+    monitor.state_changed(True, 200)
+    monitor.state_changed(False, 100)  # reordered: older than the last report
+    assert monitor.calls == [True]
+    assert monitor.last_seq == 200 and monitor.is_dimmed
+    assert counters(monitor)['stale'] == 1
+
+
+def test_duplicate_seq_dropped(monitor):
+    monitor.state_changed(True, 100)
+    monitor.state_changed(False, 100)
+    assert monitor.calls == [True]
+    assert counters(monitor)['stale'] == 1
+
+
+def test_repeated_state_dropped(monitor):
+    monitor.state_changed(True, 100)
+    monitor.state_changed(True, 200)
+    assert monitor.calls == [True]
+    assert monitor.last_seq == 200
+    assert counters(monitor)['repeat'] == 1
+
+
+def test_initial_active_report_is_a_repeat(monitor):
+    monitor.state_changed(False, 1)
+    assert monitor.calls == []
+    assert monitor.last_seq == 1
+
+
+@pytest.mark.parametrize("signature, seq", [("bd", 1234.0), ("bx", 1234), ("bi", 1234), ("bu", 1234)])
+def test_untyped_seq_handled(monitor, signature, seq):
+    reply = monitor._handle_untyped_state_change(state_call(monitor, signature, [True, seq]))
+    assert reply is not None and reply.message_type == MessageType.METHOD_RETURN
+    assert monitor.calls == [True]
+    assert monitor.last_seq == 1234
+
+
+def test_untyped_seq_follows_ordering(monitor):
+    monitor.state_changed(True, 500)
+    monitor._handle_untyped_state_change(state_call(monitor, "bd", [False, 400.0]))
+    assert monitor.calls == [True]
+
+
+@pytest.mark.parametrize("signature, body, member", [
+    ("bt", [True, 1], "stateChanged"),       # typed: the exported interface handles it
+    ("bs", [True, "1"], "stateChanged"),     # not numeric
+    ("b", [True], "stateChanged"),
+    ("bd", [True, 1.0], "somethingElse"),
+])
+def test_other_calls_passed_through(monitor, signature, body, member):
+    assert monitor._handle_untyped_state_change(state_call(monitor, signature, body, member)) is None
+    assert monitor.calls == []
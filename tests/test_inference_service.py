@@ -0,0 +1,398 @@
+"""Inference service protocol, client retries, per-uid galleries and capture sharing"""
+
+import asyncio
+import json
+import os
+import shutil
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from dbus_next import Message, MessageType, Variant
+
+from src.core import inference_protocol as proto
+from src.core.frame_source import SyntheticSource
+from src.core.inference_client import RemotePresenceChecker
+from src.core.inference_protocol import Op, Status
+from src.core.inference_service import InferenceService, LogindSeatCheck
+from src.core.presence_result import Verdict
+from src.utils.metrics import MetricsRegistry
+
+
+class ScriptedServer:
+    """Unix socket server answering each connection with a scripted handler"""
+
+    def __init__(self, path: str, handlers):
+        self.handlers = list(handlers)
+        self.requests = []
+        self.listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.listener.bind(path)
+        self.listener.listen()
+        self.thread = threading.Thread(target=self._serve, daemon=True)
+        self.thread.start()
+
+    def _serve(self):
+        for handler in self.handlers:
+            conn, _ = self.listener.accept()
+            with conn:
+                handler(self, conn)
+
+    def receive(self, conn):
+        message = proto.recv_message(conn)
+        self.requests.append(message)
+        return message
+
+    def close(self):
+        self.listener.close()
+
+
+def reply_pong(server, conn):
+    _, request_id, _ = server.receive(conn)
+    conn.sendall(proto.encode(Status.OK, request_id))
+
+
+def drop_without_reply(server, conn):
+    server.receive(conn)
+
+
+def never_reply(server, conn):
+    server.receive(conn)
+    conn.recv(1)  # until the client gives up and closes
+
+
+@pytest.fixture
+def socket_path(tmp_path):
+    return str(tmp_path / "inference.sock")
+
+
+def client_for(socket_path, timeout=2.0):
+    return RemotePresenceChecker(socket_path, "unused.pkl", timeout=timeout, metrics=MetricsRegistry())
+
+
+def test_header_round_trip():
+    message = proto.encode(Op.CHECK, 7, b"payload")
+    assert proto.decode_header(message[:proto.HEADER.size]) == (Op.CHECK, 7, len(b"payload"))
+
+
+@pytest.mark.parametrize("header", [
+    proto.HEADER.pack(b"XX", proto.VERSION, Op.PING, 1, 0),
+    proto.HEADER.pack(proto.MAGIC, proto.VERSION + 1, Op.PING, 1, 0),
+    proto.HEADER.pack(proto.MAGIC, proto.VERSION, Op.PING, 1, proto.MAX_PAYLOAD + 1),
+])
+def test_bad_header_rejected(header):
+    with pytest.raises(proto.ProtocolError):
+        proto.decode_header(header)
+
+
+def test_payload_cap_fits_adapted_models(gallery):
+    per_sample = os.path.getsize(gallery(100)) / 100
+    assert 500 * per_sample < proto.MAX_PAYLOAD < 100 * 1024 * 1024
+
+
+def test_verdict_codes():
+    for verdict in proto.VERDICTS:
+        assert proto.verdict_name(proto.verdict_code(verdict)) == verdict
+    assert proto.verdict_name(200) == Verdict.ERROR
+
+
+def test_client_retries_dropped_connection(socket_path):
+    server = ScriptedServer(socket_path, [drop_without_reply, reply_pong])
+    try:
+        assert client_for(socket_path).ping()
+        assert len(server.requests) == 2
+    finally:
+        server.close()
+
+
+def test_client_does_not_resend_after_timeout(socket_path):
+    server = ScriptedServer(socket_path, [never_reply, reply_pong])
+    try:
+        client = client_for(socket_path, timeout=0.1)
+        assert not client.ping()
+        assert len(server.requests) == 1
+        # The next request starts on a fresh connection
+        assert client.ping()
+        assert len(server.requests) == 2
+    finally:
+        server.close()
+
+
+def test_client_reports_unreachable_service(socket_path):
+    client = client_for(socket_path)
+    assert not client.ping()
+    assert client.check().verdict == Verdict.ERROR
+
+
+class FixedFaceDetector:
+    """Stand-in for YuNet (synthetic frames hold no real face): one face per frame"""
+
+    def __init__(self):
+        self.is_loaded = False
+        self.calls = 0
+
+    def load(self, width, height):
+        self.is_loaded = True
+
+    def unload(self):
+        self.is_loaded = False
+
+    def detect(self, frame):
+        self.calls += 1
+        return [(220, 140, 200, 200, 0.9)]
+
+
+class SlowSource(SyntheticSource):
+    """Synthetic camera taking `delay` seconds per frame"""
+
+    def __init__(self, delay: float):
+        super().__init__(640, 480, motion=8)
+        self.delay = delay
+        self.opened = 0
+
+    def open(self) -> bool:
+        self.opened += 1
+        return super().open()
+
+    def read(self, out=None):
+        time.sleep(self.delay)
+        return super().read(out)
+
+
+@pytest.fixture
+def service(tmp_path):
+    """Builds and starts an inference service on its own loop thread"""
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    started = []
+
+    def build(delay: float = 0.0, **options):
+        options.setdefault('warmup_time', 0)
+        options.setdefault('unload_after', 0)
+        options.setdefault('metrics', MetricsRegistry())
+        service = InferenceService(str(tmp_path / "inference.sock"), FixedFaceDetector(), SlowSource(delay),
+                                   **options)
+        service.loop = loop
+        assert asyncio.run_coroutine_threadsafe(service.start(), loop).result()
+        started.append(service)
+        return service
+    yield build
+
+    for service in started:
+        asyncio.run_coroutine_threadsafe(service.stop(), loop).result()
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+
+
+def call(service, uid, op, payload=b""):
+    """Dispatch a request as if it came from uid"""
+    return asyncio.run_coroutine_threadsafe(service._dispatch(uid, op, payload), service.loop).result()
+
+
+def check_payload(digest: bytes) -> bytes:
+    return proto.CHECK_REQUEST.pack(2, 0.0, 50.0, digest)
+
+
+def service_counters(service, name) -> dict:
+    return service.metrics.snapshot()['counters'].get(name, {})
+
+
+def test_check_round_trip(service, gallery):
+    srv = service()
+    client = RemotePresenceChecker(srv.socket_path, gallery(10), frames_per_check=2, metrics=MetricsRegistry())
+    result = client.check()
+    assert result.verdict in (Verdict.OWNER, Verdict.UNKNOWN)
+    assert result.frames == 2 and result.face_count == 1
+    assert set(client.last_timings) == {'capture', 'detect', 'recognize'}
+    assert srv.detector.calls == 2
+    assert client.verify() in (True, False)
+    assert client.stats()['clients'] == 1
+
+
+def test_gallery_uploaded_once(service, gallery):
+    srv = service()
+    client = RemotePresenceChecker(srv.socket_path, gallery(10), frames_per_check=1, metrics=MetricsRegistry())
+    client.check()
+    client.check()
+    assert len(srv._galleries) == 1
+
+
+def test_retrained_gallery_uploaded_again(service, gallery, tmp_path):
+    srv = service()
+    path = tmp_path / "owner.pkl"
+    shutil.copy(gallery(10), path)
+    client = RemotePresenceChecker(srv.socket_path, str(path), frames_per_check=1, metrics=MetricsRegistry())
+    client.check()
+    shutil.copy(gallery(100), path)
+    os.utime(path, ns=(time.time_ns() + 10**9,) * 2)
+    assert client.check().verdict != Verdict.ERROR
+    assert len(srv._galleries) == 2
+
+
+def test_evicted_gallery_uploaded_again(service, gallery):
+    srv = service(max_galleries=1)
+    clients = [RemotePresenceChecker(srv.socket_path, gallery(size), frames_per_check=1, metrics=MetricsRegistry())
+               for size in (10, 100)]
+    for client in clients + clients:
+        assert client.check().verdict != Verdict.ERROR
+    assert len(srv._galleries) == 1
+
+
+def test_gallery_only_served_to_its_uid(service, gallery):
+    srv = service()
+    with open(gallery(10), 'rb') as f:
+        model = f.read()
+    status, digest = call(srv, 1000, Op.LOAD, model)
+    assert status == Status.OK and digest == proto.gallery_digest(model)
+
+    status, _ = call(srv, 1001, Op.CHECK, check_payload(digest))
+    assert status == Status.NOT_LOADED
+    status, _ = call(srv, 1001, Op.VERIFY, proto.VERIFY_REQUEST.pack(50.0, 8.0, digest))
+    assert status == Status.NOT_LOADED
+    status, _ = call(srv, 1000, Op.CHECK, check_payload(digest))
+    assert status == Status.OK
+    assert srv.detector.calls == 2  # only the owner's check captured
+
+
+@pytest.mark.parametrize("op, payload", [
+    (Op.LOAD, b"not a model"),
+    (Op.CHECK, b"short"),
+    (99, b""),
+])
+def test_bad_requests(service, op, payload):
+    srv = service()
+    status, reply = call(srv, 1000, op, payload)
+    assert status == Status.BAD_REQUEST and reply
+
+
+def test_service_never_opens_client_paths(service, tmp_path):
+    srv = service()
+    # A path where a digest belongs is just an unknown digest
+    status, _ = call(srv, 1000, Op.CHECK, check_payload(b"/etc/shadow".ljust(32, b"\0")))
+    assert status == Status.NOT_LOADED
+
+
+def test_recent_capture_shared(service, gallery):
+    srv = service(coalesce_window=10.0)
+    clients = [RemotePresenceChecker(srv.socket_path, gallery(size), frames_per_check=2, metrics=MetricsRegistry())
+               for size in (10, 100)]
+    for client in clients:
+        client.check()
+    assert srv.source.opened == 1
+    assert service_counters(srv, 'service_checks') == {'captured': 1, 'shared': 1}
+    assert clients[1].metrics.snapshot()['counters']['shared_checks'] == {'': 1}
+
+
+def test_concurrent_checks_share_one_capture(service, gallery):
+    srv = service(delay=0.05, coalesce_window=0.0)
+    clients = [RemotePresenceChecker(srv.socket_path, gallery(size), frames_per_check=2, metrics=MetricsRegistry())
+               for size in (10, 100)]
+    for client in clients:
+        client.verify()  # connect and upload first, so both checks start together
+    srv.metrics.reset()
+    opened = srv.source.opened
+
+    with ThreadPoolExecutor(2) as pool:
+        results = list(pool.map(lambda c: c.check(), clients))
+    assert all(r.frames == 2 for r in results)
+    assert srv.source.opened == opened + 1
+    assert service_counters(srv, 'service_checks') == {'captured': 1, 'shared': 1}
+
+
+def model_bytes(gallery, size: int) -> bytes:
+    with open(gallery(size), 'rb') as f:
+        return f.read()
+
+
+def test_galleries_evicted_per_uid(service, gallery):
+    srv = service(max_galleries=2)
+    _, kept = call(srv, 1000, Op.LOAD, model_bytes(gallery, 10))
+    for size in (20, 30, 40):
+        assert call(srv, 1001, Op.LOAD, model_bytes(gallery, size))[0] == Status.OK
+    assert (1000, kept) in srv._galleries
+    assert sum(1 for uid, _ in srv._galleries if uid == 1001) == 2
+
+
+def test_stats_only_list_own_galleries(service, gallery):
+    srv = service()
+    _, digest = call(srv, 1000, Op.LOAD, model_bytes(gallery, 10))
+    call(srv, 1001, Op.LOAD, model_bytes(gallery, 20))
+    status, reply = call(srv, 1000, Op.STATS)
+    assert status == Status.OK
+    assert json.loads(reply)['galleries'] == [digest.hex()[:12]]
+
+
+def seat_users(*uids):
+    async def check(uid):
+        return uid in uids
+    return check
+
+
+def test_uid_without_seat_denied(service, gallery):
+    srv = service(seat_check=seat_users(1000))
+    model = model_bytes(gallery, 10)
+    assert call(srv, 1001, Op.LOAD, model)[0] == Status.DENIED
+    _, digest = call(srv, 1000, Op.LOAD, model)
+    assert call(srv, 1001, Op.CHECK, check_payload(digest))[0] == Status.DENIED
+    assert call(srv, 1001, Op.VERIFY, proto.VERIFY_REQUEST.pack(50.0, 8.0, digest))[0] == Status.DENIED
+    assert call(srv, 1001, Op.PING)[0] == Status.OK
+    assert srv.detector.calls == 0 and srv.source.opened == 0
+
+
+def test_client_without_seat_denied_before_upload(service, gallery):
+    srv = service(seat_check=seat_users())
+    client = RemotePresenceChecker(srv.socket_path, gallery(10), frames_per_check=1, metrics=MetricsRegistry())
+    assert client.ping()
+    assert client.check().verdict == Verdict.ERROR
+    assert srv._galleries == {} and srv.source.opened == 0
+
+
+class FakeLogind:
+    """ListSessions and Session properties from a table of sessions"""
+
+    def __init__(self, sessions, fail=False):
+        self.sessions = sessions  # path -> (uid, seat, active, remote)
+        self.fail = fail
+        self.calls = 0
+
+    async def call(self, msg, bus_type):
+        self.calls += 1
+        if self.fail:
+            return Message(message_type=MessageType.ERROR, error_name="org.example.Error", reply_serial=1)
+        if msg.member == "ListSessions":
+            body = [[(path.rsplit('/', 1)[-1], uid, "user", seat, path)
+                     for path, (uid, seat, _, _) in self.sessions.items()]]
+            return Message(message_type=MessageType.METHOD_RETURN, reply_serial=1, signature="a(susso)", body=body)
+        _, _, active, remote = self.sessions[msg.path]
+        value = active if msg.body[1] == "Active" else remote
+        return Message(message_type=MessageType.METHOD_RETURN, reply_serial=1, signature="v",
+                       body=[Variant('b', value)])
+
+
+@pytest.mark.parametrize("uid, allowed", [
+    (1000, True),    # active on seat0
+    (1001, False),   # SSH: no seat
+    (1002, False),   # on seat0 but switched away
+    (1003, False),   # remote session on a seat
+    (1004, False),   # not logged in
+])
+def test_logind_seat_check(uid, allowed):
+    bus = FakeLogind({
+        "/org/freedesktop/login1/session/c1": (1000, "seat0", True, False),
+        "/org/freedesktop/login1/session/c2": (1001, "", True, False),
+        "/org/freedesktop/login1/session/c3": (1002, "seat0", False, False),
+        "/org/freedesktop/login1/session/c4": (1003, "seat0", True, True),
+    })
+    assert asyncio.run(LogindSeatCheck(bus)(uid)) is allowed
+
+
+def test_logind_seat_check_fails_closed_and_caches():
+    async def scenario():
+        bus = FakeLogind({}, fail=True)
+        check = LogindSeatCheck(bus, cache_seconds=60)
+        assert not await check(1000)
+        assert not await check(1000)
+        assert bus.calls == 1
+    asyncio.run(scenario())
@@ -0,0 +1,78 @@
+"""Inference worker: slot round trips, restarts and recycling"""
+
+import pytest
+
+from src.core.inference_worker import InferenceWorker
+from src.core.presence_result import Verdict
+from tests.synthetic import synthetic_frame
+
+
+@pytest.fixture
+def worker(model_path, gallery):
+    """Builds workers on YuNet and a small gallery; all are stopped afterwards"""
+    started = []
+
+    def build(**options):
+        worker = InferenceWorker(model_path=model_path, encodings_path=gallery(10), slots=2,
+                                 max_frame_shape=(480, 640, 3), **options)
+        started.append(worker)
+        return worker
+    yield build
+
+    for worker in started:
+        worker.stop()
+
+
+def analyze_frame(worker):
+    slot, view = worker.acquire_slot((480, 640, 3))
+    try:
+        view[:] = synthetic_frame(640, 480)
+        return worker.analyze(slot, view), worker.detect(slot, view)
+    finally:
+        worker.release_slot(slot)
+
+
+def test_slot_round_trip(worker):
+    w = worker()
+    (summary, timings), detections = analyze_frame(w)
+    verdict, confidence, face_count, face_box = summary
+    # Synthetic frames hold no face YuNet would find
+    assert verdict == Verdict.NO_FACE and face_count == 0
+    assert 'detect' in timings
+    assert detections == []
+    assert sorted(w._free) == [0, 1]
+
+
+def test_frame_too_large_for_slot(worker):
+    with pytest.raises(ValueError):
+        worker().acquire_slot((720, 1280, 3))
+
+
+def test_start_waits_longer_than_request_timeout(worker):
+    # A cold interpreter start and cv2 import take far longer than this
+    w = worker(timeout=0.01)
+    assert w.start()
+    assert w.is_alive
+
+
+def test_killed_worker_respawned(worker):
+    w = worker()
+    assert w.start()
+    pid = w.pid
+    w.process.kill()
+    w.process.join()
+
+    (summary, _), _ = analyze_frame(w)
+    assert summary[0] == Verdict.NO_FACE
+    assert w.is_alive and w.pid != pid
+
+
+def test_recycled_after_requests(worker):
+    w = worker(recycle_after=3)
+    assert w.start()
+    pid = w.pid
+    analyze_frame(w)  # analyze + detect: two requests
+    assert w.pid == pid
+    analyze_frame(w)
+    assert w.is_alive and w.pid != pid
+    assert w._requests == 1  # the detect after the recycle
@@ -0,0 +1,176 @@
+"""StagePipeline ordering, early stop, errors and backpressure; pipelined vs serial checks"""
+
+import threading
+import time
+
+import pytest
+
+from src.core.pipeline import StagePipeline
+from src.core.presence_result import Verdict
+
+
+def pipeline_threads():
+    return [t for t in threading.enumerate() if t.name.startswith("pipeline-")]
+
+
+def run(pipeline, source, count, sink, timeout=5.0):
+    """StagePipeline.run on a helper thread, failing instead of hanging"""
+    outcome = {}
+
+    def target():
+        try:
+            outcome['stats'] = pipeline.run(source, count, sink)
+        except Exception as e:
+            outcome['error'] = e
+    thread = threading.Thread(target=target)
+    thread.start()
+    thread.join(timeout)
+    assert not thread.is_alive(), "pipeline run hung"
+    assert pipeline_threads() == []
+    if 'error' in outcome:
+        raise outcome['error']
+    return outcome['stats']
+
+
+class Counter:
+    """Source producing 0, 1, 2, ... (None after `limit`)"""
+
+    def __init__(self, limit=None):
+        self.limit = limit
+        self.produced = 0
+
+    def __call__(self):
+        if self.limit is not None and self.produced >= self.limit:
+            return None
+        self.produced += 1
+        return self.produced - 1
+
+
+def jitter(item):
+    time.sleep(0.001 * ((item * 7) % 3))
+    return item
+
+
+def test_items_arrive_in_order():
+    received = []
+    pipeline = StagePipeline([('a', jitter), ('b', lambda item: item * 10), ('c', jitter)], depth=2)
+    stats = run(pipeline, Counter(), 20, lambda item: received.append(item))
+    assert received == [i * 10 for i in range(20)]
+    assert stats.items == 20
+    assert set(stats.busy) == {'capture', 'a', 'b', 'c'}
+
+
+def test_source_exhausted_early():
+    received = []
+    stats = run(StagePipeline([('a', jitter)]), Counter(limit=3), 10, received.append)
+    assert received == [0, 1, 2] and stats.items == 3
+
+
+def test_sink_stops_run():
+    received = []
+    source = Counter()
+
+    def sink(item):
+        received.append(item)
+        return item == 2
+    stats = run(StagePipeline([('a', jitter), ('b', jitter)], depth=1), source, 1000, sink)
+    assert received == [0, 1, 2] and stats.items == 3
+    assert source.produced < 20  # in-flight items only, not the whole count
+
+
+@pytest.mark.parametrize("where", ["source", "stage", "sink"])
+def test_error_propagates(where):
+    def fail_at(item):
+        if item == 3:
+            raise ValueError(where)
+        return item
+
+    received = []
+    counter = Counter()
+    source = (lambda: fail_at(counter())) if where == "source" else counter
+    stage = fail_at if where == "stage" else jitter
+    sink = (lambda item: fail_at(item) and False) if where == "sink" else received.append
+
+    with pytest.raises(ValueError, match=where):
+        run(StagePipeline([('a', stage), ('b', jitter)], depth=1), source, 1000, sink)
+    assert counter.produced < 20
+    assert received == list(range(len(received)))  # whatever arrived before the error, in order
+
+
+def test_backpressure_bounds_items_in_flight():
+    depth, stages = 2, [('a', lambda item: item), ('b', lambda item: item)]
+    source = Counter()
+    ahead = []
+
+    def slow_sink(item):
+        time.sleep(0.005)
+        ahead.append(source.produced - (item + 1))
+
+    run(StagePipeline(stages, depth=depth), source, 60, slow_sink)
+    # Each queue holds `depth`, and each thread at most one more in hand
+    assert max(ahead) <= (len(stages) + 1) * depth + len(stages) + 1
+    assert max(ahead) > 0  # the source did run ahead of the sink
+
+
+class FixedFaceDetector:
+    """Stand-in for YuNet (synthetic frames hold no real face): one face per frame"""
+
+    def __init__(self):
+        self.is_loaded = False
+
+    def load(self, width, height):
+        self.is_loaded = True
+
+    def unload(self):
+        self.is_loaded = False
+
+    def detect(self, frame):
+        return self.detect_prepared(self.prepare(frame), frame.shape[1])
+
+    def prepare(self, frame):
+        return frame
+
+    def detect_prepared(self, image, frame_width):
+        return [(220, 140, 200, 200, 0.9)]
+
+
+class ScriptedRecognizer:
+    """Recognizer matching the owner on one call only"""
+
+    def __init__(self, owner_on):
+        self.owner_on = owner_on
+        self.calls = 0
+        self.is_loaded = True
+
+    def ensure_loaded(self):
+        pass
+
+    def unload(self):
+        pass
+
+    def recognize(self, face):
+        self.calls += 1
+        if self.calls == self.owner_on:
+            return True, 20.0
+        return False, 90.0 + self.calls
+
+
+def summary(result):
+    return result.verdict, result.confidence, result.face_count, result.frames
+
+
+def test_pipelined_check_matches_serial(presence_checker):
+    results = [presence_checker(FixedFaceDetector(), frames_per_check=6, pipeline=pipeline).check()
+               for pipeline in (False, True)]
+    assert results[0].face_count == 1 and results[0].frames == 6
+    assert summary(results[1]) == summary(results[0])
+
+
+@pytest.mark.parametrize("pipeline", [False, True], ids=["serial", "pipelined"])
+def test_owner_match_stops_check(presence_checker, pipeline):
+    checker = presence_checker(FixedFaceDetector(), frames_per_check=6, pipeline=pipeline)
+    checker.recognizer = ScriptedRecognizer(owner_on=3)
+    result = checker.check()
+    assert summary(result) == (Verdict.OWNER, 20.0, 1, 3)
+    if pipeline:
+        assert checker.last_pipeline_stats.items == 3
@@ -0,0 +1,49 @@
+"""D-Bus power actions: object paths and fallbacks"""
+
+import asyncio
+
+from dbus_next import Message, MessageType
+
+from src.core.inhibitors import ScreenSaverInhibitor
+from src.core.power_actions import DBusActionBackend
+
+
+class FakeBusManager:
+    """Records calls; replies with `replies[path]` (an error by default)"""
+
+    def __init__(self, replies=None, delay=0.0):
+        self.replies = replies or {}
+        self.delay = delay
+        self.calls = []
+
+    async def call(self, msg, bus_type):
+        self.calls.append((msg.path, msg.member))
+        await asyncio.sleep(self.delay)
+        if self.replies.get(msg.path):
+            return Message(message_type=MessageType.METHOD_RETURN, reply_serial=1)
+        return Message(message_type=MessageType.ERROR, error_name="org.example.Error", reply_serial=1)
+
+
+def test_lock_uses_standard_screensaver_path():
+    async def scenario():
+        bus = FakeBusManager({ScreenSaverInhibitor.path: True})
+        assert await DBusActionBackend(bus).lock_screen()
+        assert bus.calls == [("/org/freedesktop/ScreenSaver", "Lock")]
+    asyncio.run(scenario())
+
+
+def test_lock_falls_back_to_logind(monkeypatch):
+    monkeypatch.setenv("XDG_SESSION_ID", "3")
+
+    async def scenario():
+        bus = FakeBusManager({"/org/freedesktop/login1": True})
+        assert await DBusActionBackend(bus).lock_screen()
+        assert bus.calls[-1] == ("/org/freedesktop/login1", "LockSession")
+    asyncio.run(scenario())
+
+
+def test_hung_service_times_out():
+    async def scenario():
+        bus = FakeBusManager({"/org/freedesktop/login1": True}, delay=1.0)
+        assert not await DBusActionBackend(bus, timeout=0.05).power_off()
+    asyncio.run(scenario())
@@ -0,0 +1,47 @@
+"""Power source detection from a fake /sys/class/power_supply tree"""
+
+from pathlib import Path
+
+import pytest
+
+from src.monitors.power_monitor import read_on_battery
+
+
+def supply(root: Path, name: str, **attributes: str) -> None:
+    path = root / name
+    path.mkdir(parents=True)
+    for key, value in attributes.items():
+        (path / key).write_text(value + "\n")
+
+
+@pytest.mark.parametrize("supplies, expected", [
+    ({'AC': {'type': "Mains", 'online': "1"}, 'BAT0': {'type': "Battery", 'status': "Charging"}}, False),
+    ({'AC': {'type': "Mains", 'online': "0"}, 'BAT0': {'type': "Battery", 'status': "Discharging"}}, True),
+    ({'AC': {'type': "Mains", 'online': "0"}, 'BAT0': {'type': "Battery", 'status': "Full"}}, True),
+    # Any online adapter means AC, wherever it sorts
+    ({'ADP0': {'type': "Mains", 'online': "0"}, 'ADP1': {'type': "Mains", 'online': "1"}}, False),
+    # No mains entry (some USB-C chargers): battery state decides
+    ({'BAT0': {'type': "Battery", 'status': "Discharging"}, 'ucsi-source-psy': {'type': "USB"}}, True),
+    ({'BAT0': {'type': "Battery", 'status': "Charging"}}, None),
+    # Desktops and peripheral batteries
+    ({}, None),
+    ({'hidpp_battery_0': {'type': "Battery", 'status': "Full"}}, None),
+    ({'hidpp_battery_0': {'type': "Battery", 'scope': "Device", 'status': "Discharging"}}, None),
+    ({'BAT0': {'type': "Battery", 'scope': "System", 'status': "Discharging"},
+      'hidpp_battery_0': {'type': "Battery", 'scope': "Device", 'status': "Full"}}, True),
+])
+def test_read_on_battery(tmp_path, supplies, expected):
+    for name, attributes in supplies.items():
+        supply(tmp_path, name, **attributes)
+    assert read_on_battery(tmp_path) is expected
+
+
+def test_unreadable_entries_skipped(tmp_path):
+    supply(tmp_path, "AC", type="Mains")  # no online file
+    supply(tmp_path, "BAT0", type="Battery", status="Discharging")
+    (tmp_path / "broken").mkdir()
+    assert read_on_battery(tmp_path) is True
+
+
+def test_missing_directory(tmp_path):
+    assert read_on_battery(tmp_path / "absent") is None
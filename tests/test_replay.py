@@ -0,0 +1,36 @@
+"""Recording ids across restarts and the private replay bus"""
+
+import os
+import shutil
+
+import pytest
+
+from src.replay.recording import SessionRecorder, load_events
+from src.replay.replayer import PrivateSessionBus
+
+
+@pytest.mark.filterwarnings("error")
+def test_recorder_continues_ids(tmp_path):
+    recorder = SessionRecorder(str(tmp_path))
+    recorder.begin_event(idle=False)
+    recorder.begin_event(idle=False)
+    recorder.close()
+
+    recorder = SessionRecorder(str(tmp_path))  # counts existing events without leaking the file
+    recorder.begin_event(idle=False)
+    recorder.close()
+    assert [e.id for e in load_events(str(tmp_path))] == [1, 2, 3]
+
+
+@pytest.mark.skipif(shutil.which("dbus-daemon") is None, reason="dbus-daemon not installed")
+@pytest.mark.parametrize("previous", [None, "unix:path=/run/user/1000/bus"])
+def test_private_bus_restores_environment(monkeypatch, previous):
+    if previous is None:
+        monkeypatch.delenv("DBUS_SESSION_BUS_ADDRESS", raising=False)
+    else:
+        monkeypatch.setenv("DBUS_SESSION_BUS_ADDRESS", previous)
+    bus = PrivateSessionBus()
+    address = bus.start()
+    assert os.environ["DBUS_SESSION_BUS_ADDRESS"] == address
+    bus.stop()
+    assert os.environ.get("DBUS_SESSION_BUS_ADDRESS") == previous
@@ -0,0 +1,164 @@
+"""Pre-sleep check: budget, delay lock release and re-arm after resume"""
+
+import asyncio
+import os
+import time
+
+import pytest
+from dbus_next import Message, MessageType, Variant
+
+from src.core.presence_result import PresenceResult, Verdict
+from src.monitors.sleep_monitor import SleepMonitor
+
+MAX_DELAY = 0.3
+SAFETY_MARGIN = 0.1
+
+
+class FakeLogind:
+    """Bus manager answering InhibitDelayMaxUSec and Inhibit (a pipe end as the lock fd)"""
+
+    def __init__(self):
+        self.fds = []
+        self.handlers = []
+
+    async def call(self, msg, bus_type):
+        if msg.member == "Get":
+            return Message(message_type=MessageType.METHOD_RETURN, reply_serial=1, signature="v",
+                           body=[Variant('t', int(MAX_DELAY * 1_000_000))])
+        read_end, write_end = os.pipe()
+        os.close(write_end)
+        self.fds.append(read_end)
+        return Message(message_type=MessageType.METHOD_RETURN, reply_serial=1, signature="h",
+                       body=[0], unix_fds=[read_end])
+
+    async def add_message_handler(self, handler, bus_type):
+        self.handlers.append(handler)
+
+    def remove_message_handler(self, handler, bus_type):
+        self.handlers.remove(handler)
+
+    async def add_match(self, rule, bus_type):
+        return True
+
+    async def remove_match(self, rule, bus_type):
+        return True
+
+
+def is_open(fd: int) -> bool:
+    try:
+        os.fstat(fd)
+        return True
+    except OSError:
+        return False
+
+
+def prepare_for_sleep(monitor, starting: bool) -> Message:
+    return Message(message_type=MessageType.SIGNAL, path=monitor.login1_path, interface=monitor.login1_interface,
+                   member="PrepareForSleep", signature="b", body=[starting])
+
+
+async def started_monitor(presence_check, on_verdict=None) -> SleepMonitor:
+    monitor = SleepMonitor(presence_check, on_verdict, safety_margin=SAFETY_MARGIN, bus_manager=FakeLogind())
+    assert await monitor.start()
+    assert monitor.max_delay == pytest.approx(MAX_DELAY)
+    return monitor
+
+
+async def suspend(monitor) -> float:
+    """Deliver PrepareForSleep(true) and wait for the check; returns the seconds it took"""
+    start = time.monotonic()
+    monitor._handle_signal(prepare_for_sleep(monitor, True))
+    await monitor._task
+    return time.monotonic() - start
+
+
+def test_verdict_reported_and_lock_released():
+    async def scenario():
+        budgets, verdicts = [], []
+
+        async def check(budget):
+            budgets.append(budget)
+            return PresenceResult(Verdict.OWNER, 20.0, 1, 1), {'detect': 0.01}
+
+        async def on_verdict(result):
+            verdicts.append(result.verdict)
+        monitor = await started_monitor(check, on_verdict)
+        fd = monitor.delay_lock.fd
+        await suspend(monitor)
+        assert budgets == [pytest.approx(MAX_DELAY - SAFETY_MARGIN)]
+        assert verdicts == [Verdict.OWNER]
+        assert not is_open(fd) and not monitor.delay_lock.is_active
+        assert monitor.last_report['budget'] == pytest.approx(MAX_DELAY - SAFETY_MARGIN)
+        await monitor.stop()
+    asyncio.run(scenario())
+
+
+def test_slow_check_cut_off_at_budget():
+    async def scenario():
+        verdicts = []
+
+        async def check(budget):
+            await asyncio.sleep(10)
+            return PresenceResult(Verdict.OWNER), {}
+
+        async def on_verdict(result):
+            verdicts.append(result)
+        monitor = await started_monitor(check, on_verdict)
+        fd = monitor.delay_lock.fd
+        held = await suspend(monitor)
+        assert held < MAX_DELAY  # released before logind would have given up on us
+        assert verdicts == []  # no verdict, so no action
+        assert not is_open(fd)
+        await monitor.stop()
+    asyncio.run(scenario())
+
+
+@pytest.mark.parametrize("failure", ["raises", "hangs"])
+def test_lock_released_when_verdict_action_fails(failure):
+    async def scenario():
+        async def check(budget):
+            return PresenceResult(Verdict.UNKNOWN, 90.0, 1, 1), {}
+
+        async def on_verdict(result):
+            if failure == "raises":
+                raise RuntimeError("lock screen failed")
+            await asyncio.sleep(10)
+        monitor = await started_monitor(check, on_verdict)
+        fd = monitor.delay_lock.fd
+        held = await suspend(monitor)
+        assert held < MAX_DELAY
+        assert not is_open(fd) and not monitor.delay_lock.is_active
+        await monitor.stop()
+    asyncio.run(scenario())
+
+
+def test_lock_released_when_check_fails():
+    async def scenario():
+        async def check(budget):
+            raise RuntimeError("camera gone")
+        monitor = await started_monitor(check)
+        fd = monitor.delay_lock.fd
+        await suspend(monitor)
+        assert not is_open(fd)
+        await monitor.stop()
+    asyncio.run(scenario())
+
+
+def test_lock_retaken_after_resume():
+    async def scenario():
+        async def check(budget):
+            return PresenceResult(Verdict.NO_FACE, frames=1), {}
+        monitor = await started_monitor(check)
+        await suspend(monitor)
+        assert not monitor.delay_lock.is_active
+
+        monitor._handle_signal(prepare_for_sleep(monitor, False))
+        await monitor._task
+        assert monitor.delay_lock.is_active and is_open(monitor.delay_lock.fd)
+        assert len(monitor.bus_manager.fds) == 2
+
+        fd = monitor.delay_lock.fd
+        await monitor.stop()
+        assert not is_open(fd)
+        assert monitor.bus_manager.handlers == []
+    asyncio.run(scenario())
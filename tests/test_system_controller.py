@@ -0,0 +1,111 @@
+"""Inhibitor lease: renewal, re-verification and stall handling"""
+
+import asyncio
+import time
+
+from src.core.system_controller import SystemController
+
+
+class LeaseController(SystemController):
+    """SystemController without D-Bus: counts releases instead of calling inhibitors"""
+
+    def __init__(self, verifier=None, verify_timeout=0.05):
+        super().__init__(bus_manager=object(), action_backend=object(), inhibitor_backends=(),
+                         verify_timeout=verify_timeout, presence_verifier=verifier)
+        self.released = 0
+
+    async def uninhibit_idle(self) -> bool:
+        self._stop_lease()
+        self.released += 1
+        return True
+
+
+class Verifier:
+    def __init__(self, present=True, delay=0.0):
+        self.present = present
+        self.delay = delay
+        self.calls = 0
+
+    async def __call__(self) -> bool:
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return self.present
+
+
+def test_lease_renewed_while_verified():
+    async def scenario():
+        verifier = Verifier()
+        controller = LeaseController(verifier)
+        controller._start_lease(0.1)
+        await asyncio.sleep(0.35)
+        assert verifier.calls >= 2
+        assert controller.lease_expiry is not None
+        assert controller.released == 0
+        controller._stop_lease()
+    asyncio.run(scenario())
+
+
+def test_renew_lease_postpones_verification():
+    async def scenario():
+        verifier = Verifier()
+        controller = LeaseController(verifier, verify_timeout=0.1)
+        controller._start_lease(0.3)  # first verification due at 0.2
+        await asyncio.sleep(0.1)
+        assert controller.renew_lease(0.3)  # now due at 0.3
+        await asyncio.sleep(0.15)
+        assert verifier.calls == 0
+        await asyncio.sleep(0.15)
+        assert verifier.calls == 1
+        assert controller.released == 0
+        controller._stop_lease()
+    asyncio.run(scenario())
+
+
+def test_renew_lease_without_lease():
+    async def scenario():
+        assert not LeaseController(Verifier()).renew_lease()
+    asyncio.run(scenario())
+
+
+def test_lease_released_when_owner_gone():
+    async def scenario():
+        verifier = Verifier(present=False)
+        controller = LeaseController(verifier)
+        controller._start_lease(0.1)
+        await asyncio.sleep(0.2)
+        assert verifier.calls == 1
+        assert controller.released == 1
+        assert controller.lease_expiry is None
+    asyncio.run(scenario())
+
+
+def test_lease_released_when_verification_times_out():
+    async def scenario():
+        verifier = Verifier(delay=1.0)
+        controller = LeaseController(verifier, verify_timeout=0.05)
+        controller._start_lease(0.1)
+        await asyncio.sleep(0.2)
+        assert verifier.calls == 1
+        assert controller.released == 1
+    asyncio.run(scenario())
+
+
+def test_lease_expires_without_verifier():
+    async def scenario():
+        controller = LeaseController()
+        controller._start_lease(0.1)
+        await asyncio.sleep(0.2)
+        assert controller.released == 1
+    asyncio.run(scenario())
+
+
+def test_stalled_loop_releases_without_verifying():
+    async def scenario():
+        verifier = Verifier()
+        controller = LeaseController(verifier)
+        controller._start_lease(0.1)
+        time.sleep(0.15)  # block the event loop past the expiry
+        await asyncio.sleep(0.05)
+        assert verifier.calls == 0
+        assert controller.released == 1
+    asyncio.run(scenario())